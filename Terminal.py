@@ -163,10 +163,9 @@ def _render_tool(tool_id: str, tool_name: str, tab_idx: int = 0):
     """Rend le contenu d'un outil dans un onglet."""
 
     # ── Imports paresseux ──
-    import yfinance as yf
+    from chart_module import http_client, market_data
     import pandas as pd
     import plotly.graph_objects as go
-    import requests
     import numpy as np
 
     if tool_id == "PORTFOLIO":
@@ -187,8 +186,7 @@ def _render_tool(tool_id: str, tool_name: str, tab_idx: int = 0):
             tf    = st.selectbox("TF", ["1h","4h","1d","1w"], index=1, key=f"tc_tf_{tool_id}_{tab_idx}", label_visibility="collapsed")
         sym = CRYPTOS[pair]
         html = render_chart(symbol=sym, interval=tf, limit=200, height=640,
-                            pair_label=pair, exchange="Binance · Spot", show_ma=True
-                            ) + f"<!-- {sym}:{int(time.time()*1000)} -->"
+                            pair_label=pair, exchange="Binance · Spot", show_ma=True)
         components.html(html, height=650, scrolling=False)
 
     elif tool_id == "CHART_STOCK":
@@ -236,7 +234,7 @@ def _render_tool(tool_id: str, tool_name: str, tab_idx: int = 0):
         st.markdown("### ₿ Bitcoin Dominance")
         col1, col2, col3 = st.columns(3)
         try:
-            r = requests.get("https://api.coingecko.com/api/v3/global", timeout=8)
+            r = http_client.get("https://api.coingecko.com/api/v3/global", timeout=8)
             dom = r.json()["data"]["market_cap_percentage"]["btc"]
             col1.metric("BTC Dominance", f"{dom:.1f}%")
         except:
@@ -338,7 +336,7 @@ def _render_tool(tool_id: str, tool_name: str, tab_idx: int = 0):
     elif tool_id == "FEAR_GREED":
         st.markdown("### 😨 Fear & Greed Index")
         try:
-            r = requests.get("https://api.alternative.me/fng/?limit=30", timeout=8)
+            r = http_client.get("https://api.alternative.me/fng/?limit=30", timeout=8)
             data = r.json()["data"]
             current = data[0]
             val   = int(current["value"])
@@ -367,7 +365,7 @@ def _render_tool(tool_id: str, tool_name: str, tab_idx: int = 0):
         st.markdown("### 🔗 Corrélation inter-actifs")
         SYMS = {"BTC":"BTC-USD","ETH":"ETH-USD","SOL":"SOL-USD","AAPL":"AAPL","NVDA":"NVDA","SPY":"SPY","GLD":"GLD"}
         try:
-            df_all = yf.download(list(SYMS.values()), period="6mo", progress=False)["Close"]
+            df_all = market_data.download(list(SYMS.values()), period="6mo", progress=False)["Close"]
             df_all.columns = list(SYMS.keys())
             corr = df_all.corr()
             fig = go.Figure(go.Heatmap(
@@ -409,7 +407,7 @@ def _render_tool(tool_id: str, tool_name: str, tab_idx: int = 0):
         }
         try:
             tickers = list(WATCH.values())
-            data = yf.download([t[0] for t in tickers], period="2d", progress=False)["Close"]
+            data = market_data.download([t[0] for t in tickers], period="2d", progress=False)["Close"]
             cols_m = st.columns(4)
             for i, (name, (sym, cat)) in enumerate(WATCH.items()):
                 try:
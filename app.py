@@ -1,7 +1,9 @@
 import streamlit as st
 import yfinance as yf
+from chart_module import market_data
 import pandas as pd
-import requests
+from chart_module import http_client
+from chart_module import fundamentals_store
 import feedparser
 import streamlit.components.v1 as components
 from datetime import datetime, timedelta
@@ -51,18 +53,9 @@ iframe { border: none; }
 #  HELPERS
 # ══════════════════════════════════════════════
 
-def _get(url, params=None, retries=2, timeout=10):
-    for _ in range(retries):
-        try:
-            r = requests.get(url, params=params, timeout=timeout)
-            if r.status_code == 429:
-                time.sleep(2)
-                continue
-            if r.status_code == 200:
-                return r.json()
-        except:
-            pass
-    return None
+def _get(url, params=None, timeout=10):
+    # Retry/backoff (429, 5xx) et keep-alive gérés par la session partagée
+    return http_client.get_json(url, params=params, timeout=timeout)
 
 PLOTLY_BASE = dict(
     template="plotly_dark", paper_bgcolor="#000000", plot_bgcolor="#0a0a0a",
@@ -924,7 +917,7 @@ def get_crypto_price(symbol):
     # Source 1 : Binance
     try:
         url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}USDT"
-        res = requests.get(url, timeout=3).json()
+        res = http_client.get(url, timeout=3).json()
         if res.get('price'):
             return float(res['price'])
     except:
@@ -937,7 +930,7 @@ def get_crypto_price(symbol):
                   "AVAX":"avalanche-2","LINK":"chainlink","UNI":"uniswap"}
         cg_id = cg_map.get(symbol.upper(), symbol.lower())
         url2 = f"https://api.coingecko.com/api/v3/simple/price?ids={cg_id}&vs_currencies=usd"
-        r2 = requests.get(url2, timeout=4).json()
+        r2 = http_client.get(url2, timeout=4).json()
         if r2.get(cg_id, {}).get("usd"):
             return float(r2[cg_id]["usd"])
     except:
@@ -972,7 +965,7 @@ class ValuationCalculator:
         # Fallback minimal yfinance
         info = {}
         try:
-            hist = self.ticker.history(period="5d")
+            hist = market_data.history(self.symbol, period="5d")
             if not hist.empty:
                 info['currentPrice'] = info['regularMarketPrice'] = float(hist['Close'].iloc[-1])
                 if len(hist) > 1: info['previousClose'] = float(hist['Close'].iloc[-2])
@@ -992,6 +985,9 @@ class ValuationCalculator:
                             operating_cf = cash_flow.loc['Operating Cash Flow'].iloc[0] if 'Operating Cash Flow' in cash_flow.index else 0
                             capex = cash_flow.loc['Capital Expenditure'].iloc[0] if 'Capital Expenditure' in cash_flow.index else 0
                             fcf = operating_cf + capex
+                    if fcf:
+                        fundamentals_store.put(self.symbol, {'freeCashflow': float(fcf)},
+                                               source="yfinance")
                 except Exception:
                     pass
             if not fcf or fcf == 0:
@@ -1018,7 +1014,7 @@ class ValuationCalculator:
             current_price = self.info.get('currentPrice', 0)
             if current_price == 0 or current_price is None:
                 try:
-                    hist = self.ticker.history(period="5d", timeout=5)
+                    hist = market_data.history(self.symbol, period="5d")
                     if not hist.empty:
                         current_price = float(hist['Close'].iloc[-1])
                 except:
@@ -1061,7 +1057,7 @@ class ValuationCalculator:
             current_price = self.info.get('currentPrice', 0)
             if current_price == 0 or current_price is None:
                 try:
-                    hist = self.ticker.history(period="5d", timeout=5)
+                    hist = market_data.history(self.symbol, period="5d")
                     if not hist.empty:
                         current_price = float(hist['Close'].iloc[-1])
                 except:
@@ -1112,7 +1108,7 @@ class ValuationCalculator:
             current_price = self.info.get('currentPrice', 0)
             if current_price == 0 or current_price is None:
                 try:
-                    hist = self.ticker.history(period="5d", timeout=5)
+                    hist = market_data.history(self.symbol, period="5d")
                     if not hist.empty:
                         current_price = float(hist['Close'].iloc[-1])
                 except:
@@ -1146,7 +1142,7 @@ class ValuationCalculator:
 
     def nvt_valuation(self, window=90):
         try:
-            hist = self.ticker.history(period=f"{window}d")
+            hist = market_data.history(self.symbol, period=f"{window}d")
             if hist.empty:
                 return {"error": "Données historiques non disponibles"}
             market_cap = self.info.get('marketCap', 0)
@@ -1202,7 +1198,7 @@ class ValuationCalculator:
             current_price = self.info.get('currentPrice', 0)
             if current_price == 0 or current_price is None:
                 try:
-                    hist = self.ticker.history(period="5d", timeout=5)
+                    hist = market_data.history(self.symbol, period="5d")
                     if not hist.empty:
                         current_price = float(hist['Close'].iloc[-1])
                 except:
@@ -1318,7 +1314,7 @@ class ValuationCalculator:
             # Fallback history si prix toujours à 0
             if not current_price or current_price == 0:
                 try:
-                    hist = self.ticker.history(period="5d", timeout=5)
+                    hist = market_data.history(self.symbol, period="5d")
                     if not hist.empty:
                         current_price = float(hist['Close'].iloc[-1])
                 except:
@@ -1363,7 +1359,6 @@ def get_ticker_info(ticker):
     Récupère les infos — Alpha Vantage en priorité (fonctionne sur Streamlit Cloud),
     curl_cffi yfinance en fallback, CoinGecko/Binance pour la crypto.
     """
-    import requests as _rq
     info = {}
 
     # ══ CRYPTO : CoinGecko + Binance (jamais bloqués) ══
@@ -1376,7 +1371,7 @@ def get_ticker_info(ticker):
                       "DOGE":"dogecoin","DOT":"polkadot","AVAX":"avalanche-2",
                       "LINK":"chainlink","LTC":"litecoin","UNI":"uniswap"}
             cg_id = cg_map.get(sym, sym.lower())
-            _cg = _rq.get(
+            _cg = http_client.get(
                 f"https://api.coingecko.com/api/v3/simple/price?ids={cg_id}&vs_currencies=usd&include_24hr_change=true",
                 timeout=5).json().get(cg_id, {})
             if _cg.get("usd"):
@@ -1391,7 +1386,7 @@ def get_ticker_info(ticker):
         if not info.get('currentPrice'):
             try:
                 sym = ticker.replace("-USD","").upper()
-                _bn = _rq.get(f"https://api.binance.com/api/v3/ticker/24hr?symbol={sym}USDT", timeout=3).json()
+                _bn = http_client.get(f"https://api.binance.com/api/v3/ticker/24hr?symbol={sym}USDT", timeout=3).json()
                 if _bn.get("lastPrice"):
                     info['currentPrice'] = info['regularMarketPrice'] = float(_bn["lastPrice"])
                     info['previousClose'] = float(_bn.get("prevClosePrice", _bn["lastPrice"]))
@@ -1400,13 +1395,18 @@ def get_ticker_info(ticker):
                 pass
         return info if info.get('currentPrice') else None
 
-    # ══ ACTIONS — Alpha Vantage pour US, curl_cffi yfinance pour les autres ══
+    # ══ ACTIONS — fondamentaux depuis le store disque s'il est frais ══
+    snap = fundamentals_store.get(ticker, full=True)
+    if snap:
+        info.update(snap)
+
+    # ══ Alpha Vantage pour US, curl_cffi yfinance pour les autres ══
     is_us = '.' not in ticker and not ticker.endswith('=F')  # MC.PA, TTE.PA = non-US
     av_key = _av_key()
     if av_key and is_us:
         # GLOBAL_QUOTE → prix en temps réel
         try:
-            _r1 = _rq.get("https://www.alphavantage.co/query", params={
+            _r1 = http_client.get("https://www.alphavantage.co/query", params={
                 "function": "GLOBAL_QUOTE", "symbol": ticker, "apikey": av_key
             }, timeout=10)
             _q = _r1.json().get("Global Quote", {})
@@ -1422,79 +1422,102 @@ def get_ticker_info(ticker):
         except Exception:
             pass
 
-        # OVERVIEW → tous les fondamentaux
+        # OVERVIEW → tous les fondamentaux (inutile si snapshot disque)
+        if not snap:
+            try:
+                _r2 = http_client.get("https://www.alphavantage.co/query", params={
+                    "function": "OVERVIEW", "symbol": ticker, "apikey": av_key
+                }, timeout=10)
+                _ov = _r2.json()
+                if _ov.get("Symbol"):
+                    def _f(k): 
+                        v = _ov.get(k)
+                        try: return float(v) if v and v != "None" else None
+                        except: return None
+                    def _s(k): 
+                        v = _ov.get(k)
+                        return v if v and v != "None" else None
+
+                    info['shortName']            = _s("Name") or ticker.upper()
+                    info['longName']             = _s("Name") or ticker.upper()
+                    info['sector']               = _s("Sector")
+                    info['industry']             = _s("Industry")
+                    info['longBusinessSummary']  = _s("Description")
+                    info['country']              = _s("Country")
+                    info['currency']             = _s("Currency") or "USD"
+                    info['exchange']             = _s("Exchange")
+                    info['trailingPE']           = _f("TrailingPE") or _f("PERatio")
+                    info['forwardPE']            = _f("ForwardPE")
+                    info['trailingEps']          = _f("EPS") or _f("DilutedEPSTTM")
+                    info['bookValue']            = _f("BookValue")
+                    info['priceToBook']          = _f("PriceToBookRatio")
+                    info['returnOnEquity']       = _f("ReturnOnEquityTTM")
+                    info['returnOnAssets']       = _f("ReturnOnAssetsTTM")
+                    info['profitMargins']        = _f("ProfitMargin")
+                    info['operatingMargins']     = _f("OperatingMarginTTM")
+                    info['revenueGrowth']        = _f("QuarterlyRevenueGrowthYOY")
+                    info['earningsGrowth']       = _f("QuarterlyEarningsGrowthYOY")
+                    info['dividendYield']        = _f("DividendYield")
+                    info['dividendRate']         = _f("DividendPerShare")
+                    info['marketCap']            = _f("MarketCapitalization")
+                    info['beta']                 = _f("Beta")
+                    info['fiftyTwoWeekHigh']     = _f("52WeekHigh") or info.get('fiftyTwoWeekHigh')
+                    info['fiftyTwoWeekLow']      = _f("52WeekLow")  or info.get('fiftyTwoWeekLow')
+                    info['fiftyDayAverage']      = _f("50DayMovingAverage")
+                    info['twoHundredDayAverage'] = _f("200DayMovingAverage")
+                    info['sharesOutstanding']    = _f("SharesOutstanding")
+                    info['debtToEquity']         = _f("DebtToEquityRatio")
+                    info['fullTimeEmployees']    = _f("FullTimeEmployees")
+                    info['totalRevenue']         = _f("RevenueTTM")
+                    info['grossMargins']         = _f("GrossProfitTTM")
+                    info['freeCashflow']         = _f("FreeCashFlowTTM")
+                    info['analystTargetPrice']   = _f("AnalystTargetPrice")
+                    info['pegRatio']             = _f("PEGRatio")
+                    info['priceToSales']         = _f("PriceToSalesRatioTTM")
+                    info['ebitda']               = _f("EBITDA")
+                    # Calculs dérivés — AV ne les fournit pas directement
+                    _eps    = _f("EPS") or _f("DilutedEPSTTM") or 0
+                    _div    = _f("DividendPerShare") or 0
+                    _rev    = _f("RevenueTTM") or 0
+                    _shares = _f("SharesOutstanding") or 0
+                    _cash   = _f("CashAndCashEquivalentsBalanceSheet") or _f("CashAndShortTermInvestments") or 0
+                    # Payout Ratio = Dividende / EPS
+                    if _eps and _eps > 0 and _div:
+                        info['payoutRatio'] = round(_div / _eps, 4)
+                    # Cash per Share = Cash total / Nombre d'actions
+                    if _cash and _shares and _shares > 0:
+                        info['totalCashPerShare'] = round(_cash / _shares, 4)
+                    # Données supplémentaires DCF
+                    info['totalCash']  = _f("CashAndCashEquivalentsBalanceSheet") or _f("CashAndShortTermInvestments")
+                    info['totalDebt']  = _f("LongTermDebtBalanceSheet") or _f("ShortLongTermDebtTotal")
+                    info['freeCashflow'] = _f("FreeCashFlowTTM") or _f("OperatingCashflowTTM")
+            except Exception:
+                pass
+
+    # ══ Snapshot frais : seuls les champs de prix viennent du réseau ══
+    if snap:
         try:
-            _r2 = _rq.get("https://www.alphavantage.co/query", params={
-                "function": "OVERVIEW", "symbol": ticker, "apikey": av_key
-            }, timeout=10)
-            _ov = _r2.json()
-            if _ov.get("Symbol"):
-                def _f(k): 
-                    v = _ov.get(k)
-                    try: return float(v) if v and v != "None" else None
-                    except: return None
-                def _s(k): 
-                    v = _ov.get(k)
-                    return v if v and v != "None" else None
-
-                info['shortName']            = _s("Name") or ticker.upper()
-                info['longName']             = _s("Name") or ticker.upper()
-                info['sector']               = _s("Sector")
-                info['industry']             = _s("Industry")
-                info['longBusinessSummary']  = _s("Description")
-                info['country']              = _s("Country")
-                info['currency']             = _s("Currency") or "USD"
-                info['exchange']             = _s("Exchange")
-                info['trailingPE']           = _f("TrailingPE") or _f("PERatio")
-                info['forwardPE']            = _f("ForwardPE")
-                info['trailingEps']          = _f("EPS") or _f("DilutedEPSTTM")
-                info['bookValue']            = _f("BookValue")
-                info['priceToBook']          = _f("PriceToBookRatio")
-                info['returnOnEquity']       = _f("ReturnOnEquityTTM")
-                info['returnOnAssets']       = _f("ReturnOnAssetsTTM")
-                info['profitMargins']        = _f("ProfitMargin")
-                info['operatingMargins']     = _f("OperatingMarginTTM")
-                info['revenueGrowth']        = _f("QuarterlyRevenueGrowthYOY")
-                info['earningsGrowth']       = _f("QuarterlyEarningsGrowthYOY")
-                info['dividendYield']        = _f("DividendYield")
-                info['dividendRate']         = _f("DividendPerShare")
-                info['marketCap']            = _f("MarketCapitalization")
-                info['beta']                 = _f("Beta")
-                info['fiftyTwoWeekHigh']     = _f("52WeekHigh") or info.get('fiftyTwoWeekHigh')
-                info['fiftyTwoWeekLow']      = _f("52WeekLow")  or info.get('fiftyTwoWeekLow')
-                info['fiftyDayAverage']      = _f("50DayMovingAverage")
-                info['twoHundredDayAverage'] = _f("200DayMovingAverage")
-                info['sharesOutstanding']    = _f("SharesOutstanding")
-                info['debtToEquity']         = _f("DebtToEquityRatio")
-                info['fullTimeEmployees']    = _f("FullTimeEmployees")
-                info['totalRevenue']         = _f("RevenueTTM")
-                info['grossMargins']         = _f("GrossProfitTTM")
-                info['freeCashflow']         = _f("FreeCashFlowTTM")
-                info['analystTargetPrice']   = _f("AnalystTargetPrice")
-                info['pegRatio']             = _f("PEGRatio")
-                info['priceToSales']         = _f("PriceToSalesRatioTTM")
-                info['ebitda']               = _f("EBITDA")
-                # Calculs dérivés — AV ne les fournit pas directement
-                _eps    = _f("EPS") or _f("DilutedEPSTTM") or 0
-                _div    = _f("DividendPerShare") or 0
-                _rev    = _f("RevenueTTM") or 0
-                _shares = _f("SharesOutstanding") or 0
-                _cash   = _f("CashAndCashEquivalentsBalanceSheet") or _f("CashAndShortTermInvestments") or 0
-                # Payout Ratio = Dividende / EPS
-                if _eps and _eps > 0 and _div:
-                    info['payoutRatio'] = round(_div / _eps, 4)
-                # Cash per Share = Cash total / Nombre d'actions
-                if _cash and _shares and _shares > 0:
-                    info['totalCashPerShare'] = round(_cash / _shares, 4)
-                # Données supplémentaires DCF
-                info['totalCash']  = _f("CashAndCashEquivalentsBalanceSheet") or _f("CashAndShortTermInvestments")
-                info['totalDebt']  = _f("LongTermDebtBalanceSheet") or _f("ShortLongTermDebtTotal")
-                info['freeCashflow'] = _f("FreeCashFlowTTM") or _f("OperatingCashflowTTM")
+            _h = market_data.history(ticker, period="1y")
+            if not _h.empty:
+                _c = _h['Close']
+                _px = {
+                    'currentPrice':         float(_c.iloc[-1]),
+                    'regularMarketPrice':   float(_c.iloc[-1]),
+                    'previousClose':        float(_c.iloc[-2]) if len(_c) > 1 else float(_c.iloc[-1]),
+                    'volume':               int(_h['Volume'].iloc[-1] or 0),
+                    'fiftyTwoWeekHigh':     float(_h['High'].max()),
+                    'fiftyTwoWeekLow':      float(_h['Low'].min()),
+                    'fiftyDayAverage':      float(_c.tail(50).mean()),
+                    'twoHundredDayAverage': float(_c.tail(200).mean()),
+                }
+                for k, v in _px.items():
+                    if not info.get(k):
+                        info[k] = v
         except Exception:
             pass
 
     # ══ Non-US ou fallback : curl_cffi + yfinance ══
-    if not is_us or not info.get('currentPrice') or not info.get('trailingPE'):
+    if not snap and (not is_us or not info.get('currentPrice') or not info.get('trailingPE')):
         yf_info = {}
         # curl_cffi
         try:
@@ -1528,6 +1551,11 @@ def get_ticker_info(ticker):
             if val not in (None, '', 0) and info.get(k) in (None, '', 0, None):
                 info[k] = val
 
+    # ── Persistance des fondamentaux (prix exclus par le store) ──
+    if not snap and (info.get('marketCap') or info.get('trailingPE') or info.get('sector')):
+        fundamentals_store.put(ticker, info, full=True,
+                               source="alphavantage" if av_key and is_us else "yfinance")
+
     # ── Defaults ──
     if not info.get('previousClose') and info.get('currentPrice'):
         info['previousClose'] = info['currentPrice']
@@ -1577,8 +1605,7 @@ def get_ticker_history(ticker, period="2d"):
         pass
     # 2. yfinance fallback
     try:
-        data = yf.Ticker(ticker)
-        hist = data.history(period=period)
+        hist = market_data.history(ticker, period=period)
         if not hist.empty:
             return hist
     except:
@@ -1593,7 +1620,7 @@ def trouver_ticker(nom):
     try:
         url = f"https://query2.finance.yahoo.com/v1/finance/search?q={nom}"
         headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=5).json()
+        response = http_client.get(url, headers=headers, timeout=5).json()
         quotes = response.get('quotes', [])
         # Préférer les actions (EQUITY) aux autres types
         for q in quotes:
@@ -1629,7 +1656,7 @@ def trouver_ticker(nom):
     for base in ["https://query2.finance.yahoo.com", "https://query1.finance.yahoo.com"]:
         try:
             url = f"{base}/v1/finance/search?q={nom}&quotesCount=10&newsCount=0"
-            quotes = requests.get(url, headers=headers, timeout=6).json().get('quotes', [])
+            quotes = http_client.get(url, headers=headers, timeout=6).json().get('quotes', [])
             for qtype in ('EQUITY', 'ETF'):
                 for q in quotes:
                     if q.get('quoteType') == qtype:
@@ -1737,7 +1764,7 @@ def _plotly_candle_pro(symbol, height=600):
         # Fallback Plotly si render_chart échoue
         try:
             from plotly.subplots import make_subplots
-            df = yf.download(symbol, period="6mo", progress=False, auto_adjust=True)
+            df = market_data.download(symbol, period="6mo", progress=False, auto_adjust=True)
             if df.empty:
                 st.warning(f"Pas de données pour {symbol}")
                 return
@@ -1808,7 +1835,7 @@ def afficher_mini_graphique(symbol, chart_id):
     if _is_european(symbol):
         # Plotly mini pour EU
         try:
-            df = yf.download(symbol, period="3mo", progress=False, auto_adjust=True)
+            df = market_data.download(symbol, period="3mo", progress=False, auto_adjust=True)
             if df.empty:
                 st.warning(f"Pas de données pour {symbol}")
                 return
@@ -1868,7 +1895,7 @@ def get_coinbase_order_book(product_id="BTC-USD"):
         if "-" not in clean_symbol:
             clean_symbol = f"{clean_symbol}-USD"
         url = f"https://api.exchange.coinbase.com/products/{clean_symbol}/book?level=2"
-        response = requests.get(url, timeout=5)
+        response = http_client.get(url, timeout=5)
         if response.status_code == 200:
             data = response.json()
             bids = pd.DataFrame(data['bids'], columns=['Price', 'Quantity', 'NumOrders']).astype(float)
@@ -1935,6 +1962,9 @@ if "workspace" not in st.session_state:
 if "multi_charts" not in st.session_state:
     st.session_state.multi_charts = []
 
+# Rafraîchissement périodique du store fondamentaux (un thread par processus)
+fundamentals_store.start_refresher()
+
 # ============================================================
 #  STYLE BLOOMBERG TERMINAL
 # ============================================================
@@ -2297,7 +2327,7 @@ categorie = st.session_state.categorie
 st.sidebar.markdown("---")
 
 if categorie == "ACCUEIL":
-    import datetime, requests as _rq
+    import datetime
 
     # ── Theme toggle ──
     if "theme_mode" not in st.session_state:
@@ -2483,7 +2513,7 @@ if categorie == "ACCUEIL":
         results = {}
         tickers_map = {"BTC-USD":"BTC","ETH-USD":"ETH","^GSPC":"S&P 500","^IXIC":"NASDAQ","^FCHI":"CAC 40","NVDA":"NVDA","AAPL":"AAPL"}
         try:
-            _cg = _rq.get("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin,ethereum&vs_currencies=usd&include_24hr_change=true", timeout=5).json()
+            _cg = http_client.get("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin,ethereum&vs_currencies=usd&include_24hr_change=true", timeout=5).json()
             if _cg.get("bitcoin",{}).get("usd"):
                 results["BTC"] = {"price": float(_cg["bitcoin"]["usd"]), "chg": float(_cg["bitcoin"].get("usd_24h_change",0))}
             if _cg.get("ethereum",{}).get("usd"):
@@ -2518,7 +2548,7 @@ if categorie == "ACCUEIL":
     @st.cache_data(ttl=300)
     def _fetch_fear_greed():
         try:
-            r = _rq.get("https://api.alternative.me/fng/?limit=1", timeout=5)
+            r = http_client.get("https://api.alternative.me/fng/?limit=1", timeout=5)
             d = r.json()["data"][0]
             return int(d["value"]), d["value_classification"]
         except: return 50, "Neutral"
@@ -2526,7 +2556,7 @@ if categorie == "ACCUEIL":
     @st.cache_data(ttl=300)
     def _fetch_crypto_dominance():
         try:
-            r = _rq.get("https://api.coingecko.com/api/v3/global", timeout=5)
+            r = http_client.get("https://api.coingecko.com/api/v3/global", timeout=5)
             d = r.json()["data"]["market_cap_percentage"]
             return round(d.get("btc",0),1), round(d.get("eth",0),1)
         except: return 0, 0
@@ -2539,7 +2569,7 @@ if categorie == "ACCUEIL":
         _hdrs = {"User-Agent":"Mozilla/5.0 Chrome/122.0.0.0","Accept":"application/json","Referer":"https://finance.yahoo.com"}
         action_syms = [s for s in watchlist if "-USD" not in s]
         try:
-            _r = _rq.get(f"https://query2.finance.yahoo.com/v7/finance/quote?symbols={','.join(action_syms)}", headers=_hdrs, timeout=6)
+            _r = http_client.get(f"https://query2.finance.yahoo.com/v7/finance/quote?symbols={','.join(action_syms)}", headers=_hdrs, timeout=6)
             if _r.status_code == 200:
                 for _q in _r.json().get("quoteResponse",{}).get("result",[]):
                     price = float(_q.get("regularMarketPrice",0))
@@ -2548,7 +2578,7 @@ if categorie == "ACCUEIL":
                     movers.append({"sym": _q["symbol"], "price": price, "chg": chg})
         except: pass
         try:
-            _cg = _rq.get("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin,ethereum&vs_currencies=usd&include_24hr_change=true", timeout=5).json()
+            _cg = http_client.get("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin,ethereum&vs_currencies=usd&include_24hr_change=true", timeout=5).json()
             if _cg.get("bitcoin",{}).get("usd"):
                 movers.append({"sym":"BTC","price":float(_cg["bitcoin"]["usd"]),"chg":float(_cg["bitcoin"].get("usd_24h_change",0))})
             if _cg.get("ethereum",{}).get("usd"):
@@ -2829,7 +2859,7 @@ def _get_marquee_prices(watchlist_tuple):
             # ── Crypto : Binance direct (jamais bloqué) ──
             if tkr.endswith("-USD") or tkr.endswith("USDT"):
                 sym = tkr.replace("-USD", "USDT").replace("-", "")
-                r1 = requests.get(f"https://api.binance.com/api/v3/ticker/24hr?symbol={sym}", timeout=5)
+                r1 = http_client.get(f"https://api.binance.com/api/v3/ticker/24hr?symbol={sym}", timeout=5)
                 if r1.status_code == 200:
                     d = r1.json()
                     price = float(d.get("lastPrice", 0))
@@ -2902,7 +2932,6 @@ components.html(marquee_html, height=60)
 # ==========================================
 if outil == "GRAPHIQUE CRYPTO":
     from chart_module import render_chart
-    import time as _t
 
     st.markdown("""
     <div style='display:flex;align-items:center;gap:12px;margin-bottom:12px;'>
@@ -2943,7 +2972,7 @@ if outil == "GRAPHIQUE CRYPTO":
         exchange="Binance · Spot",
         show_ma=True,
         show_bb=False,
-    ) + f"<!-- {symbol}:{tf_choix}:{int(_t.time()*1000)} -->"
+    )
 
     components.html(_html, height=670, scrolling=False)
 
@@ -3006,7 +3035,7 @@ elif outil == "CRYPTO WALLET":
         try:
             url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}USDT"
             headers = {'User-Agent': 'Mozilla/5.0'}
-            response = requests.get(url, headers=headers, timeout=5)
+            response = http_client.get(url, headers=headers, timeout=5)
             if response.status_code == 200:
                 return float(response.json()['price'])
             return yf.Ticker(f"{symbol}-USD").fast_info['last_price']
@@ -3121,7 +3150,7 @@ elif outil == "WHALE WATCHER":
     def get_live_trades():
         try:
             url = "https://api.binance.com/api/v3/trades?symbol=BTCUSDT&limit=50"
-            res = requests.get(url, timeout=2).json()
+            res = http_client.get(url, timeout=2).json()
             return res
         except:
             return []
@@ -3240,8 +3269,7 @@ elif outil == "ANALYSEUR PRO":
     # ── Fallback garanti : si info vide, construire depuis history + états financiers ──
     if not info.get('currentPrice') and not info.get('previousClose'):
         try:
-            _t   = yf.Ticker(ticker)
-            _h   = _t.history(period="5d")
+            _h   = market_data.history(ticker, period="5d")
             if not _h.empty:
                 if isinstance(_h.columns, pd.MultiIndex):
                     _h.columns = _h.columns.get_level_values(0)
@@ -3254,6 +3282,7 @@ elif outil == "ANALYSEUR PRO":
                     info['regularMarketChangePercent'] = round((_price/_prev - 1)*100, 2)
                 info.setdefault('currency', 'USD' if '.' not in ticker else 'EUR')
                 # Fondamentaux depuis états financiers
+                _t  = yf.Ticker(ticker)
                 _fi = _t.fast_info
                 _sh = getattr(_fi, 'shares', None)
                 _mc = getattr(_fi, 'market_cap', None)
@@ -3571,7 +3600,7 @@ elif outil == "ANALYSE TECHNIQUE PRO":
                     safe_period = "3mo"
                     st.warning("⚠️ Période ajustée à 3mo — SMA50 nécessite au moins 50 jours de données.")
 
-                df = yf.download(ticker_tech, period=safe_period, progress=False, auto_adjust=True)
+                df = market_data.download(ticker_tech, period=safe_period, progress=False, auto_adjust=True)
                 if df.empty:
                     st.error("Aucune donnée disponible pour ce ticker.")
                 else:
@@ -3832,7 +3861,7 @@ elif outil == "FIBONACCI CALCULATOR":
     if st.button("🚀 CALCULER FIBONACCI", key="fib_calc"):
         try:
             with st.spinner("Calcul des niveaux Fibonacci..."):
-                df_fib = yf.download(ticker_fib, period=period_fib, progress=False)
+                df_fib = market_data.download(ticker_fib, period=period_fib, progress=False)
                 if df_fib.empty:
                     st.error("Aucune donnée disponible")
                 else:
@@ -4032,134 +4061,30 @@ elif outil == "BACKTESTING ENGINE":
     if st.button("🚀 LANCER LE BACKTEST", key="bt_launch"):
         try:
             with st.spinner("Backtesting en cours..."):
-                df_bt = yf.download(ticker_bt, period=period_bt, progress=False)
+                df_bt = market_data.download(ticker_bt, period=period_bt, progress=False)
                 if df_bt.empty:
                     st.error("Aucune donnée disponible")
                 else:
                     if isinstance(df_bt.columns, pd.MultiIndex):
                         df_bt.columns = df_bt.columns.get_level_values(0)
 
-                    delta = df_bt['Close'].diff()
-                    gain = delta.copy(); loss = delta.copy()
-                    gain[gain < 0] = 0; loss[loss > 0] = 0; loss = abs(loss)
-                    avg_gain = gain.rolling(window=14).mean()
-                    avg_loss = loss.rolling(window=14).mean()
-                    avg_loss = avg_loss.replace(0, 0.0001)
-                    rs = avg_gain / avg_loss
-                    df_bt['RSI'] = 100 - (100 / (1 + rs))
-
-                    exp1 = df_bt['Close'].ewm(span=12, adjust=False).mean()
-                    exp2 = df_bt['Close'].ewm(span=26, adjust=False).mean()
-                    df_bt['MACD'] = exp1 - exp2
-                    df_bt['Signal'] = df_bt['MACD'].ewm(span=9, adjust=False).mean()
-
-                    bb_p = bb_period if "Bollinger" in strategy else 20
-                    df_bt['BB_SMA'] = df_bt['Close'].rolling(window=bb_p).mean()
-                    df_bt['BB_std'] = df_bt['Close'].rolling(window=bb_p).std()
-                    df_bt['BB_Upper'] = df_bt['BB_SMA'] + (df_bt['BB_std'] * 2)
-                    df_bt['BB_Lower'] = df_bt['BB_SMA'] - (df_bt['BB_std'] * 2)
-
-                    if "Moving Average" in strategy:
-                        df_bt['MA_Fast'] = df_bt['Close'].rolling(window=ma_fast).mean()
-                        df_bt['MA_Slow'] = df_bt['Close'].rolling(window=ma_slow).mean()
-                    else:
-                        df_bt['MA_Fast'] = df_bt['Close'].rolling(window=20).mean()
-                        df_bt['MA_Slow'] = df_bt['Close'].rolling(window=50).mean()
-
-                    df_bt = df_bt.dropna()
-
-                    capital = float(capital_bt)
-                    position = 0; shares = 0; entry_price = 0
-                    trades = []; equity_curve = []
-
-                    for i in range(1, len(df_bt)):
-                        row = df_bt.iloc[i]
-                        prev_row = df_bt.iloc[i-1]
-                        current_price = float(row['Close'])
-                        current_equity = capital if position == 0 else (shares * current_price)
-                        equity_curve.append({'Date': row.name, 'Equity': current_equity})
-
-                        if position == 1 and entry_price > 0:
-                            if stop_loss_pct > 0 and current_price <= entry_price * (1 - stop_loss_pct/100):
-                                capital = shares * current_price * (1 - commission_pct/100)
-                                profit = capital - (shares * entry_price)
-                                trades.append({'Date': row.name, 'Type': 'STOP LOSS', 'Prix': current_price,
-                                               'Shares': shares, 'P/L': profit,
-                                               'P/L %': (profit / (shares * entry_price)) * 100, 'Capital': capital})
-                                position = 0; shares = 0; entry_price = 0; continue
-                            if take_profit_pct > 0 and current_price >= entry_price * (1 + take_profit_pct/100):
-                                capital = shares * current_price * (1 - commission_pct/100)
-                                profit = capital - (shares * entry_price)
-                                trades.append({'Date': row.name, 'Type': 'TAKE PROFIT', 'Prix': current_price,
-                                               'Shares': shares, 'P/L': profit,
-                                               'P/L %': (profit / (shares * entry_price)) * 100, 'Capital': capital})
-                                position = 0; shares = 0; entry_price = 0; continue
-
-                        buy_signal = False; sell_signal = False
-
-                        if strategy == "RSI Oversold/Overbought":
-                            if float(row['RSI']) < rsi_buy and position == 0: buy_signal = True
-                            elif float(row['RSI']) > rsi_sell and position == 1: sell_signal = True
-                        elif strategy == "MACD Crossover":
-                            if float(row['MACD']) > float(row['Signal']) and float(prev_row['MACD']) <= float(prev_row['Signal']) and position == 0: buy_signal = True
-                            elif float(row['MACD']) < float(row['Signal']) and float(prev_row['MACD']) >= float(prev_row['Signal']) and position == 1: sell_signal = True
-                        elif strategy == "Moving Average Cross (Golden Cross)":
-                            if float(row['MA_Fast']) > float(row['MA_Slow']) and float(prev_row['MA_Fast']) <= float(prev_row['MA_Slow']) and position == 0: buy_signal = True
-                            elif float(row['MA_Fast']) < float(row['MA_Slow']) and float(prev_row['MA_Fast']) >= float(prev_row['MA_Slow']) and position == 1: sell_signal = True
-                        elif strategy == "Bollinger Bounce":
-                            if current_price <= float(row['BB_Lower']) and position == 0: buy_signal = True
-                            elif current_price >= float(row['BB_Upper']) and position == 1: sell_signal = True
-                        elif strategy == "Combinée (RSI + MACD)":
-                            if float(row['RSI']) < 35 and float(row['MACD']) > float(row['Signal']) and position == 0: buy_signal = True
-                            elif (float(row['RSI']) > 65 or float(row['MACD']) < float(row['Signal'])) and position == 1: sell_signal = True
-
-                        if buy_signal and position == 0:
-                            shares = (capital * (1 - commission_pct/100)) / current_price
-                            entry_price = current_price
-                            trades.append({'Date': row.name, 'Type': 'BUY', 'Prix': current_price,
-                                           'Shares': shares, 'P/L': 0, 'P/L %': 0, 'Capital': 0})
-                            capital = 0; position = 1
-                        elif sell_signal and position == 1:
-                            capital = shares * current_price * (1 - commission_pct/100)
-                            profit = capital - (shares * entry_price)
-                            trades.append({'Date': row.name, 'Type': 'SELL', 'Prix': current_price,
-                                           'Shares': shares, 'P/L': profit,
-                                           'P/L %': (profit / (shares * entry_price)) * 100, 'Capital': capital})
-                            position = 0; shares = 0; entry_price = 0
-
-                    final_price = float(df_bt['Close'].iloc[-1])
-                    final_value = shares * final_price if position == 1 else capital
-                    total_return = final_value - capital_bt
-                    total_return_pct = (total_return / capital_bt) * 100
-
-                    buy_hold_shares = capital_bt / float(df_bt['Close'].iloc[0])
-                    buy_hold_value = buy_hold_shares * final_price
-                    buy_hold_return = buy_hold_value - capital_bt
-                    buy_hold_return_pct = (buy_hold_return / capital_bt) * 100
-
-                    df_trades = pd.DataFrame(trades)
-                    if len(df_trades) > 0:
-                        completed_trades = df_trades[df_trades['Type'].isin(['SELL', 'STOP LOSS', 'TAKE PROFIT'])]
-                        if len(completed_trades) > 0:
-                            winning_trades = completed_trades[completed_trades['P/L'] > 0]
-                            losing_trades = completed_trades[completed_trades['P/L'] <= 0]
-                            num_trades = len(completed_trades)
-                            num_wins = len(winning_trades); num_losses = len(losing_trades)
-                            win_rate = (num_wins / num_trades * 100) if num_trades > 0 else 0
-                            avg_win = winning_trades['P/L'].mean() if len(winning_trades) > 0 else 0
-                            avg_loss = losing_trades['P/L'].mean() if len(losing_trades) > 0 else 0
-                            equity_series = pd.Series([e['Equity'] for e in equity_curve])
-                            running_max = equity_series.cummax()
-                            drawdown = ((equity_series - running_max) / running_max) * 100
-                            max_drawdown = drawdown.min()
-                            returns = equity_series.pct_change().dropna()
-                            sharpe = (returns.mean() / returns.std()) * np.sqrt(252) if len(returns) > 0 and returns.std() > 0 else 0
-                        else:
-                            num_trades = win_rate = avg_win = avg_loss = max_drawdown = sharpe = 0
-                            num_wins = num_losses = 0
-                    else:
-                        num_trades = win_rate = avg_win = avg_loss = max_drawdown = sharpe = 0
-                        num_wins = num_losses = 0
+                    from chart_module.backtest import run_backtest
+                    bt = run_backtest(
+                        df_bt, strategy, capital_bt,
+                        rsi_buy=rsi_buy if "RSI" in strategy else 30,
+                        rsi_sell=rsi_sell if "RSI" in strategy else 70,
+                        bb_period=bb_period if "Bollinger" in strategy else 20,
+                        ma_fast=ma_fast if "Moving Average" in strategy else 20,
+                        ma_slow=ma_slow if "Moving Average" in strategy else 50,
+                        stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct,
+                        commission_pct=commission_pct,
+                    )
+                    df_bt, df_trades, df_equity = bt["data"], bt["trades"], bt["equity"]
+                    final_value, total_return, total_return_pct = bt["final_value"], bt["total_return"], bt["total_return_pct"]
+                    buy_hold_value, buy_hold_return_pct = bt["buy_hold_value"], bt["buy_hold_return_pct"]
+                    num_trades, num_wins, num_losses = bt["num_trades"], bt["num_wins"], bt["num_losses"]
+                    win_rate, avg_win, avg_loss = bt["win_rate"], bt["avg_win"], bt["avg_loss"]
+                    max_drawdown, sharpe = bt["max_drawdown"], bt["sharpe"]
 
                     st.markdown("---")
                     st.markdown("## 📊 RÉSULTATS DU BACKTEST")
@@ -4195,13 +4120,10 @@ elif outil == "BACKTESTING ENGINE":
                     col_avg = st.columns(3)
                     with col_avg[0]: st.metric("Gain Moyen", f"${avg_win:+,.0f}")
                     with col_avg[1]: st.metric("Perte Moyenne", f"${avg_loss:+,.0f}")
-                    with col_avg[2]:
-                        profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else 0
-                        st.metric("Profit Factor", f"{profit_factor:.2f}")
+                    with col_avg[2]: st.metric("Profit Factor", f"{bt['profit_factor']:.2f}")
 
                     st.markdown("---")
                     st.markdown("### 📈 EQUITY CURVE")
-                    df_equity = pd.DataFrame(equity_curve)
                     fig_equity = go.Figure()
                     fig_equity.add_trace(go.Scatter(x=df_equity['Date'], y=df_equity['Equity'],
                                                      fill='tozeroy', name='Portfolio Value',
@@ -4210,15 +4132,14 @@ elif outil == "BACKTESTING ENGINE":
                     fig_equity.add_hline(y=capital_bt, line_dash="dash", line_color="orange",
                                          annotation_text="Capital Initial",
                                          annotation=dict(font=dict(size=10)))
-                    buy_hold_equity = [buy_hold_shares * float(df_bt.loc[date, 'Close']) for date in df_equity['Date']]
-                    fig_equity.add_trace(go.Scatter(x=df_equity['Date'], y=buy_hold_equity,
+                    fig_equity.add_trace(go.Scatter(x=df_equity['Date'], y=bt["buy_hold_equity"],
                                                      name='Buy & Hold', line=dict(color='yellow', width=2, dash='dash')))
                     fig_equity.update_layout(template="plotly_dark", paper_bgcolor='black', plot_bgcolor='black',
                                               title="Évolution du Capital vs Buy & Hold",
                                               xaxis_title="Date", yaxis_title="Valeur ($)", height=500, hovermode='x unified')
                     st.plotly_chart(fig_equity, use_container_width=True)
 
-                    if len(trades) > 0:
+                    if len(df_trades) > 0:
                         st.markdown("---")
                         st.markdown("### 📍 POINTS D'ENTRÉE ET SORTIE")
                         fig_trades = go.Figure()
@@ -4265,6 +4186,15 @@ elif outil == "BACKTESTING ENGINE":
             import traceback
             st.code(traceback.format_exc())
 
+    with st.expander("🔬 OPTIMISATION DES PARAMÈTRES (grid / random / walk-forward)"):
+        def _load_bt():
+            df_opt = market_data.download(ticker_bt, period=period_bt, progress=False)
+            if isinstance(df_opt.columns, pd.MultiIndex):
+                df_opt.columns = df_opt.columns.get_level_values(0)
+            return df_opt
+        interface_finance_marche.show_optimizer(_load_bt, "long", strategy, capital_bt, key="bt_opt",
+                                                fixed={"commission_pct": commission_pct})
+
 # ==========================================
 # OUTIL : VALORISATION FONDAMENTALE
 # ==========================================
@@ -5279,10 +5209,12 @@ elif outil == "DIVIDEND CALENDAR":
         """Récupère les vrais dividendes via yfinance pour chaque ticker."""
         today = datetime.now()
         dividends = []
+        # Fondamentaux depuis le store disque (fiches manquantes téléchargées en lot)
+        snaps = fundamentals_store.get_many(list(tickers_dict), fetch=True)
         for ticker_sym, name in tickers_dict.items():
             try:
                 t = yf.Ticker(ticker_sym)
-                info = t.info or {}
+                info = snaps.get(ticker_sym.upper()) or {}
                 div_hist = t.dividends
                 # Montant dernier dividende réel
                 last_amount = float(div_hist.iloc[-1]) if not div_hist.empty else 0.0
@@ -5296,7 +5228,10 @@ elif outil == "DIVIDEND CALENDAR":
                     div_yield = round(float(raw_yield) * 100, 2)    # décimal → %
                 # Sanity check : un rendement > 25% est suspect → recalcul depuis price+amount
                 if div_yield > 25 and last_amount > 0:
-                    price = info.get("currentPrice") or info.get("regularMarketPrice") or 0
+                    try:
+                        price = float(t.fast_info["last_price"] or 0)
+                    except Exception:
+                        price = 0
                     if price > 0:
                         # Annualiser le dernier dividende
                         freq_mult = {"Mensuel": 12, "Trimestriel": 4, "Semestriel": 2, "Annuel": 1}
@@ -5577,7 +5512,7 @@ elif outil == "CORRÉLATION DASH":
     }
     with st.spinner('Calculating correlations...'):
         try:
-            data = yf.download(list(assets.keys()), period="60d", interval="1d")['Close']
+            data = market_data.download(list(assets.keys()), period="60d", interval="1d")['Close']
             returns = data.pct_change().dropna()
             corr_matrix = returns.corr()
             corr_matrix.columns = [assets[c] for c in corr_matrix.columns]
@@ -5681,7 +5616,7 @@ elif outil == "HEATMAP MARCHÉ":
 
                 for ticker_item, sector in tickers_list:
                     try:
-                        df = yf.download(ticker_item, period=period, progress=False)
+                        df = market_data.download(ticker_item, period=period, progress=False)
                         if not df.empty:
                             if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
                             # Variation : dernière clôture vs avant-dernière (J0 vs J-1)
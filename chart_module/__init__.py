@@ -12,10 +12,11 @@
 # ============================================================
 
 from .chart import render_chart
+from .candles import Candles
 # quant/__init__.py
 from .monte_carlo import estimate_params, merton_jd
 
-__all__ = ["estimate_params", "merton_jd", "render_chart"]
+__all__ = ["Candles", "estimate_params", "merton_jd", "render_chart"]
 
 
 
@@ -0,0 +1,411 @@
+# ============================================================
+#  chart_module/alert_worker.py
+#  Worker d'alertes autonome — aucune session navigateur requise
+#
+#  Boucle planifiée, indépendante de Streamlit :
+#    1. charge les alertes de tous les utilisateurs (Firestore)
+#    2. regroupe les alertes actives par ticker → un seul
+#       téléchargement multi-tickers par cycle ; un ticker déjà
+#       suivi ne reçoit que ses dernières bougies (5 jours)
+#    3. met à jour l'état incrémental de chaque ticker et évalue
+#       toutes les alertes (StreamingAlertEngine)
+#    4. désactive les alertes déclenchées et enregistre ces seuls
+#       déclenchements, par id, sur la version stockée (relecture
+#       + écriture conditionnelle : rien n'écrase l'interface)
+#    5. pousse les emails dans une file envoyée par un thread
+#       dédié (retries), sans bloquer le cycle suivant
+#    6. entre deux cycles, les alertes prix / variation crypto
+#       sont évaluées en temps réel sur le flux Binance
+#
+#  Store et mailer sont injectables : MemoryAlertStore et
+#  MemoryMailer remplacent Firestore et SMTP en local / en test.
+#
+#  LANCEMENT :
+#  ───────────
+#  python -m chart_module.alert_worker              # boucle infinie
+#  python -m chart_module.alert_worker --once       # un seul cycle
+#  python -m chart_module.alert_worker --dry-run    # emails non envoyés
+#  python -m chart_module.alert_worker --no-stream  # sans flux Binance
+#
+#  Configuration (variables d'environnement, sinon
+#  .streamlit/secrets.toml) : FIREBASE_PROJECT_ID,
+#  FIREBASE_SERVICE_ACCOUNT (fichier JSON) ou FIRESTORE_TOKEN,
+#  SMTP_USER, SMTP_PASSWORD.
+# ============================================================
+
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from . import alerts as alert_logic
+from .config import ALERT_INTERVAL, ALERT_EMAIL_RETRIES, ALERT_STREAM
+
+log = logging.getLogger("alert_worker")
+
+
+# ══════════════════════════════════════════════
+#  STORES D'ALERTES
+# ══════════════════════════════════════════════
+
+class MemoryAlertStore:
+    """Stand-in local de Firestore : {uid: {"email": ..., "alerts": [...]}}."""
+
+    def __init__(self, users: dict = None):
+        self.users = users if users is not None else {}
+        self.saves = 0
+
+    def load(self) -> list:
+        return [(uid, u.get("email", ""), u.get("alerts", []))
+                for uid, u in self.users.items()]
+
+    def mark_triggered(self, uid: str, updates: dict) -> bool:
+        """Applique {alert_id: champs} aux alertes stockées de `uid`."""
+        alert_logic.apply_triggers(self.users.get(uid, {}).get("alerts", []), updates)
+        self.saves += 1
+        return True
+
+
+class FirestoreAlertStore:
+    """Collection `users` Firestore (champs `alerts` et `email`)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def load(self) -> list:
+        return [(uid, doc.get("email", ""), doc.get("alerts") or [])
+                for uid, doc in self.client.list_documents("users")]
+
+    def mark_triggered(self, uid: str, updates: dict, attempts: int = 3) -> bool:
+        """
+        Relecture + écriture conditionnelle (updateTime) des alertes de `uid` :
+        seuls les déclenchements `updates` ({alert_id: champs}) sont appliqués,
+        les alertes ajoutées ou supprimées entre-temps par l'interface sont
+        conservées. Rejoué si le document a changé entre lecture et écriture.
+        """
+        path = f"users/{uid}"
+        for _ in range(attempts):
+            doc, update_time = self.client.get_document(path)
+            stored = doc.get("alerts") or []
+            if not alert_logic.apply_triggers(stored, updates):
+                return True                     # alertes supprimées entre-temps
+            if self.client.update_fields(path, {"alerts": stored}, update_time=update_time):
+                return True
+        return False
+
+
+# ══════════════════════════════════════════════
+#  EMAIL
+# ══════════════════════════════════════════════
+
+class SmtpMailer:
+    """Envoi Gmail SMTP (SSL), mêmes réglages que l'écran Alertes."""
+
+    def __init__(self, user: str, password: str, host: str = "smtp.gmail.com", port: int = 465):
+        self.user, self.password, self.host, self.port = user, password, host, port
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"]    = f"AM-Trading 🔔 <{self.user}>"
+        msg["To"]      = to
+        msg.attach(MIMEText(html, "html"))
+        with smtplib.SMTP_SSL(self.host, self.port, timeout=10) as server:
+            server.login(self.user, self.password)
+            server.sendmail(self.user, to, msg.as_string())
+
+
+class MemoryMailer:
+    """Stand-in local de SMTP : les messages sont conservés dans `outbox`."""
+
+    def __init__(self):
+        self.outbox = []
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        self.outbox.append({"to": to, "subject": subject, "html": html})
+
+
+class EmailDispatcher:
+    """File d'emails vidée par un thread dédié (retries avec backoff)."""
+
+    def __init__(self, mailer, retries: int = ALERT_EMAIL_RETRIES, backoff: float = 2.0):
+        self.mailer  = mailer
+        self.retries = retries
+        self.backoff = backoff
+        self.queue   = queue.Queue()
+        self.stats   = {"sent": 0, "failed": 0}
+        self._thread = threading.Thread(target=self._loop, name="alert-mailer", daemon=True)
+        self._thread.start()
+
+    def submit(self, to: str, subject: str, html: str) -> None:
+        self.queue.put((to, subject, html))
+
+    def _loop(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            to, subject, html = item
+            for attempt in range(self.retries + 1):
+                try:
+                    self.mailer.send(to, subject, html)
+                    self.stats["sent"] += 1
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        self.stats["failed"] += 1
+                        log.warning("email vers %s abandonné : %s", to, e)
+                    else:
+                        time.sleep(self.backoff * 2 ** attempt)
+            self.queue.task_done()
+
+    def flush(self) -> None:
+        """Attend que tous les emails en file soient traités."""
+        self.queue.join()
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self._thread.join()
+
+
+# ══════════════════════════════════════════════
+#  WORKER
+# ══════════════════════════════════════════════
+
+def _valid_email(email) -> bool:
+    return bool(email) and email != "Invité" and "@" in email
+
+
+class AlertWorker:
+    """
+    Un cycle = chargement de toutes les alertes, téléchargement groupé
+    (historique `seed_period` pour un nouveau ticker, `update_period`
+    ensuite), mise à jour incrémentale, évaluation, sauvegarde des
+    utilisateurs modifiés et mise en file des emails.
+    `fetch(tickers, period) → {ticker: DataFrame}` est injectable (tests).
+
+    Avec `stream=True`, les alertes prix / variation des cryptos sont en
+    plus évaluées à chaque événement du flux Binance (binance_stream.py),
+    sur le même état incrémental ; `connect` remplace le transport
+    WebSocket (ReplayFeed.connect en test).
+    """
+
+    def __init__(self, store, mailer, fetch=None, interval: float = ALERT_INTERVAL,
+                 seed_period: str = "60d", update_period: str = "5d",
+                 stream: bool = False, connect=None):
+        self.store         = store
+        self.dispatcher    = EmailDispatcher(mailer)
+        self.fetch         = fetch or alert_logic.fetch_frames
+        self.engine        = alert_logic.StreamingAlertEngine()
+        self.interval      = interval
+        self.seed_period   = seed_period
+        self.update_period = update_period
+        self._stop         = threading.Event()
+        self._lock         = threading.RLock()    # état partagé cycle / flux
+        self._owner        = {}                   # id(alerte) → (uid, email)
+        self._fired        = set()                # alert_id déclenchés, pas encore relus inactifs
+        self.stream        = None
+        self._stream_th    = None
+        if stream:
+            from .binance_stream import BinanceAlertStream
+            self.stream = BinanceAlertStream(self.engine, self._on_stream_trigger,
+                                             connect=connect, lock=self._lock)
+
+    def _refresh_prices(self, tickers) -> int:
+        with self._lock:
+            new   = [t for t in tickers if not self.engine.seeded(t)]
+            known = [t for t in tickers if self.engine.seeded(t)]
+        n = 0
+        for group, period in ((new, self.seed_period), (known, self.update_period)):
+            if not group:
+                continue
+            frames = self.fetch(group, period)          # réseau hors verrou
+            with self._lock:
+                for tk, df in frames.items():
+                    self.engine.update_frame(tk, df)
+            n += len(frames)
+        with self._lock:
+            self.engine.prune(tickers)
+        return n
+
+    def _trigger(self, uid: str, email: str, alert: dict, price: float,
+                 change_pct: float, extra: str) -> bool:
+        """Marque l'alerte déclenchée et met l'email en file ; True si email en file."""
+        alert["active"]          = False
+        alert["triggered_at"]    = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        alert["triggered_price"] = round(float(price), 4)
+        if alert.get("notify_email") and _valid_email(email):
+            self.dispatcher.submit(email, alert_logic.email_subject(alert),
+                                   alert_logic.email_body(alert, price, change_pct, extra))
+            return True
+        return False
+
+    def _save(self, uid: str, updates: dict) -> None:
+        """Enregistre les déclenchements {alert_id: champs} de `uid`."""
+        try:
+            if not self.store.mark_triggered(uid, updates):
+                log.warning("alertes de %s modifiées en continu : déclenchements non enregistrés", uid)
+        except Exception as e:
+            log.warning("sauvegarde des alertes de %s impossible : %s", uid, e)
+
+    @staticmethod
+    def _trigger_fields(alert: dict) -> dict:
+        return {k: alert[k] for k in alert_logic.TRIGGER_FIELDS if k in alert}
+
+    def _on_stream_trigger(self, alert: dict, price: float, change_pct: float, extra: str) -> None:
+        # Le flux peut encore évaluer les alertes du cycle précédent pendant
+        # que run_once télécharge : un id déjà déclenché n'est traité qu'une fois.
+        aid = alert_logic.alert_id(alert)
+        with self._lock:
+            who = self._owner.get(id(alert))
+            if who is None or aid in self._fired:
+                return
+            self._fired.add(aid)
+        self._trigger(who[0], who[1], alert, price, change_pct, extra)
+        log.info("flux : %s %s déclenchée à %.4f", alert.get("ticker"), alert.get("type"), price)
+        self._save(who[0], {alert_logic.alert_id(alert): self._trigger_fields(alert)})
+
+    def run_once(self) -> dict:
+        users  = self.store.load()
+        owner  = {}
+        active = []
+        for uid, email, user_alerts in users:
+            for a in user_alerts:
+                if isinstance(a, dict) and a.get("active", True):
+                    owner[id(a)] = (uid, email)
+                    active.append(a)
+
+        groups  = alert_logic.group_by_ticker(active)
+        fetched = self._refresh_prices(list(groups))
+
+        changed, queued, n_trig = {}, 0, 0
+        with self._lock:
+            # Ids déclenchés depuis le dernier chargement (flux, ou sauvegarde
+            # pas encore visible dans `users`) : ni réévalués, ni streamés.
+            self._fired &= {alert_logic.alert_id(a) for a in active}
+            pending = [a for a in active if alert_logic.alert_id(a) not in self._fired]
+            for alert, triggered, price, change_pct, extra in self.engine.evaluate(pending):
+                if not triggered:
+                    continue
+                n_trig += 1
+                self._fired.add(alert_logic.alert_id(alert))
+                uid, email = owner[id(alert)]
+                queued += self._trigger(uid, email, alert, price, change_pct, extra)
+                changed.setdefault(uid, {})[alert_logic.alert_id(alert)] = self._trigger_fields(alert)
+            self._owner = owner
+            if self.stream is not None:
+                self.stream.set_alerts([a for a in pending if a.get("active", True)])
+
+        for uid, updates in changed.items():
+            self._save(uid, updates)
+
+        stats = {"users": len(users), "alerts": len(active), "tickers": len(groups),
+                 "fetched": fetched, "triggered": n_trig, "emails_queued": queued}
+        if self.stream is not None:
+            stats["streamed"] = len(self.stream.symbols)
+        log.info("cycle : %s", stats)
+        return stats
+
+    def start_stream(self) -> None:
+        if self.stream is not None and self._stream_th is None:
+            self._stream_th = threading.Thread(target=self.stream.run,
+                                               name="binance-stream", daemon=True)
+            self._stream_th.start()
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.run_once()
+                self.start_stream()
+            except Exception as e:
+                log.exception("cycle en échec : %s", e)
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self.stream is not None:
+            self.stream.stop()
+
+    def close(self) -> None:
+        if self.stream is not None:
+            self.stream.stop()
+        self.dispatcher.flush()
+        self.dispatcher.close()
+
+
+# ══════════════════════════════════════════════
+#  CONFIGURATION + CLI
+# ══════════════════════════════════════════════
+
+def _secret(name: str, default: str = "") -> str:
+    """Variable d'environnement, sinon .streamlit/secrets.toml."""
+    if os.environ.get(name):
+        return os.environ[name]
+    try:
+        import tomllib
+        with open(os.path.join(".streamlit", "secrets.toml"), "rb") as f:
+            return str(tomllib.load(f).get(name, default))
+    except (ImportError, OSError, ValueError):
+        return default
+
+
+def build_store():
+    from .firestore import FirestoreClient, service_account_token
+
+    project = _secret("FIREBASE_PROJECT_ID")
+    if not project:
+        raise SystemExit("FIREBASE_PROJECT_ID manquant")
+    sa_file = _secret("FIREBASE_SERVICE_ACCOUNT") or _secret("GOOGLE_APPLICATION_CREDENTIALS")
+    token   = service_account_token(sa_file) if sa_file else _secret("FIRESTORE_TOKEN")
+    if not token:
+        raise SystemExit("FIREBASE_SERVICE_ACCOUNT ou FIRESTORE_TOKEN manquant")
+    return FirestoreAlertStore(FirestoreClient(project, token))
+
+
+def build_mailer(dry_run: bool = False):
+    user, password = _secret("SMTP_USER"), _secret("SMTP_PASSWORD")
+    if dry_run or not (user and password):
+        if not dry_run:
+            log.warning("SMTP_USER / SMTP_PASSWORD manquants : emails conservés en mémoire")
+        return MemoryMailer()
+    return SmtpMailer(user, password)
+
+
+def main(argv=None) -> None:
+    import argparse
+    import signal
+
+    parser = argparse.ArgumentParser(description="Worker d'alertes AM-Trading")
+    parser.add_argument("--once", action="store_true", help="un seul cycle puis sortie")
+    parser.add_argument("--interval", type=float, default=ALERT_INTERVAL,
+                        help="secondes entre deux cycles")
+    parser.add_argument("--dry-run", action="store_true", help="n'envoie aucun email")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="pas de flux Binance temps réel (cycles seulement)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    worker = AlertWorker(build_store(), build_mailer(args.dry_run), interval=args.interval,
+                         stream=ALERT_STREAM and not args.no_stream and not args.once)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    try:
+        if args.once:
+            worker.run_once()
+        else:
+            worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
+
+
+if __name__ == "__main__":
+    main()
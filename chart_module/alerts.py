@@ -0,0 +1,350 @@
+# ============================================================
+#  chart_module/alerts.py
+#  Évaluation des alertes — sans Streamlit
+#
+#  Logique partagée entre l'écran Alertes (interface_alertes.py)
+#  et le worker de fond (alert_worker.py) :
+#  • regroupement des alertes par ticker → un seul
+#    téléchargement multi-tickers par cycle
+#  • évaluation en lot : RSI / croisements MA calculés une
+#    fois par ticker, quel que soit le nombre d'alertes
+#  • StreamingAlertEngine : état incrémental par ticker
+#    (chart_module.incremental), mises à jour O(1) par prix
+#  • mises à jour par id (apply_triggers / merge_triggered) :
+#    ni le worker ni l'interface n'écrasent la liste de l'autre
+#
+#  UTILISATION :
+#  ─────────────
+#  from chart_module import alerts
+#  frames  = alerts.fetch_frames({"AAPL", "NVDA"})
+#  results = alerts.evaluate(active_alerts, frames)
+#  for a, triggered, price, chg, extra in results: ...
+# ============================================================
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ALERT_TYPES = [
+    "Prix au-dessus", "Prix en-dessous",
+    "Variation % positive", "Variation % négative",
+    "RSI survente", "RSI surachat",
+    "Croisement MA haussier", "Croisement MA baissier",
+]
+
+MIN_BARS = 5
+
+
+# ══════════════════════════════════════════════
+#  CALCULS TECHNIQUES
+# ══════════════════════════════════════════════
+
+def get_rsi(closes: pd.Series, period: int = 14) -> float:
+    delta = closes.diff()
+    gain  = delta.clip(lower=0).rolling(period).mean()
+    loss  = (-delta.clip(upper=0)).rolling(period).mean()
+    rs    = gain / loss.replace(0, np.nan)
+    rsi   = 100 - (100 / (1 + rs))
+    return float(rsi.iloc[-1]) if not rsi.empty else 50.0
+
+
+def get_ma_cross(closes: pd.Series, fast: int = 20, slow: int = 50) -> dict:
+    """Retourne la position relative des MAs et si croisement récent."""
+    if len(closes) < slow + 5:
+        return {"cross": None, "fast_val": None, "slow_val": None}
+    ma_fast = closes.rolling(fast).mean()
+    ma_slow = closes.rolling(slow).mean()
+    # Croisement haussier : fast passe au-dessus de slow dans les 3 dernières bougies
+    cross_up   = (ma_fast.iloc[-1] > ma_slow.iloc[-1]) and (ma_fast.iloc[-4] < ma_slow.iloc[-4])
+    cross_down = (ma_fast.iloc[-1] < ma_slow.iloc[-1]) and (ma_fast.iloc[-4] > ma_slow.iloc[-4])
+    return {
+        "cross":    "up" if cross_up else ("down" if cross_down else None),
+        "fast_val": round(float(ma_fast.iloc[-1]), 2),
+        "slow_val": round(float(ma_slow.iloc[-1]), 2),
+    }
+
+
+# ══════════════════════════════════════════════
+#  ÉVALUATION
+# ══════════════════════════════════════════════
+
+class _TickerContext:
+    """Indicateurs d'un ticker, calculés à la demande puis réutilisés."""
+
+    def __init__(self, closes: pd.Series):
+        self.closes     = closes
+        self.price      = float(closes.iloc[-1])
+        prev            = float(closes.iloc[-2]) if len(closes) >= 2 else self.price
+        self.change_pct = ((self.price - prev) / prev * 100) if prev else 0
+        self._rsi       = None
+        self._cross     = {}
+
+    @property
+    def rsi(self) -> float:
+        if self._rsi is None:
+            self._rsi = get_rsi(self.closes)
+        return self._rsi
+
+    def ma_cross(self, fast: int, slow: int) -> dict:
+        key = (fast, slow)
+        if key not in self._cross:
+            self._cross[key] = get_ma_cross(self.closes, fast, slow)
+        return self._cross[key]
+
+
+def _evaluate_one(alert: dict, ctx: _TickerContext) -> tuple[bool, float, float, str]:
+    price, change_pct = ctx.price, ctx.change_pct
+    extra     = ""
+    triggered = False
+
+    t = alert["type"]
+
+    if t == "Prix au-dessus":
+        triggered = price >= float(alert["value"])
+
+    elif t == "Prix en-dessous":
+        triggered = price <= float(alert["value"])
+
+    elif t == "Variation % positive":
+        triggered = change_pct >= float(alert["value"])
+
+    elif t == "Variation % négative":
+        triggered = change_pct <= -float(alert["value"])
+
+    elif t == "RSI survente":
+        triggered = ctx.rsi <= float(alert["value"])
+        extra = f"RSI actuel : {ctx.rsi:.1f}"
+
+    elif t == "RSI surachat":
+        triggered = ctx.rsi >= float(alert["value"])
+        extra = f"RSI actuel : {ctx.rsi:.1f}"
+
+    elif t in ("Croisement MA haussier", "Croisement MA baissier"):
+        fast, slow = int(alert.get("ma_fast", 20)), int(alert.get("ma_slow", 50))
+        res = ctx.ma_cross(fast, slow)
+        triggered = res["cross"] == ("up" if t == "Croisement MA haussier" else "down")
+        extra = f"MA{alert.get('ma_fast',20)}={res['fast_val']} / MA{alert.get('ma_slow',50)}={res['slow_val']}"
+
+    return triggered, price, change_pct, extra
+
+
+def check_alert(alert: dict, df: pd.DataFrame) -> tuple[bool, float, float, str]:
+    """
+    Vérifie si une alerte est déclenchée.
+    Retourne : (triggered, current_price, change_pct, extra_info)
+    """
+    return _evaluate_one(alert, _TickerContext(df["Close"].squeeze()))
+
+
+def group_by_ticker(alerts) -> dict:
+    """{ticker: [alertes...]} pour les alertes actives."""
+    groups = {}
+    for a in alerts:
+        if a.get("active", True) and a.get("ticker"):
+            groups.setdefault(str(a["ticker"]).upper().strip(), []).append(a)
+    return groups
+
+
+def fetch_frames(tickers, period: str = "60d") -> dict:
+    """
+    Un seul téléchargement multi-tickers (cache market_data) →
+    {ticker: DataFrame OHLCV aplati}. Les tickers sans données sont absents.
+    """
+    from . import market_data
+
+    tickers = sorted({str(t).upper().strip() for t in tickers if t})
+    if not tickers:
+        return {}
+    try:
+        raw = market_data.download(tickers, period=period, auto_adjust=True)
+    except Exception:
+        return {}
+    if raw is None or raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return {tickers[0]: raw} if len(tickers) == 1 else {}
+    level = 1 if set(tickers) & set(raw.columns.get_level_values(1)) else 0
+    frames = {}
+    for tk in tickers:
+        if tk not in raw.columns.get_level_values(level):
+            continue
+        df = raw.xs(tk, axis=1, level=level).dropna(how="all")
+        if not df.empty:
+            frames[tk] = df
+    return frames
+
+
+def evaluate(alerts, frames: dict) -> list:
+    """
+    Évalue toutes les alertes actives contre `frames` ({ticker: DataFrame}).
+    Retourne [(alert, triggered, price, change_pct, extra), ...] pour les
+    alertes dont le ticker a au moins MIN_BARS clôtures.
+    """
+    out = []
+    for ticker, group in group_by_ticker(alerts).items():
+        df = frames.get(ticker)
+        if df is None:
+            continue
+        closes = df["Close"].squeeze().dropna()
+        if len(closes) < MIN_BARS:
+            continue
+        ctx = _TickerContext(closes)
+        for alert in group:
+            try:
+                out.append((alert, *_evaluate_one(alert, ctx)))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return out
+
+
+class StreamingAlertEngine:
+    """
+    Évaluation sur flux de prix : un TickerState incrémental
+    (chart_module.incremental) par ticker, amorcé une fois depuis
+    l'historique puis mis à jour en O(1) à chaque prix ou bougie.
+    """
+
+    def __init__(self, wilder: bool = False):
+        self.wilder = wilder
+        self.states = {}
+
+    def state(self, ticker: str):
+        from .incremental import TickerState
+
+        tk = ticker.upper().strip()
+        st = self.states.get(tk)
+        if st is None:
+            st = self.states[tk] = TickerState(wilder=self.wilder)
+        return st
+
+    def seeded(self, ticker: str) -> bool:
+        st = self.states.get(ticker.upper().strip())
+        return st is not None and len(st) > 0
+
+    def update_frame(self, ticker: str, df: pd.DataFrame) -> None:
+        """Injecte les bougies de `df` (re-livrer la dernière bougie = tick)."""
+        closes = df["Close"].squeeze().dropna()
+        self.state(ticker).seed(closes.to_numpy(), closes.index)
+
+    def on_price(self, ticker: str, price: float, ts=None):
+        """Nouveau prix pour `ticker` (ts=None → bougie en cours) ; retourne son TickerState."""
+        st = self.state(ticker)
+        if ts is None:
+            st.replace(price)
+        else:
+            st.on_bar(ts, price)
+        return st
+
+    def on_tick(self, ticker: str, price: float, alerts, ts=None) -> list:
+        """Met à jour `ticker` puis évalue ses `alerts` → résultats déclenchés uniquement."""
+        st = self.on_price(ticker, price, ts)
+        if len(st) < MIN_BARS:
+            return []
+        out = []
+        for alert in alerts:
+            res = _evaluate_one(alert, st)
+            if res[0]:
+                out.append((alert, *res))
+        return out
+
+    def evaluate(self, alerts) -> list:
+        """Même sortie que evaluate(alerts, frames), à partir de l'état courant."""
+        out = []
+        for ticker, group in group_by_ticker(alerts).items():
+            st = self.states.get(ticker)
+            if st is None or len(st) < MIN_BARS:
+                continue
+            for alert in group:
+                try:
+                    out.append((alert, *_evaluate_one(alert, st)))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return out
+
+    def prune(self, keep) -> None:
+        """Oublie l'état des tickers qui n'ont plus d'alerte."""
+        keep = {t.upper().strip() for t in keep}
+        for tk in [t for t in self.states if t not in keep]:
+            del self.states[tk]
+
+
+# ══════════════════════════════════════════════
+#  PERSISTANCE — MISES À JOUR PAR IDENTIFIANT
+# ══════════════════════════════════════════════
+#  Le worker et l'écran Alertes écrivent le même champ `alerts` :
+#  aucun des deux ne réécrit la liste telle qu'il l'a lue, les
+#  déclenchements sont appliqués par id sur la version stockée.
+
+TRIGGER_FIELDS = ("active", "triggered_at", "triggered_price")
+
+
+def alert_id(alert: dict) -> str:
+    """Identifiant stable d'une alerte (`id`, sinon empreinte des champs de création)."""
+    if alert.get("id"):
+        return str(alert["id"])
+    return "|".join(str(alert.get(k, "")) for k in ("ticker", "type", "value", "created_at"))
+
+
+def apply_triggers(stored: list, updates: dict) -> int:
+    """
+    Applique `updates` ({alert_id: {champ: valeur}}) aux alertes de `stored`
+    (modifiées en place). Les alertes supprimées entre-temps sont ignorées.
+    Retourne le nombre d'alertes modifiées.
+    """
+    n = 0
+    for a in stored:
+        if isinstance(a, dict) and alert_id(a) in updates:
+            a.update(updates[alert_id(a)])
+            n += 1
+    return n
+
+
+def merge_triggered(local: list, stored: list) -> list:
+    """
+    Liste `local` (écran Alertes, peut-être ancienne) complétée par les
+    déclenchements enregistrés dans `stored` : une alerte désactivée par
+    le worker n'est pas réactivée par une sauvegarde de l'interface.
+    """
+    fired = {alert_id(a): {k: a[k] for k in TRIGGER_FIELDS if k in a}
+             for a in stored
+             if isinstance(a, dict) and not a.get("active", True) and a.get("triggered_at")}
+    out = []
+    for a in local:
+        if isinstance(a, dict) and a.get("active", True) and alert_id(a) in fired:
+            a = {**a, **fired[alert_id(a)]}
+        out.append(a)
+    return out
+
+
+# ══════════════════════════════════════════════
+#  EMAIL
+# ══════════════════════════════════════════════
+
+def email_subject(alert: dict) -> str:
+    return f"🔔 Alerte déclenchée : {alert['ticker']} — {alert['type']}"
+
+
+def email_body(alert: dict, current_price: float, change_pct: float, extra: str = "") -> str:
+    color = "#00ff88" if "au-dessus" in alert["type"] or "positive" in alert["type"] else "#ff4444"
+    return f"""
+    <div style="background:#0d0d0d;color:#fff;font-family:monospace;padding:30px;border-radius:12px;max-width:600px;margin:auto;border:2px solid #ff9800;">
+      <h2 style="color:#ff9800;margin:0 0 20px 0;">🔔 ALERTE DÉCLENCHÉE — AM-Trading</h2>
+      <table style="width:100%;border-collapse:collapse;">
+        <tr><td style="color:#aaa;padding:8px 0;">Ticker</td>
+            <td style="color:#fff;font-weight:bold;font-size:18px;">{alert['ticker']}</td></tr>
+        <tr><td style="color:#aaa;padding:8px 0;">Type</td>
+            <td style="color:#ff9800;">{alert['type']}</td></tr>
+        <tr><td style="color:#aaa;padding:8px 0;">Seuil</td>
+            <td style="color:#fff;">{alert['value']}</td></tr>
+        <tr><td style="color:#aaa;padding:8px 0;">Prix actuel</td>
+            <td style="color:{color};font-size:20px;font-weight:bold;">{current_price:.2f}</td></tr>
+        <tr><td style="color:#aaa;padding:8px 0;">Variation 24h</td>
+            <td style="color:{color};">{change_pct:+.2f}%</td></tr>
+        {'<tr><td style="color:#aaa;padding:8px 0;">Info</td><td style="color:#fff;">' + extra + '</td></tr>' if extra else ''}
+        <tr><td style="color:#aaa;padding:8px 0;">Heure</td>
+            <td style="color:#fff;">{datetime.now().strftime("%d/%m/%Y à %H:%M:%S")}</td></tr>
+      </table>
+      <p style="color:#555;font-size:12px;margin:20px 0 0 0;">AM-Trading Bloomberg Terminal</p>
+    </div>
+    """
@@ -0,0 +1,358 @@
+"""
+backtest.py — Moteur de backtest vectorisé
+===========================================
+Signaux calculés en tableaux NumPy, une seule boucle d'état sur des
+listes de floats (jamais de df.iloc ligne à ligne).
+
+Deux modes partagés par le terminal :
+
+  run_backtest(df, strategy, …)          → long-only à états (BUY / SELL /
+                                           STOP LOSS / TAKE PROFIT), outil
+                                           « BACKTESTING ENGINE » de app.py
+  quant_signal(df, strategy)             → signal −1/0/+1 des stratégies
+  run_positions(df, signal, capital, …)  → backtest position = signal(t−1),
+                                           long/short, show_backtest_quant
+
+Les indicateurs reprennent exactement les formules historiques des deux
+écrans (mêmes fenêtres, même traitement des NaN) : les résultats sont
+identiques à l'ancienne implémentation.
+"""
+
+from __future__ import annotations
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+STRATEGIES = [
+    "RSI Oversold/Overbought",
+    "MACD Crossover",
+    "Moving Average Cross (Golden Cross)",
+    "Bollinger Bounce",
+    "Combinée (RSI + MACD)",
+]
+
+QUANT_STRATEGIES = [
+    "Mean Reversion (Bollinger)",
+    "Momentum (SMA Crossover)",
+    "RSI Reversal",
+    "Breakout Volatilité",
+]
+
+_EXIT_TYPES = ("SELL", "STOP LOSS", "TAKE PROFIT")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  1. INDICATEURS (long-only)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def add_indicators(df: pd.DataFrame, bb_period: int = 20,
+                   ma_fast: int = 20, ma_slow: int = 50) -> pd.DataFrame:
+    """
+    Ajoute RSI(14), MACD(12,26,9), Bollinger(bb_period, 2) et MA rapide /
+    lente au DataFrame OHLCV, puis retire les lignes incomplètes.
+    """
+    df    = df.copy()
+    close = df['Close']
+
+    delta = close.diff()
+    gain = delta.copy(); loss = delta.copy()
+    gain[gain < 0] = 0; loss[loss > 0] = 0; loss = abs(loss)
+    avg_gain = gain.rolling(window=14).mean()
+    avg_loss = loss.rolling(window=14).mean()
+    avg_loss = avg_loss.replace(0, 0.0001)
+    rs = avg_gain / avg_loss
+    df['RSI'] = 100 - (100 / (1 + rs))
+
+    exp1 = close.ewm(span=12, adjust=False).mean()
+    exp2 = close.ewm(span=26, adjust=False).mean()
+    df['MACD']   = exp1 - exp2
+    df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
+
+    df['BB_SMA']   = close.rolling(window=bb_period).mean()
+    df['BB_std']   = close.rolling(window=bb_period).std()
+    df['BB_Upper'] = df['BB_SMA'] + (df['BB_std'] * 2)
+    df['BB_Lower'] = df['BB_SMA'] - (df['BB_std'] * 2)
+
+    df['MA_Fast'] = close.rolling(window=ma_fast).mean()
+    df['MA_Slow'] = close.rolling(window=ma_slow).mean()
+
+    return df.dropna()
+
+
+def _cross_up(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a passe au-dessus de b entre t−1 et t (faux au premier point)."""
+    out = np.zeros(len(a), dtype=bool)
+    out[1:] = (a[1:] > b[1:]) & (a[:-1] <= b[:-1])
+    return out
+
+
+def _cross_down(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(a), dtype=bool)
+    out[1:] = (a[1:] < b[1:]) & (a[:-1] >= b[:-1])
+    return out
+
+
+def entry_exit_signals(df: pd.DataFrame, strategy: str,
+                       rsi_buy: float = 30, rsi_sell: float = 70) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Conditions brutes d'entrée / de sortie par barre (indépendantes de
+    la position), sur un DataFrame issu de add_indicators.
+    """
+    col   = lambda k: df[k].to_numpy(dtype=np.float64)
+    close = col('Close')
+
+    if strategy == "RSI Oversold/Overbought":
+        rsi = col('RSI')
+        return rsi < rsi_buy, rsi > rsi_sell
+    if strategy == "MACD Crossover":
+        macd, sig = col('MACD'), col('Signal')
+        return _cross_up(macd, sig), _cross_down(macd, sig)
+    if strategy == "Moving Average Cross (Golden Cross)":
+        fast, slow = col('MA_Fast'), col('MA_Slow')
+        return _cross_up(fast, slow), _cross_down(fast, slow)
+    if strategy == "Bollinger Bounce":
+        return close <= col('BB_Lower'), close >= col('BB_Upper')
+    if strategy == "Combinée (RSI + MACD)":
+        rsi, macd, sig = col('RSI'), col('MACD'), col('Signal')
+        return (rsi < 35) & (macd > sig), (rsi > 65) | (macd < sig)
+    raise ValueError(f"Stratégie inconnue : {strategy!r}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  2. MOTEUR LONG-ONLY À ÉTATS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def run_backtest(
+    df:              pd.DataFrame,
+    strategy:        str,
+    capital:         float,
+    rsi_buy:         float = 30,
+    rsi_sell:        float = 70,
+    bb_period:       int   = 20,
+    ma_fast:         int   = 20,
+    ma_slow:         int   = 50,
+    stop_loss_pct:   float = 5,
+    take_profit_pct: float = 0,
+    commission_pct:  float = 0.1,
+) -> Dict:
+    """
+    Backtest long-only : tout le capital entre sur signal d'achat, sort
+    sur signal de vente, stop-loss ou take-profit (0 = désactivé), avec
+    commission à l'entrée et à la sortie. Exécution au cours de clôture.
+
+    Retourne
+    --------
+    dict contenant :
+      data         → DataFrame OHLCV + indicateurs (après dropna)
+      trades       → DataFrame [Date, Type, Prix, Shares, P/L, P/L %, Capital]
+      equity       → DataFrame [Date, Equity] (à partir de la 2ᵉ barre)
+      buy_hold_equity → ndarray aligné sur equity
+      final_value, total_return, total_return_pct,
+      buy_hold_value, buy_hold_return, buy_hold_return_pct,
+      num_trades, num_wins, num_losses, win_rate, avg_win, avg_loss,
+      max_drawdown, sharpe, profit_factor
+    """
+    data = add_indicators(df, bb_period=bb_period, ma_fast=ma_fast, ma_slow=ma_slow)
+    return simulate(data, strategy, capital, rsi_buy=rsi_buy, rsi_sell=rsi_sell,
+                    stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct,
+                    commission_pct=commission_pct)
+
+
+def simulate(
+    data:            pd.DataFrame,
+    strategy:        str,
+    capital:         float,
+    rsi_buy:         float = 30,
+    rsi_sell:        float = 70,
+    stop_loss_pct:   float = 5,
+    take_profit_pct: float = 0,
+    commission_pct:  float = 0.1,
+) -> Dict:
+    """
+    Boucle d'état de run_backtest sur un DataFrame d'indicateurs déjà
+    calculé (add_indicators) — réutilisable tel quel par l'optimiseur
+    pour toutes les combinaisons RSI / SL / TP / frais d'une même fenêtre.
+    """
+    buy_c, sell_c = entry_exit_signals(data, strategy, rsi_buy, rsi_sell)
+
+    dates  = data.index
+    closes = data['Close'].to_numpy(dtype=np.float64)
+    prices = closes.tolist()
+    buys   = buy_c.tolist()
+    sells  = sell_c.tolist()
+    n      = len(prices)
+
+    sl_mult  = 1 - stop_loss_pct / 100
+    tp_mult  = 1 + take_profit_pct / 100
+    fee_mult = 1 - commission_pct / 100
+
+    cash = float(capital)
+    position = 0; shares = 0; entry_price = 0
+    trades = []
+    equity = np.empty(max(n - 1, 0), dtype=np.float64)
+
+    def _exit(i, kind, price):
+        value  = shares * price * fee_mult
+        profit = value - (shares * entry_price)
+        trades.append({'Date': dates[i], 'Type': kind, 'Prix': price,
+                       'Shares': shares, 'P/L': profit,
+                       'P/L %': (profit / (shares * entry_price)) * 100, 'Capital': value})
+        return value
+
+    for i in range(1, n):
+        price = prices[i]
+        equity[i - 1] = cash if position == 0 else (shares * price)
+
+        if position == 1 and entry_price > 0:
+            if stop_loss_pct > 0 and price <= entry_price * sl_mult:
+                cash = _exit(i, 'STOP LOSS', price)
+                position = 0; shares = 0; entry_price = 0; continue
+            if take_profit_pct > 0 and price >= entry_price * tp_mult:
+                cash = _exit(i, 'TAKE PROFIT', price)
+                position = 0; shares = 0; entry_price = 0; continue
+
+        if position == 0 and buys[i]:
+            shares = (cash * fee_mult) / price
+            entry_price = price
+            trades.append({'Date': dates[i], 'Type': 'BUY', 'Prix': price,
+                           'Shares': shares, 'P/L': 0, 'P/L %': 0, 'Capital': 0})
+            cash = 0; position = 1
+        elif position == 1 and sells[i]:
+            cash = _exit(i, 'SELL', price)
+            position = 0; shares = 0; entry_price = 0
+
+    final_price = prices[-1]
+    final_value = shares * final_price if position == 1 else cash
+    total_return = final_value - capital
+    bh_shares = capital / prices[0]
+    bh_value  = bh_shares * final_price
+    bh_return = bh_value - capital
+
+    df_equity = pd.DataFrame({'Date': dates[1:], 'Equity': equity})
+    df_trades = pd.DataFrame(trades)
+
+    res = {
+        "data": data, "trades": df_trades, "equity": df_equity,
+        "buy_hold_equity": bh_shares * closes[1:],
+        "final_value": final_value,
+        "total_return": total_return,
+        "total_return_pct": (total_return / capital) * 100,
+        "buy_hold_value": bh_value,
+        "buy_hold_return": bh_return,
+        "buy_hold_return_pct": (bh_return / capital) * 100,
+    }
+    res.update(_trade_metrics(df_trades, df_equity['Equity']))
+    return res
+
+
+def _trade_metrics(df_trades: pd.DataFrame, equity: pd.Series) -> Dict:
+    """Statistiques des trades clôturés + drawdown / Sharpe de l'equity."""
+    out = {"num_trades": 0, "num_wins": 0, "num_losses": 0, "win_rate": 0,
+           "avg_win": 0, "avg_loss": 0, "max_drawdown": 0, "sharpe": 0}
+    if len(df_trades) > 0:
+        completed = df_trades[df_trades['Type'].isin(_EXIT_TYPES)]
+        if len(completed) > 0:
+            wins   = completed[completed['P/L'] > 0]
+            losses = completed[completed['P/L'] <= 0]
+            n_tr   = len(completed)
+            running_max = equity.cummax()
+            drawdown = ((equity - running_max) / running_max) * 100
+            returns  = equity.pct_change().dropna()
+            out.update({
+                "num_trades":   n_tr,
+                "num_wins":     len(wins),
+                "num_losses":   len(losses),
+                "win_rate":     (len(wins) / n_tr * 100) if n_tr > 0 else 0,
+                "avg_win":      wins['P/L'].mean() if len(wins) > 0 else 0,
+                "avg_loss":     losses['P/L'].mean() if len(losses) > 0 else 0,
+                "max_drawdown": drawdown.min(),
+                "sharpe":       (returns.mean() / returns.std()) * np.sqrt(252)
+                                if len(returns) > 0 and returns.std() > 0 else 0,
+            })
+    out["profit_factor"] = abs(out["avg_win"] / out["avg_loss"]) if out["avg_loss"] != 0 else 0
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  3. MODE POSITIONS (signal → position t+1, long/short)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def quant_signal(df: pd.DataFrame, strategy: str, window: int = 20, k: float = 2,
+                 fast: int = 20, slow: int = 50, rsi_n: int = 14,
+                 rsi_lo: float = 30, rsi_hi: float = 70,
+                 atr_n: int = 14, atr_mult: float = 0.5) -> Tuple[pd.Series, str]:
+    """
+    Signal −1 / 0 / +1 par barre pour les stratégies QUANT_STRATEGIES.
+    Ajoute au DataFrame les colonnes d'indicateurs utilisées.
+    Les paramètres par défaut sont ceux de l'écran Backtest Quant.
+    Retourne (signal, nom lisible).
+    """
+    if strategy == "Mean Reversion (Bollinger)":
+        df["sma"]   = df["Close"].rolling(window).mean()
+        df["std"]   = df["Close"].rolling(window).std()
+        df["upper"] = df["sma"] + k * df["std"]
+        df["lower"] = df["sma"] - k * df["std"]
+        close = df["Close"].to_numpy()
+        sig   = np.where(close > df["upper"].to_numpy(), -1,
+                np.where(close < df["lower"].to_numpy(), 1, 0))
+        return pd.Series(sig, index=df.index), f"Bollinger Bands ({window},{k:g})"
+
+    if strategy == "Momentum (SMA Crossover)":
+        df["sma_fast"] = df["Close"].rolling(fast).mean()
+        df["sma_slow"] = df["Close"].rolling(slow).mean()
+        sig = np.where(df["sma_fast"] > df["sma_slow"], 1, -1)
+        return pd.Series(sig, index=df.index), f"SMA {fast}/{slow} Crossover"
+
+    if strategy == "RSI Reversal":
+        delta = df["Close"].diff()
+        gain  = delta.where(delta > 0, 0).rolling(rsi_n).mean()
+        loss  = (-delta.where(delta < 0, 0)).rolling(rsi_n).mean()
+        rs    = gain / loss
+        df["rsi"] = 100 - 100 / (1 + rs)
+        rsi = df["rsi"].to_numpy()
+        sig = np.where(rsi > rsi_hi, -1, np.where(rsi < rsi_lo, 1, 0))
+        return pd.Series(sig, index=df.index), f"RSI({rsi_n}) {rsi_lo:g}/{rsi_hi:g}"
+
+    if strategy == "Breakout Volatilité":
+        df["atr"] = df["High"].rolling(atr_n).max() - df["Low"].rolling(atr_n).min()
+        sig = np.where(df["Close"] > df["Close"].shift(1) + df["atr"]*atr_mult, 1,
+              np.where(df["Close"] < df["Close"].shift(1) - df["atr"]*atr_mult, -1, 0))
+        return pd.Series(sig, index=df.index), "ATR Breakout"
+
+    raise ValueError(f"Stratégie inconnue : {strategy!r}")
+
+
+def run_positions(df: pd.DataFrame, signal, capital: float, fees: float,
+                  rf: float = 0.045) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Backtest vectorisé : position(t) = signal(t−1), frais `fees` (décimal)
+    à chaque changement de position. Ajoute au DataFrame les colonnes
+    returns, signal, position, strat_ret, cum_ret, cum_strat, equity,
+    drawdown et retourne (df, métriques).
+    """
+    df["returns"]   = df["Close"].pct_change()
+    df["signal"]    = signal
+    df["position"]  = df["signal"].shift(1).fillna(0)
+    turnover        = df["position"].diff().fillna(0)
+    df["strat_ret"] = df["position"] * df["returns"] - abs(turnover) * fees
+    df["cum_ret"]   = (1 + df["returns"]).cumprod()
+    df["cum_strat"] = (1 + df["strat_ret"]).cumprod()
+    df["equity"]    = capital * df["cum_strat"]
+    df["drawdown"]  = (df["equity"] / df["equity"].cummax()) - 1
+
+    total_ret = float(df["cum_strat"].iloc[-1]) - 1
+    n_years   = len(df) / 252
+    cagr      = (1 + total_ret) ** (1/n_years) - 1 if n_years > 0 else 0
+    vol_ann   = float(df["strat_ret"].std()) * np.sqrt(252)
+    n_trades  = int((turnover != 0).sum())
+    return df, {
+        "total_ret": total_ret,
+        "bh_ret":    float(df["cum_ret"].iloc[-1]) - 1,
+        "cagr":      cagr,
+        "vol_ann":   vol_ann,
+        "sharpe":    (cagr - rf) / vol_ann if vol_ann > 0 else 0,
+        "max_dd":    float(df["drawdown"].min()),
+        "n_trades":  n_trades,
+        "win_rate":  float((df.loc[df["strat_ret"] != 0, "strat_ret"] > 0).mean()) if n_trades > 0 else 0,
+    }
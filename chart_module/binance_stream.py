@@ -0,0 +1,254 @@
+# ============================================================
+#  chart_module/binance_stream.py
+#  Alertes crypto temps réel — flux combiné Binance (WebSocket)
+#
+#  Une seule connexion multiplexée
+#    wss://stream.binance.com:9443/stream?streams=a@miniTicker/b@miniTicker...
+#  pour tous les tickers crypto ayant une alerte active. Chaque
+#  événement (miniTicker ou trade) met à jour l'état incrémental du
+#  ticker (StreamingAlertEngine) puis évalue ses alertes de prix et
+#  de variation : déclenchement en ~1 s au lieu du cycle suivant.
+#
+#  • reconnexion avec backoff exponentiel (+ jitter), remis à zéro
+#    dès qu'un message est reçu
+#  • reconnexion aussi quand la liste des symboles change
+#  • transport injectable : ReplayFeed rejoue un flux enregistré
+#    (liste de messages ou fichier .jsonl) pour les tests locaux
+#
+#  UTILISATION :
+#  ─────────────
+#  stream = BinanceAlertStream(engine, on_trigger=callback)
+#  stream.set_alerts(active_alerts)
+#  threading.Thread(target=stream.run, daemon=True).start()
+# ============================================================
+
+import json
+import logging
+import random
+import threading
+import time
+
+import pandas as pd
+
+from .config import BINANCE_WS_URL, BINANCE_STREAM_CHANNEL
+
+log = logging.getLogger("binance_stream")
+
+# Types d'alertes évalués à chaque tick (les alertes RSI / MA restent
+# évaluées sur bougies par le cycle du worker)
+STREAM_TYPES = ("Prix au-dessus", "Prix en-dessous",
+                "Variation % positive", "Variation % négative")
+
+_MAX_STREAMS = 1024          # limite Binance par connexion
+
+
+def to_binance_symbol(ticker: str):
+    """'BTC-USD' / 'BTCUSDT' / 'btc' → 'BTCUSDT' ; None si ce n'est pas une crypto USD."""
+    t = str(ticker).upper().strip()
+    if t.endswith("-USD") or t.endswith("-USDT"):
+        return t.split("-")[0] + "USDT"
+    if t.endswith("USDT") and "." not in t and "-" not in t:
+        return t
+    return None
+
+
+def combined_url(symbols, channel: str = BINANCE_STREAM_CHANNEL) -> str:
+    streams = "/".join(f"{s.lower()}@{channel}" for s in sorted(symbols))
+    return f"{BINANCE_WS_URL}?streams={streams}"
+
+
+def parse_event(raw):
+    """
+    Message brut (combiné ou non) → (symbole, prix, horodatage ms) ;
+    None si le message n'est pas un miniTicker / ticker / trade.
+    """
+    try:
+        msg = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+    except ValueError:
+        return None
+    data = msg.get("data", msg) if isinstance(msg, dict) else None
+    if not isinstance(data, dict):
+        return None
+    kind = data.get("e")
+    if kind in ("24hrMiniTicker", "24hrTicker"):
+        price = data.get("c")
+    elif kind in ("trade", "aggTrade"):
+        price = data.get("p")
+    else:
+        return None
+    try:
+        return data["s"].upper(), float(price), int(data.get("E") or data.get("T") or 0)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _day(ts_ms: int):
+    """Bougie journalière (UTC, minuit) d'un événement — même index que l'historique yfinance."""
+    return pd.Timestamp(ts_ms, unit="ms").normalize() if ts_ms else None
+
+
+class BinanceAlertStream:
+    """
+    Abonné au flux combiné Binance. `on_trigger(alert, price, change_pct,
+    extra)` est appelé (thread du flux) pour chaque alerte déclenchée ;
+    l'alerte est désactivée avant l'appel et ne redéclenche pas.
+    `connect(url)` doit retourner un objet avec recv() / close()
+    (websocket-client par défaut, ReplayFeed en test).
+    """
+
+    def __init__(self, engine, on_trigger, connect=None, lock=None,
+                 channel: str = BINANCE_STREAM_CHANNEL, max_backoff: float = 60.0):
+        self.engine      = engine
+        self.on_trigger  = on_trigger
+        self.connect     = connect or _ws_connect
+        self.lock        = lock or threading.Lock()
+        self.channel     = channel
+        self.max_backoff = max_backoff
+        self.routes      = {}          # symbole Binance → {ticker: [alertes]}
+        self.stats       = {"messages": 0, "triggers": 0, "reconnects": 0}
+        self._version    = 0
+        self._stop       = threading.Event()
+        self._conn       = None
+
+    # ── Abonnements ──────────────────────────────────
+    def set_alerts(self, alerts) -> None:
+        """(Re)définit les alertes suivies ; reconnecte si les symboles changent."""
+        routes = {}
+        for a in alerts:
+            if not a.get("active", True) or a.get("type") not in STREAM_TYPES:
+                continue
+            sym = to_binance_symbol(a.get("ticker", ""))
+            if sym:
+                tk = str(a["ticker"]).upper().strip()
+                routes.setdefault(sym, {}).setdefault(tk, []).append(a)
+        with self.lock:
+            changed = set(routes) != set(self.routes)
+            self.routes = routes
+            if changed:
+                self._version += 1
+        if changed:
+            self._close()
+
+    @property
+    def symbols(self) -> list:
+        return sorted(self.routes)[:_MAX_STREAMS]
+
+    # ── Traitement d'un message ──────────────────────
+    def handle(self, raw) -> int:
+        """Traite un message ; retourne le nombre d'alertes déclenchées."""
+        ev = parse_event(raw)
+        if ev is None:
+            return 0
+        sym, price, ts = ev
+        fired = []
+        with self.lock:
+            self.stats["messages"] += 1
+            for ticker, group in self.routes.get(sym, {}).items():
+                live = [a for a in group if a.get("active", True)]
+                if not live:
+                    continue
+                for alert, _, px, chg, extra in self.engine.on_tick(ticker, price, live, _day(ts)):
+                    alert["active"] = False
+                    fired.append((alert, px, chg, extra))
+        for alert, px, chg, extra in fired:
+            self.stats["triggers"] += 1
+            try:
+                self.on_trigger(alert, px, chg, extra)
+            except Exception as e:
+                log.warning("callback de déclenchement en échec : %s", e)
+        return len(fired)
+
+    # ── Boucle de connexion ──────────────────────────
+    def run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            symbols = self.symbols
+            if not symbols:
+                self._stop.wait(1.0)
+                continue
+            version = self._version
+            try:
+                self._conn = self.connect(combined_url(symbols, self.channel))
+                while not self._stop.is_set() and version == self._version:
+                    raw = self._conn.recv()
+                    if not raw:
+                        raise ConnectionError("flux fermé")
+                    self.handle(raw)
+                    backoff = 1.0
+            except Exception as e:
+                if self._stop.is_set() or version != self._version:
+                    continue
+                self.stats["reconnects"] += 1
+                delay = min(self.max_backoff, backoff) * (0.5 + random.random() / 2)
+                log.info("flux Binance interrompu (%s) — reconnexion dans %.1f s", e, delay)
+                self._stop.wait(delay)
+                backoff = min(self.max_backoff, backoff * 2)
+            finally:
+                self._close()
+
+    def _close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._close()
+
+
+def _ws_connect(url: str):
+    from websocket import create_connection
+    return create_connection(url, timeout=30)
+
+
+# ══════════════════════════════════════════════
+#  FLUX REJOUÉ (tests / démo hors ligne)
+# ══════════════════════════════════════════════
+
+class ReplayFeed:
+    """
+    Transport de test : `connect(url)` retourne une connexion qui rejoue
+    `messages` (liste de str/dict ou chemin d'un fichier .jsonl).
+    `drop_every=n` coupe la connexion tous les n messages (test de
+    reconnexion) ; à la fin du flux recv() lève ConnectionError.
+    """
+
+    def __init__(self, messages, drop_every: int = 0, delay: float = 0.0):
+        if isinstance(messages, str):
+            with open(messages, encoding="utf-8") as f:
+                messages = [line.strip() for line in f if line.strip()]
+        self.messages   = [m if isinstance(m, str) else json.dumps(m) for m in messages]
+        self.drop_every = drop_every
+        self.delay      = delay
+        self.pos        = 0
+        self.urls       = []
+
+    def connect(self, url: str):
+        self.urls.append(url)
+        return _ReplayConnection(self)
+
+    @property
+    def done(self) -> bool:
+        return self.pos >= len(self.messages)
+
+
+class _ReplayConnection:
+    def __init__(self, feed: ReplayFeed):
+        self.feed, self.sent, self.closed = feed, 0, False
+
+    def recv(self):
+        f = self.feed
+        if self.closed or f.done or (f.drop_every and self.sent >= f.drop_every):
+            raise ConnectionError("fin du flux rejoué")
+        if f.delay:
+            time.sleep(f.delay)
+        msg = f.messages[f.pos]
+        f.pos += 1
+        self.sent += 1
+        return msg
+
+    def close(self) -> None:
+        self.closed = True
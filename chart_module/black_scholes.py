@@ -0,0 +1,85 @@
+"""
+black_scholes.py — Pricing Black-Scholes-Merton vectorisé
+==========================================================
+Prix + Greeks d'une chaîne d'options complète en une seule passe NumPy.
+
+Toutes les entrées (S, K, T, r, σ, q, is_call) sont des scalaires ou des
+tableaux diffusables (broadcasting NumPy) : une grille strikes × maturités
+se price en une fois, sans boucle Python.
+
+Les intermédiaires coûteux ne sont calculés qu'une fois par contrat :
+  √T, σ√T, e^{-qT}, e^{-rT}, φ(d1), et deux cdf seulement — N(s·d1) et
+  N(s·d2) avec s = +1 (call) / −1 (put), ce qui couvre calls et puts sans
+  perte de précision sur les puts très hors de la monnaie.
+
+Fonctions publiques
+-------------------
+  bs_price_greeks(S, K, T, r, sigma, q, is_call) → dict {price, delta, ...}
+  bs_price(S, K, T, r, sigma, q, is_call)        → prix seul
+
+Conventions (identiques à l'écran Option Pricer) :
+  theta par jour calendaire (/365), vega et rho pour 1 point de %.
+"""
+
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+from scipy.special import ndtr
+
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+
+def bs_price_greeks(S, K, T, r, sigma, q=0.0, is_call=True) -> Dict[str, np.ndarray]:
+    """
+    Prix et Greeks Black-Scholes-Merton (européen, dividende continu q).
+
+    Paramètres
+    ----------
+    S, K    : spot, strike
+    T       : maturité en années (> 0)
+    r, q    : taux sans risque, rendement du dividende (décimaux)
+    sigma   : volatilité (décimal, > 0)
+    is_call : booléen ou tableau de booléens (False = put)
+
+    Retourne
+    --------
+    {price, delta, gamma, theta, vega, rho, d1, d2} — ndarrays à la forme
+    diffusée des entrées (0-d si toutes les entrées sont scalaires).
+    """
+    S, K, T, r, sigma, q = (np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma, q))
+    s = np.where(np.asarray(is_call, dtype=bool), 1.0, -1.0)
+
+    sqrt_t  = np.sqrt(T)
+    sig_rt  = sigma * sqrt_t
+    d1      = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / sig_rt
+    d2      = d1 - sig_rt
+    disc_q  = np.exp(-q * T)
+    disc_r  = np.exp(-r * T)
+    pdf_d1  = _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+    n1      = ndtr(s * d1)               # N(d1) call / N(-d1) put
+    n2      = ndtr(s * d2)               # N(d2) call / N(-d2) put
+
+    s_fwd   = S * disc_q                 # S·e^{-qT}
+    k_disc  = K * disc_r                 # K·e^{-rT}
+
+    price = s * (s_fwd * n1 - k_disc * n2)
+    delta = s * disc_q * n1
+    gamma = disc_q * pdf_d1 / (S * sig_rt)
+    vega  = s_fwd * pdf_d1 * sqrt_t / 100
+    theta = (-(s_fwd * pdf_d1 * sigma) / (2 * sqrt_t)
+             - s * r * k_disc * n2
+             + s * q * s_fwd * n1) / 365
+    rho   = s * K * T * disc_r * n2 / 100
+
+    return {"price": price, "delta": delta, "gamma": gamma, "theta": theta,
+            "vega": vega, "rho": rho, "d1": d1, "d2": d2}
+
+
+def bs_price(S, K, T, r, sigma, q=0.0, is_call=True) -> np.ndarray:
+    """Prix Black-Scholes-Merton seul (mêmes entrées que bs_price_greeks)."""
+    S, K, T, r, sigma, q = (np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma, q))
+    s      = np.where(np.asarray(is_call, dtype=bool), 1.0, -1.0)
+    sig_rt = sigma * np.sqrt(T)
+    d1     = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / sig_rt
+    return s * (S * np.exp(-q * T) * ndtr(s * d1) - K * np.exp(-r * T) * ndtr(s * (d1 - sig_rt)))
@@ -0,0 +1,86 @@
+# ============================================================
+#  chart_module/candle_store.py
+#  Stockage local colonnaire des bougies — un store par
+#  (source, symbole, interval)
+#
+#  Au lieu de re-télécharger toute la fenêtre `limit` à chaque
+#  rendu, data.py ne demande à la source que les bougies
+#  postérieures au dernier timestamp connu, puis les fusionne :
+#  la dernière bougie (encore ouverte) est remplacée, les
+#  nouvelles sont ajoutées en fin de colonnes (NumPy, cf. candles.py).
+# ============================================================
+
+import threading
+
+import numpy as np
+
+from .candles import COLS, Candles
+
+_MAX_BARS = 5_000          # historique conservé par store
+
+
+class CandleStore:
+    """Bougies d'un (source, symbole, interval), triées par timestamp croissant."""
+
+    def __init__(self, max_bars: int = _MAX_BARS):
+        self.max_bars = max_bars
+        self.lock     = threading.Lock()
+        self.candles  = Candles.empty()
+        self.stats    = {"full": 0, "incremental": 0, "bars_fetched": 0}
+
+    def __len__(self) -> int:
+        return len(self.candles)
+
+    @property
+    def last_t(self):
+        return int(self.candles.t[-1]) if len(self.candles) else None
+
+    def reset(self) -> None:
+        self.candles = Candles.empty()
+
+    def merge(self, bars) -> int:
+        """
+        Fusionne des bougies (Candles ou [{t,o,h,l,c,v}, ...]) dans le store.
+        Tout ce qui est stocké à partir du premier timestamp reçu est
+        remplacé (bougie ouverte mise à jour + nouvelles bougies).
+        Les colonnes sont réallouées, jamais modifiées en place : les
+        vues déjà retournées par tail() restent valides.
+        Retourne le nombre de bougies reçues.
+        """
+        new = Candles.from_records(bars)
+        if not len(new):
+            return 0
+        if np.any(np.diff(new.t) < 0):
+            order = np.argsort(new.t, kind="stable")
+            new   = Candles(*(getattr(new, k)[order] for k in COLS))
+        cut    = int(np.searchsorted(self.candles.t, new.t[0], side="left"))
+        merged = Candles.concat([self.candles[:cut], new])
+        self.candles = merged.tail(self.max_bars)
+        self.stats["bars_fetched"] += len(new)
+        return len(new)
+
+    def tail(self, n: int) -> Candles:
+        """Les `n` dernières bougies (vues sur les colonnes du store)."""
+        return self.candles.tail(n)
+
+
+_stores: dict[tuple, CandleStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(source: str, symbol: str, interval: str) -> CandleStore:
+    key = (source.lower(), symbol.upper().strip(), interval.lower())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = CandleStore()
+        return store
+
+
+def store_stats() -> dict:
+    """Taille et compteurs (full / incrémental / bougies reçues) par store."""
+    with _stores_lock:
+        return {
+            "/".join(key): {"bars": len(s), **s.stats}
+            for key, s in _stores.items()
+        }
@@ -0,0 +1,115 @@
+# ============================================================
+#  chart_module/candles.py
+#  Conteneur OHLCV colonnaire — colonnes NumPy parallèles
+#
+#  t : int64   (timestamp unix, secondes)
+#  o, h, l, c, v : float64
+#
+#  Les calculs quant (estimate_params, kelly_full_analysis)
+#  lisent directement `candles.c` sans recopie, et le payload
+#  du graphique est émis colonne par colonne (D.t, D.o, ...),
+#  exactement la forme attendue côté JS — en JSON (to_columns)
+#  ou en binaire base64 (to_payload, amorçage du graphique).
+#
+#  Compatibilité : itération, indexation entière et
+#  to_records() renvoient toujours des dicts {t,o,h,l,c,v}.
+# ============================================================
+
+from __future__ import annotations
+
+import base64
+
+import numpy as np
+
+COLS = ("t", "o", "h", "l", "c", "v")
+
+
+class Candles:
+    """Bougies OHLCV en colonnes NumPy parallèles (ordre chronologique)."""
+
+    __slots__ = COLS
+
+    def __init__(self, t, o, h, l, c, v):
+        self.t = np.asarray(t, dtype=np.int64)
+        self.o = np.asarray(o, dtype=np.float64)
+        self.h = np.asarray(h, dtype=np.float64)
+        self.l = np.asarray(l, dtype=np.float64)
+        self.c = np.asarray(c, dtype=np.float64)
+        self.v = np.asarray(v, dtype=np.float64)
+
+    # ── Constructeurs ──────────────────────────────────────
+    @classmethod
+    def empty(cls) -> "Candles":
+        return cls(*([] for _ in COLS))
+
+    @classmethod
+    def from_records(cls, records) -> "Candles":
+        """Depuis [{t,o,h,l,c,v}, ...] (ou un Candles, renvoyé tel quel)."""
+        if isinstance(records, Candles):
+            return records
+        records = list(records or [])
+        return cls(*([r.get(k, 0) or 0 for r in records] for k in COLS))
+
+    @classmethod
+    def from_rows(cls, rows, idx=(0, 1, 2, 3, 4, 5), t_div: int = 1) -> "Candles":
+        """
+        Depuis des lignes brutes d'API (listes de str/nombres), ex. klines
+        Binance. `idx` donne la position de t,o,h,l,c,v dans chaque ligne,
+        `t_div` convertit le timestamp (1000 pour des millisecondes).
+        """
+        if not rows:
+            return cls.empty()
+        arr = np.asarray([[r[i] for i in idx] for r in rows], dtype=np.float64)
+        return cls(arr[:, 0].astype(np.int64) // t_div,
+                   arr[:, 1], arr[:, 2], arr[:, 3], arr[:, 4], arr[:, 5])
+
+    @classmethod
+    def concat(cls, parts) -> "Candles":
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls.empty()
+        return cls(*(np.concatenate([getattr(p, k) for p in parts]) for k in COLS))
+
+    # ── Accès ──────────────────────────────────────────────
+    def __len__(self) -> int:
+        return int(self.t.shape[0])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Candles(*(getattr(self, k)[i] for k in COLS))
+        return {"t": int(self.t[i]), "o": float(self.o[i]), "h": float(self.h[i]),
+                "l": float(self.l[i]), "c": float(self.c[i]), "v": float(self.v[i])}
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "Candles(0)"
+        return f"Candles({len(self)}, t=[{self.t[0]}..{self.t[-1]}], last_c={self.c[-1]})"
+
+    def tail(self, n: int) -> "Candles":
+        return self[max(0, len(self) - n):]
+
+    def copy(self) -> "Candles":
+        return Candles(*(getattr(self, k).copy() for k in COLS))
+
+    # ── Sérialisation ──────────────────────────────────────
+    def to_records(self) -> list[dict]:
+        """Vue compatible [{t,o,h,l,c,v}, ...] (types Python natifs)."""
+        return [dict(zip(COLS, row)) for row in zip(*(getattr(self, k).tolist() for k in COLS))]
+
+    def to_columns(self) -> dict:
+        """{t:[...], o:[...], ...} — prêt pour json.dumps et le `D` du JS."""
+        return {k: getattr(self, k).tolist() for k in COLS}
+
+    def to_payload(self) -> dict:
+        """
+        Forme compacte pour le JS : {"n": N, "cols": "tohlcv", "b64": ...}
+        où b64 encode les 6 colonnes float64 little-endian bout à bout
+        (t, o, h, l, c, v) — ~11 caractères par valeur au lieu de ~18 en JSON.
+        """
+        mat = np.stack([getattr(self, k).astype("<f8") for k in COLS]) if len(self) \
+            else np.empty((len(COLS), 0), dtype="<f8")
+        return {"n": len(self), "cols": "".join(COLS),
+                "b64": base64.b64encode(np.ascontiguousarray(mat).tobytes()).decode("ascii")}
@@ -1,10 +1,31 @@
+# ============================================================
+#  chart_module/chart.py
+#  Graphique AM.Terminal — gabarit statique + config JSON
+#
+#  Le document HTML/CSS/JS (~3 500 lignes) est un gabarit
+#  STATIQUE compilé une seule fois par processus (_shell).
+#  Seul un petit blob JSON (symbole, timeframe, options,
+#  calibrations quant, bougies amorcées) varie d'un appel à
+#  l'autre ; le JS l'applique au chargement (applyConfig).
+#
+#  Le HTML final est mis en cache (market_data) par jeu de
+#  paramètres pendant le TTL de l'interval : un rerun
+#  Streamlit avec le même symbole / timeframe renvoie la même
+#  chaîne → components.html garde le même iframe.
+# ============================================================
+
 import json
+from functools import lru_cache
+
+from .candles import Candles
 from .data import fetch_ohlcv
 from .config import (
     DEFAULT_SYMBOL, DEFAULT_INTERVAL, DEFAULT_LIMIT,
-    CHART_HEIGHT, VOLUME_HEIGHT, BOTTOM_BAR_H, COLORS
+    CHART_HEIGHT, VOLUME_HEIGHT, BOTTOM_BAR_H
 )
 
+_CFG_MARK = "__AM_CHART_CFG__"
+
 
 def render_chart(
     symbol: str       = DEFAULT_SYMBOL,
@@ -21,25 +42,51 @@ def render_chart(
     show_bb: bool     = False,  # afficher Bollinger Bands
     default_tf: str   = None,   # timeframe actif par défaut (ex: "4h")
 ) -> str:
+    """
+    HTML complet du graphique. Même paramètres → même chaîne tant que
+    les bougies sont en cache (seules les données live sont cachées).
+    """
+    from . import market_data
+    from .config import DATA_SOURCE
+
+    args = (symbol, interval, limit, show_header, show_volume, show_bottom,
+            pair_label, exchange, live_sim, show_ma, show_bb, default_tf)
+
+    def _build():
+        cfg = _chart_config(*args)
+        return _shell().replace(_CFG_MARK, _to_js(cfg), 1), cfg["is_live"]
+
+    html, _ = market_data.cached(("chart_html", DATA_SOURCE.lower()) + args,
+                                 market_data.ttl_for(interval), _build,
+                                 keep=lambda res: res[1])
+    return html
+
+
+def _to_js(cfg: dict) -> str:
+    """JSON sûr à l'intérieur d'un <script> (pas de « </ » littéral)."""
+    return json.dumps(cfg, ensure_ascii=False).replace("</", "<\\/")
 
+
+def _chart_config(
+    symbol, interval, limit, show_header, show_volume, show_bottom,
+    pair_label, exchange, live_sim, show_ma, show_bb, default_tf,
+) -> dict:
+    """Partie variable du graphique (lue par applyConfig() côté JS)."""
     from .config import COINGECKO_IDS, DATA_SOURCE
 
     try:
         candles, is_live = fetch_ohlcv(symbol=symbol, interval=interval, limit=limit)
     except Exception as e:
         print(f"[chart_module] Erreur fetch ({symbol} {interval}): {e}")
-        candles, is_live = [], False
+        candles, is_live = Candles.empty(), False
+
+    # ── Quant : closes lus directement dans la colonne NumPy (sans copie) ──
+    closes = candles.c
 
     # ── Quant : calibration Merton depuis l'historique ──────
     try:
-        from .quant.monte_carlo import estimate_params
-        closes_list: list = []
-        for c in (candles or []):
-            if isinstance(c, dict):
-                closes_list.append(float(c.get('close', c.get('c', 0)) or 0))
-            elif isinstance(c, (list, tuple)) and len(c) >= 5:
-                closes_list.append(float(c[4] or 0))
-        mp       = estimate_params(closes_list, freq=interval.lower())
+        from .monte_carlo import estimate_params
+        mp       = estimate_params(closes, freq=interval.lower())
         mc_mu    = round(mp['mu']    * 100, 2)   # dérive annualisée en %
         mc_sigma = round(mp['sigma'] * 100, 2)   # vol annualisée en %
     except Exception:
@@ -47,9 +94,9 @@ def render_chart(
 
     # ── Quant : Kelly Criterion depuis l'historique ──────────
     try:
-        from kelly import kelly_full_analysis
+        from .kelly import kelly_full_analysis
         kp = kelly_full_analysis(
-            closes   = closes_list,
+            closes   = closes,
             capital  = 10_000.0,
             freq     = interval.lower(),
             fraction = 0.5,
@@ -105,19 +152,11 @@ def render_chart(
     # ── Timeframe actif par défaut ──
     active_tf = default_tf or interval.lower()
 
-    c          = COLORS
-    cd         = json.dumps(candles)
-    n_candles  = len(candles)
-    status_txt = "● LIVE" if is_live else "◎ SIM"
-    status_cls = "live"   if is_live else "sim"
-    run_sim    = "true"   if (not is_live and live_sim) else "false"
-
-    # ── Visibilité des sections ──
-    hdr_display  = "flex"   if show_header else "none"
-    bbar_display = "flex"   if show_bottom else "none"
-    vol_init_js  = "true"   if show_volume else "false"
-    ma_init_js   = "true"   if show_ma     else "false"
-    bb_init_js   = "true"   if show_bb     else "false"
+    # Amorçage du JS depuis les bougies serveur (cache market_data = source unique) ;
+    # seulement si elles sont réelles et du même timeframe que celui affiché,
+    # sinon le JS garde son chargement Binance → CoinGecko.
+    n_candles = len(candles)
+    boot_ok   = is_live and n_candles > 0 and active_tf == interval.lower()
 
     data_info = (
         f"{DATA_SOURCE.upper()} · {n_candles} bougies · LIVE"
@@ -130,34 +169,34 @@ def render_chart(
         "1h":3600,"4h":14400,"1d":86400,"1w":604800
     }.get(interval.lower(), 14400)
 
-    # ── Classes CSS pré-calculées (évite les f-strings imbriquées) ──
-    def _tf(tf):
-        return "tf-btn active" if active_tf == tf else "tf-btn"
-
-    cls_1m  = _tf("1m");  cls_5m  = _tf("5m");  cls_15m = _tf("15m")
-    cls_1h  = _tf("1h");  cls_4h  = _tf("4h");  cls_1d  = _tf("1d");  cls_1w  = _tf("1w")
-    cls_ma  = "indicator-btn on" if show_ma     else "indicator-btn"
-    cls_vol = "indicator-btn on" if show_volume else "indicator-btn"
-    cls_bb  = "indicator-btn on" if show_bb     else "indicator-btn"
-    cls_gc  = "indicator-btn"
-    cls_ob  = "indicator-btn"
-
-    # ── Dépaquetage Kelly pour le f-string (évite NameError sur kp[key]) ──
-    kelly_win_rate      = kp["kelly_win_rate"]
-    kelly_ratio_wl      = kp["kelly_ratio_wl"]
-    kelly_n_candles     = kp["kelly_n_candles"]
-    kelly_mu_pct        = kp["kelly_mu_pct"]
-    kelly_sigma_pct     = kp["kelly_sigma_pct"]
-    kelly_capital       = kp["kelly_capital"]
-    kelly_f_full        = kp["kelly_f_full"]
-    kelly_f_half        = kp["kelly_f_half"]
-    kelly_f_quarter     = kp["kelly_f_quarter"]
-    kelly_f_pct         = kp["kelly_f_pct"]
-    kelly_pos_size      = kp["kelly_pos_size"]
-    kelly_edge_pct      = kp["kelly_edge_pct"]
-    kelly_ruin_risk_pct = kp["kelly_ruin_risk_pct"]
-    kelly_sharpe        = kp["kelly_sharpe"]
+    return {
+        "is_live":        bool(is_live),
+        "pair":           pair_disp,
+        "exchange":       exchange,
+        "source":         DATA_SOURCE.upper(),
+        "status_txt":     "● LIVE" if is_live else "◎ SIM",
+        "status_cls":     "live"   if is_live else "sim",
+        "active_tf":      active_tf,
+        "iv_sec":         iv_sec,
+        "binance_symbol": binance_symbol,
+        "coingecko_id":   coingecko_id,
+        "show_header":    bool(show_header),
+        "show_bottom":    bool(show_bottom),
+        "show_vol":       bool(show_volume),
+        "show_ma":        bool(show_ma),
+        "show_bb":        bool(show_bb),
+        "run_sim":        bool(not is_live and live_sim),
+        "data_info":      data_info,
+        "mc_mu":          mc_mu,
+        "mc_sigma":       mc_sigma,
+        "kelly":          {k: (v.item() if hasattr(v, "item") else v) for k, v in kp.items()},
+        "boot":           candles.to_payload() if boot_ok else None,
+    }
+
 
+@lru_cache(maxsize=1)
+def _shell() -> str:
+    """Gabarit HTML/CSS/JS statique — construit une fois par processus."""
     return f"""<!DOCTYPE html>
 <html>
 <head>
@@ -591,11 +630,11 @@ body.is-fullscreen{{
 <body>
 
 <!-- HEADER -->
-<div class="hdr" style="display:{hdr_display}">
+<div class="hdr" id="hdrBar">
   <div class="logo">AM<span style="color:#fff">.</span>TERMINAL</div>
-  <div class="pair">{pair_disp}</div>
-  <div class="exch">{exchange}</div>
-  <div class="live-badge" style="background:rgba(255,152,0,0.08);color:var(--orange);border:1px solid rgba(255,152,0,0.2);font-size:8px;padding:2px 7px;border-radius:2px;letter-spacing:1px;">{DATA_SOURCE.upper()}</div>
+  <div class="pair" id="pairDisp"></div>
+  <div class="exch" id="exchDisp"></div>
+  <div class="live-badge" style="background:rgba(255,152,0,0.08);color:var(--orange);border:1px solid rgba(255,152,0,0.2);font-size:8px;padding:2px 7px;border-radius:2px;letter-spacing:1px;" id="srcBadge"></div>
   <div class="price-big" id="curPrice">—</div>
   <div class="price-chg up" id="curChg">—</div>
   <div class="ohlc-row">
@@ -605,27 +644,27 @@ body.is-fullscreen{{
     <div class="ohlc-item"><div class="ohlc-lbl">C</div><div class="ohlc-val" id="hc">—</div></div>
   </div>
   <div class="hdr-right">
-    <span class="live-badge {status_cls}" id="apiBadge">{status_txt}</span>
+    <span class="live-badge" id="apiBadge"></span>
   </div>
 </div>
 
 <!-- TOOLBAR -->
 <div class="toolbar">
-  <button class="{cls_1m}" onclick="setTF(this,'1m')">1m</button>
-  <button class="{cls_5m}" onclick="setTF(this,'5m')">5m</button>
-  <button class="{cls_15m}" onclick="setTF(this,'15m')">15m</button>
-  <button class="{cls_1h}" onclick="setTF(this,'1h')">1h</button>
-  <button class="{cls_4h}" onclick="setTF(this,'4h')">4h</button>
-  <button class="{cls_1d}" onclick="setTF(this,'1d')">1D</button>
-  <button class="{cls_1w}" onclick="setTF(this,'1w')">1W</button>
+  <button class="tf-btn" data-tf="1m" onclick="setTF(this,'1m')">1m</button>
+  <button class="tf-btn" data-tf="5m" onclick="setTF(this,'5m')">5m</button>
+  <button class="tf-btn" data-tf="15m" onclick="setTF(this,'15m')">15m</button>
+  <button class="tf-btn" data-tf="1h" onclick="setTF(this,'1h')">1h</button>
+  <button class="tf-btn" data-tf="4h" onclick="setTF(this,'4h')">4h</button>
+  <button class="tf-btn" data-tf="1d" onclick="setTF(this,'1d')">1D</button>
+  <button class="tf-btn" data-tf="1w" onclick="setTF(this,'1w')">1W</button>
   <div class="tb-sep"></div>
-  <button class="{cls_ma}" id="btnMA" onclick="toggleMA()">MA</button>
-  <button class="{cls_vol}" id="btnVol" onclick="toggleVol()">Vol</button>
-  <button class="{cls_bb}" id="btnBB" onclick="toggleBB()">BB</button>
+  <button class="indicator-btn" id="btnMA" onclick="toggleMA()">MA</button>
+  <button class="indicator-btn" id="btnVol" onclick="toggleVol()">Vol</button>
+  <button class="indicator-btn" id="btnBB" onclick="toggleBB()">BB</button>
   <button class="indicator-btn" id="btnRSI" onclick="toggleRSI()">RSI</button>
   <button class="indicator-btn" id="btnMACD" onclick="toggleMACD()">MACD</button>
-  <button class="{cls_gc}" id="btnGC" onclick="toggleGC()" title="Gaussian Channel">GC</button>
-  <button class="{cls_ob}" id="btnOB" onclick="toggleOB()" title="Order Blocks">OB</button>
+  <button class="indicator-btn" id="btnGC" onclick="toggleGC()" title="Gaussian Channel">GC</button>
+  <button class="indicator-btn" id="btnOB" onclick="toggleOB()" title="Order Blocks">OB</button>
 
   <div style="margin-left:auto;display:flex;align-items:center;gap:6px;">
     <button class="fs-btn" id="fsBtn" onclick="toggleFullscreen()" title="Plein écran (F11)" style="height:26px;width:26px;font-size:14px;">⛶</button>
@@ -765,12 +804,12 @@ body.is-fullscreen{{
         </div>
         <div class="field-row">
           <span class="field-lbl">DÉRIVE μ/AN</span>
-          <input class="field-inp" id="mc_mu" value="{mc_mu}" style="max-width:55px">
+          <input class="field-inp" id="mc_mu" value="" style="max-width:55px">
           <span class="field-unit">%</span>
         </div>
         <div class="field-row">
           <span class="field-lbl">VOL σ/AN</span>
-          <input class="field-inp" id="mc_sigma" value="{mc_sigma}" style="max-width:55px">
+          <input class="field-inp" id="mc_sigma" value="" style="max-width:55px">
           <span class="field-unit">%</span>
         </div>
 
@@ -879,7 +918,7 @@ body.is-fullscreen{{
       <div class="tool-body-q">
 
         <div style="font-size:7px;letter-spacing:1.5px;color:#4d9fff;margin:4px 0 2px;border-bottom:1px solid #1a1a1a;padding-bottom:3px;">
-          AUTO-CALIBRÉ <span style="color:#555;font-size:8px;">{kelly_n_candles} bougies</span>
+          AUTO-CALIBRÉ <span style="color:#555;font-size:8px;" id="kelly_n"></span>
         </div>
 
         <!-- Mode tabs -->
@@ -900,12 +939,12 @@ body.is-fullscreen{{
         <div id="kelly_inputs_trade">
           <div class="field-row">
             <span class="field-lbl">WIN RATE</span>
-            <input class="field-inp" id="kelly_p" value="{kelly_win_rate}" style="max-width:55px" oninput="calcKelly()">
+            <input class="field-inp" id="kelly_p" value="" style="max-width:55px" oninput="calcKelly()">
             <span class="field-unit">%</span>
           </div>
           <div class="field-row">
             <span class="field-lbl">RATIO W/L</span>
-            <input class="field-inp" id="kelly_b" value="{kelly_ratio_wl}" style="max-width:55px" oninput="calcKelly()">
+            <input class="field-inp" id="kelly_b" value="" style="max-width:55px" oninput="calcKelly()">
           </div>
         </div>
 
@@ -913,12 +952,12 @@ body.is-fullscreen{{
         <div id="kelly_inputs_ret" style="display:none">
           <div class="field-row">
             <span class="field-lbl">DÉRIVE μ/AN</span>
-            <input class="field-inp" id="kelly_mu" value="{kelly_mu_pct}" style="max-width:55px" oninput="calcKelly()">
+            <input class="field-inp" id="kelly_mu" value="" style="max-width:55px" oninput="calcKelly()">
             <span class="field-unit">%</span>
           </div>
           <div class="field-row">
             <span class="field-lbl">VOL σ/AN</span>
-            <input class="field-inp" id="kelly_sigma" value="{kelly_sigma_pct}" style="max-width:55px" oninput="calcKelly()">
+            <input class="field-inp" id="kelly_sigma" value="" style="max-width:55px" oninput="calcKelly()">
             <span class="field-unit">%</span>
           </div>
         </div>
@@ -926,7 +965,7 @@ body.is-fullscreen{{
         <!-- Capital -->
         <div class="field-row" style="margin-top:4px">
           <span class="field-lbl">CAPITAL</span>
-          <input class="field-inp" id="kelly_capital" value="{kelly_capital}" style="max-width:70px" oninput="calcKelly()">
+          <input class="field-inp" id="kelly_capital" value="" style="max-width:70px" oninput="calcKelly()">
           <span class="field-unit">USDT</span>
         </div>
 
@@ -935,37 +974,37 @@ body.is-fullscreen{{
           <div style="font-size:7px;color:#666;letter-spacing:1px;margin-bottom:4px;">— FRACTIONS KELLY —</div>
           <div class="result-row">
             <span class="result-lbl">FULL KELLY</span>
-            <span class="result-val val-green" id="kelly_r_full">{kelly_f_full}</span>
+            <span class="result-val val-green" id="kelly_r_full"></span>
           </div>
           <div class="result-row">
             <span class="result-lbl">½ KELLY</span>
-            <span class="result-val val-orange" id="kelly_r_half">{kelly_f_half}</span>
+            <span class="result-val val-orange" id="kelly_r_half"></span>
           </div>
           <div class="result-row">
             <span class="result-lbl">¼ KELLY</span>
-            <span class="result-val val-yellow" id="kelly_r_quarter">{kelly_f_quarter}</span>
+            <span class="result-val val-yellow" id="kelly_r_quarter"></span>
           </div>
           <div style="font-size:7px;color:#666;letter-spacing:1px;margin:6px 0 4px;">— SIZING (½ KELLY) —</div>
           <div class="result-row">
             <span class="result-lbl">% DU CAPITAL</span>
-            <span class="result-val val-green" id="kelly_r_pct">{kelly_f_pct}%</span>
+            <span class="result-val val-green" id="kelly_r_pct"></span>
           </div>
           <div class="result-row">
             <span class="result-lbl">TAILLE POSITION</span>
-            <span class="result-val val-green" id="kelly_r_size">${{kelly_pos_size}}</span>
+            <span class="result-val val-green" id="kelly_r_size"></span>
           </div>
           <div style="font-size:7px;color:#666;letter-spacing:1px;margin:6px 0 4px;">— RISQUE —</div>
           <div class="result-row">
             <span class="result-lbl">EDGE</span>
-            <span class="result-val" id="kelly_r_edge">{kelly_edge_pct}%</span>
+            <span class="result-val" id="kelly_r_edge"></span>
           </div>
           <div class="result-row">
             <span class="result-lbl">RISQUE RUINE</span>
-            <span class="result-val val-red" id="kelly_r_ruin">{kelly_ruin_risk_pct}%</span>
+            <span class="result-val val-red" id="kelly_r_ruin"></span>
           </div>
           <div class="result-row">
             <span class="result-lbl">SHARPE</span>
-            <span class="result-val" id="kelly_r_sharpe">{kelly_sharpe}</span>
+            <span class="result-val" id="kelly_r_sharpe"></span>
           </div>
         </div>
 
@@ -1054,7 +1093,7 @@ body.is-fullscreen{{
 </div>
 
 <!-- BOTTOM BAR -->
-<div class="bbar" style="display:{bbar_display}">
+<div class="bbar" id="bbarBar">
   <div class="bstat"><span class="lbl">24H HIGH</span><span class="val" id="b_hi" style="color:var(--bull)">—</span></div>
   <div class="bstat"><span class="lbl">24H LOW</span> <span class="val" id="b_lo" style="color:var(--bear)">—</span></div>
   <div class="bstat"><span class="lbl">CHANGE</span>  <span class="val" id="b_chg">—</span></div>
@@ -1063,16 +1102,78 @@ body.is-fullscreen{{
 
 <script>
 // ════════════════════════════════════════════════════════
-//  DONNÉES — chargées 100% depuis Binance en JS
-//  (aucune donnée Python injectée pour éviter conflit au reload)
+//  CONFIG — seule partie variable du document (JSON injecté
+//  par render_chart) ; le reste est un gabarit statique.
 // ════════════════════════════════════════════════════════
-const SYMBOL_INIT = '{binance_symbol}';
-const IV_INIT     = '{active_tf}';
-const IV_SEC      = {iv_sec};
+const CFG = {_CFG_MARK};
+
+(function applyConfig() {{
+  const $id = id => document.getElementById(id);
+  const K = CFG.kelly;
+  if(!CFG.show_header) $id('hdrBar').style.display = 'none';
+  if(!CFG.show_bottom) $id('bbarBar').style.display = 'none';
+  $id('pairDisp').textContent = CFG.pair;
+  $id('exchDisp').textContent = CFG.exchange;
+  $id('srcBadge').textContent = CFG.source;
+  const badge = $id('apiBadge');
+  badge.textContent = CFG.status_txt;
+  badge.classList.add(CFG.status_cls);
+  document.querySelectorAll('.tf-btn').forEach(b => {{
+    if(b.dataset.tf === CFG.active_tf) b.classList.add('active');
+  }});
+  [['btnMA', CFG.show_ma], ['btnVol', CFG.show_vol], ['btnBB', CFG.show_bb]].forEach(([id, on]) => {{
+    if(on) $id(id).classList.add('on');
+  }});
+  const inputs = {{
+    mc_mu: CFG.mc_mu, mc_sigma: CFG.mc_sigma,
+    kelly_p: K.kelly_win_rate, kelly_b: K.kelly_ratio_wl, kelly_mu: K.kelly_mu_pct,
+    kelly_sigma: K.kelly_sigma_pct, kelly_capital: K.kelly_capital,
+  }};
+  Object.entries(inputs).forEach(([id, v]) => {{ $id(id).value = v; }});
+  const texts = {{
+    kelly_n: K.kelly_n_candles + ' bougies',
+    kelly_r_full: K.kelly_f_full, kelly_r_half: K.kelly_f_half, kelly_r_quarter: K.kelly_f_quarter,
+    kelly_r_pct: K.kelly_f_pct + '%', kelly_r_size: '$' + K.kelly_pos_size,
+    kelly_r_edge: K.kelly_edge_pct + '%', kelly_r_ruin: K.kelly_ruin_risk_pct + '%',
+    kelly_r_sharpe: K.kelly_sharpe,
+  }};
+  Object.entries(texts).forEach(([id, v]) => {{ $id(id).textContent = v; }});
+}})();
+
+// ════════════════════════════════════════════════════════
+//  DONNÉES — amorcées depuis les bougies serveur (BOOT),
+//  puis seul le WebSocket est utilisé. Sans BOOT (mock,
+//  autre timeframe) fetchInit() charge Binance → CoinGecko.
+//  Les changements de TF rechargent côté JS (reloadOHLCV).
+// ════════════════════════════════════════════════════════
+const SYMBOL_INIT = CFG.binance_symbol;
+const IV_INIT     = CFG.active_tf;
+const IV_SEC      = CFG.iv_sec;
+const BOOT        = CFG.boot;   // {{n, cols:"tohlcv", b64}} — float64 LE, colonnes bout à bout
 
-// D démarre VIDE — rempli par fetchInit()
+// D démarre VIDE — rempli par bootFromPayload() ou fetchInit()
 const D = {{ t:[], o:[], h:[], l:[], c:[], v:[] }};
 
+function bootFromPayload(p) {{
+  if(!p || !p.n || !p.b64) return false;
+  try {{
+    const bin = atob(p.b64);
+    const buf = new Uint8Array(bin.length);
+    for(let i=0;i<bin.length;i++) buf[i]=bin.charCodeAt(i);
+    const dv = new DataView(buf.buffer), n = p.n, keys = p.cols.split('');
+    if(bin.length !== n*keys.length*8) return false;
+    keys.forEach((k,j)=>{{
+      const col = D[k], off = j*n*8;
+      for(let i=0;i<n;i++) col.push(dv.getFloat64(off+i*8, true));
+    }});
+    for(let i=0;i<n;i++) D.t[i]=Math.round(D.t[i]);
+    return true;
+  }} catch(e) {{
+    ['t','o','h','l','c','v'].forEach(k=>{{ D[k].length=0; }});
+    return false;
+  }}
+}}
+
 // ════════════════════════════════════════════════════════
 //  CONFIG RENDU
 // ════════════════════════════════════════════════════════
@@ -1086,9 +1187,9 @@ let TIME_SCALE   = 1.0;   // multiplicateur zoom horizontal (>1 = plus de bougie
 // État drag axes
 let axisDrag = null;  // {{type:'y'|'x', startY, startX, startScale, startOffset, startN, startStart}}
 const VPAH = 80;   // hauteur volume
-let showMA  = {ma_init_js};
-let showVol = {vol_init_js};
-let showBB   = {bb_init_js};
+let showMA  = CFG.show_ma;
+let showVol = CFG.show_vol;
+let showBB   = CFG.show_bb;
 let showRSI  = false;
 let showMACD = false;
 const RSI_H  = 80;
@@ -1189,16 +1290,135 @@ function setupCanvas() {{
   if(sepMC) sepMC.style.display=showMACD?'block':'none';
 }}
 
-// ── Calcul MA ──
+// ════════════════════════════════════════════════════════
+//  CACHE D'INDICATEURS
+//  Recalcul complet seulement quand la série change (rechargement,
+//  nouvelle bougie, décalage) ; un tick sur la bougie en cours ne
+//  met à jour que le dernier point (tick() → false = recalcul).
+// ════════════════════════════════════════════════════════
+const IND = {{ shape:'', items:{{}} }};
+const seriesShape = () => {{ const n=D.t.length; return n+'|'+D.t[0]+'|'+D.t[n-1]; }};
+const lastBarSig  = () => {{ const i=D.t.length-1; return D.o[i]+'|'+D.h[i]+'|'+D.l[i]+'|'+D.c[i]+'|'+D.v[i]; }};
+function resetIndicators() {{ IND.shape=''; IND.items={{}}; }}
+
+function indicator(name, build, tick) {{
+  const shape=seriesShape();
+  if(shape!==IND.shape) {{ IND.shape=shape; IND.items={{}}; }}
+  const bar=lastBarSig();
+  let it=IND.items[name];
+  if(!it) it=IND.items[name]={{val:build(), bar}};
+  else if(it.bar!==bar) {{
+    if(!tick || tick(it.val)===false) it.val=build();
+    it.bar=bar;
+  }}
+  return it.val;
+}}
+
+const indMA    = p  => indicator('ma'+p, () => calcMA(D.c,p),  ma => lastMA(D.c,p,ma));
+const indVolMA = () => indicator('vma',  () => calcMA(D.v,20), ma => lastMA(D.v,20,ma));
+const indBB    = () => indicator('bb',   () => calcBB(D.c,20,2), bb => lastBB(D.c,bb,20,2));
+const indGC    = () => indicator('gc',   () => calcGaussianChannel(D.c,D.h,D.l,4,144,1.414),
+                                          gc => gc ? lastGC(D.c,D.h,D.l,gc) : false);
+const indOB    = () => indicator('ob',   () => calcOrderBlocks(D.o,D.h,D.l,D.c,D.v,10,3));
+const indRSI   = () => indicator('rsi',  () => {{ const st={{}}; return {{rsi:calcRSI(D.c,14,st), st}}; }},
+                                          r => lastRSI(D.c,r,14));
+const indMACD  = () => indicator('macd', () => calcMACD(D.c,12,26,9), md => lastMACD(D.c,md,12,26,9));
+
+// ════════════════════════════════════════════════════════
+//  PYRAMIDE LOD — bougies pré-agrégées par 2, 4, 8 … barres
+//  (o = 1re ouverture, h = max, l = min, c = dernière clôture,
+//  v = somme). Le rendu choisit le niveau d'après la largeur en
+//  pixels d'une barre : coût de dessin borné par la largeur du
+//  canvas, quel que soit le nombre de bougies chargées.
+// ════════════════════════════════════════════════════════
+const LOD_MIN_PX = 3;   // largeur minimale (px) d'une bougie dessinée
+
+function lodBucket(prev, L, j) {{
+  const a=2*j, b=Math.min(a+1, prev.h.length-1);
+  L.o[j]=prev.o[a]; L.c[j]=prev.c[b];
+  L.h[j]=Math.max(prev.h[a],prev.h[b]); L.l[j]=Math.min(prev.l[a],prev.l[b]);
+  L.v[j]=prev.v[a]+(b>a?prev.v[b]:0);
+}}
+function buildLOD() {{
+  const levels=[D];
+  let prev=D;
+  while(prev.h.length>1) {{
+    const m=Math.ceil(prev.h.length/2);
+    const L={{o:new Float64Array(m), h:new Float64Array(m), l:new Float64Array(m),
+             c:new Float64Array(m), v:new Float64Array(m)}};
+    for(let j=0;j<m;j++) lodBucket(prev, L, j);
+    levels.push(L); prev=L;
+  }}
+  return levels;
+}}
+// Tick : seul le dernier bucket de chaque niveau contient la bougie en cours
+function lastLOD(levels) {{
+  for(let k=1;k<levels.length;k++) lodBucket(levels[k-1], levels[k], levels[k].h.length-1);
+}}
+const indLOD = () => indicator('lod', buildLOD, lastLOD);
+
+// Niveau à dessiner pour N barres visibles : L = niveau (D si zoomé), B = barres par bucket
+function lodView(N) {{
+  const CW=(cvMain.width-PAD.l-PAD.r)/Math.max(N,1);
+  if(CW>=LOD_MIN_PX) return {{ L:D, B:1 }};
+  const levels=indLOD();
+  const k=Math.min(Math.ceil(Math.log2(LOD_MIN_PX/CW)), levels.length-1);
+  return {{ L:levels[k], B:1<<k }};
+}}
+// Indices de vue échantillonnés tous les B (dernier point inclus) pour les courbes
+function lodIndices(N, B) {{
+  const idx=[];
+  for(let i=0;i<N;i+=B) idx.push(i);
+  if(idx[idx.length-1]!==N-1) idx.push(N-1);
+  return idx;
+}}
+// [min low, max high] exacts sur [s, e) : buckets complets du niveau + bords bruts
+function lodRange(L, B, s, e) {{
+  let lo=Infinity, hi=-Infinity;
+  const a=Math.min(e, Math.ceil(s/B)*B), b=Math.max(a, Math.floor(e/B)*B);
+  for(let i=s;i<a;i++) {{ if(D.l[i]<lo) lo=D.l[i]; if(D.h[i]>hi) hi=D.h[i]; }}
+  for(let j=a/B;j<b/B;j++) {{ if(L.l[j]<lo) lo=L.l[j]; if(L.h[j]>hi) hi=L.h[j]; }}
+  for(let i=b;i<e;i++) {{ if(D.l[i]<lo) lo=D.l[i]; if(D.h[i]>hi) hi=D.h[i]; }}
+  return [lo, hi];
+}}
+// Valeurs de arr aux indices de vue IDX (tableau dense aligné sur IDX : vals[q] ↔ barre IDX[q])
+const lodPick = (arr, IDX, s) => IDX.map(i=>arr[s+i]);
+function viewHiLo() {{
+  const {{ L, B }}=lodView(VIEW_END-VIEW_START);
+  return lodRange(L, B, VIEW_START, VIEW_END);
+}}
+
+// ── Max / min glissants (deque monotone) : out[i] = extrême de data[i-w+1..i], O(n) ──
+function rollingExtreme(data, w, isMax) {{
+  const n=data.length, out=new Array(n).fill(null), dq=new Int32Array(n);
+  let head=0, tail=0;
+  for(let i=0;i<n;i++) {{
+    const v=data[i];
+    while(tail>head && (isMax ? data[dq[tail-1]]<=v : data[dq[tail-1]]>=v)) tail--;
+    dq[tail++]=i;
+    if(dq[head]<=i-w) head++;
+    if(i>=w-1) out[i]=data[dq[head]];
+  }}
+  return out;
+}}
+
+// ── Calcul MA (somme glissante) ──
 function calcMA(data, period) {{
-  const out=[];
+  const out=new Array(data.length).fill(null);
+  let s=0;
   for(let i=0;i<data.length;i++) {{
-    if(i<period-1){{out.push(null);continue;}}
-    let s=0;for(let j=i-period+1;j<=i;j++) s+=data[j];
-    out.push(s/period);
+    s+=data[i];
+    if(i>=period) s-=data[i-period];
+    if(i>=period-1) out[i]=s/period;
   }}
   return out;
 }}
+function lastMA(data, period, out) {{
+  const n=data.length;
+  if(n<period) return;
+  let s=0;for(let j=n-period;j<n;j++) s+=data[j];
+  out[n-1]=s/period;
+}}
 
 // ── Calcul Bollinger Bands ──
 function calcBB(data, period=20, mult=2) {{
@@ -1212,11 +1432,31 @@ function calcBB(data, period=20, mult=2) {{
   }}
   return {{ma,upper,lower}};
 }}
+function lastBB(data, bb, period=20, mult=2) {{
+  const n=data.length;
+  if(n<period) return;
+  lastMA(data,period,bb.ma);
+  const m=bb.ma[n-1];
+  let v=0;for(let j=n-period;j<n;j++) v+=Math.pow(data[j]-m,2);
+  const sd=Math.sqrt(v/period);
+  bb.upper[n-1]=m+mult*sd; bb.lower[n-1]=m-mult*sd;
+}}
 
 
 // ════════════════════════════════════════════════════════
 //  GAUSSIAN CHANNEL [DW] — traduit de Pine Script v4
 // ════════════════════════════════════════════════════════
+// Filtre gaussien à N pôles : valeur au rang i à partir des rangs précédents
+function gaussPole(f, i, v, a, N) {{
+  const xv = 1 - a;
+  let val = Math.pow(a, N) * (v || 0);
+  if(i >= 1) val += N * xv * f[i-1];
+  if(N >= 2 && i >= 2) val -= (N*(N-1)/2) * xv*xv * f[i-2];
+  if(N >= 3 && i >= 3) val += (N*(N-1)*(N-2)/6) * Math.pow(xv,3) * f[i-3];
+  if(N >= 4 && i >= 4) val -= (N*(N-1)*(N-2)*(N-3)/24) * Math.pow(xv,4) * f[i-4];
+  return val;
+}}
+
 function calcGaussianChannel(closes, highs, lows, N=4, per=144, mult=1.414) {{
   const n = closes.length;
   if(n < per) return null;
@@ -1224,8 +1464,6 @@ function calcGaussianChannel(closes, highs, lows, N=4, per=144, mult=1.414) {{
   // Beta & alpha
   const beta  = (1 - Math.cos(4*Math.asin(1)/per)) / (Math.pow(1.414, 2/N) - 1);
   const alpha = -beta + Math.sqrt(beta*beta + 2*beta);
-  const x     = 1 - alpha;
-  const lag   = Math.floor((per - 1) / (2 * N));
 
   // Calcul filtre gaussien (N poles) sur hlc3
   const src  = closes.map((c,i) => (highs[i] + lows[i] + c) / 3);
@@ -1234,57 +1472,61 @@ function calcGaussianChannel(closes, highs, lows, N=4, per=144, mult=1.414) {{
     return Math.max(highs[i] - lows[i], Math.abs(highs[i] - prev), Math.abs(lows[i] - prev));
   }});
 
-  function applyFilter(data, a) {{
-    const f = new Array(data.length).fill(0);
-    const xv = 1 - a;
-    for(let i = 0; i < data.length; i++) {{
-      let val = Math.pow(a, N) * (data[i] || 0);
-      if(i >= 1) val += N * xv * f[i-1];
-      if(N >= 2 && i >= 2) val -= (N*(N-1)/2) * xv*xv * f[i-2];
-      if(N >= 3 && i >= 3) val += (N*(N-1)*(N-2)/6) * Math.pow(xv,3) * f[i-3];
-      if(N >= 4 && i >= 4) val -= (N*(N-1)*(N-2)*(N-3)/24) * Math.pow(xv,4) * f[i-4];
-      f[i] = val;
-    }}
-    return f;
+  const filt = new Array(n).fill(0), filttr = new Array(n).fill(0);
+  for(let i = 0; i < n; i++) {{
+    filt[i]   = gaussPole(filt, i, src[i], alpha, N);
+    filttr[i] = gaussPole(filttr, i, trs[i], alpha, N);
   }}
 
-  const filt   = applyFilter(src, alpha);
-  const filttr = applyFilter(trs, alpha);
-
   const upper = filt.map((v,i) => v + filttr[i] * mult);
   const lower = filt.map((v,i) => v - filttr[i] * mult);
 
-  return {{ filt, upper, lower }};
+  return {{ filt, filttr, upper, lower, alpha, N, mult }};
+}}
+
+// Tick : seul le dernier point du filtre dépend de la bougie en cours
+function lastGC(closes, highs, lows, gc) {{
+  const i = closes.length - 1;
+  if(i < 1) return false;
+  const src  = (highs[i] + lows[i] + closes[i]) / 3;
+  const prev = closes[i-1];
+  const tr   = Math.max(highs[i] - lows[i], Math.abs(highs[i] - prev), Math.abs(lows[i] - prev));
+  gc.filt[i]   = gaussPole(gc.filt, i, src, gc.alpha, gc.N);
+  gc.filttr[i] = gaussPole(gc.filttr, i, tr, gc.alpha, gc.N);
+  gc.upper[i]  = gc.filt[i] + gc.filttr[i] * gc.mult;
+  gc.lower[i]  = gc.filt[i] - gc.filttr[i] * gc.mult;
 }}
 
 // ════════════════════════════════════════════════════════
 //  ORDER BLOCKS [LuxAlgo / Flux] — traduit de Pine Script
+//  O(n) : ATR en somme glissante, swings et pivots de volume
+//  par max / min glissants (deque monotone).
 // ════════════════════════════════════════════════════════
 function calcOrderBlocks(opens, highs, lows, closes, volumes, swingLen=10, maxOBs=3) {{
   const n = closes.length;
   if(n < swingLen * 2 + 5) return {{ bull: [], bear: [] }};
 
   // ATR (10)
-  function calcATR(period=10) {{
-    const atrs = [];
-    for(let i=0; i<n; i++) {{
-      if(i < period) {{ atrs.push(null); continue; }}
-      let sum = 0;
-      for(let j=i-period+1; j<=i; j++) {{
-        const prev = closes[j-1] || closes[j];
-        sum += Math.max(highs[j]-lows[j], Math.abs(highs[j]-prev), Math.abs(lows[j]-prev));
-      }}
-      atrs.push(sum/period);
-    }}
-    return atrs;
+  const period = 10;
+  const trAt = j => {{
+    const prev = closes[j-1] || closes[j];
+    return Math.max(highs[j]-lows[j], Math.abs(highs[j]-prev), Math.abs(lows[j]-prev));
+  }};
+  const trs = closes.map((_,j) => trAt(j));
+  const atr = new Array(n).fill(null);
+  let trSum = 0;
+  for(let i=0; i<n; i++) {{
+    trSum += trs[i];
+    if(i >= period) {{ trSum -= trs[i-period]; atr[i] = trSum/period; }}
   }}
-  const atr = calcATR(10);
 
-  // Swing detection
+  // Swing detection : extrêmes des swingLen bougies précédentes
+  const hiMax = rollingExtreme(highs, swingLen, true);
+  const loMin = rollingExtreme(lows,  swingLen, false);
   const swingType = new Array(n).fill(0);
   for(let i=swingLen; i<n; i++) {{
-    const upper = Math.max(...highs.slice(i-swingLen, i));
-    const lower = Math.min(...lows.slice(i-swingLen, i));
+    const upper = hiMax[i-1];
+    const lower = loMin[i-1];
     if(highs[i-swingLen] > upper) swingType[i] = 0;
     else if(lows[i-swingLen] < lower) swingType[i] = 1;
     else swingType[i] = swingType[i-1] || 0;
@@ -1293,14 +1535,10 @@ function calcOrderBlocks(opens, highs, lows, closes, volumes, swingLen=10, maxOB
   const bullOBs = [];
   const bearOBs = [];
 
-  // Pivot volume highs
+  // Pivot volume highs : volume = max de la fenêtre centrée [i-swingLen, i+swingLen]
+  const volMax = rollingExtreme(volumes, 2*swingLen+1, true);
   for(let i=swingLen; i<n-swingLen; i++) {{
-    const vol = volumes[i];
-    let isVolPivot = true;
-    for(let j=i-swingLen; j<=i+swingLen; j++) {{
-      if(j!==i && volumes[j] > vol) {{ isVolPivot=false; break; }}
-    }}
-    if(!isVolPivot) continue;
+    if(volumes[i] < volMax[i+swingLen]) continue;
 
     const st = swingType[i];
 
@@ -1344,26 +1582,29 @@ function calcOrderBlocks(opens, highs, lows, closes, volumes, swingLen=10, maxOB
 // ════════════════════════════════════════════════════════
 //  DRAW — GAUSSIAN CHANNEL
 // ════════════════════════════════════════════════════════
-function drawGaussianChannel(ctx, W, H, toX, toY, VIEW_START, VIEW_END) {{
-  const gc = calcGaussianChannel(D.c, D.h, D.l, 4, 144, 1.414);
+function drawGaussianChannel(ctx, W, H, toX, toY, VIEW_START, VIEW_END, IDX) {{
+  const gc = indGC();
   if(!gc) return;
 
   const N = VIEW_END - VIEW_START;
-  const filt  = gc.filt.slice(VIEW_START, VIEW_END);
-  const upper = gc.upper.slice(VIEW_START, VIEW_END);
-  const lower = gc.lower.slice(VIEW_START, VIEW_END);
+  IDX = IDX || lodIndices(N, 1);
+  const filt  = lodPick(gc.filt,  IDX, VIEW_START);
+  const upper = lodPick(gc.upper, IDX, VIEW_START);
+  const lower = lodPick(gc.lower, IDX, VIEW_START);
 
   // Fill canal
   ctx.beginPath();
   let started = false;
-  for(let i=0; i<N; i++) {{
-    if(upper[i]==null) continue;
-    started ? ctx.lineTo(toX(i), toY(upper[i])) : ctx.moveTo(toX(i), toY(upper[i]));
+  for(let q=0;q<IDX.length;q++) {{
+    const i=IDX[q];
+    if(upper[q]==null) continue;
+    started ? ctx.lineTo(toX(i), toY(upper[q])) : ctx.moveTo(toX(i), toY(upper[q]));
     started = true;
   }}
-  for(let i=N-1; i>=0; i--) {{
-    if(lower[i]==null) continue;
-    ctx.lineTo(toX(i), toY(lower[i]));
+  for(let q=IDX.length-1; q>=0; q--) {{
+    const i = IDX[q];
+    if(lower[q]==null) continue;
+    ctx.lineTo(toX(i), toY(lower[q]));
   }}
   ctx.closePath();
   ctx.fillStyle = 'rgba(0,200,100,0.06)';
@@ -1371,29 +1612,32 @@ function drawGaussianChannel(ctx, W, H, toX, toY, VIEW_START, VIEW_END) {{
 
   // Upper band
   ctx.beginPath(); started=false;
-  for(let i=0;i<N;i++) {{
-    if(upper[i]==null) continue;
-    started?ctx.lineTo(toX(i),toY(upper[i])):ctx.moveTo(toX(i),toY(upper[i]));
+  for(let q=0;q<IDX.length;q++) {{
+    const i=IDX[q];
+    if(upper[q]==null) continue;
+    started?ctx.lineTo(toX(i),toY(upper[q])):ctx.moveTo(toX(i),toY(upper[q]));
     started=true;
   }}
   ctx.strokeStyle='rgba(0,255,136,0.45)'; ctx.lineWidth=1.2; ctx.setLineDash([4,3]); ctx.stroke(); ctx.setLineDash([]);
 
   // Lower band
   ctx.beginPath(); started=false;
-  for(let i=0;i<N;i++) {{
-    if(lower[i]==null) continue;
-    started?ctx.lineTo(toX(i),toY(lower[i])):ctx.moveTo(toX(i),toY(lower[i]));
+  for(let q=0;q<IDX.length;q++) {{
+    const i=IDX[q];
+    if(lower[q]==null) continue;
+    started?ctx.lineTo(toX(i),toY(lower[q])):ctx.moveTo(toX(i),toY(lower[q]));
     started=true;
   }}
   ctx.strokeStyle='rgba(255,75,75,0.45)'; ctx.lineWidth=1.2; ctx.setLineDash([4,3]); ctx.stroke(); ctx.setLineDash([]);
 
   // Filtre central (coloré selon direction)
-  for(let i=1;i<N;i++) {{
-    if(filt[i]==null||filt[i-1]==null) continue;
-    const rising = filt[i] > filt[i-1];
+  for(let q=1;q<IDX.length;q++) {{
+    const i = IDX[q], p = IDX[q-1];
+    if(filt[q]==null||filt[q-1]==null) continue;
+    const rising = filt[q] > filt[q-1];
     ctx.beginPath();
-    ctx.moveTo(toX(i-1), toY(filt[i-1]));
-    ctx.lineTo(toX(i),   toY(filt[i]));
+    ctx.moveTo(toX(p), toY(filt[q-1]));
+    ctx.lineTo(toX(i), toY(filt[q]));
     ctx.strokeStyle = rising ? 'rgba(0,255,136,0.85)' : 'rgba(255,75,75,0.85)';
     ctx.lineWidth = 2.2; ctx.stroke();
   }}
@@ -1408,7 +1652,7 @@ function drawGaussianChannel(ctx, W, H, toX, toY, VIEW_START, VIEW_END) {{
 //  DRAW — ORDER BLOCKS
 // ════════════════════════════════════════════════════════
 function drawOrderBlocks(ctx, W, H, toX, toY, VIEW_START, VIEW_END) {{
-  const obs = calcOrderBlocks(D.o, D.h, D.l, D.c, D.v, 10, 3);
+  const obs = indOB();
   const N   = VIEW_END - VIEW_START;
   const CW  = (W - 72) / N;   // PAD.r = 72
 
@@ -1476,16 +1720,16 @@ function drawMain() {{
   const N=VIEW_END-VIEW_START;
   if(N<1) return;
 
-  const slice=(arr)=>arr.slice(VIEW_START,VIEW_END);
-  const ts=slice(D.t), os=slice(D.o), hs=slice(D.h), ls=slice(D.l), cs=slice(D.c);
+  // Niveau LOD : une bougie dessinée = B barres agrégées (B=1 si zoomé)
+  const {{ L, B }}=lodView(N);
+  const IDX=lodIndices(N, B);
 
-  const minP=Math.min(...ls);
-  const maxP=Math.max(...hs);
+  const [minP, maxP]=lodRange(L, B, VIEW_START, VIEW_END);
   const pad =Math.max((maxP-minP)*0.05, maxP*0.001);
   const lo=minP-pad, hi=maxP+pad, rng=hi-lo||1;
 
   const CW=(W-PAD.l-PAD.r)/N;
-  const BW=Math.max(1, CW*0.75);
+  const BW=Math.max(1, CW*B*0.75);
   const toX=i=>PAD.l+i*CW+CW/2;
   // Axis scale : zoom Y via PRICE_SCALE, pan Y via PRICE_OFFSET
   const midP   = (hi+lo)/2 + PRICE_OFFSET*rng;
@@ -1517,7 +1761,7 @@ function drawMain() {{
   for(let t=0;t<=nTicks;t++) {{
     const i=Math.floor(t*(N-1)/Math.max(nTicks,1));
     const x=toX(i);
-    const d=new Date(ts[i]*1000);
+    const d=new Date(D.t[VIEW_START+i]*1000);
     ctx.strokeStyle='#111111'; ctx.lineWidth=1;
     ctx.beginPath(); ctx.moveTo(x,PAD.t); ctx.lineTo(x,H-PAD.b); ctx.stroke();
     // Label : heure si intraday, date si daily+
@@ -1536,39 +1780,41 @@ function drawMain() {{
 
   // ── BOLLINGER BANDS ──
   if(showBB) {{
-    const bbAll=calcBB(D.c,20,2);
-    const bbU=bbAll.upper.slice(VIEW_START,VIEW_END);
-    const bbL=bbAll.lower.slice(VIEW_START,VIEW_END);
-    const bbM=bbAll.ma.slice(VIEW_START,VIEW_END);
+    const bbAll=indBB();
+    const bbU=lodPick(bbAll.upper,IDX,VIEW_START);
+    const bbL=lodPick(bbAll.lower,IDX,VIEW_START);
+    const bbM=lodPick(bbAll.ma,IDX,VIEW_START);
 
     // Fill entre upper et lower
     ctx.beginPath();
-    for(let i=0;i<N;i++) {{ if(bbU[i]!==null){{ const x=toX(i);i===0?ctx.moveTo(x,toY(bbU[i])):ctx.lineTo(x,toY(bbU[i])); }} }}
-    for(let i=N-1;i>=0;i--) {{ if(bbL[i]!==null){{ ctx.lineTo(toX(i),toY(bbL[i])); }} }}
+    for(let q=0;q<IDX.length;q++) {{ const i=IDX[q]; if(bbU[q]!==null){{ const x=toX(i);i===0?ctx.moveTo(x,toY(bbU[q])):ctx.lineTo(x,toY(bbU[q])); }} }}
+    for(let q=IDX.length-1;q>=0;q--) {{ const i=IDX[q]; if(bbL[q]!==null){{ ctx.lineTo(toX(i),toY(bbL[q])); }} }}
     ctx.closePath();
     ctx.fillStyle='rgba(255,152,0,0.04)'; ctx.fill();
 
     // Lignes upper/lower/middle
     [bbU,bbL].forEach((band,bi)=>{{
       ctx.beginPath(); let started=false;
-      for(let i=0;i<N;i++) {{
-        if(band[i]===null) continue;
-        started?ctx.lineTo(toX(i),toY(band[i])):ctx.moveTo(toX(i),toY(band[i]));
+      for(let q=0;q<IDX.length;q++) {{
+        const i=IDX[q];
+        if(band[q]===null) continue;
+        started?ctx.lineTo(toX(i),toY(band[q])):ctx.moveTo(toX(i),toY(band[q]));
         started=true;
       }}
       ctx.strokeStyle='rgba(255,102,0,0.35)'; ctx.lineWidth=1; ctx.setLineDash([3,3]); ctx.stroke(); ctx.setLineDash([]);
     }});
     ctx.beginPath(); let s2=false;
-    for(let i=0;i<N;i++) {{
-      if(bbM[i]===null) continue;
-      s2?ctx.lineTo(toX(i),toY(bbM[i])):ctx.moveTo(toX(i),toY(bbM[i]));
+    for(let q=0;q<IDX.length;q++) {{
+      const i=IDX[q];
+      if(bbM[q]===null) continue;
+      s2?ctx.lineTo(toX(i),toY(bbM[q])):ctx.moveTo(toX(i),toY(bbM[q]));
       s2=true;
     }}
     ctx.strokeStyle='rgba(255,102,0,0.45)'; ctx.lineWidth=1; ctx.stroke();
   }}
 
   // ── GAUSSIAN CHANNEL ──
-  if(showGC) drawGaussianChannel(ctx, W, H, toX, toY, VIEW_START, VIEW_END);
+  if(showGC) drawGaussianChannel(ctx, W, H, toX, toY, VIEW_START, VIEW_END, IDX);
 
   // ── ORDER BLOCKS ──
   if(showOB) drawOrderBlocks(ctx, W, H, toX, toY, VIEW_START, VIEW_END);
@@ -1581,11 +1827,12 @@ function drawMain() {{
       {{p:200, color:'rgba(100,180,255,0.80)',w:1.6}},
     ];
     maConf.forEach(mc=>{{
-      const ma=calcMA(D.c,mc.p).slice(VIEW_START,VIEW_END);
+      const ma=lodPick(indMA(mc.p),IDX,VIEW_START);
       ctx.beginPath(); let started=false;
-      for(let i=0;i<N;i++) {{
-        if(ma[i]===null) continue;
-        const x=toX(i), y=toY(ma[i]);
+      for(let q=0;q<IDX.length;q++) {{
+        const i=IDX[q];
+        if(ma[q]===null) continue;
+        const x=toX(i), y=toY(ma[q]);
         started?ctx.lineTo(x,y):ctx.moveTo(x,y);
         started=true;
       }}
@@ -1602,11 +1849,15 @@ function drawMain() {{
   // ── MONTE CARLO MERTON — BANDES ──
   drawMCBands(ctx, W, H, toX, toY, N, CW);
 
-  // ── BOUGIES ──
-  for(let i=0;i<N;i++) {{
-    const x=toX(i);
-    const oy=toY(os[i]), hy=toY(hs[i]), ly=toY(ls[i]), cy=toY(cs[i]);
-    const bull=cs[i]>=os[i];
+  // ── BOUGIES (bucket j du niveau L = barres [j*B, j*B+B)) ──
+  const j0=Math.floor(VIEW_START/B), j1=Math.ceil(VIEW_END/B);
+  ctx.save();
+  ctx.beginPath(); ctx.rect(0, 0, W-PAD.r, H); ctx.clip();
+  for(let j=j0;j<j1;j++) {{
+    const a=j*B, b=Math.min(a+B, D.t.length)-1;
+    const x=toX((a+b)/2-VIEW_START);
+    const oy=toY(L.o[j]), hy=toY(L.h[j]), ly=toY(L.l[j]), cy=toY(L.c[j]);
+    const bull=L.c[j]>=L.o[j];
     const bullCol='#00ff41', bearCol='#ff2222';
     const col=bull?bullCol:bearCol;
 
@@ -1624,17 +1875,18 @@ function drawMain() {{
     ctx.fillStyle = bull ? bullCol : bearCol;
     ctx.fillRect(x-hw, top, hw*2, bH);
 
-    // Dernière bougie — halo pulsant
-    if(i===N-1) {{
-      const glow=1.5+Math.sin(Date.now()/300)*1;
+    // Dernière bougie — halo
+    if(j===j1-1) {{
+      const glow=1.5;
       ctx.strokeStyle=bull?'rgba(38,166,154,0.6)':'rgba(239,83,80,0.6)';
       ctx.lineWidth=1;
       ctx.strokeRect(x-hw-glow, top-glow, hw*2+glow*2, bH+glow*2);
     }}
   }}
+  ctx.restore();
 
   // ── LIGNE PRIX ACTUEL ──
-  const lastC=cs[N-1], lastO=os[N-1];
+  const lastC=D.c[VIEW_END-1], lastO=D.o[VIEW_END-1];
   const lastBull=lastC>=lastO;
   const py=toY(lastC);
   // Ligne pointillée
@@ -1671,8 +1923,7 @@ function drawMain() {{
       ctx.fillText(fmt(hp), W-PAD.r+5, HOVER_Y+4);
     }}
     // Label date en bas
-    const d=new Date(ts[HOVER_IDX]*1000);
-    const dateLbl=fmtDate(ts[HOVER_IDX]);
+    const dateLbl=fmtDate(D.t[VIEW_START+HOVER_IDX]);
     ctx.fillStyle='#1a0800'; ctx.textAlign='center';
     const tw=ctx.measureText(dateLbl).width+12;
     ctx.beginPath(); ctx.roundRect(x-tw/2, H-PAD.b+2, tw, 16, 2); ctx.fill();
@@ -1693,7 +1944,7 @@ function drawMain() {{
 // ════════════════════════════════════════════════════════
 //  RSI — Relative Strength Index (14)
 // ════════════════════════════════════════════════════════
-function calcRSI(closes, period=14) {{
+function calcRSI(closes, period=14, st=null) {{
   const rsi = new Array(closes.length).fill(null);
   if(closes.length < period+1) return rsi;
   let avgGain=0, avgLoss=0;
@@ -1704,6 +1955,7 @@ function calcRSI(closes, period=14) {{
   avgGain/=period; avgLoss/=period;
   rsi[period] = 100 - 100/(1+(avgLoss===0?Infinity:avgGain/avgLoss));
   for(let i=period+1;i<closes.length;i++) {{
+    if(st && i===closes.length-1) {{ st.g=avgGain; st.l=avgLoss; }}
     const d=closes[i]-closes[i-1];
     avgGain=(avgGain*(period-1)+(d>0?d:0))/period;
     avgLoss=(avgLoss*(period-1)+(d<0?Math.abs(d):0))/period;
@@ -1712,6 +1964,16 @@ function calcRSI(closes, period=14) {{
   return rsi;
 }}
 
+// Tick : moyennes de Wilder reprises depuis l'avant-dernière bougie
+function lastRSI(closes, r, period=14) {{
+  const i=closes.length-1;
+  if(r.st.g===undefined || i<=period) return false;
+  const d=closes[i]-closes[i-1];
+  const g=(r.st.g*(period-1)+(d>0?d:0))/period;
+  const l=(r.st.l*(period-1)+(d<0?Math.abs(d):0))/period;
+  r.rsi[i]=100-100/(1+(l===0?100:g/l));
+}}
+
 function drawRSI() {{
   const cv=$('cvRSI');
   if(!cv||!showRSI) return;
@@ -1722,8 +1984,9 @@ function drawRSI() {{
   const N=VIEW_END-VIEW_START;
   if(N<2||H<10) return;
 
-  const rsiAll=calcRSI(D.c,14);
-  const rsi=rsiAll.slice(VIEW_START,VIEW_END);
+  const rsiAll=indRSI().rsi;
+  const IDX=lodIndices(N, lodView(N).B);
+  const rsi=lodPick(rsiAll,IDX,VIEW_START);
   const CW=(W-PAD.l-PAD.r)/N;
   const toX=i=>PAD.l+i*CW+CW/2;
   const toY=v=>H-4-(v/100)*(H-8);
@@ -1745,10 +2008,11 @@ function drawRSI() {{
   }});
 
   // Courbe RSI
-  for(let i=1;i<N;i++) {{
-    if(rsi[i]===null||rsi[i-1]===null) continue;
-    const avg=(rsi[i]+rsi[i-1])/2;
-    ctx.beginPath(); ctx.moveTo(toX(i-1),toY(rsi[i-1])); ctx.lineTo(toX(i),toY(rsi[i]));
+  for(let q=1;q<IDX.length;q++) {{
+    const i=IDX[q], p=IDX[q-1];
+    if(rsi[q]===null||rsi[q-1]===null) continue;
+    const avg=(rsi[q]+rsi[q-1])/2;
+    ctx.beginPath(); ctx.moveTo(toX(p),toY(rsi[q-1])); ctx.lineTo(toX(i),toY(rsi[q]));
     ctx.strokeStyle=avg>=70?'#ff4444':avg<=30?'#00ff65':'#e8a838';
     ctx.lineWidth=1.5; ctx.stroke();
   }}
@@ -1788,7 +2052,19 @@ function calcMACD(closes,fast=12,slow=26,signal=9) {{
   const macd=closes.map((_,i)=>(ema12[i]!==null&&ema26[i]!==null)?ema12[i]-ema26[i]:null);
   const sig=calcEMA(macd,signal);
   const hist=macd.map((v,i)=>(v!==null&&sig[i]!==null)?v-sig[i]:null);
-  return {{macd,signal:sig,hist}};
+  return {{macd,signal:sig,hist,ema12,ema26}};
+}}
+
+// Tick : les EMA du dernier point ne dépendent que du point précédent
+function lastMACD(closes,md,fast=12,slow=26,signal=9) {{
+  const i=closes.length-1;
+  if(i<1||md.ema12[i-1]===null||md.ema26[i-1]===null||md.signal[i-1]===null) return false;
+  const k=p=>2/(p+1), c=closes[i];
+  md.ema12[i]=c*k(fast)+md.ema12[i-1]*(1-k(fast));
+  md.ema26[i]=c*k(slow)+md.ema26[i-1]*(1-k(slow));
+  md.macd[i]=md.ema12[i]-md.ema26[i];
+  md.signal[i]=md.macd[i]*k(signal)+md.signal[i-1]*(1-k(signal));
+  md.hist[i]=md.macd[i]-md.signal[i];
 }}
 
 function drawMACD() {{
@@ -1801,14 +2077,16 @@ function drawMACD() {{
   const N=VIEW_END-VIEW_START;
   if(N<2||H<10) return;
 
-  const md=calcMACD(D.c,12,26,9);
-  const macd=md.macd.slice(VIEW_START,VIEW_END);
-  const sig=md.signal.slice(VIEW_START,VIEW_END);
-  const hist=md.hist.slice(VIEW_START,VIEW_END);
+  const md=indMACD();
+  const B=lodView(N).B, IDX=lodIndices(N, B);
+  const macd=lodPick(md.macd,IDX,VIEW_START);
+  const sig=lodPick(md.signal,IDX,VIEW_START);
+  const hist=lodPick(md.hist,IDX,VIEW_START);
 
-  const vals=[...macd,...sig,...hist].filter(v=>v!==null);
-  if(!vals.length) return;
-  const rng=Math.max(Math.abs(Math.max(...vals)),Math.abs(Math.min(...vals)))*1.1||1;
+  let vmax=-Infinity, vmin=Infinity;
+  [macd,sig,hist].forEach(arr=>{{ for(const v of arr) if(v!==null){{ if(v>vmax)vmax=v; if(v<vmin)vmin=v; }} }});
+  if(vmax===-Infinity) return;
+  const rng=Math.max(Math.abs(vmax),Math.abs(vmin))*1.1||1;
 
   const CW=(W-PAD.l-PAD.r)/N;
   const toX=i=>PAD.l+i*CW+CW/2;
@@ -1820,29 +2098,32 @@ function drawMACD() {{
   ctx.setLineDash([]);
 
   // Histogramme
-  for(let i=0;i<N;i++) {{
-    if(hist[i]===null) continue;
-    const x=PAD.l+i*CW+1, bw=Math.max(1,CW-2);
-    const y0=H/2, y1=toY(hist[i]);
-    const bull=hist[i]>=0;
-    const prev=hist[i-1]||0;
-    ctx.fillStyle=bull?(hist[i]>prev?'#00cc44':'#007722'):(hist[i]<prev?'#cc0000':'#882200');
+  for(let q=0;q<IDX.length;q++) {{
+    const i=IDX[q];
+    if(hist[q]===null) continue;
+    const x=PAD.l+i*CW+1, bw=Math.max(1,CW*B-2);
+    const y0=H/2, y1=toY(hist[q]);
+    const bull=hist[q]>=0;
+    const prev=(q>0?hist[q-1]:0)||0;
+    ctx.fillStyle=bull?(hist[q]>prev?'#00cc44':'#007722'):(hist[q]<prev?'#cc0000':'#882200');
     ctx.fillRect(x,Math.min(y0,y1),bw,Math.abs(y1-y0));
   }}
 
   // Ligne MACD
   ctx.beginPath(); let s1=false;
-  for(let i=0;i<N;i++) {{
-    if(macd[i]===null) continue;
-    s1?ctx.lineTo(toX(i),toY(macd[i])):ctx.moveTo(toX(i),toY(macd[i])); s1=true;
+  for(let q=0;q<IDX.length;q++) {{
+    const i=IDX[q];
+    if(macd[q]===null) continue;
+    s1?ctx.lineTo(toX(i),toY(macd[q])):ctx.moveTo(toX(i),toY(macd[q])); s1=true;
   }}
   ctx.strokeStyle='rgba(100,180,255,0.9)'; ctx.lineWidth=1.5; ctx.stroke();
 
   // Ligne Signal
   ctx.beginPath(); let s2=false;
-  for(let i=0;i<N;i++) {{
-    if(sig[i]===null) continue;
-    s2?ctx.lineTo(toX(i),toY(sig[i])):ctx.moveTo(toX(i),toY(sig[i])); s2=true;
+  for(let q=0;q<IDX.length;q++) {{
+    const i=IDX[q];
+    if(sig[q]===null) continue;
+    s2?ctx.lineTo(toX(i),toY(sig[q])):ctx.moveTo(toX(i),toY(sig[q])); s2=true;
   }}
   ctx.strokeStyle='rgba(255,165,0,0.9)'; ctx.lineWidth=1.2; ctx.stroke();
 
@@ -1864,26 +2145,41 @@ function drawVol() {{
 
   const N=VIEW_END-VIEW_START;
   if(!N||H<4) return;
-  const vs=D.v.slice(VIEW_START,VIEW_END);
-  const maxV=Math.max(...vs)||1;
   const CW=(W-PAD.l-PAD.r)/N;
 
+  // Barres par bucket LOD : volume moyen par barre (même échelle que la MA)
+  const {{ L, B }}=lodView(N);
+  const j0=Math.floor(VIEW_START/B), j1=Math.ceil(VIEW_END/B);
+  const bars=[];
+  let maxV=0;
+  for(let j=j0;j<j1;j++) {{
+    const a=Math.max(j*B, VIEW_START), b=Math.min(j*B+B, VIEW_END);
+    let v=0;
+    if(B===1) v=L.v[j];
+    else if(a===j*B && b===j*B+B) v=L.v[j]/B;
+    else {{ for(let i=a;i<b;i++) v+=D.v[i]; v/=(b-a); }}
+    bars.push([a, b, v, L.c[j]>=L.o[j]]);
+    if(v>maxV) maxV=v;
+  }}
+  maxV=maxV||1;
+
   // MA volume (20)
-  const maV=calcMA(D.v,20).slice(VIEW_START,VIEW_END);
+  const IDX=lodIndices(N, B);
+  const maV=lodPick(indVolMA(),IDX,VIEW_START);
 
-  for(let i=0;i<N;i++) {{
-    const bh=Math.max(1,(vs[i]/maxV)*(H-4));
-    const bull=D.c[VIEW_START+i]>=D.o[VIEW_START+i];
+  for(const [a, b, v, bull] of bars) {{
+    const bh=Math.max(1,(v/maxV)*(H-4));
     ctx.fillStyle=bull?'rgba(38,166,154,0.5)':'rgba(239,83,80,0.5)';
-    ctx.fillRect(PAD.l+i*CW+1, H-bh, Math.max(1,CW-2), bh);
+    ctx.fillRect(PAD.l+(a-VIEW_START)*CW+1, H-bh, Math.max(1,(b-a)*CW-2), bh);
   }}
 
   // MA volume line
   ctx.beginPath(); let s=false;
-  for(let i=0;i<N;i++) {{
-    if(maV[i]===null) continue;
+  for(let q=0;q<IDX.length;q++) {{
+    const i=IDX[q];
+    if(maV[q]===null) continue;
     const x=PAD.l+i*CW+CW/2;
-    const y=H-(maV[i]/maxV)*(H-4);
+    const y=H-(maV[q]/maxV)*(H-4);
     s?ctx.lineTo(x,y):ctx.moveTo(x,y); s=true;
   }}
   ctx.strokeStyle='rgba(255,102,0,0.70)'; ctx.lineWidth=1; ctx.stroke();
@@ -1893,7 +2189,30 @@ function drawVol() {{
   ctx.textAlign='left'; ctx.fillText('VOLUME', 4, 10);
 }}
 
-function render() {{ drawMain(); drawVol(); drawRSI(); drawMACD(); }}
+// ════════════════════════════════════════════════════════
+//  RENDU À LA DEMANDE
+//  Au plus un dessin par frame (requestAnimationFrame) ; les ticks
+//  et le contrôle périodique ne redessinent que si la série ou la
+//  vue a changé. render() force le dessin complet (toggles, dessins).
+// ════════════════════════════════════════════════════════
+let DRAW_MAIN=false, DRAW_ALL=false, FRAME_KEY='';
+const viewKey = () => seriesShape()+'|'+lastBarSig()+'|'+VIEW_START+'|'+VIEW_END+'|'+PRICE_SCALE+'|'+PRICE_OFFSET
+  +'|'+HOVER_IDX+'|'+HOVER_Y+'|'+cvMain.width+'|'+cvMain.height;
+
+function flushDraw() {{
+  const all=DRAW_ALL;
+  DRAW_MAIN=DRAW_ALL=false;
+  FRAME_KEY=viewKey();
+  drawMain();
+  if(all) {{ drawVol(); drawRSI(); drawMACD(); }}
+}}
+function scheduleDraw(all) {{
+  if(!DRAW_MAIN && !DRAW_ALL) requestAnimationFrame(flushDraw);
+  if(all) DRAW_ALL=true; else DRAW_MAIN=true;
+}}
+function render()          {{ scheduleDraw(true); }}
+function renderMain()      {{ scheduleDraw(false); }}
+function renderIfChanged() {{ if(viewKey()!==FRAME_KEY) render(); }}
 
 function applyHeaderPrice(price, pct) {{
   const bull=parseFloat(pct)>=0;
@@ -1948,9 +2267,7 @@ function clearDrawings() {{
 function pxToPrice(y) {{
   const H = cvMain.height;
   const N = VIEW_END - VIEW_START;
-  const slice = arr => arr.slice(VIEW_START, VIEW_END);
-  const hi = Math.max(...slice(D.h));
-  const lo = Math.min(...slice(D.l));
+  const [lo, hi] = viewHiLo();
   const rng = (hi - lo) || 1;
   return hi - ((y - PAD.t) / (H - PAD.t - PAD.b)) * rng;
 }}
@@ -1964,9 +2281,7 @@ function pxToIdx(x) {{
 function priceToY(price) {{
   const H = cvMain.height;
   const N = VIEW_END - VIEW_START;
-  const slice = arr => arr.slice(VIEW_START, VIEW_END);
-  const hi = Math.max(...slice(D.h));
-  const lo = Math.min(...slice(D.l));
+  const [lo, hi] = viewHiLo();
   const rng = (hi - lo) || 1;
   return PAD.t + ((hi - price) / rng) * (H - PAD.t - PAD.b);
 }}
@@ -2119,7 +2434,7 @@ cvMain.addEventListener('mousemove', e => {{
     drawPending.i2=pxToIdx(e.clientX-rect2.left);
     drawPending.p2=pxToPrice(e.clientY-rect2.top);
   }}
-  drawMain();
+  renderMain();
 }});
 
 cvMain.addEventListener('mousedown', e => {{
@@ -2166,7 +2481,7 @@ cvMain.addEventListener('mouseleave', () => {{
   // Remettre OHLC de la dernière bougie
   const N=D.c.length;
   if(N) {{ setTxt('ho',fmt(D.o[N-1])); setTxt('hh',fmt(D.h[N-1])); setTxt('hl',fmt(D.l[N-1])); setTxt('hc',fmt(D.c[N-1])); }}
-  drawMain();
+  renderMain();
 }});
 
 // Scroll = zoom
@@ -2209,10 +2524,7 @@ function resetAxisScale() {{
 axisY.addEventListener('mousedown', e => {{
   e.preventDefault();
   const N = VIEW_END - VIEW_START;
-  const slice_h = D.h.slice(VIEW_START, VIEW_END);
-  const slice_l = D.l.slice(VIEW_START, VIEW_END);
-  const hi = Math.max(...slice_h);
-  const lo = Math.min(...slice_l);
+  const [lo, hi] = viewHiLo();
   const rng = (hi - lo) || 1;
   axisDrag = {{
     type: 'y',
@@ -2308,7 +2620,7 @@ const TF_MAP = {{
   '1w':  {{iv:'1w',  sec:604800}},
 }};
 
-let CURRENT_TF = '{active_tf}';
+let CURRENT_TF = CFG.active_tf;
 
 async function setTF(btn, tf) {{
   tf = tf.toLowerCase();
@@ -2331,7 +2643,7 @@ async function setTF(btn, tf) {{
 }}
 
 async function reloadOHLCV(tf) {{
-  const sym   = '{binance_symbol}'.toUpperCase();
+  const sym   = CFG.binance_symbol.toUpperCase();
   const cfg   = TF_MAP[tf] || TF_MAP['4h'];
   const limit = 200;
 
@@ -2347,6 +2659,7 @@ async function reloadOHLCV(tf) {{
     // Remplacer les données
     D.t.length=0; D.o.length=0; D.h.length=0;
     D.l.length=0; D.c.length=0; D.v.length=0;
+    resetIndicators();
     raw.forEach(c=>{{
       D.t.push(Math.floor(c[0]/1000));
       D.o.push(parseFloat(c[1]));
@@ -2374,7 +2687,7 @@ async function reloadOHLCV(tf) {{
 }}
 
 async function reloadOHLCVCoinGecko(tf) {{
-  const coinId = '{coingecko_id}';
+  const coinId = CFG.coingecko_id;
   const daysMap = {{'1m':1,'5m':1,'15m':1,'1h':7,'4h':30,'1d':365,'1w':1825}};
   const days = daysMap[tf] || 30;
   try {{
@@ -2385,6 +2698,7 @@ async function reloadOHLCVCoinGecko(tf) {{
 
     D.t.length=0; D.o.length=0; D.h.length=0;
     D.l.length=0; D.c.length=0; D.v.length=0;
+    resetIndicators();
     raw.forEach(c=>{{
       D.t.push(Math.floor(c[0]/1000));
       D.o.push(parseFloat(c[1]));
@@ -2599,6 +2913,159 @@ function mertonJDSim(S0, mu, sigma, lam, mu_j, sigma_j, horizon, nSim) {{
   }};
 }}
 
+// ════════════════════════════════════════════════════════
+//  WORKER MONTE CARLO — simulation hors du thread UI
+//  Le Worker simule par lots de MC_BATCH trajectoires et renvoie
+//  après chaque lot les bandes percentiles (Float64Array
+//  transférées, sans copie) : les bandes s'affinent à l'écran
+//  pendant le calcul. Percentiles par pas lus dans un histogramme
+//  de log-prix (mémoire O(pas × bins) au lieu de O(pas × nSim)) ;
+//  stats terminales exactes sur les prix finaux.
+//  Repli synchrone (mertonJDSim, ≤ MC_MAX_SIM_SYNC) si les
+//  Workers sont indisponibles.
+// ════════════════════════════════════════════════════════
+const MC_MAX_SIM      = 200000;   // plafond avec Worker
+const MC_MAX_SIM_SYNC = 10000;    // plafond du repli sur le thread UI
+const MC_BATCH        = 5000;     // trajectoires par lot (= une mise à jour des bandes)
+let MC_WORKER = null, MC_WORKER_URL = null;
+
+/* Corps du Worker (sérialisé avec _randn / _poisson via toString) */
+function mcWorkerMain() {{
+  const BINS = 2048;
+  const PCTS = [5, 10, 25, 50, 75, 90, 95];
+
+  self.onmessage = e => {{
+    const {{ S0, mu, sigma, lam, mu_j, sigma_j, horizon, nSim, batch }} = e.data;
+    const dt    = 1/252;
+    const k     = Math.exp(mu_j + 0.5*sigma_j*sigma_j) - 1;
+    const drift = (mu - lam*k - 0.5*sigma*sigma) * dt;
+    const volDt = sigma * Math.sqrt(dt);
+    const xMin  = Math.log(1e-12 / S0);            // plancher de prix 1e-12
+    const steps = horizon + 1;
+
+    const finals = new Float64Array(nSim);
+    const xs     = new Float64Array(batch * steps); // log(S/S0) du lot courant
+    let hist = null, lo = 0, w = 1;
+
+    // Bandes percentiles depuis l'histogramme (interpolation dans le bin)
+    function bands(n) {{
+      const paths = {{}};
+      for(const p of PCTS) {{ paths[`p${{p}}`] = new Float64Array(steps); paths[`p${{p}}`][0] = S0; }}
+      for(let t=1; t<steps; t++) {{
+        const h = hist.subarray(t*BINS, (t+1)*BINS);
+        let cum = 0, b = 0;
+        for(const p of PCTS) {{
+          const r = Math.min(n-1, Math.floor(p/100*(n-1)));
+          while(b < BINS-1 && cum + h[b] <= r) {{ cum += h[b]; b++; }}
+          const frac = h[b] ? (r - cum + 0.5) / h[b] : 0.5;
+          paths[`p${{p}}`][t] = S0 * Math.exp(lo + (b + frac) * w);
+        }}
+      }}
+      return paths;
+    }}
+    const buffers = paths => Object.values(paths).map(a => a.buffer);
+
+    let done = 0, sumF = 0;
+    while(done < nSim) {{
+      const nb = Math.min(batch, nSim - done);
+      for(let s=0; s<nb; s++) {{
+        let x = 0;
+        xs[s*steps] = 0;
+        for(let t=1; t<steps; t++) {{
+          const Z  = _randn();
+          const nj = _poisson(lam * dt);
+          let J = 0;
+          for(let jj=0; jj<nj; jj++) J += _randn()*sigma_j + mu_j;
+          x += drift + volDt*Z + J;
+          if(x < xMin) x = xMin;
+          xs[s*steps + t] = x;
+        }}
+        finals[done + s] = S0 * Math.exp(x);
+        sumF += finals[done + s];
+      }}
+
+      // Bornes de l'histogramme fixées sur le 1er lot (+25 % de marge)
+      if(!hist) {{
+        let mn = 0, mx = 0;
+        for(let i=0; i<nb*steps; i++) {{ if(xs[i]<mn) mn=xs[i]; if(xs[i]>mx) mx=xs[i]; }}
+        const pad = (mx - mn) * 0.25 || 1e-6;
+        lo = mn - pad; w = (mx - mn + 2*pad) / BINS;
+        hist = new Uint32Array(steps * BINS);
+      }}
+      for(let s=0; s<nb; s++) {{
+        for(let t=1; t<steps; t++) {{
+          const b = Math.min(BINS-1, Math.max(0, Math.floor((xs[s*steps + t] - lo) / w)));
+          hist[t*BINS + b]++;
+        }}
+      }}
+      done += nb;
+
+      // Résultat partiel : bandes + prix finaux déjà simulés (stats lues sur les bandes)
+      if(done < nSim) {{
+        const paths = bands(done), part = finals.slice(0, done), at = p => paths[`p${{p}}`][horizon];
+        self.postMessage({{
+          type: 'progress', done, paths, finals: part,
+          mean: sumF / done, p5:at(5), p25:at(25), p50:at(50), p75:at(75), p95:at(95),
+          S0, horizon,
+        }}, [...buffers(paths), part.buffer]);
+      }}
+    }}
+
+    // ── Stats terminales (exactes) ──
+    const paths   = bands(nSim);
+    const sortedF = finals.slice().sort();
+    const q   = f => sortedF[Math.floor(f*(nSim-1))];
+    const p5v = q(0.05);
+    let probProfit=0, tailSum=0, tailN=0;
+    for(let s=0; s<nSim; s++) {{
+      if(finals[s] > S0) probProfit++;
+      if(finals[s] <= p5v) {{ tailSum+=finals[s]; tailN++; }}
+    }}
+    self.postMessage({{
+      type: 'done',
+      paths, finals,
+      mean: sumF / nSim, p5:p5v, p25:q(0.25), p50:q(0.50), p75:q(0.75), p95:q(0.95),
+      probProfit: probProfit/nSim*100,
+      var95: p5v - S0,
+      cvar95: tailN>0 ? tailSum/tailN - S0 : p5v - S0,
+      S0, horizon,
+    }}, [...buffers(paths), finals.buffer]);
+  }};
+}}
+
+function mcWorkerUrl() {{
+  if(!MC_WORKER_URL) {{
+    const src = [_randn, _poisson, mcWorkerMain].map(f => f.toString()).join('\\n') + '\\nmcWorkerMain();';
+    MC_WORKER_URL = URL.createObjectURL(new Blob([src], {{type:'text/javascript'}}));
+  }}
+  return MC_WORKER_URL;
+}}
+
+// Lance une simulation dans un Worker neuf (le calcul précédent est abandonné).
+// Retourne false si les Workers sont indisponibles ; onFail si le Worker plante.
+function mcStartWorker(params, onProgress, onDone, onFail) {{
+  if(MC_WORKER) {{ MC_WORKER.terminate(); MC_WORKER = null; }}
+  if(typeof Worker === 'undefined') return false;
+  let w;
+  try {{ w = new Worker(mcWorkerUrl()); }} catch(e) {{ return false; }}
+  MC_WORKER = w;
+  w.onmessage = e => {{
+    if(w !== MC_WORKER) return;
+    if(e.data.type === 'progress') {{ onProgress(e.data); return; }}
+    MC_WORKER = null; w.terminate();
+    onDone(e.data);
+  }};
+  w.onerror = ev => {{
+    ev.preventDefault();
+    if(w !== MC_WORKER) return;
+    MC_WORKER = null; w.terminate();
+    console.warn('[AM.Terminal] Worker Monte Carlo indisponible :', ev.message);
+    onFail();
+  }};
+  w.postMessage(params);
+  return true;
+}}
+
 // ════════════════════════════════════════════════════════
 //  AUTO-CALIBRATION μ et σ depuis D.c
 // ════════════════════════════════════════════════════════
@@ -2643,74 +3110,99 @@ function runMonteCarlo() {{
   const mu_j    = (parseFloat($('mc_muj'  )?.value) || -5)  / 100;
   const sigma_j = (parseFloat($('mc_sigmaj')?.value)|| 10)  / 100;
   const horizon = parseInt  ($('mc_horizon')?.value) || 90;
-  const nSim    = Math.min(10000, parseInt($('mc_nsim')?.value) || 5000);
+  const nSim    = Math.min(MC_MAX_SIM, parseInt($('mc_nsim')?.value) || 5000);
 
   // Info calcul en cours
   const infoEl = $('mc_r_info');
   if(infoEl) infoEl.textContent = `⏳ Calcul ${{nSim}} trajectoires…`;
 
-  // Calcul asynchrone (évite de bloquer l'UI)
-  setTimeout(() => {{
-    const t0  = performance.now();
-    const res = mertonJDSim(S0, mu, sigma, lam, mu_j, sigma_j, horizon, nSim);
-    const ms  = (performance.now() - t0).toFixed(0);
-
-    // Formatage résultats
-    const fmtR = (v, ref) => {{
-      const pct = ((v-ref)/ref*100);
-      return fmt(v) + ' (' + (pct>=0?'+':'') + pct.toFixed(1) + '%)';
-    }};
-    const setR = (id, txt, cls) => {{
-      const el=$(id);
-      if(!el) return;
-      el.textContent = txt;
-      if(cls) el.className = 'result-val ' + cls;
-    }};
-
-    setR('mc_r_s0',   fmt(S0),                     '');
-    setR('mc_r_mean', fmtR(res.mean, S0),           'val-orange');
-    setR('mc_r_p50',  fmtR(res.p50,  S0),           'val-yellow');
-    setR('mc_r_p95',  fmtR(res.p95,  S0),           'val-green');
-    setR('mc_r_p5',   fmtR(res.p5,   S0),           'val-red');
-    const pp = res.probProfit;
-    setR('mc_r_prob', pp.toFixed(1)+'%',             pp>=50?'val-green':'val-red');
-    setR('mc_r_var',  (res.var95>=0?'+':'')+fmt(res.var95)+ ' ('+((res.var95/S0)*100).toFixed(1)+'%)', 'val-red');
-    setR('mc_r_cvar', (res.cvar95>=0?'+':'')+fmt(res.cvar95)+'  CVaR','val-red');
-
-    const bar = $('mc_r_bar');
-    if(bar) bar.style.width = pp.toFixed(0)+'%';
-    if(infoEl) infoEl.textContent =
-      `${{nSim}} sim · ${{horizon}}j · Merton JD · ${{ms}}ms`;
-
-    // Sauvegarde (ancien système canvas)
-    MC_BANDS = res;
-
-    // ── Alimenter le panel MC avec les mêmes résultats ──────
-    // Convertir format mertonJDSim → format panel mcDraw
-    MC_RESULT = {{
-      percs:       res.paths,
-      allPaths:    null,
-      finals:      res.finals,
-      S0:          res.S0,
-      horizon:     res.horizon,
-      mean:        res.mean,
-      p5:          res.p5,
-      p25:         res.p25,
-      p50:         res.p50,
-      p75:         res.p75,
-      p95:         res.p95,
-      prob_profit: res.probProfit,
-      var_95:      res.var95,
-    }};
-
-    // Si panel ouvert → redessiner immédiatement
-    if(MC_OPEN) {{
-      mcResizeCanvas();
-      mcDraw();
-    }}
-    const barInfo = $('mcBarInfo');
-    if(barInfo) barInfo.textContent = nSim + ' sim · ' + horizon + 'j · Merton JD';
+  const t0 = performance.now();
+  const elapsed = () => (performance.now() - t0).toFixed(0);
+
+  // Repli : calcul sur le thread UI, plafonné
+  const runSync = () => setTimeout(() => {{
+    const n = Math.min(nSim, MC_MAX_SIM_SYNC);
+    mcShowResult(mertonJDSim(S0, mu, sigma, lam, mu_j, sigma_j, horizon, n), n, elapsed());
   }}, 10);
+
+  const started = mcStartWorker(
+    {{ S0, mu, sigma, lam, mu_j, sigma_j, horizon, nSim, batch: MC_BATCH }},
+    m => {{
+      // Bandes et histogramme affinés à chaque lot terminé
+      MC_BANDS  = m;
+      MC_RESULT = {{ percs: m.paths, allPaths: null, finals: m.finals, S0: m.S0, horizon: m.horizon,
+                    mean: m.mean, p5: m.p5, p25: m.p25, p50: m.p50, p75: m.p75, p95: m.p95 }};
+      if(MC_OPEN) {{ mcResizeCanvas(); mcDraw(); }}
+      if(MC_SHOW) render();
+      if(infoEl) infoEl.textContent = `⏳ ${{m.done}} / ${{nSim}} trajectoires…`;
+    }},
+    res => mcShowResult(res, nSim, elapsed()),
+    runSync,
+  );
+  if(!started) runSync();
+}}
+
+// Affiche un résultat mertonJDSim (ou Worker) : panneau quant, bandes, panel MC
+function mcShowResult(res, nSim, ms) {{
+  const S0 = res.S0, horizon = res.horizon;
+  const infoEl = $('mc_r_info');
+
+  // Formatage résultats
+  const fmtR = (v, ref) => {{
+    const pct = ((v-ref)/ref*100);
+    return fmt(v) + ' (' + (pct>=0?'+':'') + pct.toFixed(1) + '%)';
+  }};
+  const setR = (id, txt, cls) => {{
+    const el=$(id);
+    if(!el) return;
+    el.textContent = txt;
+    if(cls) el.className = 'result-val ' + cls;
+  }};
+
+  setR('mc_r_s0',   fmt(S0),                     '');
+  setR('mc_r_mean', fmtR(res.mean, S0),           'val-orange');
+  setR('mc_r_p50',  fmtR(res.p50,  S0),           'val-yellow');
+  setR('mc_r_p95',  fmtR(res.p95,  S0),           'val-green');
+  setR('mc_r_p5',   fmtR(res.p5,   S0),           'val-red');
+  const pp = res.probProfit;
+  setR('mc_r_prob', pp.toFixed(1)+'%',             pp>=50?'val-green':'val-red');
+  setR('mc_r_var',  (res.var95>=0?'+':'')+fmt(res.var95)+ ' ('+((res.var95/S0)*100).toFixed(1)+'%)', 'val-red');
+  setR('mc_r_cvar', (res.cvar95>=0?'+':'')+fmt(res.cvar95)+'  CVaR','val-red');
+
+  const bar = $('mc_r_bar');
+  if(bar) bar.style.width = pp.toFixed(0)+'%';
+  if(infoEl) infoEl.textContent =
+    `${{nSim}} sim · ${{horizon}}j · Merton JD · ${{ms}}ms`;
+
+  // Sauvegarde (ancien système canvas)
+  MC_BANDS = res;
+
+  // ── Alimenter le panel MC avec les mêmes résultats ──────
+  // Convertir format mertonJDSim → format panel mcDraw
+  MC_RESULT = {{
+    percs:       res.paths,
+    allPaths:    null,
+    finals:      res.finals,
+    S0:          res.S0,
+    horizon:     res.horizon,
+    mean:        res.mean,
+    p5:          res.p5,
+    p25:         res.p25,
+    p50:         res.p50,
+    p75:         res.p75,
+    p95:         res.p95,
+    prob_profit: res.probProfit,
+    var_95:      res.var95,
+  }};
+
+  // Si panel ouvert → redessiner immédiatement
+  if(MC_OPEN) {{
+    mcResizeCanvas();
+    mcDraw();
+  }}
+  const barInfo = $('mcBarInfo');
+  if(barInfo) barInfo.textContent = nSim + ' sim · ' + horizon + 'j · Merton JD';
+  if(MC_SHOW) render();
 }}
 
 // ════════════════════════════════════════════════════════
@@ -2892,11 +3384,11 @@ function applyPriceUpdate(price, chg24, vol24, high24, low24) {{
   setCol('b_chg',bull?'var(--bull)':'var(--bear)');
   const badge=$('apiBadge');
   if(badge){{ badge.textContent='● LIVE'; badge.className='live-badge live'; }}
-  render();
+  renderIfChanged();
 }}
 
 function startBinanceWS() {{
-  const sym='{binance_symbol}'.toLowerCase();
+  const sym=CFG.binance_symbol.toLowerCase();
   if(!sym||sym==='undefined'){{ startFallbackPolling(); return; }}
   ws=new WebSocket(`wss://stream.binance.com:9443/stream?streams=${{sym}}@ticker`);
   ws.onopen=()=>{{ simActive=false; wsConnected=true; console.log('[AM.Terminal] WS Binance connecté'); }};
@@ -2913,7 +3405,7 @@ function startBinanceWS() {{
 
 async function fetchLivePrice() {{
   try {{
-    const id='{coingecko_id}';
+    const id=CFG.coingecko_id;
     const res=await fetch(`https://api.coingecko.com/api/v3/simple/price?ids=${{id}}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true`,{{signal:AbortSignal.timeout(8000)}});
     const json=await res.json(); const data=json[id];
     if(data) applyPriceUpdate(data.usd,data.usd_24h_change,data.usd_24h_vol,null,null);
@@ -2924,8 +3416,8 @@ function startFallbackPolling(){{ fetchLivePrice(); setInterval(fetchLivePrice,1
 // ════════════════════════════════════════════════════════
 //  INIT
 // ════════════════════════════════════════════════════════
-const RUN_SIM = {run_sim};
-console.log('[AM.Terminal] {data_info}');
+const RUN_SIM = CFG.run_sim;
+console.log('[AM.Terminal] ' + CFG.data_info);
 
 async function fetchInit() {{
   // Charge les données OHLCV depuis Binance dès le départ
@@ -2938,6 +3430,14 @@ async function fetchInit() {{
   window.IV_SEC_CURRENT = cfg.sec;
   window.CURRENT_TF = IV_INIT;
   window.CURRENT_SYMBOL = SYMBOL_INIT;
+  // Bougies déjà fournies par le serveur → aucun aller-retour réseau
+  if(bootFromPayload(BOOT)) {{
+    simPrice  = D.c[D.c.length-1] || 100;
+    prevPrice = simPrice;
+    candleStart = D.t[D.t.length-1] || Math.floor(Date.now()/1000);
+    console.log(`[AM.Terminal] Init ${{SYMBOL_INIT}} ${{IV_INIT}} → ${{D.t.length}} bougies (serveur)`);
+    return;
+  }}
   try {{
     const url = `https://api.binance.com/api/v3/klines?symbol=${{SYMBOL_INIT}}&interval=${{cfg.iv}}&limit=200`;
     const res = await fetch(url);
@@ -2959,7 +3459,7 @@ async function fetchInit() {{
     console.warn('[AM.Terminal] fetchInit Binance échoué:', e.message);
     // Fallback CoinGecko
     try {{
-      const cgId = '{coingecko_id}';
+      const cgId = CFG.coingecko_id;
       const daysMap={{'1m':1,'5m':1,'15m':1,'1h':7,'4h':30,'1d':365,'1w':1825}};
       const days = daysMap[IV_INIT]||30;
       const r2 = await fetch(`https://api.coingecko.com/api/v3/coins/${{cgId}}/ohlc?vs_currency=usd&days=${{days}}`);
@@ -2999,7 +3499,8 @@ function init() {{
       setTimeout(()=>{{ if(!wsConnected) {{ simActive=true; }} }}, 6000);
       setInterval(simTick, 400);
     }}
-    setInterval(()=>{{ if(HOVER_IDX<0) drawMain(); }}, 200);
+    // Filet de sécurité : série modifiée hors des chemins de rendu
+    setInterval(renderIfChanged, 1000);
   }});
 }}
 
@@ -14,6 +14,40 @@ DEFAULT_LIMIT    = 150
 # ── FALLBACK ──────────────────────────────────────────────
 FALLBACK_TO_MOCK = True      # Si CoinGecko échoue → mock auto
 
+# ── COURSE DE FOURNISSEURS (actions) ──────────────────────
+# True  → Twelve Data + yfinance lancés en parallèle, le 1er valide gagne
+# False → essais séquentiels (Twelve Data puis yfinance)
+PROVIDER_RACE = True
+RACE_TIMEOUT  = 15           # secondes, borne globale de la course
+
+# ── CIRCUIT BREAKER PAR FOURNISSEUR ───────────────────────
+BREAKER_FAILURES     = 3     # échecs consécutifs avant ouverture
+BREAKER_COOLDOWN     = 30    # secondes avant la sonde half-open
+BREAKER_MAX_COOLDOWN = 600   # plafond du cooldown (doublé à chaque sonde ratée)
+
+# ── CLIENT HTTP PARTAGÉ (http_client.py) ──────────────────
+HTTP_POOL_MAXSIZE = 16       # connexions keep-alive conservées par hôte
+HTTP_MAX_PER_HOST = 8        # requêtes simultanées max vers un même hôte
+HTTP_RETRIES      = 2        # rejeux GET sur erreur réseau / 429 / 5xx
+HTTP_BACKOFF      = 0.5      # backoff exponentiel : 0.5s, 1s, 2s...
+
+# ── CACHE FONDAMENTAUX (fundamentals.py) ──────────────────
+FUNDAMENTALS_TTL = 6 * 3600      # P/E, P/B, EPS, dividende, market cap
+PROFILE_TTL      = 7 * 86400     # secteur, nom — quasi statiques
+
+# ── STORE FONDAMENTAUX SUR DISQUE (fundamentals_store.py) ─
+FUNDAMENTALS_DB      = ".am_cache/fundamentals.sqlite"   # relatif au répertoire de lancement
+FUNDAMENTALS_MAX_AGE = 36 * 3600     # snapshot plus vieux → re-téléchargé à la lecture
+FUNDAMENTALS_REFRESH = 6 * 3600      # période du job de rafraîchissement en tâche de fond
+FUNDAMENTALS_FULL_EVERY = 7 * 86400  # fiche complète .info (FCF, dette, cash...) re-téléchargée
+
+# ── WORKER D'ALERTES (alert_worker.py) ────────────────────
+ALERT_INTERVAL      = 300    # secondes entre deux cycles d'évaluation
+ALERT_EMAIL_RETRIES = 3      # nouvelles tentatives SMTP avant abandon
+ALERT_STREAM        = True   # alertes crypto évaluées en temps réel (flux Binance)
+BINANCE_WS_URL         = "wss://stream.binance.com:9443/stream"
+BINANCE_STREAM_CHANNEL = "miniTicker"   # "miniTicker" (1 s) | "trade" | "aggTrade"
+
 # ── DIMENSIONS ────────────────────────────────────────────
 CHART_HEIGHT  = 420
 VOLUME_HEIGHT = 70
@@ -5,7 +5,16 @@
 
 import time
 import random
-from .config import DATA_SOURCE, DEFAULT_LIMIT, FALLBACK_TO_MOCK, COINGECKO_IDS
+
+import numpy as np
+
+from .config import (
+    DATA_SOURCE, DEFAULT_LIMIT, FALLBACK_TO_MOCK, COINGECKO_IDS,
+    PROVIDER_RACE, RACE_TIMEOUT,
+)
+from . import http_client, market_data, providers
+from .candle_store import get_store
+from .candles import Candles
 
 # ── Clé Twelve Data (depuis st.secrets ou variable d'env) ──
 def _get_td_key() -> str:
@@ -38,40 +47,42 @@ def _is_stock(symbol: str) -> bool:
     return False
 
 
-def fetch_ohlcv(symbol: str, interval: str, limit: int = DEFAULT_LIMIT) -> tuple[list[dict], bool]:
+def fetch_ohlcv(symbol: str, interval: str, limit: int = DEFAULT_LIMIT) -> tuple[Candles, bool]:
     """
     Retourne (candles, is_live).
-    candles  : [{t, o, h, l, c, v}, ...]
+    candles  : Candles — colonnes NumPy t/o/h/l/c/v
+               (itérable en [{t, o, h, l, c, v}, ...], cf. candles.py)
     is_live  : True si données réelles
     Auto-détecte les actions et route vers Twelve Data → yfinance → mock.
+    Passe par le cache partagé de market_data (TTL selon l'interval) :
+    seules les données live sont mises en cache, jamais le mock.
     """
+    key = ("ohlcv", DATA_SOURCE.lower(), symbol.upper().strip(), interval.lower(), int(limit))
+    return market_data.cached(
+        key, market_data.ttl_for(interval),
+        lambda: _fetch_ohlcv_uncached(symbol, interval, limit),
+        keep=lambda res: res[1],
+    )
+
+
+def _fetch_ohlcv_uncached(symbol: str, interval: str, limit: int) -> tuple[Candles, bool]:
     src = DATA_SOURCE.lower()
 
     # ── Auto-routing : si c'est une action ──
     if _is_stock(symbol) and src not in ("yfinance",):
 
-        # 1. Twelve Data en priorité (fiable sur Streamlit Cloud)
-        td_key = _get_td_key()
+        # 1. Twelve Data en priorité (fiable sur Streamlit Cloud), 2. yfinance
+        td_key     = _get_td_key()
+        candidates = []
         if td_key:
-            try:
-                data = _from_twelvedata(symbol, interval, limit, td_key)
-                if data and len(data) > 0:
-                    print(f"[chart_module] Twelve Data OK pour {symbol}")
-                    return data, True
-            except Exception as e:
-                print(f"[chart_module] Twelve Data échoué ({symbol}): {e} → yfinance")
+            candidates.append(("twelvedata", lambda: _from_twelvedata(symbol, interval, limit, td_key)))
         else:
             print(f"[chart_module] Clé Twelve Data manquante → yfinance")
+        candidates.append(("yfinance", lambda: _incremental("yfinance", symbol, interval, limit, _from_yfinance)))
 
-        # 2. Fallback yfinance
-        try:
-            data = _from_yfinance(symbol, interval, limit)
-            if data and len(data) > 0:
-                print(f"[chart_module] yfinance OK pour {symbol}")
-                return data, True
-            raise ValueError("Données vides")
-        except Exception as e2:
-            print(f"[chart_module] yfinance échoué ({symbol}): {e2}")
+        data = _first_valid(candidates, symbol)
+        if data is not None:
+            return data, True
 
         # 3. Fallback mock
         if FALLBACK_TO_MOCK:
@@ -79,29 +90,28 @@ def fetch_ohlcv(symbol: str, interval: str, limit: int = DEFAULT_LIMIT) -> tuple
         raise RuntimeError(f"Impossible de charger les données pour {symbol}")
 
     try:
+        # providers.call → circuit breaker : une source en circuit ouvert
+        # lève CircuitOpenError immédiatement → fallback mock sans attendre
         if src == "coingecko":
-            return _from_coingecko(symbol, interval, limit), True
+            return providers.call("coingecko", lambda: _from_coingecko(symbol, interval, limit)), True
         elif src == "binance":
-            return _from_binance(symbol, interval, limit), True
+            return providers.call("binance", lambda: _incremental("binance", symbol, interval, limit, _from_binance)), True
         elif src == "bybit":
-            return _from_bybit(symbol, interval, limit), True
+            return providers.call("bybit", lambda: _incremental("bybit", symbol, interval, limit, _from_bybit)), True
         elif src == "yfinance":
             # yfinance direct → fallback Twelve Data si besoin
-            try:
-                data = _from_yfinance(symbol, interval, limit)
-                if data and len(data) > 0:
-                    return data, True
-                raise ValueError("Données vides")
-            except Exception as e:
-                print(f"[chart_module] yfinance échoué ({symbol}): {e} → Twelve Data")
-                td_key = _get_td_key()
-                if td_key:
-                    return _from_twelvedata(symbol, interval, limit, td_key), True
-                if FALLBACK_TO_MOCK:
-                    return _mock(symbol, interval, limit), False
-                raise
+            candidates = [("yfinance", lambda: _incremental("yfinance", symbol, interval, limit, _from_yfinance))]
+            td_key = _get_td_key()
+            if td_key:
+                candidates.append(("twelvedata", lambda: _from_twelvedata(symbol, interval, limit, td_key)))
+            data = _first_valid(candidates, symbol)
+            if data is not None:
+                return data, True
+            if FALLBACK_TO_MOCK:
+                return _mock(symbol, interval, limit), False
+            raise RuntimeError(f"Impossible de charger les données pour {symbol}")
         elif src == "kraken":
-            return _from_kraken(symbol, interval, limit), True
+            return providers.call("kraken", lambda: _incremental("kraken", symbol, interval, limit, _from_kraken)), True
         else:
             return _mock(symbol, interval, limit), False
 
@@ -113,6 +123,62 @@ def fetch_ohlcv(symbol: str, interval: str, limit: int = DEFAULT_LIMIT) -> tuple
         raise
 
 
+# ── CHAÎNE DE FOURNISSEURS ───────────────────────────────
+def _first_valid(candidates: list, symbol: str):
+    """
+    Premier résultat non vide parmi `candidates` [(nom, fn), ...].
+    PROVIDER_RACE=True → tous en parallèle, le plus rapide gagne ;
+    sinon essais séquentiels dans l'ordre. Les fournisseurs dont le
+    circuit breaker est ouvert sont sautés. None si tous échouent.
+    """
+    candidates = [(name, fn) for name, fn in candidates if providers.is_available(name)]
+    if not candidates:
+        print(f"[chart_module] Tous les fournisseurs sont en circuit ouvert ({symbol})")
+        return None
+
+    if PROVIDER_RACE and len(candidates) > 1:
+        try:
+            name, data = providers.race(candidates, timeout=RACE_TIMEOUT)
+            print(f"[chart_module] {name} OK pour {symbol} (race)")
+            return data
+        except Exception as e:
+            print(f"[chart_module] Race échouée ({symbol}): {e}")
+            return None
+
+    for name, fn in candidates:
+        try:
+            data = providers.call(name, fn)
+            print(f"[chart_module] {name} OK pour {symbol}")
+            return data
+        except Exception as e:
+            print(f"[chart_module] {name} échoué ({symbol}): {e}")
+    return None
+
+
+# ── STORE INCRÉMENTAL ────────────────────────────────────
+def _incremental(source: str, symbol: str, interval: str, limit: int, loader) -> Candles:
+    """
+    Sert `limit` bougies depuis le CandleStore local de (source, symbole,
+    interval). Si le store couvre déjà la fenêtre, on ne demande à la
+    source que les bougies depuis le dernier timestamp stocké (inclus,
+    pour rafraîchir la bougie encore ouverte). Sinon : chargement complet.
+    `loader(symbol, interval, limit, since=None)`.
+    """
+    store = get_store(source, symbol, interval)
+    step  = _MOCK_STEP.get(interval.lower(), 14400)
+    with store.lock:
+        last = store.last_t
+        gap  = (time.time() - last) / step if last else None
+        if last is not None and len(store) >= limit and gap < limit:
+            store.merge(loader(symbol, interval, int(gap) + 2, since=last))
+            store.stats["incremental"] += 1
+        else:
+            store.reset()
+            store.merge(loader(symbol, interval, limit))
+            store.stats["full"] += 1
+        return store.tail(limit)
+
+
 # ── TWELVE DATA ──────────────────────────────────────────
 # Correspondance interval AM-Trading → Twelve Data
 _TD_IV = {
@@ -127,9 +193,8 @@ _TD_IV = {
     "1wk": "1week",
 }
 
-def _from_twelvedata(symbol: str, interval: str, limit: int, api_key: str) -> list[dict]:
+def _from_twelvedata(symbol: str, interval: str, limit: int, api_key: str) -> Candles:
     """Récupère les bougies OHLCV depuis Twelve Data."""
-    import requests
 
     iv = _TD_IV.get(interval.lower(), "1day")
 
@@ -145,7 +210,7 @@ def _from_twelvedata(symbol: str, interval: str, limit: int, api_key: str) -> li
         "order":      "ASC",
     }
 
-    r = requests.get(url, params=params, timeout=15)
+    r = http_client.get(url, params=params, timeout=15)
     r.raise_for_status()
     data = r.json()
 
@@ -178,7 +243,7 @@ def _from_twelvedata(symbol: str, interval: str, limit: int, api_key: str) -> li
         except Exception:
             continue
 
-    return candles[-limit:]
+    return Candles.from_records(candles[-limit:])
 
 
 # ── COINGECKO ────────────────────────────────────────────
@@ -192,20 +257,19 @@ def _coingecko_days(interval: str) -> int:
         "1h": 7, "4h": 30, "1d": 365, "7d": 1825,
     }.get(interval.lower(), 30)
 
-def _from_coingecko(symbol: str, interval: str, limit: int) -> list[dict]:
-    import requests
+def _from_coingecko(symbol: str, interval: str, limit: int) -> Candles:
     coin_id = _resolve_id(symbol)
     days    = _coingecko_days(interval)
     headers = {"User-Agent": "Mozilla/5.0 (Arthur-Trading-Chart/1.0)", "Accept": "application/json"}
     ohlc_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/ohlc"
-    r_ohlc   = requests.get(ohlc_url, params={"vs_currency": "usd", "days": days}, headers=headers, timeout=15)
+    r_ohlc   = http_client.get(ohlc_url, params={"vs_currency": "usd", "days": days}, headers=headers, timeout=15)
     r_ohlc.raise_for_status()
     ohlc_raw = r_ohlc.json()
     if not isinstance(ohlc_raw, list) or len(ohlc_raw) == 0:
         raise ValueError(f"CoinGecko OHLC vide pour {coin_id}")
     vol_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
     try:
-        r_vol   = requests.get(vol_url, params={"vs_currency": "usd", "days": days}, headers=headers, timeout=15)
+        r_vol   = http_client.get(vol_url, params={"vs_currency": "usd", "days": days}, headers=headers, timeout=15)
         vol_map = {int(v[0])//1000: float(v[1]) for v in r_vol.json().get("total_volumes", [])}
     except Exception:
         vol_map = {}
@@ -218,89 +282,89 @@ def _from_coingecko(symbol: str, interval: str, limit: int) -> list[dict]:
             if abs(closest - ts) < 14400:
                 vol = vol_map[closest]
         candles.append({"t": ts, "o": float(row[1]), "h": float(row[2]), "l": float(row[3]), "c": float(row[4]), "v": vol})
-    return candles
+    return Candles.from_records(candles)
 
 
 # ── BINANCE ──────────────────────────────────────────────
 _BINANCE_IV = {"1m":"1m","5m":"5m","15m":"15m","30m":"30m","1h":"1h","4h":"4h","1d":"1d","1w":"1w"}
 
-def _from_binance(symbol: str, interval: str, limit: int) -> list[dict]:
-    import requests
-    iv = _BINANCE_IV.get(interval.lower(), interval)
-    r  = requests.get("https://api.binance.com/api/v3/klines",
-        params={"symbol": symbol.upper(), "interval": iv, "limit": min(limit, 1000)},
-        headers={"User-Agent": "Mozilla/5.0"}, timeout=15)
+def _from_binance(symbol: str, interval: str, limit: int, since: int = None) -> Candles:
+    iv     = _BINANCE_IV.get(interval.lower(), interval)
+    params = {"symbol": symbol.upper(), "interval": iv, "limit": min(limit, 1000)}
+    if since is not None:
+        params["startTime"] = int(since) * 1000
+    r  = http_client.get("https://api.binance.com/api/v3/klines",
+        params=params, headers={"User-Agent": "Mozilla/5.0"}, timeout=15)
     r.raise_for_status()
     data = r.json()
     if not isinstance(data, list) or not data:
         raise ValueError("Binance: réponse vide")
-    return [{"t": int(c[0])//1000, "o": float(c[1]), "h": float(c[2]),
-             "l": float(c[3]), "c": float(c[4]), "v": float(c[5])} for c in data]
+    return Candles.from_rows(data, t_div=1000)
 
 
 # ── BYBIT ────────────────────────────────────────────────
 _BYBIT_IV = {"1m":"1","5m":"5","15m":"15","30m":"30","1h":"60","4h":"240","1d":"D","1w":"W"}
 
-def _from_bybit(symbol: str, interval: str, limit: int) -> list[dict]:
-    import requests
-    iv = _BYBIT_IV.get(interval.lower(), "240")
-    r  = requests.get("https://api.bybit.com/v5/market/kline",
-        params={"category": "spot", "symbol": symbol.upper(), "interval": iv, "limit": min(limit, 1000)}, timeout=15)
+def _from_bybit(symbol: str, interval: str, limit: int, since: int = None) -> Candles:
+    iv     = _BYBIT_IV.get(interval.lower(), "240")
+    params = {"category": "spot", "symbol": symbol.upper(), "interval": iv, "limit": min(limit, 1000)}
+    if since is not None:
+        params["start"] = int(since) * 1000
+    r  = http_client.get("https://api.bybit.com/v5/market/kline", params=params, timeout=15)
     r.raise_for_status()
     raw = r.json()
     if raw.get("retCode", 1) != 0:
         raise ValueError(f"Bybit: {raw.get('retMsg')}")
-    return [{"t": int(c[0])//1000, "o": float(c[1]), "h": float(c[2]),
-             "l": float(c[3]), "c": float(c[4]), "v": float(c[5])}
-            for c in reversed(raw["result"]["list"])]
+    return Candles.from_rows(list(reversed(raw["result"]["list"])), t_div=1000)
 
 
 # ── YFINANCE ─────────────────────────────────────────────
-def _from_yfinance(symbol: str, interval: str, limit: int) -> list[dict]:
-    import yfinance as yf
+def _from_yfinance(symbol: str, interval: str, limit: int, since: int = None) -> Candles:
+    import pandas as pd
     _period = {"1m":"7d","5m":"60d","15m":"60d","30m":"60d",
                "1h":"730d","4h":"730d","1d":"5y","1w":"10y","1wk":"10y"}
-    df = yf.download(symbol, period=_period.get(interval.lower(), "60d"),
-                     interval=interval, progress=False, auto_adjust=True)
+    if since is not None:
+        from datetime import datetime, timezone
+        df = market_data.download(symbol, interval=interval, auto_adjust=True,
+                                  start=datetime.fromtimestamp(since, tz=timezone.utc))
+    else:
+        df = market_data.download(symbol, period=_period.get(interval.lower(), "60d"),
+                                  interval=interval, auto_adjust=True)
     if df.empty:
         raise ValueError(f"yFinance: vide pour {symbol}")
     if hasattr(df.columns, "get_level_values"):
         df.columns = df.columns.get_level_values(0)
-    df  = df.tail(limit).reset_index()
-    ts  = "Datetime" if "Datetime" in df.columns else "Date"
-    out = []
-    for _, row in df.iterrows():
-        try:
-            out.append({"t": int(row[ts].timestamp()),
-                "o": float(row["Open"]),  "h": float(row["High"]),
-                "l": float(row["Low"]),   "c": float(row["Close"]),
-                "v": float(row.get("Volume", 0))})
-        except Exception:
-            continue
-    return out
+    df = df.dropna(subset=["Open", "High", "Low", "Close"]).tail(limit)
+    ix = pd.DatetimeIndex(df.index)
+    if ix.tz is not None:
+        ix = ix.tz_convert("UTC").tz_localize(None)
+    t  = (ix - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1)
+    v  = df["Volume"].fillna(0) if "Volume" in df.columns else np.zeros(len(df))
+    return Candles(t, df["Open"], df["High"], df["Low"], df["Close"], v)
 
 
 # ── KRAKEN ───────────────────────────────────────────────
 _KRAKEN_IV = {"1m":1,"5m":5,"15m":15,"30m":30,"1h":60,"4h":240,"1d":1440,"1w":10080}
 
-def _from_kraken(symbol: str, interval: str, limit: int) -> list[dict]:
-    import requests
-    iv = _KRAKEN_IV.get(interval.lower(), 240)
-    r  = requests.get("https://api.kraken.com/0/public/OHLC",
-        params={"pair": symbol.upper(), "interval": iv}, timeout=15)
+def _from_kraken(symbol: str, interval: str, limit: int, since: int = None) -> Candles:
+    iv     = _KRAKEN_IV.get(interval.lower(), 240)
+    params = {"pair": symbol.upper(), "interval": iv}
+    if since is not None:
+        # `since` Kraken est exclusif → on recule d'une bougie
+        params["since"] = int(since) - iv * 60
+    r  = http_client.get("https://api.kraken.com/0/public/OHLC", params=params, timeout=15)
     r.raise_for_status()
     res = r.json()
     if res.get("error"):
         raise ValueError(f"Kraken: {res['error']}")
     raw = list(res["result"].values())[0][-limit:]
-    return [{"t": int(c[0]), "o": float(c[1]), "h": float(c[2]),
-             "l": float(c[3]), "c": float(c[4]), "v": float(c[6])} for c in raw]
+    return Candles.from_rows(raw, idx=(0, 1, 2, 3, 4, 6))
 
 
 # ── MOCK (fallback ultime) ───────────────────────────────
 _MOCK_STEP = {"1m":60,"5m":300,"15m":900,"30m":1800,"1h":3600,"4h":14400,"1d":86400,"1w":604800}
 
-def _mock(symbol: str, interval: str, limit: int) -> list[dict]:
+def _mock(symbol: str, interval: str, limit: int) -> Candles:
     step  = _MOCK_STEP.get(interval.lower(), 14400)
     now   = int(time.time())
     price = 67000.0
@@ -316,4 +380,4 @@ def _mock(symbol: str, interval: str, limit: int) -> list[dict]:
                     "o": round(o,2), "h": round(h,2),
                     "l": round(l,2), "c": round(c,2), "v": round(v,2)})
         price = c
-    return out
+    return Candles.from_records(out)
@@ -0,0 +1,112 @@
+# ============================================================
+#  chart_module/firestore.py
+#  Firestore REST — conversion des valeurs + client minimal
+#
+#  Sans Streamlit : utilisé par firebase_auth.py (jeton de
+#  l'utilisateur connecté) et par le worker d'alertes
+#  (jeton de compte de service, aucune session navigateur).
+# ============================================================
+
+from . import http_client
+
+BASE_URL = "https://firestore.googleapis.com/v1/projects/{}/databases/(default)/documents"
+
+
+def to_value(value):
+    if isinstance(value, bool):  return {"booleanValue": value}
+    if isinstance(value, int):   return {"integerValue": str(value)}
+    if isinstance(value, float): return {"doubleValue": value}
+    if isinstance(value, str):   return {"stringValue": value}
+    if isinstance(value, list):
+        return {"arrayValue": {"values": [to_value(v) for v in value]}}
+    if isinstance(value, dict):
+        return {"mapValue": {"fields": {k: to_value(v) for k, v in value.items()}}}
+    return {"stringValue": str(value)}
+
+
+def from_value(field):
+    if "stringValue"  in field: return field["stringValue"]
+    if "integerValue" in field: return int(field["integerValue"])
+    if "doubleValue"  in field: return float(field["doubleValue"])
+    if "booleanValue" in field: return field["booleanValue"]
+    if "arrayValue"   in field:
+        return [from_value(v) for v in field["arrayValue"].get("values", [])]
+    if "mapValue" in field:
+        return {k: from_value(v) for k, v in field["mapValue"].get("fields", {}).items()}
+    return None
+
+
+def from_document(doc: dict) -> dict:
+    return {k: from_value(v) for k, v in doc.get("fields", {}).items()}
+
+
+class FirestoreClient:
+    """
+    Client REST Firestore. `token` est une chaîne ou une fonction sans
+    argument retournant un jeton OAuth valide (rafraîchi à chaque appel).
+    """
+
+    def __init__(self, project_id: str, token):
+        self.url   = BASE_URL.format(project_id)
+        self.token = token
+
+    def _headers(self) -> dict:
+        tok = self.token() if callable(self.token) else self.token
+        return {"Authorization": f"Bearer {tok}", "Content-Type": "application/json"}
+
+    def list_documents(self, collection: str, page_size: int = 300):
+        """Itère sur (id, champs) de tous les documents d'une collection."""
+        token = None
+        while True:
+            params = {"pageSize": page_size}
+            if token:
+                params["pageToken"] = token
+            r = http_client.get(f"{self.url}/{collection}", params=params,
+                                headers=self._headers(), timeout=15)
+            r.raise_for_status()
+            data = r.json()
+            for doc in data.get("documents", []):
+                yield doc["name"].rsplit("/", 1)[-1], from_document(doc)
+            token = data.get("nextPageToken")
+            if not token:
+                return
+
+    def get_document(self, path: str) -> tuple:
+        """(champs, updateTime) du document `path` ; ({}, None) s'il n'existe pas."""
+        r = http_client.get(f"{self.url}/{path}", headers=self._headers(), timeout=15)
+        if r.status_code == 404:
+            return {}, None
+        r.raise_for_status()
+        doc = r.json()
+        return from_document(doc), doc.get("updateTime")
+
+    def update_fields(self, path: str, fields: dict, update_time: str = None) -> bool:
+        """
+        PATCH des seuls champs `fields` du document `path` (ex : users/<uid>).
+        Avec `update_time`, l'écriture échoue (False) si le document a été
+        modifié depuis la lecture (précondition currentDocument.updateTime).
+        """
+        params = [("updateMask.fieldPaths", k) for k in fields]
+        if update_time:
+            params.append(("currentDocument.updateTime", update_time))
+        r = http_client.patch(f"{self.url}/{path}", params=params, headers=self._headers(),
+                              json={"fields": {k: to_value(v) for k, v in fields.items()}})
+        return r.status_code == 200
+
+
+def service_account_token(path: str):
+    """
+    Fournisseur de jeton pour un fichier de compte de service Google
+    (dépendance optionnelle google-auth). Le jeton est rafraîchi à expiration.
+    """
+    from google.oauth2 import service_account
+    from google.auth.transport.requests import Request
+
+    creds = service_account.Credentials.from_service_account_file(
+        path, scopes=["https://www.googleapis.com/auth/datastore"])
+
+    def _token():
+        if not creds.valid:
+            creds.refresh(Request())
+        return creds.token
+    return _token
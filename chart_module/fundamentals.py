@@ -0,0 +1,270 @@
+# ============================================================
+#  chart_module/fundamentals.py
+#  Fondamentaux actions en lot + cache longue durée
+#
+#  Séparé du cache OHLCV (market_data.py, TTL de quelques
+#  minutes) : P/E, P/B, EPS, dividende ou market cap ne
+#  bougent qu'au fil des publications → FUNDAMENTALS_TTL
+#  (heures), secteur et nom → PROFILE_TTL (jours).
+#
+#  • ratios : endpoint Yahoo v7/quote, 50 symboles par appel
+#  • profil (secteur) : quoteSummary assetProfile par symbole,
+#    uniquement pour les symboles absents du cache
+#  • repli : yf.Ticker(symbol).info si Yahoo refuse le lot
+#  • persistance : store SQLite fundamentals_store.py, relu
+#    avant tout appel réseau et alimenté après chaque appel
+#
+#  UTILISATION :
+#  ─────────────
+#  from chart_module import fundamentals
+#  data = fundamentals.get_many(["AAPL", "MC.PA", ...])
+#  data["AAPL"] → {pe, pb, eps, div_yield, mktcap, shares,
+#                  currency, name, sector}
+# ============================================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import fundamentals_store, http_client
+from .config import FUNDAMENTALS_TTL, PROFILE_TTL
+
+_QUOTE_URL   = "https://query1.finance.yahoo.com/v7/finance/quote"
+_SUMMARY_URL = "https://query2.finance.yahoo.com/v10/finance/quoteSummary/{}"
+_CRUMB_URL   = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+_BATCH       = 50
+
+_lock     = threading.Lock()
+_quotes   = {}      # symbole → (expires_at, {pe, pb, eps, ...})
+_profiles = {}      # symbole → (expires_at, {sector, name})
+_crumb    = {"value": None}
+_stats    = {"hits": 0, "misses": 0, "store_hits": 0, "bulk_calls": 0,
+             "profile_calls": 0, "fallbacks": 0}
+
+
+def _count(key: str, n: int = 1) -> None:
+    with _lock:
+        _stats[key] += n
+
+
+# ── Crumb Yahoo (cookie de session + jeton) ──────────────
+#  Session à cookies dédiée (stateful=True) : la session partagée n'en garde aucun.
+def _get_crumb(refresh: bool = False):
+    if _crumb["value"] and not refresh:
+        return _crumb["value"]
+    try:
+        http_client.get("https://fc.yahoo.com", timeout=5, allow_redirects=True, stateful=True)
+        r = http_client.get(_CRUMB_URL, timeout=5, stateful=True)
+        crumb = r.text.strip() if r.status_code == 200 else None
+    except Exception:
+        crumb = None
+    _crumb["value"] = crumb or None
+    return _crumb["value"]
+
+
+def _yahoo_json(url: str, params: dict):
+    """GET Yahoo avec crumb ; un seul renouvellement du crumb sur 401/403."""
+    for attempt in range(2):
+        crumb = _get_crumb(refresh=attempt > 0)
+        p = dict(params, crumb=crumb) if crumb else params
+        try:
+            r = http_client.get(url, params=p, timeout=10, stateful=True)
+        except Exception:
+            return None
+        if r.status_code == 200:
+            try:
+                return r.json()
+            except ValueError:
+                return None
+        if r.status_code not in (401, 403):
+            return None
+    return None
+
+
+# ── Normalisation ────────────────────────────────────────
+def _from_quote(q: dict) -> dict:
+    div = q.get("trailingAnnualDividendYield")
+    if div is None and q.get("dividendYield") is not None:
+        div = q["dividendYield"] / 100          # v7 : dividendYield en %
+    return {
+        "pe":        q.get("trailingPE") or q.get("forwardPE"),
+        "pb":        q.get("priceToBook"),
+        "eps":       q.get("epsTrailingTwelveMonths") or q.get("epsForward"),
+        "div_yield": div or 0,
+        "mktcap":    q.get("marketCap"),
+        "shares":    q.get("sharesOutstanding"),
+        "currency":  q.get("currency") or "USD",
+        "name":      q.get("shortName") or q.get("longName"),
+    }
+
+
+def _from_info(info: dict) -> dict:
+    return {
+        "pe":        info.get("trailingPE") or info.get("forwardPE"),
+        "pb":        info.get("priceToBook"),
+        "eps":       info.get("trailingEps") or info.get("forwardEps"),
+        "div_yield": info.get("dividendYield", 0) or 0,
+        "mktcap":    info.get("marketCap"),
+        "shares":    info.get("sharesOutstanding"),
+        "currency":  info.get("currency") or "USD",
+        "name":      info.get("shortName") or info.get("longName"),
+    }
+
+
+# ── Chargeurs ────────────────────────────────────────────
+def _bulk_quotes(symbols: list) -> dict:
+    """Ratios pour `symbols` par lots de 50 ; symboles absents de la réponse ignorés."""
+    out = {}
+    for i in range(0, len(symbols), _BATCH):
+        chunk = symbols[i:i + _BATCH]
+        data  = _yahoo_json(_QUOTE_URL, {"symbols": ",".join(chunk)})
+        _count("bulk_calls")
+        for q in ((data or {}).get("quoteResponse") or {}).get("result") or []:
+            sym = q.get("symbol")
+            if sym:
+                out[sym.upper()] = _from_quote(q)
+    return out
+
+
+def _profile(symbol: str):
+    data = _yahoo_json(_SUMMARY_URL.format(symbol), {"modules": "assetProfile,price"})
+    _count("profile_calls")
+    try:
+        res = data["quoteSummary"]["result"][0]
+    except (TypeError, KeyError, IndexError):
+        return None
+    prof  = res.get("assetProfile") or {}
+    price = res.get("price") or {}
+    return {"sector": prof.get("sector") or "—",
+            "name":   price.get("shortName") or price.get("longName")}
+
+
+def _info_fallback(symbol: str):
+    """Ancien chemin par symbole (yfinance .info) : ratios + profil."""
+    try:
+        import yfinance as yf
+        info = yf.Ticker(symbol).info or {}
+    except Exception:
+        return None
+    if not info:
+        return None
+    _count("fallbacks")
+    fundamentals_store.put(symbol, info, source="yfinance", full=True)
+    return _from_info(info), {"sector": info.get("sector") or "—",
+                              "name":   info.get("shortName") or info.get("longName")}
+
+
+def _fresh(table: dict, sym: str, now: float):
+    hit = table.get(sym)
+    return hit[1] if hit is not None and hit[0] > now else None
+
+
+def to_info(q: dict) -> dict:
+    """Format interne → clés yfinance .info (format du store disque)."""
+    return {"trailingPE": q.get("pe"), "priceToBook": q.get("pb"),
+            "trailingEps": q.get("eps"), "dividendYield": q.get("div_yield"),
+            "marketCap": q.get("mktcap"), "sharesOutstanding": q.get("shares"),
+            "currency": q.get("currency"), "shortName": q.get("name"),
+            "sector": q.get("sector")}
+
+
+def _merge(q: dict, p, sym: str) -> dict:
+    p = p or {"sector": "—", "name": None}
+    return {**q, "sector": p.get("sector") or "—", "name": q.get("name") or p.get("name") or sym}
+
+
+# ── API ──────────────────────────────────────────────────
+def fetch(symbols, workers: int = 16) -> dict:
+    """
+    Téléchargement réseau (sans lecture de cache) → {symbole: {pe, pb, eps,
+    div_yield, mktcap, shares, currency, name, sector}}. Les profils encore
+    frais en mémoire ne sont pas redemandés.
+    """
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    now  = time.time()
+    with _lock:
+        need_p = [s for s in syms if _fresh(_profiles, s, now) is None]
+
+    quotes   = _bulk_quotes(syms) if syms else {}
+    profiles = {}
+    # Symboles refusés par le lot → repli .info (donne aussi le profil)
+    missing  = [s for s in syms if s not in quotes]
+    need_p   = [s for s in need_p if s in quotes]
+
+    def _fb(sym):
+        return sym, _info_fallback(sym)
+
+    def _pr(sym):
+        return sym, _profile(sym)
+
+    if missing or need_p:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fundamentals") as ex:
+            for sym, res in ex.map(_fb, missing):
+                if res:
+                    quotes[sym], profiles[sym] = res
+            for sym, res in ex.map(_pr, need_p):
+                if res:
+                    profiles[sym] = res
+
+    now = time.time()
+    with _lock:
+        for sym, q in quotes.items():
+            _quotes[sym] = (now + FUNDAMENTALS_TTL, q)
+        for sym, p in profiles.items():
+            _profiles[sym] = (now + PROFILE_TTL, p)
+        return {s: _merge(q, _fresh(_profiles, s, now), s) for s, q in quotes.items()}
+
+
+def get_many(symbols, workers: int = 16) -> dict:
+    """
+    Fondamentaux de `symbols` → {symbole: {pe, pb, eps, div_yield, mktcap,
+    shares, currency, name, sector}}. Ordre de lecture : cache mémoire,
+    store disque (fundamentals_store), puis Yahoo pour le reste — dont le
+    résultat est écrit dans le store. Un symbole introuvable est absent
+    du résultat.
+    """
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    now  = time.time()
+    out  = {}
+    with _lock:
+        for s in syms:
+            q, p = _fresh(_quotes, s, now), _fresh(_profiles, s, now)
+            if q is not None and p is not None:
+                out[s] = _merge(q, p, s)
+        _stats["hits"]   += len(out)
+        _stats["misses"] += len(syms) - len(out)
+    need = [s for s in syms if s not in out]
+    if not need:
+        return out
+
+    stored = fundamentals_store.get_many(need)
+    with _lock:
+        for sym, info in stored.items():
+            q = _from_info(info)
+            p = {"sector": info.get("sector") or "—", "name": q.get("name")}
+            _quotes[sym]   = (now + FUNDAMENTALS_TTL, q)
+            _profiles[sym] = (now + PROFILE_TTL, p)
+            out[sym] = _merge(q, p, sym)
+        _stats["store_hits"] += len(stored)
+    need = [s for s in need if s not in stored]
+    if not need:
+        return out
+
+    fetched = fetch(need, workers)
+    for sym, q in fetched.items():
+        fundamentals_store.put(sym, to_info(q), source="yahoo")
+    out.update(fetched)
+    return out
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {**_stats, "quotes": len(_quotes), "profiles": len(_profiles)}
+
+
+def clear_cache() -> None:
+    with _lock:
+        _quotes.clear()
+        _profiles.clear()
+        for k in _stats:
+            _stats[k] = 0
@@ -0,0 +1,344 @@
+# ============================================================
+#  chart_module/fundamentals_store.py
+#  Store SQLite des fondamentaux — un snapshot par (ticker, date)
+#
+#  P/E, P/B, EPS, secteur, actions en circulation, dividende,
+#  FCF... ne changent qu'au plus une fois par jour : ils sont
+#  écrits sur disque et relus par le screener, get_ticker_info,
+#  ValuationCalculator et le calendrier des dividendes. Une page
+#  à froid ne touche plus le réseau que pour les prix.
+#
+#  • clés au format yfinance .info (trailingPE, priceToBook...)
+#  • les champs de prix (currentPrice, volume...) ne sont jamais
+#    stockés : ils restent sur le cache court de market_data.py
+#  • un snapshot reprend les champs du précédent qu'il ne fournit
+#    pas (dernière valeur connue à cette date)
+#  • historique conservé → screens point-in-time (as_of)
+#  • job de fond : start_refresher() rafraîchit en lot les tickers
+#    connus du store (bulk v7/quote, fiche .info complète chaque
+#    FUNDAMENTALS_FULL_EVERY)
+#
+#  UTILISATION :
+#  ─────────────
+#  from chart_module import fundamentals_store as fs
+#  info = fs.get("AAPL")                    # dict ou None si absent/périmé
+#  fs.put("AAPL", yf_info, source="yfinance", full=True)
+#  df   = fs.as_of("2024-06-30")            # fondamentaux connus à cette date
+# ============================================================
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as _date
+
+from .config import (FUNDAMENTALS_DB, FUNDAMENTALS_MAX_AGE,
+                     FUNDAMENTALS_REFRESH, FUNDAMENTALS_FULL_EVERY)
+
+# Champs conservés (tout le reste de .info est ignoré)
+FIELDS = (
+    "shortName", "longName", "sector", "industry", "country", "exchange",
+    "currency", "quoteType", "longBusinessSummary", "fullTimeEmployees",
+    "trailingPE", "forwardPE", "pegRatio", "priceToBook", "priceToSales",
+    "trailingEps", "forwardEps", "bookValue",
+    "marketCap", "sharesOutstanding", "beta",
+    "dividendYield", "dividendRate", "payoutRatio",
+    "returnOnEquity", "returnOnAssets", "profitMargins", "operatingMargins",
+    "grossMargins", "revenueGrowth", "earningsGrowth",
+    "totalRevenue", "ebitda", "freeCashflow", "totalDebt", "totalCash",
+    "totalCashPerShare", "debtToEquity", "analystTargetPrice",
+)
+
+# Colonnes SQL dédiées (filtrables sans décoder le JSON)
+_COLS = {"pe": "trailingPE", "pb": "priceToBook", "eps": "trailingEps",
+         "div_yield": "dividendYield", "mktcap": "marketCap", "sector": "sector"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    ticker     TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    full_at    REAL,
+    source     TEXT,
+    pe REAL, pb REAL, eps REAL, div_yield REAL, mktcap REAL, sector TEXT,
+    data       TEXT NOT NULL,
+    PRIMARY KEY (ticker, date)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON snapshots(date);
+"""
+
+_local    = threading.local()
+_lock     = threading.Lock()
+_disabled = {"value": False}       # disque non inscriptible → store inactif
+_refresher = {"thread": None}
+
+
+# ── Connexion (une par thread, WAL) ──────────────────────
+def _conn():
+    if _disabled["value"]:
+        return None
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+    try:
+        folder = os.path.dirname(FUNDAMENTALS_DB)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        conn = sqlite3.connect(FUNDAMENTALS_DB, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _lock:
+            conn.executescript(_SCHEMA)
+    except (sqlite3.Error, OSError):
+        _disabled["value"] = True
+        return None
+    _local.conn = conn
+    return conn
+
+
+# ── Normalisation ────────────────────────────────────────
+def _clean(info: dict) -> dict:
+    out = {}
+    for k in FIELDS:
+        v = info.get(k)
+        if v in (None, "", "None"):
+            continue
+        if isinstance(v, float) and math.isnan(v):
+            continue
+        if hasattr(v, "item"):                 # numpy → scalaire Python
+            v = v.item()
+        out[k] = v
+    return out
+
+
+def _row_to_info(data: str) -> dict:
+    try:
+        return json.loads(data)
+    except (TypeError, ValueError):
+        return {}
+
+
+def _norm(ticker: str) -> str:
+    return ticker.strip().upper()
+
+
+# ── Écriture ─────────────────────────────────────────────
+def put(ticker: str, info: dict, source: str = "", full: bool = False, day=None) -> None:
+    """
+    Enregistre le snapshot du jour (ou de `day`) pour `ticker`.
+    Les champs absents de `info` sont repris du dernier snapshot connu ;
+    `full=True` marque une fiche complète (.info / OVERVIEW).
+    """
+    conn = _conn()
+    fields = _clean(info or {})
+    if conn is None or not fields:
+        return
+    ticker = _norm(ticker)
+    day    = str(day or _date.today())
+    now    = time.time()
+    try:
+        with _lock, conn:
+            prev = conn.execute(
+                "SELECT data, full_at FROM snapshots WHERE ticker=? AND date<=? "
+                "ORDER BY date DESC LIMIT 1", (ticker, day)).fetchone()
+            data    = {**(_row_to_info(prev[0]) if prev else {}), **fields}
+            full_at = now if full else (prev[1] if prev else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (ticker, date, fetched_at, full_at, source, "
+                "pe, pb, eps, div_yield, mktcap, sector, data) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                (ticker, day, now, full_at, source,
+                 *(data.get(k) for k in _COLS.values()), json.dumps(data)))
+    except sqlite3.Error:
+        pass
+
+
+# ── Lecture ──────────────────────────────────────────────
+def _latest(tickers, max_age):
+    """{ticker: (info, fetched_at, full_at)} — dernier snapshot, périmés exclus."""
+    conn = _conn()
+    if conn is None or not tickers:
+        return {}
+    out   = {}
+    limit = time.time() - max_age if max_age is not None else -math.inf
+    try:
+        for i in range(0, len(tickers), 500):
+            chunk = tickers[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows  = conn.execute(
+                f"SELECT s.ticker, s.data, s.fetched_at, s.full_at FROM snapshots s "
+                f"JOIN (SELECT ticker, MAX(date) d FROM snapshots WHERE ticker IN ({marks}) "
+                f"GROUP BY ticker) m ON s.ticker = m.ticker AND s.date = m.d", chunk)
+            for tk, data, fetched_at, full_at in rows:
+                if fetched_at >= limit:
+                    out[tk] = (_row_to_info(data), fetched_at, full_at)
+    except sqlite3.Error:
+        return {}
+    return out
+
+
+def get(ticker: str, max_age: float = FUNDAMENTALS_MAX_AGE, full: bool = False):
+    """
+    Dernier snapshot de `ticker` (dict au format .info) ou None s'il est
+    absent, plus vieux que `max_age` secondes, ou — avec `full=True` —
+    s'il ne contient pas de fiche complète récente.
+    """
+    hit = _latest([_norm(ticker)], max_age).get(_norm(ticker))
+    if hit is None:
+        return None
+    if full and (hit[2] is None or hit[2] < time.time() - FUNDAMENTALS_FULL_EVERY):
+        return None
+    return hit[0]
+
+
+def get_many(tickers, max_age: float = FUNDAMENTALS_MAX_AGE, fetch: bool = False,
+             workers: int = 4) -> dict:
+    """
+    {ticker: info} pour les snapshots frais. Avec `fetch=True`, les tickers
+    absents ou périmés sont d'abord téléchargés (fiche complète) puis stockés.
+    """
+    syms = list(dict.fromkeys(_norm(t) for t in tickers if t and t.strip()))
+    out  = {tk: hit[0] for tk, hit in _latest(syms, max_age).items()}
+    if fetch:
+        missing = [s for s in syms if s not in out]
+        if missing:
+            refresh(missing, full=True, workers=workers)
+            out.update({tk: hit[0] for tk, hit in _latest(missing, None).items()})
+    return out
+
+
+def history(ticker: str):
+    """Historique des snapshots de `ticker` → DataFrame indexé par date."""
+    import pandas as pd
+
+    conn = _conn()
+    if conn is None:
+        return pd.DataFrame()
+    try:
+        rows = conn.execute(
+            "SELECT date, pe, pb, eps, div_yield, mktcap, sector FROM snapshots "
+            "WHERE ticker=? ORDER BY date", (_norm(ticker),)).fetchall()
+    except sqlite3.Error:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows, columns=["date", *_COLS])
+    return df.set_index("date")
+
+
+def as_of(day, tickers=None):
+    """
+    Fondamentaux connus à la date `day` (dernier snapshot <= day par
+    ticker) → DataFrame [ticker, date, pe, pb, eps, div_yield, mktcap,
+    sector]. Base des screens point-in-time.
+    """
+    import pandas as pd
+
+    conn = _conn()
+    cols = ["ticker", "date", *_COLS]
+    if conn is None:
+        return pd.DataFrame(columns=cols)
+    where, args = "date <= ?", [str(day)]
+    if tickers is not None:
+        syms  = [_norm(t) for t in tickers]
+        where += f" AND ticker IN ({','.join('?' * len(syms))})"
+        args  += syms
+    try:
+        rows = conn.execute(
+            f"SELECT s.ticker, s.date, s.pe, s.pb, s.eps, s.div_yield, s.mktcap, s.sector "
+            f"FROM snapshots s JOIN (SELECT ticker, MAX(date) d FROM snapshots WHERE {where} "
+            f"GROUP BY ticker) m ON s.ticker = m.ticker AND s.date = m.d", args).fetchall()
+    except sqlite3.Error:
+        rows = []
+    return pd.DataFrame(rows, columns=cols)
+
+
+def tickers() -> list:
+    """Tous les tickers présents dans le store."""
+    conn = _conn()
+    if conn is None:
+        return []
+    try:
+        return [r[0] for r in conn.execute("SELECT DISTINCT ticker FROM snapshots")]
+    except sqlite3.Error:
+        return []
+
+
+# ── Rafraîchissement ─────────────────────────────────────
+def _full_info(symbol: str) -> dict:
+    try:
+        import yfinance as yf
+        return yf.Ticker(symbol).info or {}
+    except Exception:
+        return {}
+
+
+def refresh(symbols, full: bool = False, workers: int = 4) -> int:
+    """
+    Télécharge et stocke les fondamentaux de `symbols`.
+    full=False : ratios en lot (Yahoo v7/quote, cf. fundamentals.py) ;
+    full=True  : fiche .info complète par symbole (FCF, dette, cash...).
+    Retourne le nombre de snapshots écrits.
+    """
+    syms = list(dict.fromkeys(_norm(s) for s in symbols if s and s.strip()))
+    if not syms:
+        return 0
+    if full:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fstore") as ex:
+            infos = dict(zip(syms, ex.map(_full_info, syms)))
+        n = 0
+        for sym, info in infos.items():
+            if info:
+                put(sym, info, source="yfinance", full=True)
+                n += 1
+        return n
+    from . import fundamentals
+    data = fundamentals.fetch(syms)
+    for sym, q in data.items():
+        put(sym, fundamentals.to_info(q), source="yahoo")
+    return len(data)
+
+
+def refresh_stale(max_age: float = FUNDAMENTALS_REFRESH) -> int:
+    """Rafraîchit les tickers du store dont le dernier snapshot a plus de `max_age` s."""
+    known = tickers()
+    fresh = _latest(known, None)
+    now   = time.time()
+    stale = [t for t in known if fresh.get(t, (None, 0, None))[1] < now - max_age]
+    old   = [t for t in known
+             if (fresh.get(t, (None, 0, None))[2] or 0) < now - FUNDAMENTALS_FULL_EVERY]
+    n = refresh(stale) if stale else 0
+    if old:
+        n += refresh(old, full=True)
+    return n
+
+
+def start_refresher(interval: float = FUNDAMENTALS_REFRESH) -> None:
+    """Lance (une seule fois par processus) le thread de rafraîchissement périodique."""
+    with _lock:
+        th = _refresher["thread"]
+        if th is not None and th.is_alive():
+            return
+
+        def _loop():
+            while True:
+                try:
+                    refresh_stale(interval)
+                except Exception:
+                    pass
+                time.sleep(interval)
+
+        th = threading.Thread(target=_loop, name="fundamentals-refresher", daemon=True)
+        _refresher["thread"] = th
+        th.start()
+
+
+def stats() -> dict:
+    conn = _conn()
+    if conn is None:
+        return {"enabled": False, "tickers": 0, "snapshots": 0}
+    try:
+        n_t, n_s = conn.execute("SELECT COUNT(DISTINCT ticker), COUNT(*) FROM snapshots").fetchone()
+    except sqlite3.Error:
+        n_t = n_s = 0
+    return {"enabled": True, "tickers": n_t, "snapshots": n_s, "path": FUNDAMENTALS_DB}
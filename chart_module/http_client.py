@@ -0,0 +1,121 @@
+# ============================================================
+#  chart_module/http_client.py
+#  Client HTTP partagé — une Session requests par processus
+#  (sans cookies) + une Session à cookies pour le flux crumb Yahoo
+#
+#  • pools de connexions par hôte + keep-alive : Binance,
+#    CoinGecko, Yahoo, FRED... réutilisent des connexions
+#    TCP/TLS chaudes au lieu d'en ouvrir une par appel
+#  • retry/backoff exponentiel urllib3 sur 429/5xx (GET)
+#    au lieu du time.sleep(2) fixe
+#  • limite de requêtes simultanées par hôte (sémaphore)
+#  • la session partagée refuse tous les cookies : les appels
+#    Firebase / OAuth / Firestore ne transportent aucun état
+#    d'un utilisateur à l'autre. Seul le flux crumb Yahoo
+#    (fundamentals.py) passe stateful=True → session dédiée.
+#
+#  UTILISATION :
+#  ─────────────
+#  from chart_module import http_client
+#  r    = http_client.get(url, params={...}, timeout=10)   # requests.Response
+#  data = http_client.get_json(url, params={...})          # JSON ou None
+#  r    = http_client.get(url, stateful=True)                # cookies conservés
+# ============================================================
+
+import threading
+from urllib.parse import urlsplit
+
+from .config import HTTP_POOL_MAXSIZE, HTTP_MAX_PER_HOST, HTTP_RETRIES, HTTP_BACKOFF
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (AM-Terminal/2.0)"}
+
+_lock      = threading.Lock()
+_sessions  = {}             # stateful (bool) → Session
+_host_sems = {}
+
+
+def session(stateful: bool = False):
+    """
+    Session requests partagée (créée au premier appel). Sans cookies par
+    défaut ; `stateful=True` → session dédiée qui conserve ses cookies.
+    """
+    s = _sessions.get(stateful)
+    if s is None:
+        with _lock:
+            s = _sessions.get(stateful)
+            if s is None:
+                s = _sessions[stateful] = _build_session(stateful)
+    return s
+
+
+def _build_session(stateful: bool = False):
+    import requests
+    from http.cookiejar import DefaultCookiePolicy
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=HTTP_RETRIES, connect=HTTP_RETRIES, read=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        # Un Retry-After de plusieurs minutes bloquerait le rendu Streamlit :
+        # on s'en tient au backoff exponentiel borné.
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=HTTP_POOL_MAXSIZE,
+                          max_retries=retry)
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update(DEFAULT_HEADERS)
+    if not stateful:
+        s.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))   # aucun cookie accepté
+    return s
+
+
+def _host_sem(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc.lower()
+    with _lock:
+        sem = _host_sems.get(host)
+        if sem is None:
+            sem = _host_sems[host] = threading.BoundedSemaphore(HTTP_MAX_PER_HOST)
+        return sem
+
+
+def get(url: str, params=None, headers=None, timeout: float = 10,
+        stateful: bool = False, **kwargs):
+    """GET via la session partagée. Même retour/exceptions que requests.get."""
+    with _host_sem(url):
+        return session(stateful).get(url, params=params, headers=headers,
+                                     timeout=timeout, **kwargs)
+
+
+def request(method: str, url: str, timeout: float = 15, stateful: bool = False, **kwargs):
+    """Requête quelconque via la session partagée (seuls GET/HEAD sont rejoués)."""
+    with _host_sem(url):
+        return session(stateful).request(method, url, timeout=timeout, **kwargs)
+
+
+def post(url: str, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def patch(url: str, **kwargs):
+    return request("PATCH", url, **kwargs)
+
+
+def delete(url: str, **kwargs):
+    return request("DELETE", url, **kwargs)
+
+
+def get_json(url: str, params=None, headers=None, timeout: float = 10):
+    """JSON de la réponse si HTTP 200, sinon None (jamais d'exception)."""
+    try:
+        r = get(url, params=params, headers=headers, timeout=timeout)
+        if r.status_code == 200:
+            return r.json()
+    except Exception:
+        pass
+    return None
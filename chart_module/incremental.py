@@ -0,0 +1,307 @@
+# ============================================================
+#  chart_module/incremental.py
+#  Indicateurs incrémentaux — mise à jour O(1) par prix / bougie
+#
+#  Chaque indicateur garde son état et se met à jour sans
+#  recalculer de fenêtre glissante :
+#    push(x)    → nouvelle bougie clôturée (ou nouvelle barre)
+#    replace(x) → nouveau prix sur la bougie en cours (tick)
+#    value      → valeur courante (None tant que pas assez d'historique)
+#
+#  • SMA, EMA
+#  • RSI : SmaRSI (moyennes simples, comme alerts.get_rsi et le
+#    screener) et WilderRSI (lissage de Wilder, RSI « classique »)
+#  • MACross : croisement de deux SMA (même règle que get_ma_cross)
+#  • TickerState : état complet d'un ticker pour le moteur d'alertes
+#
+#  Les sommes glissantes sont recalculées exactement toutes les
+#  _RESYNC mises à jour pour borner la dérive flottante.
+# ============================================================
+
+from collections import deque
+
+_RESYNC = 4096
+
+
+class SMA:
+    """Moyenne mobile simple sur `n` valeurs."""
+
+    def __init__(self, n: int):
+        self.n    = int(n)
+        self.buf  = deque(maxlen=self.n)
+        self.sum  = 0.0
+        self._ops = 0
+
+    def push(self, x: float) -> None:
+        if len(self.buf) == self.n:
+            self.sum -= self.buf[0]
+        self.buf.append(x)
+        self.sum += x
+        self._tick()
+
+    def replace(self, x: float) -> None:
+        if not self.buf:
+            return self.push(x)
+        self.sum += x - self.buf[-1]
+        self.buf[-1] = x
+        self._tick()
+
+    def _tick(self) -> None:
+        self._ops += 1
+        if self._ops >= _RESYNC:
+            self.sum, self._ops = float(sum(self.buf)), 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.buf) == self.n
+
+    @property
+    def value(self):
+        return self.sum / self.n if self.ready else None
+
+
+class EMA:
+    """Moyenne mobile exponentielle (α = 2/(n+1)), amorcée par la SMA des n premières valeurs."""
+
+    def __init__(self, n: int):
+        self.n      = int(n)
+        self.alpha  = 2.0 / (self.n + 1)
+        self._seed  = SMA(self.n)
+        self._prev  = None            # EMA avant la bougie en cours
+        self._value = None
+
+    def push(self, x: float) -> None:
+        self._prev = self._value
+        if self._value is None:
+            self._seed.push(x)
+            self._value = self._seed.value
+        else:
+            self._value = self._value + self.alpha * (x - self._value)
+
+    def replace(self, x: float) -> None:
+        if self._prev is None:
+            self._seed.replace(x)
+            self._value = self._seed.value
+        else:
+            self._value = self._prev + self.alpha * (x - self._prev)
+
+    @property
+    def value(self):
+        return self._value
+
+
+class _RSIBase:
+    """Variations de clôture → gains / pertes ; la moyenne est déléguée aux sous-classes."""
+
+    def __init__(self, n: int = 14):
+        self.n       = int(n)
+        self._last   = None        # dernière clôture (bougie en cours)
+        self._before = None        # clôture précédente
+
+    def push(self, x: float) -> None:
+        if self._last is not None:
+            d = x - self._last
+            self._push_change(max(d, 0.0), max(-d, 0.0))
+        self._before, self._last = self._last, x
+
+    def replace(self, x: float) -> None:
+        if self._before is None:
+            self._last = x
+            return
+        d = x - self._before
+        self._replace_change(max(d, 0.0), max(-d, 0.0))
+        self._last = x
+
+    @staticmethod
+    def _rsi(gain, loss):
+        if gain is None or not loss:
+            return None            # perte nulle → RSI indéfini (comme get_rsi)
+        return 100 - 100 / (1 + gain / loss)
+
+
+class SmaRSI(_RSIBase):
+    """RSI sur moyennes simples des gains / pertes (identique à alerts.get_rsi)."""
+
+    def __init__(self, n: int = 14):
+        super().__init__(n)
+        self.gain = SMA(self.n)
+        self.loss = SMA(self.n)
+
+    def _push_change(self, g, l):
+        self.gain.push(g)
+        self.loss.push(l)
+
+    def _replace_change(self, g, l):
+        self.gain.replace(g)
+        self.loss.replace(l)
+
+    @property
+    def value(self):
+        return self._rsi(self.gain.value, self.loss.value)
+
+
+class WilderRSI(_RSIBase):
+    """RSI de Wilder : amorçage par moyenne simple puis lissage (n-1)/n."""
+
+    def __init__(self, n: int = 14):
+        super().__init__(n)
+        self._seed_g, self._seed_l = SMA(self.n), SMA(self.n)
+        self.avg_g = self.avg_l = None
+        self._prev = None           # (avg_g, avg_l) avant la variation en cours
+
+    def _push_change(self, g, l):
+        self._prev = (self.avg_g, self.avg_l)
+        self._apply(g, l, self._prev, push=True)
+
+    def _replace_change(self, g, l):
+        self._apply(g, l, self._prev, push=False)
+
+    def _apply(self, g, l, prev, push):
+        pg, pl = prev if prev else (None, None)
+        if pg is None:
+            if push:
+                self._seed_g.push(g)
+                self._seed_l.push(l)
+            else:
+                self._seed_g.replace(g)
+                self._seed_l.replace(l)
+            self.avg_g, self.avg_l = self._seed_g.value, self._seed_l.value
+        else:
+            k = self.n
+            self.avg_g = (pg * (k - 1) + g) / k
+            self.avg_l = (pl * (k - 1) + l) / k
+
+    @property
+    def value(self):
+        return self._rsi(self.avg_g, self.avg_l)
+
+
+class MACross:
+    """
+    Croisement SMA rapide / lente. `cross` vaut "up" si la rapide est
+    au-dessus de la lente maintenant et en dessous `lookback` bougies plus
+    tôt, "down" dans le cas inverse (règle de alerts.get_ma_cross).
+    """
+
+    def __init__(self, fast: int = 20, slow: int = 50, lookback: int = 3):
+        self.fast, self.slow = SMA(fast), SMA(slow)
+        self.spread = deque(maxlen=lookback + 1)   # (fast, slow) des dernières bougies
+        self.count  = 0
+        self._min   = slow + 5
+
+    def _snap(self):
+        return (self.fast.value, self.slow.value)
+
+    def push(self, x: float) -> None:
+        self.fast.push(x)
+        self.slow.push(x)
+        self.spread.append(self._snap())
+        self.count += 1
+
+    def replace(self, x: float) -> None:
+        if not self.count:
+            return self.push(x)
+        self.fast.replace(x)
+        self.slow.replace(x)
+        self.spread[-1] = self._snap()
+
+    @property
+    def cross(self):
+        if self.count < self._min or len(self.spread) < self.spread.maxlen:
+            return None
+        (f1, s1), (f0, s0) = self.spread[-1], self.spread[0]
+        if f1 > s1 and f0 < s0:
+            return "up"
+        if f1 < s1 and f0 > s0:
+            return "down"
+        return None
+
+    def result(self) -> dict:
+        f, s = self.spread[-1] if self.spread else (None, None)
+        return {"cross": self.cross,
+                "fast_val": round(f, 2) if f is not None and self.count >= self._min else None,
+                "slow_val": round(s, 2) if s is not None and self.count >= self._min else None}
+
+
+class TickerState:
+    """
+    État incrémental d'un ticker : dernier prix, variation vs clôture
+    précédente, RSI(14) et croisements MA créés à la demande.
+    Expose la même interface (price, change_pct, rsi, ma_cross) que le
+    contexte d'évaluation en lot de chart_module.alerts.
+
+    on_bar(ts, close) : ts identique au dernier → tick sur la bougie en
+    cours ; ts plus récent → nouvelle bougie ; ts plus ancien → ignoré.
+    """
+
+    HISTORY = 256      # clôtures gardées pour amorcer un nouveau MACross
+
+    def __init__(self, rsi_period: int = 14, wilder: bool = False):
+        self.closes   = deque(maxlen=self.HISTORY)
+        self.last_ts  = None
+        self._rsi     = (WilderRSI if wilder else SmaRSI)(rsi_period)
+        self._crosses = {}
+
+    # ── Mises à jour ─────────────────────────────────
+    def push(self, close: float) -> None:
+        close = float(close)
+        self.closes.append(close)
+        self._rsi.push(close)
+        for mc in self._crosses.values():
+            mc.push(close)
+
+    def replace(self, close: float) -> None:
+        if not self.closes:
+            return self.push(close)
+        close = float(close)
+        self.closes[-1] = close
+        self._rsi.replace(close)
+        for mc in self._crosses.values():
+            mc.replace(close)
+
+    def on_bar(self, ts, close: float) -> bool:
+        """Retourne True si l'état a changé."""
+        if self.last_ts is not None and ts < self.last_ts:
+            return False
+        if ts == self.last_ts:
+            self.replace(close)
+        else:
+            self.push(close)
+            self.last_ts = ts
+        return True
+
+    def seed(self, closes, timestamps=None) -> None:
+        """Amorce l'état depuis un historique (O(n), une seule fois)."""
+        if timestamps is None:
+            for c in closes:
+                self.push(c)
+        else:
+            for ts, c in zip(timestamps, closes):
+                self.on_bar(ts, c)
+
+    # ── Lecture (interface du moteur d'alertes) ──────
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    @property
+    def price(self) -> float:
+        return self.closes[-1]
+
+    @property
+    def change_pct(self) -> float:
+        if len(self.closes) < 2 or not self.closes[-2]:
+            return 0
+        return (self.closes[-1] - self.closes[-2]) / self.closes[-2] * 100
+
+    @property
+    def rsi(self) -> float:
+        v = self._rsi.value
+        return float("nan") if v is None else v
+
+    def ma_cross(self, fast: int, slow: int) -> dict:
+        mc = self._crosses.get((fast, slow))
+        if mc is None:
+            mc = self._crosses[(fast, slow)] = MACross(fast, slow)
+            for c in self.closes:
+                mc.push(c)
+        return mc.result()
@@ -0,0 +1,388 @@
+# ============================================================
+#  chart_module/ledger.py
+#  Journal de transactions du portefeuille — sans Streamlit
+#
+#  • transactions : achat, vente, dividende, frais
+#  • livre des positions (lots) maintenu incrémentalement :
+#    FIFO ou prix moyen pondéré ("average"), P&L réalisé
+#  • série NAV journalière mise en cache : seuls les jours
+#    postérieurs au dernier jour calculé sont évalués (le
+#    dernier jour est recalculé, sa clôture bouge en séance)
+#  • performance : TWR (chaîné jour par jour, neutre aux
+#    apports) et MWR (TRI annualisé des flux de l'investisseur)
+#
+#  Convention des flux : un achat est un apport (coût + frais),
+#  une vente un retrait (produit net de frais), supposés en début
+#  de journée ; dividendes et frais isolés sont des revenus
+#  (positifs / négatifs) de la journée.
+#
+#  Une transaction antidatée (date < dernière date du journal)
+#  rejoue le livre et invalide la NAV à partir de sa date.
+#
+#  UTILISATION :
+#  ─────────────
+#  from chart_module.ledger import Ledger, from_positions
+#  led = Ledger("fifo")
+#  led.sync(from_positions(positions) + transactions)
+#  nav = led.nav(closes)            # closes : dates × tickers
+#  nav["twr"], led.mwr()
+# ============================================================
+
+import bisect
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+TX_TYPES = ("buy", "sell", "dividend", "fee")
+METHODS  = ("fifo", "average")
+
+NAV_COLUMNS = ["value", "flow", "income", "invested", "ret", "twr"]
+
+_EPS = 1e-12
+
+
+def _day(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return (ts.tz_localize(None) if ts.tzinfo else ts).normalize()
+
+
+def normalize(tx: dict) -> dict:
+    """Transaction brute (dict Firestore / formulaire) → forme normalisée."""
+    kind = str(tx.get("type", "buy")).lower()
+    if kind not in TX_TYPES:
+        raise ValueError(f"type de transaction inconnu : {kind}")
+    return {
+        "id":     str(tx.get("id") or ""),
+        "date":   _day(tx["date"]),
+        "type":   kind,
+        "ticker": str(tx.get("ticker", "")).upper().strip(),
+        "qty":    abs(float(tx.get("qty") or 0)),
+        "price":  float(tx.get("price") or 0),
+        "fees":   float(tx.get("fees") or 0),
+        "amount": float(tx.get("amount") or 0),
+    }
+
+
+def from_positions(positions, ticker_of=None) -> list:
+    """
+    Positions « plates » (qty, buy_price, fees, buy_date) → transactions
+    d'achat. `ticker_of(pos)` donne le ticker (défaut : pos["ticker_yf"]).
+    """
+    out = []
+    for pos in positions:
+        tk = ticker_of(pos) if ticker_of else pos["ticker_yf"]
+        out.append({
+            "id":     f"pos:{pos.get('added_at') or pos.get('buy_date', '')}:{tk}",
+            "date":   pos.get("buy_date") or pos.get("added_at") or pd.Timestamp.today(),
+            "type":   "buy",
+            "ticker": tk,
+            "qty":    pos.get("qty", 0),
+            "price":  pos.get("buy_price", 0),
+            "fees":   pos.get("fees", 0),
+        })
+    return out
+
+
+def period_for(start) -> str:
+    """Plus petite période yfinance couvrant l'historique depuis `start`."""
+    days = (pd.Timestamp.today().normalize() - _day(start)).days
+    for period, span in (("1mo", 28), ("3mo", 88), ("6mo", 180), ("1y", 362),
+                         ("2y", 728), ("5y", 1824), ("10y", 3650)):
+        if days <= span:
+            return period
+    return "max"
+
+
+def xirr(times, amounts) -> float:
+    """
+    TRI annualisé : racine de Σ a_i (1+r)^-t_i (t en années) par
+    bissection. NaN si les flux ne changent pas de signe.
+    """
+    t = np.asarray(times, float)
+    a = np.asarray(amounts, float)
+    if not (a > 0).any() or not (a < 0).any():
+        return float("nan")
+
+    def npv(r):
+        return float((a * np.power(1.0 + r, -t)).sum())
+
+    lo, hi = -0.9999, 1.0
+    f_lo = npv(lo)
+    while npv(hi) * f_lo > 0:
+        hi *= 4
+        if hi > 1e6:
+            return float("nan")
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        f_mid = npv(mid)
+        if f_mid * f_lo > 0:
+            lo, f_lo = mid, f_mid
+        else:
+            hi = mid
+        if hi - lo < 1e-10:
+            break
+    return (lo + hi) / 2
+
+
+class Ledger:
+    """
+    Journal trié par date + livre des lots par ticker.
+    Lots : deque([quantité, coût unitaire frais inclus]) ; en méthode
+    "average" chaque ticker n'a qu'un lot au prix moyen pondéré.
+    """
+
+    def __init__(self, method: str = "fifo"):
+        if method not in METHODS:
+            raise ValueError(f"méthode inconnue : {method}")
+        self.method = method
+        self.txs    = []
+        self._keys  = []           # dates des transactions (bisect)
+        self._ids   = []
+        self._nav   = None
+        self._reset_book()
+
+    # ── Livre des positions ──────────────────────────
+    def _reset_book(self) -> None:
+        self.lots       = {}       # ticker → deque([qty, unit_cost])
+        self.qty        = {}       # ticker → quantité détenue
+        self.realized   = {}       # ticker → P&L réalisé
+        self.income     = {}       # ticker → dividendes − frais
+        self.last_price = {}       # ticker → dernier prix de transaction
+        # colonnes par transaction appliquée (même ordre que self.txs)
+        self._dq, self._flow, self._inc = [], [], []
+
+    def _apply(self, tx: dict) -> None:
+        tk, kind = tx["ticker"], tx["type"]
+        lots = self.lots.setdefault(tk, deque())
+        dq = flow = inc = 0.0
+
+        if kind == "buy" and tx["qty"] > 0:
+            q, cost = tx["qty"], tx["qty"] * tx["price"] + tx["fees"]
+            if self.method == "average" and lots:
+                held, unit = lots[0]
+                lots[0] = [held + q, (held * unit + cost) / (held + q)]
+            else:
+                lots.append([q, cost / q])
+            dq, flow = q, cost
+            self.qty[tk] = self.qty.get(tk, 0.0) + q
+            self.last_price[tk] = tx["price"]
+
+        elif kind == "sell" and tx["qty"] > 0:
+            q    = min(tx["qty"], self.qty.get(tk, 0.0))    # pas de vente à découvert
+            proceeds, consumed, left = q * tx["price"] - tx["fees"], 0.0, q
+            while left > _EPS and lots:
+                lot  = lots[0]
+                take = min(lot[0], left)
+                consumed += take * lot[1]
+                lot[0]   -= take
+                left     -= take
+                if lot[0] <= _EPS:
+                    lots.popleft()
+            self.realized[tk] = self.realized.get(tk, 0.0) + proceeds - consumed
+            dq, flow = -q, -proceeds
+            self.qty[tk] = max(self.qty.get(tk, 0.0) - q, 0.0)
+            self.last_price[tk] = tx["price"]
+
+        elif kind == "dividend":
+            inc = tx["amount"] or tx["qty"] * tx["price"]
+        elif kind == "fee":
+            inc = -(tx["amount"] or tx["fees"])
+
+        if inc:
+            self.income[tk] = self.income.get(tk, 0.0) + inc
+        self._dq.append(dq)
+        self._flow.append(flow)
+        self._inc.append(inc)
+
+    def _replay(self) -> None:
+        self._reset_book()
+        for tx in self.txs:
+            self._apply(tx)
+
+    # ── Ajout de transactions ────────────────────────
+    def add(self, tx: dict) -> None:
+        """Ajoute une transaction ; O(1) si elle est la plus récente."""
+        tx  = normalize(tx)
+        pos = bisect.bisect_right(self._keys, tx["date"])
+        self.txs.insert(pos, tx)
+        self._keys.insert(pos, tx["date"])
+        self._ids.insert(pos, tx["id"])
+        if pos == len(self.txs) - 1:
+            self._apply(tx)
+        else:
+            self._replay()
+        self._invalidate(tx["date"])
+
+    def sync(self, transactions) -> int:
+        """
+        Aligne le journal sur `transactions` (liste complète, ids stables).
+        Seules les transactions inconnues sont ajoutées ; une suppression
+        ou modification reconstruit tout. Retourne le nombre d'ajouts.
+        """
+        txs   = [normalize(t) for t in transactions]
+        known = {tx["id"]: tx for tx in self.txs}
+        want  = {t["id"]: t for t in txs}
+        if (len(want) != len(txs) or not known.keys() <= want.keys()
+                or any(want[i] != tx for i, tx in known.items())):
+            self.__init__(self.method)
+            known = {}
+        new = sorted((t for t in txs if t["id"] not in known), key=lambda t: t["date"])
+        if not new:
+            return 0
+        if not self._keys or new[0]["date"] >= self._keys[-1]:
+            for t in new:                      # ajouts en fin de journal : O(1) chacun
+                self.add(t)
+            return len(new)
+        for t in new:                          # antidatées : insertion puis un seul rejeu
+            pos = bisect.bisect_right(self._keys, t["date"])
+            self.txs.insert(pos, t)
+            self._keys.insert(pos, t["date"])
+            self._ids.insert(pos, t["id"])
+        self._replay()
+        self._invalidate(new[0]["date"])
+        return len(new)
+
+    def _invalidate(self, day) -> None:
+        if self._nav is not None and len(self._nav) and day <= self._nav.index[-1]:
+            self._nav = self._nav[self._nav.index < day]
+
+    # ── Lecture du livre ─────────────────────────────
+    @property
+    def tickers(self) -> list:
+        return sorted({tx["ticker"] for tx in self.txs})
+
+    @property
+    def start(self):
+        return self._keys[0] if self._keys else None
+
+    def holdings(self) -> dict:
+        return dict(self.qty)
+
+    def book(self, prices: dict = None) -> pd.DataFrame:
+        """
+        Positions par ticker : qty, avg_cost, cost_basis, realized, income
+        (+ price, market_value, unrealized si `prices` est fourni).
+        """
+        rows = []
+        for tk in self.tickers:
+            lots = self.lots.get(tk, ())
+            qty  = self.qty.get(tk, 0.0)
+            cost = sum(l[0] * l[1] for l in lots)
+            rows.append({"ticker": tk, "qty": qty,
+                         "avg_cost": cost / qty if qty > _EPS else 0.0,
+                         "cost_basis": cost,
+                         "realized": self.realized.get(tk, 0.0),
+                         "income": self.income.get(tk, 0.0)})
+        df = pd.DataFrame(rows, columns=["ticker", "qty", "avg_cost", "cost_basis",
+                                         "realized", "income"]).set_index("ticker")
+        if prices is not None:
+            px = df.index.map(lambda tk: prices.get(tk, self.last_price.get(tk, np.nan)))
+            df["price"]        = np.asarray(px, float)
+            df["market_value"] = df["qty"] * df["price"]
+            df["unrealized"]   = df["market_value"] - df["cost_basis"]
+        return df
+
+    # ── NAV journalière ──────────────────────────────
+    def nav(self, closes: pd.DataFrame) -> pd.DataFrame:
+        """
+        NAV journalière (colonnes NAV_COLUMNS) sur le calendrier de
+        `closes` (dates × tickers) depuis la première transaction.
+        Le cache n'est prolongé qu'à partir du dernier jour calculé.
+        """
+        if not self.txs or closes is None or closes.empty:
+            return pd.DataFrame(columns=NAV_COLUMNS)
+        idx  = closes.index
+        if getattr(idx, "tz", None) is not None:
+            idx = idx.tz_localize(None)
+        full = idx[idx >= self.start]
+        if not len(full):
+            return pd.DataFrame(columns=NAV_COLUMNS)
+
+        keep = self._nav
+        if keep is not None and len(keep):
+            keep = keep[keep.index < keep.index[-1]]     # dernier jour recalculé
+            r0   = int(full.searchsorted(keep.index[-1], side="right")) if len(keep) else 0
+        else:
+            keep, r0 = None, 0
+        if r0 >= len(full):
+            return self._nav
+
+        px   = closes.reindex(columns=self.tickers).to_numpy(float)[len(idx) - len(full):]
+        part = self._nav_rows(full, px, r0, keep)
+        self._nav = part if keep is None or not len(keep) else pd.concat([keep, part])
+        return self._nav
+
+    def _nav_rows(self, full, px, r0: int, keep) -> pd.DataFrame:
+        tickers = self.tickers
+        col     = {tk: i for i, tk in enumerate(tickers)}
+        T, K    = len(full) - r0, len(tickers)
+
+        tk   = np.fromiter((col[tx["ticker"]] for tx in self.txs), int, len(self.txs))
+        pos  = full.searchsorted(pd.DatetimeIndex(self._keys), side="left")
+        dq   = np.asarray(self._dq, float)
+        flow = np.asarray(self._flow, float)
+        inc  = np.asarray(self._inc, float)
+
+        before = pos < r0
+        inside = (pos >= r0) & (pos < len(full))
+        base   = np.zeros(K)
+        np.add.at(base, tk[before], dq[before])
+        delta  = np.zeros((T, K))
+        np.add.at(delta, (pos[inside] - r0, tk[inside]), dq[inside])
+        hold   = np.maximum(base + np.cumsum(delta, axis=0), 0.0)
+
+        prices = px[r0:]
+        fill   = np.array([self.last_price.get(t, 0.0) for t in tickers])
+        prices = np.where(np.isnan(prices), fill, prices)
+        value  = (hold * prices).sum(axis=1)
+        f      = np.bincount(pos[inside] - r0, weights=flow[inside], minlength=T)
+        i      = np.bincount(pos[inside] - r0, weights=inc[inside], minlength=T)
+
+        if keep is not None and len(keep):
+            last = keep.iloc[-1]
+            v0, inv0, twr0 = last["value"], last["invested"], last["twr"]
+        else:
+            v0, inv0, twr0 = 0.0, 0.0, 0.0
+        prev = np.concatenate([[v0], value[:-1]])
+        den  = prev + f
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = np.where(den > _EPS, (value + i) / den - 1.0, 0.0)
+        return pd.DataFrame({
+            "value":    value,
+            "flow":     f,
+            "income":   i,
+            "invested": inv0 + np.cumsum(f),
+            "ret":      ret,
+            "twr":      (1.0 + twr0) * np.cumprod(1.0 + ret) - 1.0,
+        }, index=full[r0:])
+
+    # ── Performance ──────────────────────────────────
+    def mwr(self, nav: pd.DataFrame = None, upto=None) -> float:
+        """
+        Rendement pondéré des capitaux (TRI annualisé) jusqu'à `upto`
+        (défaut : dernier jour de la NAV) : apports négatifs, retraits
+        et revenus positifs, valeur finale en flux terminal.
+        """
+        nav = self._nav if nav is None else nav
+        if nav is None or not len(nav):
+            return float("nan")
+        if upto is not None:
+            nav = nav[nav.index <= _day(upto)]
+            if not len(nav):
+                return float("nan")
+        cash = (nav["income"] - nav["flow"]).to_numpy().copy()
+        cash[-1] += nav["value"].iloc[-1]
+        live = cash != 0
+        t = (nav.index - nav.index[0]).days.to_numpy() / 365.25
+        return xirr(t[live], cash[live])
+
+    def mwr_series(self, nav: pd.DataFrame = None, freq: str = "ME") -> pd.Series:
+        """TRI annualisé à chaque fin de période `freq` (courbe MWR)."""
+        nav = self._nav if nav is None else nav
+        if nav is None or not len(nav):
+            return pd.Series(dtype=float)
+        ends = nav["value"].resample(freq).last().dropna().index
+        ends = [nav.index[nav.index <= d][-1] for d in ends] + [nav.index[-1]]
+        ends = sorted(set(ends))
+        return pd.Series([self.mwr(nav, d) for d in ends], index=ends)
@@ -0,0 +1,171 @@
+# ============================================================
+#  chart_module/market_data.py
+#  Passerelle market-data unique pour tout le terminal
+#
+#  Un seul cache OHLCV par processus, indexé par
+#  (source, symbole(s), interval, période) avec un TTL qui
+#  dépend de l'interval → une même bougie n'est téléchargée
+#  qu'une fois par TTL, quel que soit le module appelant.
+#
+#  UTILISATION :
+#  ─────────────
+#  from chart_module import market_data
+#  df = market_data.download("NVDA", period="1y", auto_adjust=True)
+#  df = market_data.history("NVDA", period="6mo")   # colonnes aplaties
+#  market_data.cache_stats()  → {"hits", "misses", "size", ...}
+# ============================================================
+
+import threading
+import time
+from collections import OrderedDict
+
+# ── TTL (secondes) par interval ──────────────────────────
+# Une bougie 1m change chaque minute, une bougie 1d quelques
+# fois par heure au plus (clôture différée Yahoo).
+_TTL = {
+    "1m":  30,   "2m":  60,   "5m":  60,   "15m": 120,
+    "30m": 180,  "60m": 300,  "90m": 300,  "1h":  300,
+    "4h":  600,  "1d":  900,  "5d":  1800, "1w":  3600,
+    "1wk": 3600, "1mo": 3600, "3mo": 3600,
+}
+_DEFAULT_TTL = 300
+_MAX_ENTRIES = 512
+
+_lock     = threading.Lock()
+_entries  = OrderedDict()        # key → (expires_at, value)
+_inflight = {}                   # key → threading.Lock (single-flight)
+_stats    = {"hits": 0, "misses": 0, "evictions": 0, "errors": 0}
+
+
+def ttl_for(interval: str) -> int:
+    """TTL en secondes associé à un interval ('1m', '1h', '1d', ...)."""
+    return _TTL.get((interval or "1d").lower(), _DEFAULT_TTL)
+
+
+def _copy(value):
+    # Les DataFrames sont souvent modifiés en place par les appelants
+    # (df.columns = ..., df["SMA20"] = ...) → on ne partage jamais l'objet caché.
+    if hasattr(value, "copy"):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value
+
+
+def _is_empty(value) -> bool:
+    if value is None:
+        return True
+    if hasattr(value, "empty"):
+        return bool(value.empty)
+    try:
+        return len(value) == 0
+    except TypeError:
+        return False
+
+
+def cached(key: tuple, ttl: float, loader, keep=None):
+    """
+    Retourne la valeur cachée sous `key`, ou appelle `loader()` et la
+    met en cache pendant `ttl` secondes. Les résultats vides (ou refusés
+    par `keep(value)`) et les exceptions ne sont jamais mis en cache.
+    Un seul appel à `loader` par clé à la fois (les appels concurrents
+    attendent le premier).
+    """
+    now = time.time()
+    with _lock:
+        hit = _entries.get(key)
+        if hit is not None and hit[0] > now:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return _copy(hit[1])
+        key_lock = _inflight.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # Un autre thread a peut-être rempli l'entrée pendant l'attente
+        with _lock:
+            hit = _entries.get(key)
+            if hit is not None and hit[0] > time.time():
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+                return _copy(hit[1])
+            _stats["misses"] += 1
+        try:
+            value = loader()
+        except Exception:
+            with _lock:
+                _stats["errors"] += 1
+                _inflight.pop(key, None)
+            raise
+
+        with _lock:
+            if not _is_empty(value) and (keep is None or keep(value)):
+                _entries[key] = (time.time() + ttl, value)
+                _entries.move_to_end(key)
+                while len(_entries) > _MAX_ENTRIES:
+                    _entries.popitem(last=False)
+                    _stats["evictions"] += 1
+            _inflight.pop(key, None)
+        return _copy(value)
+
+
+def _tickers_key(tickers) -> tuple:
+    if isinstance(tickers, str):
+        return tuple(t for t in tickers.replace(",", " ").split() if t)
+    return tuple(str(t).strip() for t in tickers)
+
+
+def download(tickers, period: str = None, interval: str = "1d", **kwargs):
+    """
+    Remplaçant drop-in de `yf.download` passant par le cache partagé.
+    Même signature, même DataFrame retourné (copie).
+    """
+    import yfinance as yf
+
+    kwargs.pop("progress", None)
+    key = ("yf.download", _tickers_key(tickers), interval, period,
+           tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+
+    def _load():
+        return yf.download(tickers, period=period, interval=interval,
+                           progress=False, **kwargs)
+
+    return cached(key, ttl_for(interval), _load)
+
+
+def history(ticker: str, period: str = "1y", interval: str = "1d",
+            auto_adjust: bool = True):
+    """
+    Historique OHLCV d'un seul ticker, colonnes aplaties
+    (Open/High/Low/Close/Volume). DataFrame vide si indisponible.
+    """
+    import pandas as pd
+
+    try:
+        df = download(ticker, period=period, interval=interval,
+                      auto_adjust=auto_adjust)
+    except Exception:
+        return pd.DataFrame()
+    if df is None or df.empty:
+        return pd.DataFrame()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+
+def cache_stats() -> dict:
+    """Compteurs hit/miss du cache partagé (pour le debug / monitoring)."""
+    with _lock:
+        total = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "size":     len(_entries),
+            "hit_rate": round(_stats["hits"] / total * 100, 1) if total else 0.0,
+        }
+
+
+def clear_cache() -> None:
+    """Vide le cache et remet les compteurs à zéro."""
+    with _lock:
+        _entries.clear()
+        for k in _stats:
+            _stats[k] = 0
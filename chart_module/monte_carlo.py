@@ -17,7 +17,9 @@ Correction de dérive de Merton :
 ═══════════════════════════════════════════════════════════════
 """
 from __future__ import annotations
-from typing import List, Dict, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional
 
 import numpy as np
 
@@ -35,7 +37,7 @@ def estimate_params(closes: List[float], freq: str = "1d") -> Dict[str, float]:
 
     Paramètres
     ----------
-    closes : liste de prix de clôture (chronologique)
+    closes : prix de clôture chronologiques (liste ou ndarray, ex. Candles.c)
     freq   : timeframe OHLCV ('1m','5m','15m','1h','4h','1d','1w')
 
     Retourne
@@ -48,7 +50,7 @@ def estimate_params(closes: List[float], freq: str = "1d") -> Dict[str, float]:
         return {"mu": 0.0, "sigma": 0.5, "factor": factor,
                 "mu_per": 0.0, "sig_per": 0.02}
 
-    c       = np.array(closes, dtype=np.float64)
+    c       = np.asarray(closes, dtype=np.float64)
     c       = c[c > 0]          # sécurité : pas de prix nuls
     lr      = np.diff(np.log(c))
     mu_per  = float(np.mean(lr))
@@ -63,6 +65,207 @@ def estimate_params(closes: List[float], freq: str = "1d") -> Dict[str, float]:
     }
 
 
+# ── Moteur streaming ───────────────────────────────────────
+# Au-delà de _MAX_BLOCK cellules (trajectoires × pas), on simule par
+# blocs et les bandes percentiles viennent d'histogrammes par pas
+# (fusionnables bloc après bloc) → mémoire O(chunk × horizon + horizon × bins)
+# au lieu de O(n_sim × horizon × max_j).
+_MAX_BLOCK = 1_000_000
+_PCTS      = [5, 10, 25, 50, 75, 90, 95]
+
+
+# ── Parallélisme reproductible ─────────────────────────────
+# Le découpage en blocs ne dépend que de n_sim et chunk_size, et chaque
+# bloc a son propre flux RNG (SeedSequence.spawn) → résultats identiques
+# au bit près pour une graine donnée, quel que soit le nombre de workers.
+# Threads plutôt que processus : la génération NumPy, cumsum/exp et
+# bincount relâchent le GIL, sans coût de sérialisation des tableaux.
+def _block_rngs(seed: Optional[int], n_blocks: int) -> List[np.random.Generator]:
+    """Un générateur indépendant par bloc, dérivé de `seed`."""
+    return [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n_blocks)]
+
+
+def _n_workers(workers: Optional[int], n_blocks: int) -> int:
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 8)
+    return max(1, min(int(workers), n_blocks))
+
+
+def _run_workers(fn: Callable[[int], None], n_workers: int) -> None:
+    """Exécute fn(0..n_workers-1) — en parallèle si n_workers > 1."""
+    if n_workers == 1:
+        fn(0)
+        return
+    with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="mc") as ex:
+        list(ex.map(fn, range(n_workers)))
+
+
+# ── Réduction de variance ──────────────────────────────────
+#   plain      : tirages pseudo-aléatoires indépendants
+#   antithetic : chemins appariés (Z, −Z) → lignes 2i / 2i+1
+#   control    : variable de contrôle = somme des chocs diffusifs ΣZ,
+#                d'espérance nulle (distincte de la quantité estimée)
+#   sobol      : quasi-Monte Carlo (Sobol brouillé, scipy.stats.qmc),
+#                un brouillage indépendant par bloc → erreur standard
+#                estimée sur la dispersion des moyennes de blocs
+VARIANCE_MODES = ("plain", "antithetic", "control", "sobol")
+_SOBOL_REPS    = 8          # nb minimal de blocs (brouillages) en mode sobol
+
+
+def _block_size(n_sim: int, chunk_size: int, variance: str) -> int:
+    """Taille de bloc : ne dépend que de n_sim, chunk_size et du mode."""
+    chunk_size = max(1, int(chunk_size))
+    if variance == "sobol":
+        target = max(1, n_sim // _SOBOL_REPS)
+        pow2   = 1 << (target.bit_length() - 1)             # puissance de 2 ≤ n_sim / REPS
+        cap    = 1 << (chunk_size.bit_length() - 1)         # puissance de 2 ≤ chunk
+        return min(pow2, cap)
+    if variance == "antithetic":
+        return chunk_size + (chunk_size % 2)                # paires jamais coupées
+    return chunk_size
+
+
+def _sim_layout(n_sim: int, chunk_size: int, variance: str) -> tuple:
+    """
+    (n_sim effectif, taille de bloc). En mode sobol, n_sim est arrondi au
+    bloc supérieur : chaque bloc est une séquence complète de 2^m points.
+    Idempotent : _sim_layout(n_eff, …) renvoie le même couple, ce qui
+    permet à gbm_estimates de retrouver le découpage depuis len(finals).
+    """
+    block = _block_size(n_sim, chunk_size, variance)
+    if variance == "sobol":
+        n_sim = -(-n_sim // block) * block
+        block = _block_size(n_sim, chunk_size, variance)   # 16 blocs → 8 blocs doubles
+    return n_sim, block
+
+
+def _normals(rng: np.random.Generator, n: int, d: int, variance: str) -> np.ndarray:
+    """Tirages N(0,1) de shape (n, d) selon le mode de réduction de variance."""
+    if variance == "antithetic":
+        z   = rng.standard_normal(((n + 1) // 2, d))
+        out = np.empty((n, d), dtype=np.float64)
+        out[0::2] = z
+        out[1::2] = -z[: n // 2]
+        return out
+    if variance == "sobol":
+        from scipy.stats import qmc
+        from scipy.special import ndtri
+        m = max(0, (n - 1).bit_length())
+        u = qmc.Sobol(d=d, scramble=True, seed=rng).random_base2(m)[:n]
+        return ndtri(np.clip(u, 1e-12, 1.0 - 1e-12))
+    return rng.standard_normal((n, d))
+
+
+def mc_estimate(
+    values:       np.ndarray,
+    variance:     str                  = "plain",
+    control:      Optional[np.ndarray] = None,
+    control_mean: Optional[float]      = None,
+    block:        Optional[int]        = None,
+) -> tuple:
+    """
+    (estimation, erreur standard) de E[values] selon le mode de simulation.
+
+    antithetic : écart-type des moyennes de paires (2i, 2i+1)
+    control    : régression sur `control` (espérance `control_mean` connue)
+    sobol      : dispersion des moyennes des blocs de taille `block`
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    if n < 2:
+        return (float(y.mean()) if n else float("nan")), float("nan")
+
+    if variance == "control" and control is not None and control_mean is not None:
+        c     = np.asarray(control, dtype=np.float64)
+        var_c = c.var()
+        beta  = float(np.mean((y - y.mean()) * (c - c.mean())) / var_c) if var_c > 0 else 0.0
+        adj   = y - beta * (c - control_mean)
+        return float(adj.mean()), float(adj.std(ddof=1) / np.sqrt(n))
+
+    if variance == "antithetic" and n >= 4:
+        pairs = y[: n // 2 * 2].reshape(-1, 2).mean(axis=1)
+        return float(y.mean()), float(pairs.std(ddof=1) / np.sqrt(len(pairs)))
+
+    if variance == "sobol" and block and n > block:
+        means = np.add.reduceat(y, np.arange(0, n, block)) / np.diff(np.append(np.arange(0, n, block), n))
+        return float(y.mean()), float(means.std(ddof=1) / np.sqrt(len(means)))
+
+    return float(y.mean()), float(y.std(ddof=1) / np.sqrt(n))
+
+
+def _simulate_block(
+    rng: np.random.Generator, n: int, horizon: int, dt: float,
+    mu_c: float, sigma: float, lam: float, mu_j: float, sigma_j: float,
+    variance: str = "plain",
+) -> tuple:
+    """
+    Log-rendements cumulés log(S_t / S0) pour `n` trajectoires, shape
+    (n, horizon), et somme des chocs diffusifs ΣZ par trajectoire
+    (variable de contrôle).
+
+    Somme des sauts sans tenseur (n, horizon, max_j) : conditionnellement
+    à N sauts, Σ J_i ~ Normal(N·μ_J, N·σ_J²) → un seul tirage normal par case.
+    La réduction de variance porte sur la diffusion ; les sauts restent
+    pseudo-aléatoires.
+    """
+    lr    = _normals(rng, n, horizon, variance)
+    z_sum = lr.sum(axis=1)
+    lr   *= sigma * np.sqrt(dt)
+    lr   += (mu_c - 0.5 * sigma ** 2) * dt
+    N_j = rng.poisson(lam * dt, (n, horizon))
+    if N_j.any():
+        hit = N_j > 0
+        nj  = N_j[hit]
+        lr[hit] += nj * mu_j + np.sqrt(nj) * sigma_j * rng.standard_normal(nj.shape[0])
+    return np.cumsum(lr, axis=1, out=lr), z_sum
+
+
+class _StepHistogram:
+    """
+    Histogramme de log(S_t/S0) par pas de temps, bornes fixées a priori
+    (moyenne ± k·écart-type théorique du pas) → fusionnable entre blocs.
+    Les valeurs hors bornes tombent dans les cases extrêmes.
+    """
+
+    def __init__(self, horizon: int, dt: float, drift: float, var: float,
+                 bins: int = 2048, k: float = 8.0):
+        t          = np.arange(1, horizon + 1, dtype=np.float64) * dt
+        half       = k * np.sqrt(var * t) + 1e-12
+        self.lo    = drift * t - half
+        self.width = 2.0 * half / bins
+        self.bins  = bins
+        self.H     = horizon
+        self.counts = np.zeros(horizon * bins, dtype=np.int64)
+        self.n     = 0
+
+    def merge(self, other: "_StepHistogram") -> None:
+        """Fusion exacte (somme de comptes entiers, indépendante de l'ordre)."""
+        self.counts += other.counts
+        self.n      += other.n
+
+    def add(self, log_cum: np.ndarray) -> None:
+        idx = ((log_cum - self.lo) / self.width).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        idx += np.arange(self.H, dtype=np.int64) * self.bins
+        self.counts += np.bincount(idx.ravel(), minlength=self.counts.size)
+        self.n += log_cum.shape[0]
+
+    def quantiles(self, pcts) -> np.ndarray:
+        """Quantiles (len(pcts), horizon) en log, interpolés dans la case."""
+        c   = self.counts.reshape(self.H, self.bins)
+        cum = np.cumsum(c, axis=1)
+        out = np.empty((len(pcts), self.H))
+        rows = np.arange(self.H)
+        for i, p in enumerate(pcts):
+            target = p / 100.0 * self.n
+            j      = np.argmax(cum >= target, axis=1)
+            before = np.where(j > 0, cum[rows, j - 1], 0)
+            inbin  = np.maximum(c[rows, j], 1)
+            frac   = np.clip((target - before) / inbin, 0.0, 1.0)
+            out[i] = self.lo + (j + frac) * self.width
+        return out
+
+
 def merton_jd(
     S0:       float,
     mu:       float,
@@ -74,6 +277,10 @@ def merton_jd(
     n_sim:    int            = 5_000,
     freq:     str            = "1d",
     seed:     Optional[int]  = None,
+    chunk_size: Optional[int] = None,
+    bins:     int            = 2048,
+    workers:  Optional[int]  = None,
+    variance: str            = "plain",
 ) -> Dict:
     """
     Monte Carlo Merton Jump-Diffusion — entièrement vectorisé NumPy.
@@ -90,14 +297,24 @@ def merton_jd(
     n_sim   : nombre de trajectoires Monte Carlo
     freq    : fréquence des pas ('1d', '4h', etc.)
     seed    : graine aléatoire (None = aléatoire)
+    chunk_size : trajectoires simulées par bloc (None = auto, ~1M cellules
+                 par bloc). Si n_sim ≤ chunk_size : percentiles exacts ;
+                 sinon mode streaming (bandes via histogrammes par pas).
+    bins    : nombre de cases par pas en mode streaming
+    workers : threads de simulation (None = nb de cœurs, max 8). Chaque
+              bloc a son flux RNG issu de SeedSequence(seed).spawn →
+              résultat identique quel que soit `workers`.
+    variance: 'plain' | 'antithetic' | 'control' | 'sobol' (cf. VARIANCE_MODES)
 
     Retourne
     --------
     dict contenant :
       paths        → dict de trajectoires percentiles (p5..p95), listes Python
       n_steps      → horizon + 1 points par trajectoire
-      mean, p5, p25, p50, p75, p95   → stats finales
+      mean, p5, p25, p50, p75, p95   → stats finales (toujours exactes)
       prob_profit  → % de trajectoires terminant > S0
+      se_mean, ci95_mean, se_prob_profit → erreurs standard / IC 95 %
+                     de l'estimateur (selon `variance`)
       var_95       → VaR 95 % (perte)
       cvar_95      → CVaR / Expected Shortfall 95 %
       S0, params   → données d'entrée
@@ -105,71 +322,169 @@ def merton_jd(
     factor = _ANN.get(freq.lower(), 252)
     dt     = 1.0 / factor
 
-    rng = np.random.default_rng(seed)
-
     # ── Correction de dérive Merton ──────────────────────────
     k     = np.exp(mu_j + 0.5 * sigma_j ** 2) - 1.0   # saut moyen exp
     mu_c  = mu - lam * k                                # dérive corrigée
 
-    # ── Composante brownienne  (n_sim × horizon) ─────────────
-    Z     = rng.standard_normal((n_sim, horizon))
-
-    # ── Processus de Poisson  → nombre de sauts par pas ──────
-    N_j   = rng.poisson(lam * dt, (n_sim, horizon))
-
-    # ── Amplitudes log-normales des sauts  ────────────────────
-    #    Pour chaque case on tire N_j sauts et on les somme.
-    #    Optimisation : on génère le max possible et on masque.
-    max_j = int(N_j.max()) if N_j.max() > 0 else 1
-    J_raw = rng.normal(mu_j, sigma_j, (n_sim, horizon, max_j))
-    mask  = np.arange(max_j)[None, None, :] < N_j[:, :, None]
-    J     = (J_raw * mask).sum(axis=2)   # somme des sauts réels
-
-    # ── Log-returns par pas  ──────────────────────────────────
-    lr    = (mu_c - 0.5 * sigma ** 2) * dt \
-            + sigma * np.sqrt(dt) * Z \
-            + J
-
-    # ── Trajectoires de prix  (n_sim × horizon+1) ────────────
-    log_cum = np.cumsum(lr, axis=1)
-    paths   = S0 * np.exp(
-        np.hstack([np.zeros((n_sim, 1), dtype=np.float64), log_cum])
-    )
-
-    # ── Statistiques terminales ───────────────────────────────
-    finals     = paths[:, -1]
-
-    PCTS = [5, 10, 25, 50, 75, 90, 95]
-    perc_paths = {
-        f"p{p}": np.percentile(paths, p, axis=0).tolist()
-        for p in PCTS
-    }
+    if variance not in VARIANCE_MODES:
+        raise ValueError(f"variance inconnue : {variance!r} (attendu : {VARIANCE_MODES})")
+    if chunk_size is None:
+        chunk_size = max(1, _MAX_BLOCK // max(horizon, 1))
+    n_sim, block = _sim_layout(n_sim, chunk_size, variance)
+    exact    = n_sim <= chunk_size
+    sim      = (horizon, dt, mu_c, sigma, lam, mu_j, sigma_j, variance)
+    n_blocks = -(-n_sim // block)
+    rngs     = _block_rngs(seed, n_blocks)
+    n_w      = _n_workers(workers, n_blocks)
+    finals   = np.empty(n_sim, dtype=np.float64)
+    z_sums   = np.empty(n_sim, dtype=np.float64)
+
+    if exact:
+        # ── Tout tient en mémoire : percentiles exacts ────────
+        log_all = np.empty((n_sim, horizon), dtype=np.float64)
+    else:
+        # ── Streaming : histogrammes par pas, un par worker ───
+        # Moments annualisés de log(S_t/S0) → bornes des histogrammes
+        drift = mu_c - 0.5 * sigma ** 2 + lam * mu_j
+        var   = sigma ** 2 + lam * (mu_j ** 2 + sigma_j ** 2)
+        hists = [_StepHistogram(horizon, dt, drift, var, bins=bins) for _ in range(n_w)]
+
+    def _work(w: int) -> None:
+        # Worker w traite les blocs w, w+n_w, ... ; écritures disjointes
+        for b in range(w, n_blocks, n_w):
+            lo             = b * block
+            n              = min(block, n_sim - lo)
+            log_cum, z_sum = _simulate_block(rngs[b], n, *sim)
+            if exact:
+                log_all[lo:lo + n] = log_cum
+            else:
+                hists[w].add(log_cum)
+            finals[lo:lo + n] = S0 * np.exp(log_cum[:, -1])
+            z_sums[lo:lo + n] = z_sum
+
+    _run_workers(_work, n_w)
+    if exact:
+        log_q = np.percentile(log_all, _PCTS, axis=0)
+        del log_all
+    else:
+        hist = hists[0]
+        for h in hists[1:]:
+            hist.merge(h)
+        log_q = hist.quantiles(_PCTS)
+
+    # ── Erreurs standard (moyenne et P(profit)) ───────────────
+    # Contrôle ΣZ (espérance nulle) : sans sauts, la composante GBM
+    # coïnciderait avec S_T et annulerait artificiellement la variance.
+    est_mean = mc_estimate(finals, variance, z_sums, 0.0, block)
+    est_prob = mc_estimate((finals > S0).astype(np.float64), variance, z_sums, 0.0, block)
+
+    # ── Bandes percentiles (pas 0 = S0) ───────────────────────
+    band = S0 * np.exp(np.hstack([np.zeros((len(_PCTS), 1)), log_q]))
+    perc_paths = {f"p{p}": band[i].tolist() for i, p in enumerate(_PCTS)}
+
+    return _summary(finals, perc_paths, S0, {
+        "mu": mu, "sigma": sigma, "lam": lam,
+        "mu_j": mu_j, "sigma_j": sigma_j,
+        "horizon": horizon, "n_sim": n_sim, "freq": freq,
+        "variance": variance,
+    }, est_mean, est_prob)
+
+
+def gbm_paths(
+    S0:        float,
+    drift:     float,
+    diffusion: float,
+    horizon:   int,
+    n_sim:     int,
+    seed:      Optional[int] = None,
+    workers:   Optional[int] = None,
+    block:     int           = 1024,
+    variance:  str           = "plain",
+) -> np.ndarray:
+    """
+    Trajectoires GBM complètes, simulées par blocs de `block` chemins
+    sur plusieurs threads.
+
+    drift, diffusion : incréments log par pas ((μ − ½σ²)·dt et σ·√dt)
+    variance         : 'plain' | 'antithetic' | 'sobol' ('control' simule
+                       comme 'plain', le contrôle s'applique dans gbm_estimates)
+
+    Retourne un tableau (horizon, n_sim) de prix (en mode sobol, n_sim est
+    arrondi à un nombre entier de blocs). Pour une graine donnée,
+    le résultat est identique au bit près quel que soit `workers`
+    (un flux RNG SeedSequence.spawn par bloc).
+    """
+    if variance not in VARIANCE_MODES:
+        raise ValueError(f"variance inconnue : {variance!r} (attendu : {VARIANCE_MODES})")
+    n_sim, block = _sim_layout(n_sim, block, variance)
+    n_blocks = max(1, -(-n_sim // block))
+    rngs     = _block_rngs(seed, n_blocks)
+    paths    = np.empty((horizon, n_sim), dtype=np.float64)
+
+    n_w = _n_workers(workers, n_blocks)
+
+    def _work(w: int) -> None:
+        for b in range(w, n_blocks, n_w):
+            lo = b * block
+            n  = min(block, n_sim - lo)
+            Z  = _normals(rngs[b], n, horizon, variance).T
+            paths[:, lo:lo + n] = S0 * np.exp(np.cumsum(drift + diffusion * Z, axis=0))
+
+    _run_workers(_work, n_w)
+    return paths
+
+
+def gbm_estimates(
+    finals:    np.ndarray,
+    S0:        float,
+    drift:     float,
+    diffusion: float,
+    horizon:   int,
+    variance:  str = "plain",
+    block:     int = 1024,
+) -> Dict[str, float]:
+    """
+    Prix final moyen et P(hausse) avec erreurs standard, pour des
+    trajectoires issues de gbm_paths (mêmes `variance` et `block`).
+    En mode 'control', la variable de contrôle est la somme des chocs
+    gaussiens ΣZ = (log(S_T/S0) − T·drift) / diffusion, d'espérance nulle :
+    corrélée à S_T sans lui être égale (S_T comme son propre contrôle
+    annulerait la variance et donnerait un IC de largeur nulle).
+    """
+    block  = _sim_layout(len(finals), block, variance)[1]
+    z_sum  = (np.log(finals / S0) - horizon * drift) / diffusion if diffusion > 0 else None
+    mean, se_mean = mc_estimate(finals, variance, z_sum, 0.0, block)
+    prob, se_prob = mc_estimate((finals > S0).astype(np.float64), variance, z_sum, 0.0, block)
+    return {"mean": mean, "se_mean": se_mean, "prob_up": prob, "se_prob_up": se_prob}
+
 
-    p5_val  = float(np.percentile(finals, 5))
+def _summary(finals: np.ndarray, perc_paths: Dict, S0: float, params: Dict,
+             est_mean: tuple, est_prob: tuple) -> Dict:
+    """Statistiques terminales + mise en forme du résultat de merton_jd."""
+    p5_val, p25, p50, p75, p95 = np.percentile(finals, [5, 25, 50, 75, 95])
     cvar_mask = finals[finals <= p5_val]
     cvar95  = float(cvar_mask.mean() - S0) if len(cvar_mask) > 0 else float(p5_val - S0)
 
     return {
         # Trajectoires pour affichage graphique
         "paths":       perc_paths,
-        "n_steps":     horizon + 1,
+        "n_steps":     params["horizon"] + 1,
 
-        # Stats résumées
-        "mean":        float(np.mean(finals)),
+        # Stats résumées (moyenne et P(profit) selon le mode de variance)
+        "mean":        est_mean[0],
+        "se_mean":     est_mean[1],
+        "ci95_mean":   (est_mean[0] - 1.96 * est_mean[1], est_mean[0] + 1.96 * est_mean[1]),
         "p5":          float(p5_val),
-        "p25":         float(np.percentile(finals, 25)),
-        "p50":         float(np.percentile(finals, 50)),
-        "p75":         float(np.percentile(finals, 75)),
-        "p95":         float(np.percentile(finals, 95)),
-        "prob_profit": float(np.mean(finals > S0) * 100),
+        "p25":         float(p25),
+        "p50":         float(p50),
+        "p75":         float(p75),
+        "p95":         float(p95),
+        "prob_profit": est_prob[0] * 100,
+        "se_prob_profit": est_prob[1] * 100,
         "var_95":      float(p5_val - S0),
         "cvar_95":     cvar95,
 
         # Méta
         "S0":   float(S0),
-        "params": {
-            "mu": mu, "sigma": sigma, "lam": lam,
-            "mu_j": mu_j, "sigma_j": sigma_j,
-            "horizon": horizon, "n_sim": n_sim, "freq": freq,
-        },
+        "params": params,
     }
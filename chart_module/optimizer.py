@@ -0,0 +1,316 @@
+"""
+optimizer.py — Balayage de paramètres & walk-forward des backtests
+===================================================================
+Évalue des milliers de combinaisons de paramètres en parallèle sur un
+pool de processus, pour les deux moteurs de backtest.py :
+
+  engine="long"   → run_backtest (RSI, MA, Bollinger, SL/TP, commission)
+  engine="quant"  → quant_signal + run_positions (fenêtres, seuils, frais)
+
+Partage des données : le DataFrame OHLCV est envoyé une seule fois à
+chaque processus (initializer du pool), et les indicateurs sont mis en
+cache par processus, indexés par les seuls paramètres qui les changent
+(ex. bb_period / ma_fast / ma_slow) — les variations de seuils, SL/TP et
+frais réutilisent les mêmes colonnes.
+
+Fonctions publiques
+-------------------
+  grid(space)                              → toutes les combinaisons
+  random_search(space, n, seed)            → n combinaisons tirées au hasard
+  sweep(df, engine, strategy, params, …)   → tableau classé (DataFrame)
+  walk_forward(df, engine, strategy, …)    → (folds, résumé out-of-sample)
+  heatmap(table, x, y, metric)             → matrice pivot pour go.Heatmap
+"""
+
+from __future__ import annotations
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import backtest
+
+METRICS = ("sharpe", "cagr", "max_dd", "total_ret", "n_trades", "win_rate")
+
+# Paramètres qui modifient les indicateurs (clé du cache par processus)
+_LONG_IND  = ("bb_period", "ma_fast", "ma_slow")
+_QUANT_IND = ("window", "k", "fast", "slow", "rsi_n", "rsi_lo", "rsi_hi", "atr_n", "atr_mult")
+
+_CHUNK = 32     # combinaisons par tâche envoyée au pool
+
+# Espaces de recherche par défaut (engine, stratégie) → {param: [valeurs]}
+_LONG_COMMON  = {"stop_loss_pct": [0, 5, 10], "take_profit_pct": [0, 10, 20]}
+DEFAULT_SPACES = {
+    ("long", "RSI Oversold/Overbought"):             {"rsi_buy": [25, 30, 35], "rsi_sell": [65, 70, 75], **_LONG_COMMON},
+    ("long", "MACD Crossover"):                      dict(_LONG_COMMON),
+    ("long", "Moving Average Cross (Golden Cross)"): {"ma_fast": [10, 20, 30, 40], "ma_slow": [50, 100, 150, 200], **_LONG_COMMON},
+    ("long", "Bollinger Bounce"):                    {"bb_period": [10, 15, 20, 25, 30], **_LONG_COMMON},
+    ("long", "Combinée (RSI + MACD)"):               dict(_LONG_COMMON),
+    ("quant", "Mean Reversion (Bollinger)"):         {"window": [10, 20, 30, 40], "k": [1.5, 2, 2.5]},
+    ("quant", "Momentum (SMA Crossover)"):           {"fast": [10, 20, 30, 40], "slow": [50, 100, 150, 200]},
+    ("quant", "RSI Reversal"):                       {"rsi_n": [7, 14, 21], "rsi_lo": [20, 25, 30], "rsi_hi": [70, 75, 80]},
+    ("quant", "Breakout Volatilité"):                {"atr_n": [10, 14, 20], "atr_mult": [0.3, 0.5, 0.8]},
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  1. ESPACES DE RECHERCHE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def grid(space: Dict[str, list]) -> List[Dict]:
+    """Produit cartésien {param: [valeurs]} → [{param: valeur}, ...]."""
+    keys = list(space)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(space[k] for k in keys))]
+
+
+def random_search(space: Dict[str, list], n: int, seed: Optional[int] = 0) -> List[Dict]:
+    """`n` combinaisons distinctes tirées uniformément dans la grille."""
+    keys  = list(space)
+    sizes = [len(space[k]) for k in keys]
+    total = int(np.prod(sizes)) if sizes else 0
+    if total == 0:
+        return []
+    rng   = np.random.default_rng(seed)
+    flat  = rng.choice(total, size=min(n, total), replace=False)
+    out   = []
+    for f in np.sort(flat):
+        idx = np.unravel_index(int(f), sizes)
+        out.append({k: space[k][i] for k, i in zip(keys, idx)})
+    return out
+
+
+def _valid(engine: str, p: Dict) -> bool:
+    """Écarte les combinaisons incohérentes (MA rapide ≥ lente, seuils RSI croisés)."""
+    if engine == "long":
+        return (p.get("ma_fast", 20) < p.get("ma_slow", 50)
+                and p.get("rsi_buy", 30) < p.get("rsi_sell", 70))
+    return (p.get("fast", 20) < p.get("slow", 50)
+            and p.get("rsi_lo", 30) < p.get("rsi_hi", 70))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  2. ÉVALUATION (côté processus)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_W: Dict = {}   # état par processus : {"df": OHLCV, "ind": {clé → indicateurs}}
+
+
+def _init_worker(df: pd.DataFrame) -> None:
+    _W["df"]  = df
+    _W["ind"] = {}
+
+
+def _indicators(engine: str, strategy: str, p: Dict):
+    keys = _LONG_IND if engine == "long" else _QUANT_IND
+    key  = (strategy,) + tuple(p.get(k) for k in keys)
+    hit  = _W["ind"].get(key)
+    if hit is None:
+        if engine == "long":
+            hit = backtest.add_indicators(_W["df"], **{k: p[k] for k in _LONG_IND if k in p})
+        else:
+            base = _W["df"][["Open", "High", "Low", "Close", "Volume"]].copy()
+            sig, _ = backtest.quant_signal(base, strategy, **{k: p[k] for k in _QUANT_IND if k in p})
+            hit = (base, sig)
+        _W["ind"][key] = hit
+    return hit
+
+
+def _score(engine: str, strategy: str, capital: float, p: Dict,
+           window: Optional[Tuple] = None) -> Dict:
+    """Métriques d'une combinaison sur la fenêtre [début, fin] (dates incluses)."""
+    lo, hi = window if window else (None, None)
+    if engine == "long":
+        data = _indicators(engine, strategy, p).loc[lo:hi]
+        if len(data) < 3:
+            return {}
+        r = backtest.simulate(
+            data, strategy, capital,
+            rsi_buy=p.get("rsi_buy", 30), rsi_sell=p.get("rsi_sell", 70),
+            stop_loss_pct=p.get("stop_loss_pct", 5),
+            take_profit_pct=p.get("take_profit_pct", 0),
+            commission_pct=p.get("commission_pct", 0.1),
+        )
+        years = max(len(data) / 252, 1e-9)
+        growth = r["final_value"] / capital
+        return {
+            "sharpe":    float(r["sharpe"]),
+            "cagr":      float(growth ** (1 / years) - 1) if growth > 0 else -1.0,
+            "max_dd":    float(r["max_drawdown"]) / 100,
+            "total_ret": float(r["total_return_pct"]) / 100,
+            "n_trades":  int(r["num_trades"]),
+            "win_rate":  float(r["win_rate"]) / 100,
+        }
+
+    base, sig = _indicators(engine, strategy, p)
+    df = base.loc[lo:hi].copy()
+    if len(df) < 3:
+        return {}
+    _, m = backtest.run_positions(df, sig.loc[lo:hi], capital, p.get("fees", 0.001))
+    return {k: float(m[k]) for k in METRICS}
+
+
+def _eval_chunk(engine: str, strategy: str, capital: float,
+                chunk: List[Dict], window: Optional[Tuple]) -> List[Dict]:
+    rows = []
+    for p in chunk:
+        m = _score(engine, strategy, capital, p, window)
+        if m:
+            rows.append({**p, **m})
+    return rows
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  3. BALAYAGE & WALK-FORWARD
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _n_workers(workers: Optional[int], n_tasks: int) -> int:
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 8)
+    return max(1, min(int(workers), n_tasks))
+
+
+def _pool(df: pd.DataFrame, workers: Optional[int], n_tasks: int) -> Optional[ProcessPoolExecutor]:
+    """Pool de processus initialisé avec `df` (None si un seul worker suffit)."""
+    n_w = _n_workers(workers, n_tasks)
+    if n_w == 1:
+        return None
+    return ProcessPoolExecutor(max_workers=n_w, initializer=_init_worker, initargs=(df,))
+
+
+def _run(df: pd.DataFrame, engine: str, strategy: str, capital: float,
+         params: List[Dict], window: Optional[Tuple], workers: Optional[int],
+         pool: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+    chunks = [params[i:i + _CHUNK] for i in range(0, len(params), _CHUNK)]
+    own    = pool is None
+    if own:
+        pool = _pool(df, workers, len(chunks))
+    if pool is None:
+        _init_worker(df)
+        return [row for c in chunks for row in _eval_chunk(engine, strategy, capital, c, window)]
+    try:
+        futs = [pool.submit(_eval_chunk, engine, strategy, capital, c, window) for c in chunks]
+        return [row for f in futs for row in f.result()]
+    finally:
+        if own:
+            pool.shutdown()
+
+
+def sweep(
+    df:       pd.DataFrame,
+    engine:   str,
+    strategy: str,
+    params:   List[Dict],
+    capital:  float         = 10_000,
+    metric:   str           = "sharpe",
+    window:   Optional[Tuple] = None,
+    workers:  Optional[int] = None,
+    pool:     Optional[ProcessPoolExecutor] = None,
+) -> pd.DataFrame:
+    """
+    Évalue chaque combinaison de `params` (grid / random_search) et
+    retourne un DataFrame [paramètres…, sharpe, cagr, max_dd, …] classé
+    par `metric` décroissant (max_dd : le moins profond d'abord).
+    """
+    if engine not in ("long", "quant"):
+        raise ValueError(f"engine inconnu : {engine!r} (attendu : 'long' ou 'quant')")
+    params = [p for p in params if _valid(engine, p)]
+    rows   = _run(df, engine, strategy, capital, params, window, workers, pool)
+    table  = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table = table.sort_values(metric, ascending=False, kind="stable").reset_index(drop=True)
+    table.index += 1
+    return table
+
+
+def _fold(df: pd.DataFrame, engine: str, strategy: str, params: List[Dict],
+          capital: float, metric: str, k: int, is_len: int, oos_len: int,
+          pool: Optional[ProcessPoolExecutor]) -> List[Dict]:
+    """Fold k du walk-forward : optimisation IS puis rejeu OOS du meilleur jeu."""
+    idx     = df.index
+    n       = len(idx)
+    s0      = k * oos_len
+    is_win  = (idx[s0], idx[s0 + is_len - 1])
+    oos_win = (idx[s0 + is_len], idx[min(s0 + is_len + oos_len, n) - 1])
+    ins = sweep(df, engine, strategy, params, capital, metric, is_win, pool=pool)
+    if ins.empty:
+        return []
+    best = ins.iloc[0]
+    # Colonne par colonne : conserve les entiers (fenêtres de rolling)
+    p    = {c: ins[c].iloc[0] for c in ins.columns if c not in METRICS}
+    p    = {c: (v.item() if hasattr(v, "item") else v) for c, v in p.items()}
+    _init_worker(df)
+    oos  = _score(engine, strategy, capital, p, oos_win)
+    return [{
+        "fold": k + 1,
+        "IS":   f"{is_win[0]:%Y-%m-%d} → {is_win[1]:%Y-%m-%d}",
+        "OOS":  f"{oos_win[0]:%Y-%m-%d} → {oos_win[1]:%Y-%m-%d}",
+        **p,
+        **{f"is_{m}": float(best[m]) for m in METRICS},
+        **{f"oos_{m}": oos.get(m, np.nan) for m in METRICS},
+    }]
+
+
+def walk_forward(
+    df:       pd.DataFrame,
+    engine:   str,
+    strategy: str,
+    params:   List[Dict],
+    capital:  float         = 10_000,
+    metric:   str           = "sharpe",
+    n_folds:  int           = 4,
+    is_ratio: float         = 0.7,
+    workers:  Optional[int] = None,
+) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Walk-forward glissant : la période est découpée en `n_folds` fenêtres
+    in-sample (IS, `is_ratio` de l'historique) suivies chacune d'un bloc
+    out-of-sample (OOS). Sur chaque fold, la meilleure combinaison IS
+    (selon `metric`) est rejouée telle quelle sur l'OOS suivant.
+
+    Les indicateurs sont calculés sur tout l'historique puis découpés :
+    ils sont causaux, l'OOS bénéficie donc d'un préchauffage sans
+    regarder vers l'avant.
+
+    Retourne (folds, résumé) — folds : une ligne par fold avec dates,
+    paramètres retenus, métriques IS et OOS ; résumé : moyennes OOS et
+    efficacité walk-forward (métrique OOS / IS).
+    """
+    idx     = df.index
+    n       = len(idx)
+    oos_len = int(n * (1 - is_ratio) / n_folds)
+    is_len  = n - n_folds * oos_len
+    if oos_len < 5 or is_len < 30:
+        raise ValueError("Historique trop court pour ce découpage walk-forward")
+
+    rows = []
+    # Un seul pool pour tous les folds : données envoyées une fois, cache
+    # d'indicateurs conservé d'un fold à l'autre
+    pool = _pool(df, workers, -(-len(params) // _CHUNK))
+    try:
+        for k in range(n_folds):
+            rows.extend(_fold(df, engine, strategy, params, capital, metric,
+                              k, is_len, oos_len, pool))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    folds = pd.DataFrame(rows)
+    if folds.empty:
+        return folds, {}
+    is_m, oos_m = folds[f"is_{metric}"].mean(), folds[f"oos_{metric}"].mean()
+    summary = {f"oos_{m}": float(folds[f"oos_{m}"].mean()) for m in METRICS}
+    summary["efficiency"] = float(oos_m / is_m) if np.isfinite(is_m) and is_m != 0 else np.nan
+    return folds, summary
+
+
+def heatmap(table: pd.DataFrame, x: str, y: str, metric: str = "sharpe") -> pd.DataFrame:
+    """
+    Matrice y × x de `metric` (meilleure valeur sur les autres paramètres ;
+    max_dd est négatif, le max est donc aussi le moins profond), prête
+    pour go.Heatmap(z=m.values, x=m.columns, y=m.index).
+    """
+    return table.pivot_table(index=y, columns=x, values=metric, aggfunc="max")
@@ -0,0 +1,130 @@
+# ============================================================
+#  chart_module/portfolio.py
+#  Valorisation vectorisée du portefeuille — sans Streamlit
+#
+#  Toutes les positions sont résolues en UN appel multi-tickers
+#  (au lieu d'un history() par position) puis valorisées par
+#  opérations NumPy : valeur de marché, P&L, poids.
+#  L'historique est retourné sous forme de matrice
+#  (dates × tickers) déjà alignée → valeur du portefeuille =
+#  produit matriciel avec le vecteur des quantités.
+#
+#  UTILISATION :
+#  ─────────────
+#  from chart_module import portfolio
+#  tickers = [p["ticker_yf"] for p in positions]
+#  prices  = portfolio.last_prices(tickers)            # {ticker: prix}
+#  val     = portfolio.value_positions(positions, prices)
+#  closes  = portfolio.close_matrix(tickers, "6mo")    # DataFrame aligné
+#  values  = portfolio.position_values(closes, tickers, val["qty"])
+# ============================================================
+
+import numpy as np
+import pandas as pd
+
+LAST_PRICE_TTL = 60          # secondes — prix « temps réel » de l'écran portfolio
+
+
+def _unique(tickers) -> list:
+    return list(dict.fromkeys(str(t).strip() for t in tickers if t))
+
+
+def _closes(raw: pd.DataFrame, tickers: list) -> pd.DataFrame:
+    """Sortie yf.download → DataFrame des clôtures (dates × tickers)."""
+    if raw is None or raw.empty:
+        return pd.DataFrame(columns=tickers, dtype=float)
+    if not isinstance(raw.columns, pd.MultiIndex):
+        if "Close" not in raw.columns or len(tickers) != 1:
+            return pd.DataFrame(columns=tickers, dtype=float)
+        return raw[["Close"]].set_axis(tickers, axis=1)
+    level = 0 if "Close" in raw.columns.get_level_values(0) else 1
+    closes = raw.xs("Close", axis=1, level=level)
+    return closes.reindex(columns=tickers).astype(float)
+
+
+def close_matrix(tickers, period: str = "1y") -> pd.DataFrame:
+    """
+    Clôtures ajustées de tous les `tickers` en un seul téléchargement
+    (cache market_data). Colonnes dans l'ordre de `tickers` (uniques),
+    calendriers différents alignés : forward-fill puis back-fill des
+    premières dates. Colonne entièrement NaN si le ticker est inconnu.
+    """
+    from . import market_data
+
+    tickers = _unique(tickers)
+    if not tickers:
+        return pd.DataFrame()
+    try:
+        raw = market_data.download(tickers, period=period, auto_adjust=True)
+    except Exception:
+        raw = None
+    closes = _closes(raw, tickers).sort_index()
+    return closes.ffill().bfill()
+
+
+def last_prices(tickers) -> dict:
+    """
+    Dernier prix de chaque ticker ({ticker: float}) en un seul appel
+    (bougie journalière en cours) ; les tickers sans cotation sont absents.
+    """
+    from . import market_data
+
+    tickers = _unique(tickers)
+    if not tickers:
+        return {}
+
+    def _load():
+        import yfinance as yf
+        return yf.download(tickers, period="5d", interval="1d",
+                           auto_adjust=True, progress=False)
+
+    try:
+        raw = market_data.cached(("portfolio.last", tuple(tickers)),
+                                 LAST_PRICE_TTL, _load)
+    except Exception:
+        return {}
+    last = _closes(raw, tickers).ffill().iloc[-1:] if raw is not None else None
+    if last is None or last.empty:
+        return {}
+    return {tk: float(v) for tk, v in last.iloc[0].items() if np.isfinite(v)}
+
+
+def value_positions(positions, prices: dict) -> dict:
+    """
+    Valorisation de toutes les positions en opérations vectorielles.
+    `positions` : dicts avec ticker_yf, qty, buy_price, fees.
+    Prix manquant → prix d'achat (même repli qu'avant).
+    Retourne {colonne: ndarray (N,)} : qty, buy_price, fees, current,
+    cost_basis, market_value, pnl_abs, pnl_pct, weight (% de la valeur).
+    """
+    n     = len(positions)
+    qty   = np.fromiter((float(p.get("qty", 0)) for p in positions), float, n)
+    buy   = np.fromiter((float(p.get("buy_price", 0)) for p in positions), float, n)
+    fees  = np.fromiter((float(p.get("fees", 0)) for p in positions), float, n)
+    quote = np.fromiter((prices.get(p["ticker_yf"], np.nan) for p in positions), float, n)
+    current = np.where(np.isnan(quote), buy, quote)
+
+    cost  = qty * buy + fees
+    value = qty * current
+    pnl   = value - cost
+    total = value.sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl_pct = np.where(cost != 0, pnl / cost * 100, 0.0)
+        weight  = value / total * 100 if total else np.zeros(n)
+    return {"qty": qty, "buy_price": buy, "fees": fees, "current": current,
+            "cost_basis": cost, "market_value": value, "pnl_abs": pnl,
+            "pnl_pct": pnl_pct, "weight": weight}
+
+
+def position_values(closes: pd.DataFrame, tickers, qty) -> pd.DataFrame:
+    """
+    Valeur de chaque position dans le temps (dates × positions) :
+    colonnes de `closes` sélectionnées par ticker (doublons permis)
+    multipliées par le vecteur des quantités.
+    """
+    if closes is None or closes.empty:
+        return pd.DataFrame()
+    cols = closes.columns.get_indexer(list(tickers))
+    mat  = closes.to_numpy()[:, np.maximum(cols, 0)] * np.asarray(qty, float)
+    mat[:, cols < 0] = np.nan
+    return pd.DataFrame(mat, index=closes.index)
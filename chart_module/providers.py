@@ -0,0 +1,207 @@
+# ============================================================
+#  chart_module/providers.py
+#  Appels aux fournisseurs OHLCV : chronométrage, stats
+#  par fournisseur et mode "race" (course parallèle)
+#
+#  En mode race, tous les fournisseurs éligibles partent en
+#  même temps sur un pool de threads ; la première réponse
+#  valide non vide gagne, les autres sont ignorées (annulées
+#  si elles n'ont pas encore démarré). La latence de la page
+#  est alors bornée par la source saine la plus rapide.
+#
+#  Circuit breaker par fournisseur :
+#    closed    → appels normaux
+#    open      → après BREAKER_FAILURES échecs consécutifs (ou un
+#                taux d'erreur ≥ 50 % sur la fenêtre glissante),
+#                tout appel est refusé immédiatement (CircuitOpenError)
+#    half_open → après le cooldown, un seul appel-sonde passe :
+#                succès → closed, échec → open (cooldown doublé)
+# ============================================================
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .config import BREAKER_FAILURES, BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN
+
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ohlcv-provider")
+
+_WINDOW = 20        # taille de la fenêtre glissante pour le taux d'erreur
+
+_lock  = threading.Lock()
+_stats = {}     # nom → {calls, ok, fail, last_ms, avg_ms, last_error, wins, state, ...}
+
+
+class CircuitOpenError(RuntimeError):
+    """Le fournisseur est en circuit ouvert : appel refusé sans réseau."""
+
+
+def _entry(name: str) -> dict:
+    return _stats.setdefault(name, {
+        "calls": 0, "ok": 0, "fail": 0, "wins": 0, "rejected": 0,
+        "last_ms": None, "avg_ms": None, "last_error": None,
+        "state": "closed", "consecutive_fail": 0, "open_until": 0.0,
+        "cooldown": float(BREAKER_COOLDOWN), "probing": False,
+        "window": deque(maxlen=_WINDOW),
+    })
+
+
+def _error_rate(s: dict) -> float:
+    w = s["window"]
+    return (w.count(False) / len(w)) if w else 0.0
+
+
+def _acquire(name: str) -> None:
+    """Vérifie le breaker avant un appel ; lève CircuitOpenError si refusé."""
+    with _lock:
+        s   = _entry(name)
+        now = time.time()
+        if s["state"] == "open":
+            if now < s["open_until"]:
+                s["rejected"] += 1
+                raise CircuitOpenError(
+                    f"{name}: circuit ouvert ({s['open_until'] - now:.0f}s restantes)")
+            s["state"] = "half_open"
+        if s["state"] == "half_open":
+            if s["probing"]:
+                s["rejected"] += 1
+                raise CircuitOpenError(f"{name}: sonde half-open déjà en cours")
+            s["probing"] = True
+
+
+def _record(name: str, ok: bool, ms: float, error: str = None) -> None:
+    with _lock:
+        s = _entry(name)
+        s["calls"]  += 1
+        s["ok" if ok else "fail"] += 1
+        s["last_ms"] = round(ms, 1)
+        # Moyenne exponentielle → réagit vite aux dégradations
+        s["avg_ms"]  = round(ms if s["avg_ms"] is None else 0.8 * s["avg_ms"] + 0.2 * ms, 1)
+        s["window"].append(ok)
+        if error:
+            s["last_error"] = error
+
+        was_probe   = s["probing"]
+        s["probing"] = False
+        if ok:
+            s["consecutive_fail"] = 0
+            if was_probe or s["state"] != "closed":
+                # Rétabli : on repart d'une fenêtre propre
+                s["cooldown"] = float(BREAKER_COOLDOWN)
+                s["window"].clear()
+            s["state"] = "closed"
+            return
+
+        s["consecutive_fail"] += 1
+        if was_probe:
+            # Sonde ratée → on rouvre, cooldown doublé (plafonné)
+            s["cooldown"] = min(s["cooldown"] * 2, float(BREAKER_MAX_COOLDOWN))
+            _open(name, s)
+        elif s["state"] == "closed" and (
+            s["consecutive_fail"] >= BREAKER_FAILURES
+            or (len(s["window"]) >= _WINDOW // 2 and _error_rate(s) >= 0.5)
+        ):
+            _open(name, s)
+
+
+def _open(name: str, s: dict) -> None:
+    s["state"]      = "open"
+    s["open_until"] = time.time() + s["cooldown"]
+    print(f"[chart_module] Circuit OUVERT pour {name} ({s['cooldown']:.0f}s) — {s['last_error']}")
+
+
+def is_available(name: str) -> bool:
+    """False si le breaker de `name` refuserait un appel maintenant."""
+    with _lock:
+        s = _stats.get(name)
+        if s is None or s["state"] == "closed":
+            return True
+        if s["state"] == "open":
+            return time.time() >= s["open_until"]
+        return not s["probing"]
+
+
+def call(name: str, fn):
+    """
+    Appelle `fn()` à travers le circuit breaker de `name`, en
+    enregistrant latence et succès/échec. Une réponse vide compte
+    comme un échec (ValueError). Lève CircuitOpenError sans appeler
+    `fn` si le circuit est ouvert.
+    """
+    _acquire(name)
+    t0 = time.perf_counter()
+    try:
+        res = fn()
+        if res is None or len(res) == 0:
+            raise ValueError(f"{name}: données vides")
+    except Exception as e:
+        _record(name, False, (time.perf_counter() - t0) * 1000, str(e)[:200])
+        raise
+    _record(name, True, (time.perf_counter() - t0) * 1000)
+    return res
+
+
+def race(candidates: list, timeout: float = 15.0):
+    """
+    Lance tous les `candidates` [(nom, fn), ...] en parallèle et retourne
+    (nom, résultat) du premier qui répond avec des données non vides.
+    Les fournisseurs en circuit ouvert sont écartés d'office.
+    Lève RuntimeError si tous échouent ou si `timeout` est dépassé.
+    """
+    candidates = [(name, fn) for name, fn in candidates if is_available(name)]
+    if not candidates:
+        raise RuntimeError("Aucun fournisseur éligible (circuits ouverts)")
+    pending = {_POOL.submit(call, name, fn): name for name, fn in candidates}
+    errors  = {}
+    deadline = time.monotonic() + timeout
+    while pending:
+        done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                       return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for fut in done:
+            name = pending.pop(fut)
+            try:
+                res = fut.result()
+            except Exception as e:
+                errors[name] = str(e)
+                continue
+            for other in pending:
+                other.cancel()
+            with _lock:
+                _entry(name)["wins"] += 1
+            return name, res
+    for fut, name in pending.items():
+        fut.cancel()
+        errors.setdefault(name, f"timeout {timeout:.0f}s")
+    raise RuntimeError(f"Tous les fournisseurs ont échoué : {errors}")
+
+
+def provider_stats() -> dict:
+    """
+    État par fournisseur : breaker (closed / open / half_open), taux
+    d'erreur sur la fenêtre, latence (dernière / moyenne, ms), compteurs.
+    """
+    now = time.time()
+    with _lock:
+        out = {}
+        for name, s in _stats.items():
+            d = {k: v for k, v in s.items() if k not in ("window", "probing", "open_until")}
+            d["error_rate"] = round(_error_rate(s) * 100, 1)
+            d["retry_in"]   = max(0.0, round(s["open_until"] - now, 1)) if s["state"] == "open" else 0.0
+            out[name] = d
+        return out
+
+
+def degraded() -> list:
+    """Noms des fournisseurs dont le circuit n'est pas fermé."""
+    with _lock:
+        return sorted(name for name, s in _stats.items() if s["state"] != "closed")
+
+
+def reset(name: str = None) -> None:
+    """Referme le(s) circuit(s) et efface les stats (tous si `name` est None)."""
+    with _lock:
+        for n in ([name] if name else list(_stats)):
+            _stats.pop(n, None)
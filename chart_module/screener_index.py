@@ -0,0 +1,288 @@
+# ============================================================
+#  chart_module/screener_index.py
+#  Index d'indicateurs du screener + moteur de requêtes
+#
+#  L'index est construit UNE fois par chargement de l'univers,
+#  sur la matrice des clôtures (dates × symboles) entière :
+#  aucun calcul par symbole, aucune boucle Python sur l'univers.
+#  Les filtres sont ensuite des expressions évaluées sur des
+#  colonnes NumPy déjà calculées (quelques µs pour 5 000 lignes).
+#
+#  Colonnes : price, volume, chg_1d/5d/1m/3m, rsi, dist_52w_high,
+#  dist_52w_low, dist_ma20/50/200, vol_z + fondamentaux (pe, pb,
+#  eps, div_yield, mktcap, sector...).
+#
+#  Syntaxe des requêtes (sous-ensemble d'expressions Python) :
+#    rsi < 30 and 5 <= pe <= 20
+#    (isna(pb) or pb < 3) and sector in ("Technology", "Energy")
+#    not (dist_ma200 < 0) and vol_z > 2 and price / eps < 15
+#  Comparaisons avec NaN → False ; isna()/notna()/abs() disponibles.
+#
+#  UTILISATION :
+#  ─────────────
+#  from chart_module.screener_index import build_index
+#  idx  = build_index(closes, volumes, fundamentals)
+#  mask = idx.query("rsi < 30 and chg_1m > 0")
+#  df   = idx.frame[mask]
+# ============================================================
+
+import ast
+import operator
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+RSI_PERIOD = 14
+PERF_WINDOWS = {"chg_1d": 1, "chg_5d": 5, "chg_1m": 21, "chg_3m": 63}
+MA_WINDOWS   = (20, 50, 200)
+YEAR_BARS    = 252
+VOLZ_WINDOW  = 20
+HIST_BARS    = 63            # mini graphique (3 mois)
+
+TEXT_COLS = ("symbol", "name", "currency", "sector")
+
+
+# ══════════════════════════════════════════
+#  CONSTRUCTION DE L'INDEX
+# ══════════════════════════════════════════
+
+def _right_align(closes: np.ndarray, *others: np.ndarray):
+    """
+    Pousse les valeurs valides de chaque colonne en bas de la matrice
+    (ordre conservé, NaN en tête) : la ligne -1 devient la dernière
+    clôture de chaque symbole quel que soit son calendrier de cotation.
+    Les autres matrices suivent la même permutation.
+    """
+    valid = ~np.isnan(closes)
+    order = np.argsort(valid, axis=0, kind="stable")
+    out   = [np.take_along_axis(m, order, axis=0) for m in (closes, *others)]
+    return out, valid.sum(axis=0)
+
+
+def _tail(m: np.ndarray, n: int) -> np.ndarray:
+    return m[-n:] if n <= len(m) else np.vstack(
+        [np.full((n - len(m), m.shape[1]), np.nan), m])
+
+
+def _pct(a, b) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (a / b - 1.0) * 100.0
+
+
+def compute_indicators(closes: np.ndarray, volumes: np.ndarray) -> dict:
+    """
+    Indicateurs vectorisés sur des matrices (T × N) alignées à droite.
+    Retourne {colonne: ndarray (N,)}. NaN quand l'historique est trop court.
+    """
+    last = closes[-1]
+    cols = {"price": last, "volume": np.nan_to_num(volumes[-1], nan=0.0)}
+
+    for name, d in PERF_WINDOWS.items():
+        cols[name] = np.round(_pct(last, _tail(closes, d + 1)[0]), 2)
+
+    # RSI (moyennes simples des gains / pertes, comme l'ancien _rsi)
+    diff  = np.diff(_tail(closes, RSI_PERIOD + 1), axis=0)
+    gain  = np.clip(diff, 0, None).mean(axis=0)
+    loss  = (-np.clip(diff, None, 0)).mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = gain / np.where(loss == 0, np.nan, loss)
+    cols["rsi"] = np.round(100 - 100 / (1 + rs), 1)
+
+    # Distance aux extrêmes 52 semaines (sur clôtures)
+    year = _tail(closes, YEAR_BARS)
+    with np.errstate(all="ignore"):
+        hi, lo = np.nanmax(year, axis=0), np.nanmin(year, axis=0)
+    cols["dist_52w_high"] = np.round(_pct(last, hi), 2)
+    cols["dist_52w_low"]  = np.round(_pct(last, lo), 2)
+
+    # Distance aux moyennes mobiles (NaN si moins de n clôtures)
+    for n in MA_WINDOWS:
+        ma = _tail(closes, n).mean(axis=0)
+        cols[f"dist_ma{n}"] = np.round(_pct(last, ma), 2)
+
+    # Z-score du dernier volume vs les VOLZ_WINDOW séances précédentes
+    prev = _tail(volumes, VOLZ_WINDOW + 1)[:-1]
+    mu, sd = prev.mean(axis=0), prev.std(axis=0, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cols["vol_z"] = np.round((volumes[-1] - mu) / np.where(sd == 0, np.nan, sd), 2)
+    return cols
+
+
+def build_index(closes: pd.DataFrame, volumes: pd.DataFrame, fundamentals: dict,
+                min_bars: int = 5) -> "ScreenerIndex":
+    """
+    closes / volumes : DataFrames (dates × symboles) issus d'un
+    téléchargement multi-tickers ; fundamentals : {symbole: {pe, pb, eps,
+    div_yield (fraction), mktcap, currency, name, sector}}.
+    Les symboles avec moins de `min_bars` clôtures ou un prix nul sont exclus.
+    """
+    symbols = [str(s) for s in closes.columns]
+    vol_m   = volumes.reindex(index=closes.index, columns=closes.columns).to_numpy(dtype=np.float64)
+    (c, v), n_valid = _right_align(closes.to_numpy(dtype=np.float64), vol_m)
+
+    keep = (n_valid >= min_bars) & (np.nan_to_num(c[-1]) != 0)
+    c, v = c[:, keep], v[:, keep]
+    symbols = [s for s, k in zip(symbols, keep) if k]
+
+    cols = compute_indicators(c, v)
+    cols["price"] = np.round(cols["price"], 2)
+
+    f = [fundamentals.get(s, {}) for s in symbols]
+
+    def _num(key, digits=None, scale=1.0):
+        a = np.array([x.get(key) if x.get(key) else np.nan for x in f], dtype=np.float64) * scale
+        return np.round(a, digits) if digits is not None else a
+
+    cols["pe"]        = _num("pe", 1)
+    cols["pb"]        = _num("pb", 2)
+    cols["eps"]       = _num("eps", 3)
+    cols["div_yield"] = np.nan_to_num(_num("div_yield", 2, 100.0), nan=0.0)
+    cols["mktcap"]    = _num("mktcap")
+
+    text = {
+        "symbol":   np.array(symbols, dtype=object),
+        "name":     np.array([(x.get("name") or s)[:28] for s, x in zip(symbols, f)], dtype=object),
+        "currency": np.array([x.get("currency") or "USD" for x in f], dtype=object),
+        "sector":   np.array([x.get("sector", "—") for x in f], dtype=object),
+    }
+    hist = _tail(c, HIST_BARS)
+    hist_lists = [col[~np.isnan(col)].tolist() for col in hist.T]
+    return ScreenerIndex(cols, text, hist_lists)
+
+
+# ══════════════════════════════════════════
+#  INDEX + REQUÊTES
+# ══════════════════════════════════════════
+
+class ScreenerIndex:
+    """Colonnes NumPy de l'univers, trié par market cap décroissante."""
+
+    def __init__(self, cols: dict, text: dict, hist: list):
+        order = np.argsort(-np.nan_to_num(cols["mktcap"], nan=-np.inf), kind="stable")
+        self.cols  = {k: np.asarray(a)[order] for k, a in {**text, **cols}.items()}
+        self.hist  = [hist[i] for i in order]
+        self.frame = pd.DataFrame(self.cols)
+        self.frame["hist"] = self.hist
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def columns(self) -> list:
+        return list(self.cols)
+
+    def query(self, expr: str) -> np.ndarray:
+        """Masque booléen des lignes satisfaisant `expr` (vide → tout)."""
+        if not expr or not expr.strip():
+            return np.ones(len(self), dtype=bool)
+        out = compile_query(expr.strip())(self.cols)
+        return np.broadcast_to(np.asarray(out, dtype=bool), (len(self),))
+
+    def select(self, expr: str) -> pd.DataFrame:
+        return self.frame[self.query(expr)]
+
+
+# ── Compilation des expressions ──────────────────────────
+
+_CMP = {ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+        ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne}
+_BIN = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+        ast.Div: operator.truediv}
+
+
+def _isna(a):
+    a = np.asarray(a)
+    return pd.isna(a) if a.dtype == object else np.isnan(a)
+
+
+_FUNCS = {"isna": _isna, "notna": lambda a: ~_isna(a), "abs": np.abs}
+
+
+def _compile(node):
+    """Nœud AST → fonction cols → ndarray. Tout nœud non prévu est refusé."""
+    if isinstance(node, ast.Expression):
+        return _compile(node.body)
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(v) for v in node.values]
+        op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        def f(c):
+            out = parts[0](c)
+            for p in parts[1:]:
+                out = op(out, p(c))
+            return out
+        return f
+
+    if isinstance(node, ast.UnaryOp):
+        inner = _compile(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda c: np.logical_not(inner(c))
+        if isinstance(node.op, ast.USub):
+            return lambda c: -inner(c)
+
+    if isinstance(node, ast.Compare):
+        left  = _compile(node.left)
+        steps = []
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                values = ast.literal_eval(right)
+                if isinstance(values, (str, int, float)):
+                    values = (values,)
+                steps.append((op, lambda c, v=tuple(values): v))
+            elif type(op) in _CMP:
+                steps.append((op, _compile(right)))
+            else:
+                raise ValueError(f"Opérateur non supporté : {type(op).__name__}")
+
+        def f(c):
+            out, a = None, left(c)
+            for op, rhs in steps:
+                b = rhs(c)
+                if isinstance(op, (ast.In, ast.NotIn)):
+                    r = np.isin(a, list(b))
+                    r = ~r if isinstance(op, ast.NotIn) else r
+                else:
+                    with np.errstate(invalid="ignore"):
+                        r = _CMP[type(op)](a, b)
+                out = r if out is None else out & r
+                a = b
+            return out
+        return f
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN:
+        lhs, rhs, op = _compile(node.left), _compile(node.right), _BIN[type(node.op)]
+        def f(c):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return op(lhs(c), rhs(c))
+        return f
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+            and node.func.id in _FUNCS and len(node.args) == 1 and not node.keywords:
+        fn, arg = _FUNCS[node.func.id], _compile(node.args[0])
+        return lambda c: fn(arg(c))
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        def f(c):
+            try:
+                return c[name]
+            except KeyError:
+                raise ValueError(f"Colonne inconnue : {name}") from None
+        return f
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+        v = node.value
+        return lambda c: v
+
+    raise ValueError(f"Expression non supportée : {ast.dump(node)[:60]}")
+
+
+@lru_cache(maxsize=256)
+def compile_query(expr: str):
+    """Compile (et met en cache) une expression de filtre."""
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Syntaxe invalide : {e.msg}") from None
+    return _compile(tree)
@@ -12,26 +12,16 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
-import time
+from chart_module import http_client
 from datetime import datetime, timedelta
 
 # ══════════════════════════════════════════════
 #  HELPERS
 # ══════════════════════════════════════════════
 
-def _get(url, params=None, retries=2, timeout=10):
-    for _ in range(retries):
-        try:
-            r = requests.get(url, params=params, timeout=timeout)
-            if r.status_code == 429:
-                time.sleep(2)
-                continue
-            if r.status_code == 200:
-                return r.json()
-        except:
-            pass
-    return None
+def _get(url, params=None, timeout=10):
+    # Retry/backoff (429, 5xx) et keep-alive gérés par la session partagée
+    return http_client.get_json(url, params=params, timeout=timeout)
 
 PLOTLY_BASE = dict(
     template="plotly_dark", paper_bgcolor="#000000", plot_bgcolor="#0a0a0a",
@@ -13,8 +13,7 @@ import base64
 from datetime import datetime
 
 import streamlit as st
-import yfinance as yf
-import pandas as pd
+from chart_module import market_data
 import numpy as np
 import plotly.graph_objects as go
 
@@ -77,11 +76,9 @@ def _styles():
 # ══════════════════════════════════════════
 def _chart_image(ticker: str, width_mm=170, height_mm=70) -> RLImage | None:
     try:
-        df = yf.download(ticker, period="6mo", auto_adjust=True)
+        df = market_data.history(ticker, period="6mo")
         if df.empty:
             return None
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
 
         fig = go.Figure(go.Candlestick(
             x=df.index,
@@ -5,7 +5,7 @@ Gère : inscription, connexion, mode invité, connexion Google, sauvegarde/charg
 """
 
 import streamlit as st
-import requests
+from chart_module import http_client, firestore
 import json
 from datetime import datetime
 
@@ -28,7 +28,7 @@ def _log_visit():
     try:
         # Incrémenter le compteur global
         url_counter = f"{FIRESTORE_URL}/analytics/global"
-        r = requests.get(url_counter, timeout=5)
+        r = http_client.get(url_counter, timeout=5)
         if r.status_code == 200:
             fields = r.json().get("fields", {})
             total = int(fields.get("total_visits", {}).get("integerValue", 0)) + 1
@@ -43,7 +43,7 @@ def _log_visit():
             st.session_state["visit_tracked"] = True
 
         # Mettre à jour le compteur global
-        requests.patch(url_counter, json={"fields": {
+        http_client.patch(url_counter, json={"fields": {
             "total_visits":     {"integerValue": str(total)},
             "unique_sessions":  {"integerValue": str(unique)},
             "last_visit":       {"stringValue": datetime.datetime.utcnow().isoformat()},
@@ -53,7 +53,7 @@ def _log_visit():
         if is_new:
             visit_id = str(uuid.uuid4())[:8]
             url_visit = f"{FIRESTORE_URL}/analytics/visits/items/{visit_id}"
-            requests.patch(url_visit, json={"fields": {
+            http_client.patch(url_visit, json={"fields": {
                 "timestamp": {"stringValue": datetime.datetime.utcnow().isoformat()},
                 "session_id": {"stringValue": visit_id},
             }}, timeout=5)
@@ -67,14 +67,14 @@ def _log_module(module_name: str):
     import datetime
     try:
         url = f"{FIRESTORE_URL}/analytics/modules"
-        r = requests.get(url, timeout=5)
+        r = http_client.get(url, timeout=5)
         if r.status_code == 200:
             fields = r.json().get("fields", {})
             count = int(fields.get(module_name, {}).get("integerValue", 0)) + 1
         else:
             fields, count = {}, 1
         fields[module_name] = {"integerValue": str(count)}
-        requests.patch(url, json={"fields": fields}, timeout=5)
+        http_client.patch(url, json={"fields": fields}, timeout=5)
     except Exception:
         pass
 
@@ -82,7 +82,7 @@ def _log_module(module_name: str):
 def get_analytics_stats() -> dict:
     """Récupère les stats pour le dashboard admin."""
     try:
-        r = requests.get(f"{FIRESTORE_URL}/analytics/global", timeout=5)
+        r = http_client.get(f"{FIRESTORE_URL}/analytics/global", timeout=5)
         if r.status_code == 200:
             fields = r.json().get("fields", {})
             return {
@@ -102,19 +102,19 @@ def get_analytics_stats() -> dict:
 def sign_up(email: str, password: str) -> dict:
     url = f"{AUTH_URL}:signUp?key={FIREBASE_API_KEY}"
     payload = {"email": email, "password": password, "returnSecureToken": True}
-    r = requests.post(url, json=payload)
+    r = http_client.post(url, json=payload)
     return r.json()
 
 def sign_in(email: str, password: str) -> dict:
     url = f"{AUTH_URL}:signInWithPassword?key={FIREBASE_API_KEY}"
     payload = {"email": email, "password": password, "returnSecureToken": True}
-    r = requests.post(url, json=payload)
+    r = http_client.post(url, json=payload)
     return r.json()
 
 def reset_password(email: str) -> dict:
     url = f"{AUTH_URL}:sendOobCode?key={FIREBASE_API_KEY}"
     payload = {"requestType": "PASSWORD_RESET", "email": email}
-    r = requests.post(url, json=payload)
+    r = http_client.post(url, json=payload)
     return r.json()
 
 
@@ -158,7 +158,7 @@ def sign_in_with_google_token(id_token_google: str) -> dict:
         "returnSecureToken": True,
         "returnIdpCredential": True,
     }
-    r = requests.post(url, json=payload)
+    r = http_client.post(url, json=payload)
     return r.json()
 
 
@@ -169,7 +169,7 @@ def exchange_google_code(code: str) -> dict:
     """
     try:
         redirect_uri = st.secrets.get("REDIRECT_URI", "http://localhost:8501")
-        r = requests.post(
+        r = http_client.post(
             "https://oauth2.googleapis.com/token",
             data={
                 "code": code,
@@ -245,27 +245,9 @@ def _handle_google_callback():
 def _firestore_headers(id_token: str) -> dict:
     return {"Authorization": f"Bearer {id_token}", "Content-Type": "application/json"}
 
-def _to_firestore(value):
-    if isinstance(value, bool):  return {"booleanValue": value}
-    if isinstance(value, int):   return {"integerValue": str(value)}
-    if isinstance(value, float): return {"doubleValue": value}
-    if isinstance(value, str):   return {"stringValue": value}
-    if isinstance(value, list):
-        return {"arrayValue": {"values": [_to_firestore(v) for v in value]}}
-    if isinstance(value, dict):
-        return {"mapValue": {"fields": {k: _to_firestore(v) for k, v in value.items()}}}
-    return {"stringValue": str(value)}
-
-def _from_firestore(field):
-    if "stringValue"  in field: return field["stringValue"]
-    if "integerValue" in field: return int(field["integerValue"])
-    if "doubleValue"  in field: return float(field["doubleValue"])
-    if "booleanValue" in field: return field["booleanValue"]
-    if "arrayValue"   in field:
-        return [_from_firestore(v) for v in field["arrayValue"].get("values", [])]
-    if "mapValue" in field:
-        return {k: _from_firestore(v) for k, v in field["mapValue"].get("fields", {}).items()}
-    return None
+# Conversion partagée avec le worker d'alertes (chart_module/firestore.py)
+_to_firestore   = firestore.to_value
+_from_firestore = firestore.from_value
 
 
 # ══════════════════════════════════════════════
@@ -275,12 +257,12 @@ def _from_firestore(field):
 def save_user_config(id_token: str, uid: str, config: dict) -> bool:
     url = f"{FIRESTORE_URL}/users/{uid}"
     fields = {k: _to_firestore(v) for k, v in config.items()}
-    r = requests.patch(url, headers=_firestore_headers(id_token), json={"fields": fields})
+    r = http_client.patch(url, headers=_firestore_headers(id_token), json={"fields": fields})
     return r.status_code == 200
 
 def load_user_config(id_token: str, uid: str) -> dict:
     url = f"{FIRESTORE_URL}/users/{uid}"
-    r = requests.get(url, headers=_firestore_headers(id_token))
+    r = http_client.get(url, headers=_firestore_headers(id_token))
     if r.status_code == 200:
         fields = r.json().get("fields", {})
         return {k: _from_firestore(v) for k, v in fields.items()}
@@ -289,9 +271,27 @@ def load_user_config(id_token: str, uid: str) -> dict:
 def save_user_field(id_token: str, uid: str, field_name: str, value) -> bool:
     url = f"{FIRESTORE_URL}/users/{uid}?updateMask.fieldPaths={field_name}"
     payload = {"fields": {field_name: _to_firestore(value)}}
-    r = requests.patch(url, headers=_firestore_headers(id_token), json=payload)
+    r = http_client.patch(url, headers=_firestore_headers(id_token), json=payload)
     return r.status_code == 200
 
+def save_user_alerts(id_token: str, uid: str, alerts: list, attempts: int = 3) -> list:
+    """
+    Sauvegarde du seul champ `alerts`, sans écraser le worker d'alertes :
+    relecture du document, déclenchements enregistrés par le worker
+    conservés (merge_triggered), écriture conditionnelle sur updateTime.
+    Retourne la liste enregistrée.
+    """
+    from chart_module.alerts import merge_triggered
+
+    client = firestore.FirestoreClient(FIREBASE_PROJECT_ID, id_token)
+    path   = f"users/{uid}"
+    for _ in range(attempts):
+        doc, update_time = client.get_document(path)
+        merged = merge_triggered(alerts, doc.get("alerts") or [])
+        if client.update_fields(path, {"alerts": merged}, update_time=update_time):
+            return merged
+    return alerts
+
 
 # ══════════════════════════════════════════════
 #  CONFIG PAR DÉFAUT
@@ -666,12 +666,15 @@ def _save_current_session_config():
 
     config = {
         "watchlist":  st.session_state.get("watchlist", DEFAULT_CONFIG["watchlist"]),
-        "alerts":     alerts_serializable,
+        "email":      st.session_state.get("user_email", ""),   # destinataire du worker d'alertes
         "portfolio":  st.session_state.get("portfolio", DEFAULT_CONFIG["portfolio"]),
         "theme":      st.session_state.get("user_theme", DEFAULT_CONFIG["theme"]),
         "last_login": datetime.now().isoformat(),
     }
-    save_user_config(id_token, uid, config)
+    # Champs masqués (updateMask) : `alerts` et `portfolio_tx` ne sont pas
+    # réécrits ici ; les alertes passent par save_user_alerts (worker).
+    firestore.FirestoreClient(FIREBASE_PROJECT_ID, id_token).update_fields(f"users/{uid}", config)
+    st.session_state["alerts"] = save_user_alerts(id_token, uid, alerts_serializable)
 
 
 def _clear_session():
@@ -7,8 +7,6 @@ Notifications : Gmail SMTP via st.secrets
 
 import streamlit as st
 import yfinance as yf
-import pandas as pd
-import numpy as np
 import smtplib
 import uuid
 from email.mime.text import MIMEText
@@ -16,6 +14,8 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 from translations import t, get_lang
+from chart_module import alerts as alert_logic
+from chart_module.alerts import email_body as _email_body
 
 # ══════════════════════════════════════════════
 #  HELPERS FIREBASE (réutilise firebase_auth)
@@ -68,107 +68,6 @@ def _send_email(subject: str, body_html: str) -> bool:
         return False
 
 
-def _email_body(alert: dict, current_price: float, change_pct: float, extra: str = "") -> str:
-    color = "#00ff88" if "au-dessus" in alert["type"] or "positive" in alert["type"] else "#ff4444"
-    return f"""
-    <div style="background:#0d0d0d;color:#fff;font-family:monospace;padding:30px;border-radius:12px;max-width:600px;margin:auto;border:2px solid #ff9800;">
-      <h2 style="color:#ff9800;margin:0 0 20px 0;">🔔 ALERTE DÉCLENCHÉE — AM-Trading</h2>
-      <table style="width:100%;border-collapse:collapse;">
-        <tr><td style="color:#aaa;padding:8px 0;">Ticker</td>
-            <td style="color:#fff;font-weight:bold;font-size:18px;">{alert['ticker']}</td></tr>
-        <tr><td style="color:#aaa;padding:8px 0;">Type</td>
-            <td style="color:#ff9800;">{alert['type']}</td></tr>
-        <tr><td style="color:#aaa;padding:8px 0;">Seuil</td>
-            <td style="color:#fff;">{alert['value']}</td></tr>
-        <tr><td style="color:#aaa;padding:8px 0;">Prix actuel</td>
-            <td style="color:{color};font-size:20px;font-weight:bold;">{current_price:.2f}</td></tr>
-        <tr><td style="color:#aaa;padding:8px 0;">Variation 24h</td>
-            <td style="color:{color};">{change_pct:+.2f}%</td></tr>
-        {'<tr><td style="color:#aaa;padding:8px 0;">Info</td><td style="color:#fff;">' + extra + '</td></tr>' if extra else ''}
-        <tr><td style="color:#aaa;padding:8px 0;">Heure</td>
-            <td style="color:#fff;">{datetime.now().strftime("%d/%m/%Y à %H:%M:%S")}</td></tr>
-      </table>
-      <p style="color:#555;font-size:12px;margin:20px 0 0 0;">AM-Trading Bloomberg Terminal</p>
-    </div>
-    """
-
-# ══════════════════════════════════════════════
-#  CALCULS TECHNIQUES
-# ══════════════════════════════════════════════
-
-def _get_rsi(closes: pd.Series, period: int = 14) -> float:
-    delta = closes.diff()
-    gain  = delta.clip(lower=0).rolling(period).mean()
-    loss  = (-delta.clip(upper=0)).rolling(period).mean()
-    rs    = gain / loss.replace(0, np.nan)
-    rsi   = 100 - (100 / (1 + rs))
-    return float(rsi.iloc[-1]) if not rsi.empty else 50.0
-
-
-def _get_ma_cross(closes: pd.Series, fast: int = 20, slow: int = 50) -> dict:
-    """Retourne la position relative des MAs et si croisement récent."""
-    if len(closes) < slow + 5:
-        return {"cross": None, "fast_val": None, "slow_val": None}
-    ma_fast = closes.rolling(fast).mean()
-    ma_slow = closes.rolling(slow).mean()
-    # Croisement haussier : fast passe au-dessus de slow dans les 3 dernières bougies
-    cross_up   = (ma_fast.iloc[-1] > ma_slow.iloc[-1]) and (ma_fast.iloc[-4] < ma_slow.iloc[-4])
-    cross_down = (ma_fast.iloc[-1] < ma_slow.iloc[-1]) and (ma_fast.iloc[-4] > ma_slow.iloc[-4])
-    return {
-        "cross":    "up" if cross_up else ("down" if cross_down else None),
-        "fast_val": round(float(ma_fast.iloc[-1]), 2),
-        "slow_val": round(float(ma_slow.iloc[-1]), 2),
-    }
-
-
-def _check_alert(alert: dict, df: pd.DataFrame) -> tuple[bool, float, float, str]:
-    """
-    Vérifie si une alerte est déclenchée.
-    Retourne : (triggered, current_price, change_pct, extra_info)
-    """
-    closes = df["Close"].squeeze()
-    current_price = float(closes.iloc[-1])
-    prev_close    = float(closes.iloc[-2]) if len(closes) >= 2 else current_price
-    change_pct    = ((current_price - prev_close) / prev_close * 100) if prev_close else 0
-    extra         = ""
-    triggered     = False
-
-    t = alert["type"]
-
-    if t == "Prix au-dessus":
-        triggered = current_price >= float(alert["value"])
-
-    elif t == "Prix en-dessous":
-        triggered = current_price <= float(alert["value"])
-
-    elif t == "Variation % positive":
-        triggered = change_pct >= float(alert["value"])
-
-    elif t == "Variation % négative":
-        triggered = change_pct <= -float(alert["value"])
-
-    elif t == "RSI survente":
-        rsi = _get_rsi(closes)
-        triggered = rsi <= float(alert["value"])
-        extra = f"RSI actuel : {rsi:.1f}"
-
-    elif t == "RSI surachat":
-        rsi = _get_rsi(closes)
-        triggered = rsi >= float(alert["value"])
-        extra = f"RSI actuel : {rsi:.1f}"
-
-    elif t == "Croisement MA haussier":
-        res = _get_ma_cross(closes, int(alert.get("ma_fast", 20)), int(alert.get("ma_slow", 50)))
-        triggered = res["cross"] == "up"
-        extra = f"MA{alert.get('ma_fast',20)}={res['fast_val']} / MA{alert.get('ma_slow',50)}={res['slow_val']}"
-
-    elif t == "Croisement MA baissier":
-        res = _get_ma_cross(closes, int(alert.get("ma_fast", 20)), int(alert.get("ma_slow", 50)))
-        triggered = res["cross"] == "down"
-        extra = f"MA{alert.get('ma_fast',20)}={res['fast_val']} / MA{alert.get('ma_slow',50)}={res['slow_val']}"
-
-    return triggered, current_price, change_pct, extra
-
 # ══════════════════════════════════════════════
 #  UI PRINCIPALE
 # ══════════════════════════════════════════════
@@ -319,35 +218,29 @@ def show_alertes():
                 triggered_count = 0
                 progress = st.progress(0, text="Vérification en cours...")
 
-                for i, alert in enumerate(active):
-                    progress.progress((i + 1) / len(active), text=f"Vérification {alert['ticker']}...")
-                    try:
-                        df = yf.download(alert["ticker"], period="60d", auto_adjust=True)
-                        if df.empty: continue
-                        if isinstance(df.columns, pd.MultiIndex):
-                            df.columns = df.columns.get_level_values(0)
-                        if len(df) < 5: continue
-
-                        triggered, current_price, change_pct, extra = _check_alert(alert, df)
-
-                        if triggered:
-                            triggered_count += 1
-                            alert["active"] = False
-                            st.session_state.triggered_alerts.append({
-                                "alert":         dict(alert),
-                                "triggered_at":  datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-                                "current_price": current_price,
-                                "change_pct":    change_pct,
-                                "extra":         extra,
-                            })
-                            # Envoi email
-                            if alert.get("notify_email") and email_ok:
-                                subj = f"🔔 Alerte déclenchée : {alert['ticker']} — {alert['type']}"
-                                html = _email_body(alert, current_price, change_pct, extra)
-                                if _send_email(subj, html):
-                                    emails_sent += 1
-                    except Exception:
-                        continue
+                # Un téléchargement pour tous les tickers, évaluation en lot
+                tickers = list(alert_logic.group_by_ticker(active))
+                progress.progress(0.3, text=f"Téléchargement de {len(tickers)} ticker(s)...")
+                frames = alert_logic.fetch_frames(tickers)
+                progress.progress(0.8, text="Évaluation des alertes...")
+
+                for alert, triggered, current_price, change_pct, extra in alert_logic.evaluate(active, frames):
+                    if triggered:
+                        triggered_count += 1
+                        alert["active"] = False
+                        st.session_state.triggered_alerts.append({
+                            "alert":         dict(alert),
+                            "triggered_at":  datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+                            "current_price": current_price,
+                            "change_pct":    change_pct,
+                            "extra":         extra,
+                        })
+                        # Envoi email
+                        if alert.get("notify_email") and email_ok:
+                            subj = alert_logic.email_subject(alert)
+                            html = _email_body(alert, current_price, change_pct, extra)
+                            if _send_email(subj, html):
+                                emails_sent += 1
 
                 progress.empty()
                 _save_alerts(alerts)
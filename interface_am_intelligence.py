@@ -4,7 +4,7 @@ Version finale — Chat IA + 6 Experts Wall Street + PDF + Historique
 """
 
 import streamlit as st
-import requests
+from chart_module import http_client
 import json
 import io
 import re
@@ -215,7 +215,7 @@ def _call_groq(prompt: str, system: str = None, history: list = None) -> str:
             messages.extend(history)
         messages.append({"role": "user", "content": prompt})
 
-        r = requests.post(
+        r = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
             json={"model": GROQ_MODEL, "messages": messages, "max_tokens": 4000, "temperature": 0.3},
@@ -17,11 +17,11 @@ Stockage : Firebase Firestore (collection "analyses/{uid}/items")
 
 import streamlit as st
 import streamlit.components.v1 as components
-import yfinance as yf
+from chart_module import market_data
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
+from chart_module import http_client
 from datetime import datetime
 import json
 from fpdf import FPDF
@@ -87,7 +87,7 @@ def save_analyse(uid, analyse_id, data):
     url = f"{_collection_path(uid)}/{analyse_id}"
     fields = {k: _to_fs(v) for k, v in data.items()}
     try:
-        r = requests.patch(url, headers=_headers(), json={"fields": fields}, timeout=8)
+        r = http_client.patch(url, headers=_headers(), json={"fields": fields}, timeout=8)
         return r.status_code in [200, 201]
     except:
         return False
@@ -96,7 +96,7 @@ def load_analyses(uid):
     """Charge toutes les analyses de l'utilisateur."""
     url = f"{_collection_path(uid)}"
     try:
-        r = requests.get(url, headers=_headers(), timeout=8)
+        r = http_client.get(url, headers=_headers(), timeout=8)
         if r.status_code == 200:
             docs = r.json().get("documents", [])
             results = []
@@ -114,7 +114,7 @@ def delete_analyse(uid, analyse_id):
     """Supprime une analyse."""
     url = f"{_collection_path(uid)}/{analyse_id}"
     try:
-        r = requests.delete(url, headers=_headers(), timeout=8)
+        r = http_client.delete(url, headers=_headers(), timeout=8)
         return r.status_code == 200
     except:
         return False
@@ -128,7 +128,7 @@ def rechercher_ticker(query):
     try:
         url = f"https://query2.finance.yahoo.com/v1/finance/search?q={query}&quotesCount=6"
         headers = {"User-Agent": "Mozilla/5.0"}
-        r = requests.get(url, headers=headers, timeout=5).json()
+        r = http_client.get(url, headers=headers, timeout=5).json()
         quotes = r.get("quotes", [])
         return [(q["symbol"], q.get("longname") or q.get("shortname", q["symbol"]),
                  q.get("typeDisp", ""), q.get("exchDisp", ""))
@@ -241,7 +241,7 @@ def score_technique(df):
 def afficher_graphique_analyse(ticker, period="6mo"):
     """Affiche le graphique technique complet."""
     try:
-        df = yf.download(ticker, period=period, progress=False)
+        df = market_data.download(ticker, period=period, progress=False)
         if df.empty:
             st.warning("Données indisponibles pour ce ticker.")
             return None
@@ -5,7 +5,7 @@ Baromètre Achat · Baromètre Indicateurs Techniques · Baromètre Moyennes Mob
 """
 
 import streamlit as st
-import yfinance as yf
+from chart_module import market_data
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
@@ -18,15 +18,7 @@ from datetime import datetime, timedelta
 # ══════════════════════════════════════════
 
 def _fetch(ticker: str, period: str = "1y") -> pd.DataFrame:
-    try:
-        df = yf.download(ticker, period=period, auto_adjust=True)
-        if df.empty:
-            return pd.DataFrame()
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
-        return df
-    except Exception:
-        return pd.DataFrame()
+    return market_data.history(ticker, period=period)
 
 def _rsi(closes: pd.Series, period: int = 14) -> pd.Series:
     delta = closes.diff()
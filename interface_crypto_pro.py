@@ -3,7 +3,7 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import feedparser
-import requests
+from chart_module import http_client
 from datetime import datetime
 
 # Headers pour éviter d'être bloqué par les API
@@ -92,7 +92,7 @@ def get_funding_rates():
     try:
         # On récupère tout d'un coup pour plus de fiabilité
         url = "https://fapi.binance.com/fapi/v1/premiumIndex"
-        data = requests.get(url, headers=HEADERS, timeout=5).json()
+        data = http_client.get(url, headers=HEADERS, timeout=5).json()
         if isinstance(data, list):
             for sym in symbols:
                 item = next((x for x in data if x.get('symbol') == sym), None)
@@ -113,8 +113,8 @@ def get_open_interest():
         for sym in symbols:
             url_oi = f"https://fapi.binance.com/fapi/v1/openInterest?symbol={sym}"
             url_px = f"https://fapi.binance.com/fapi/v1/premiumIndex?symbol={sym}"
-            oi_data = requests.get(url_oi, headers=HEADERS, timeout=3).json()
-            px_data = requests.get(url_px, headers=HEADERS, timeout=3).json()
+            oi_data = http_client.get(url_oi, headers=HEADERS, timeout=3).json()
+            px_data = http_client.get(url_px, headers=HEADERS, timeout=3).json()
             
             oi = float(oi_data.get("openInterest", 0))
             mark = float(px_data.get("markPrice", 0))
@@ -128,7 +128,7 @@ def get_btc_dominance():
     """Récupère la dominance réelle via CoinGecko"""
     try:
         url = "https://api.coingecko.com/api/v3/global"
-        data = requests.get(url, headers=HEADERS, timeout=5).json()
+        data = http_client.get(url, headers=HEADERS, timeout=5).json()
         dom = data['data']['market_cap_percentage']['btc']
         return round(dom, 1)
     except:
@@ -137,7 +137,7 @@ def get_btc_dominance():
 @st.cache_data(ttl=300)
 def get_fear_greed():
     try:
-        data = requests.get("https://api.alternative.me/fng/?limit=1", timeout=5).json()
+        data = http_client.get("https://api.alternative.me/fng/?limit=1", timeout=5).json()
         return int(data["data"][0]["value"]), data["data"][0]["value_classification"]
     except: return None, None
 
@@ -154,7 +154,7 @@ def get_ls_ratio():
             # Endpoint officiel pour le ratio global des comptes
             url = f"https://fapi.binance.com/futures/data/globalLongShortAccountRatio?symbol={sym}&period=5m&limit=1"
             
-            response = requests.get(url, headers=HEADERS, timeout=5)
+            response = http_client.get(url, headers=HEADERS, timeout=5)
             data = response.json()
 
             if data and isinstance(data, list) and len(data) > 0:
@@ -532,7 +532,6 @@ def show_interface_crypto():
 
         # ── Chart ──
         from chart_module import render_chart
-        import time as _t
         _chart_html = render_chart(
             symbol=st.session_state.chart_symbol,
             interval="4h",
@@ -540,7 +539,7 @@ def show_interface_crypto():
             height=700,
             exchange="Binance · Spot",
             pair_label=f"{st.session_state.chart_base}/USDT",
-        ) + f"<!-- {st.session_state.chart_symbol}:{int(_t.time()*1000)} -->"
+        )
         components.html(
             _chart_html,
             height=700,
@@ -8,8 +8,7 @@ Fallback : données officielles les plus récentes (mars 2026)
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import requests
-import yfinance as yf
+from chart_module import http_client, market_data
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
@@ -95,8 +94,7 @@ ANNEES_DETTE = ["2019", "2020", "2021", "2022", "2023", "2024"]
 
 def _get(url, timeout=6):
     try:
-        r = requests.get(url, timeout=timeout,
-                         headers={"User-Agent": "Mozilla/5.0 (AM-Terminal/2.0)"})
+        r = http_client.get(url, timeout=timeout)
         if r.status_code == 200:
             return r
     except Exception:
@@ -179,8 +177,7 @@ def fetch_worldbank(country_code: str, indicator: str, last_n: int = 3):
 def fetch_yfinance_rate(ticker: str):
     """yfinance pour taux obligations et indices."""
     try:
-        t = yf.Ticker(ticker)
-        hist = t.history(period="5d")
+        hist = market_data.history(ticker, period="5d")
         if not hist.empty:
             return float(hist['Close'].iloc[-1]), float(hist['Close'].iloc[-2])
     except Exception:
@@ -76,27 +76,13 @@ def show_options_pricing():
         style    = st.selectbox(t("fm_style"), ["Européen", "Américain (approx)"], key="bs_style")
         st.markdown("<br>", unsafe_allow_html=True)
 
-    # ── Calcul Black-Scholes ──
-    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-
-    if opt_type == "Call":
-        price = S * np.exp(-q * T) * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-        delta = np.exp(-q * T) * norm.cdf(d1)
-        theta = (-(S * norm.pdf(d1) * sigma * np.exp(-q * T)) / (2 * np.sqrt(T))
-                 - r * K * np.exp(-r * T) * norm.cdf(d2)
-                 + q * S * np.exp(-q * T) * norm.cdf(d1)) / 365
-        rho   = K * T * np.exp(-r * T) * norm.cdf(d2) / 100
-    else:
-        price = K * np.exp(-r * T) * norm.cdf(-d2) - S * np.exp(-q * T) * norm.cdf(-d1)
-        delta = -np.exp(-q * T) * norm.cdf(-d1)
-        theta = (-(S * norm.pdf(d1) * sigma * np.exp(-q * T)) / (2 * np.sqrt(T))
-                 + r * K * np.exp(-r * T) * norm.cdf(-d2)
-                 - q * S * np.exp(-q * T) * norm.cdf(-d1)) / 365
-        rho   = -K * T * np.exp(-r * T) * norm.cdf(-d2) / 100
-
-    gamma = norm.pdf(d1) * np.exp(-q * T) / (S * sigma * np.sqrt(T))
-    vega  = S * np.exp(-q * T) * norm.pdf(d1) * np.sqrt(T) / 100
+    # ── Calcul Black-Scholes (noyau vectorisé partagé) ──
+    from chart_module.black_scholes import bs_price_greeks
+    is_call = opt_type == "Call"
+    g     = bs_price_greeks(S, K, T, r, sigma, q, is_call)
+    price, delta, gamma = float(g["price"]), float(g["delta"]), float(g["gamma"])
+    theta, vega, rho    = float(g["theta"]), float(g["vega"]), float(g["rho"])
+    d1, d2              = float(g["d1"]), float(g["d2"])
     moneyness = "ITM" if (opt_type == "Call" and S > K) or (opt_type == "Put" and S < K) else ("ATM" if abs(S-K)/K < 0.01 else "OTM")
 
     _section("RÉSULTAT DU PRICING")
@@ -117,18 +103,15 @@ def show_options_pricing():
 
     _section("PROFIL DE PAYOFF")
     spots = np.linspace(S * 0.7, S * 1.3, 200)
-    if opt_type == "Call":
-        payoff    = np.maximum(spots - K, 0)
-        pnl       = payoff - price
-        d1_arr = (np.log(spots / K) + (r - q + 0.5*sigma**2) * T) / (sigma * np.sqrt(T))
-        d2_arr = d1_arr - sigma * np.sqrt(T)
-        theo   = spots * np.exp(-q*T) * norm.cdf(d1_arr) - K * np.exp(-r*T) * norm.cdf(d2_arr)
+    # Une seule passe pour toute la grille : ligne 0 = call, ligne 1 = put
+    curve  = bs_price_greeks(spots[None, :], K, T, r, sigma, q, np.array([[True], [False]]))
+    if is_call:
+        payoff = np.maximum(spots - K, 0)
+        theo   = curve["price"][0]
     else:
         payoff = np.maximum(K - spots, 0)
-        pnl    = payoff - price
-        d1_arr = (np.log(spots / K) + (r - q + 0.5*sigma**2) * T) / (sigma * np.sqrt(T))
-        d2_arr = d1_arr - sigma * np.sqrt(T)
-        theo   = K * np.exp(-r*T) * norm.cdf(-d2_arr) - spots * np.exp(-q*T) * norm.cdf(-d1_arr)
+        theo   = curve["price"][1]
+    pnl = payoff - price
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=spots, y=payoff, name="Payoff à expiry",
@@ -145,8 +128,7 @@ def show_options_pricing():
     st.plotly_chart(fig, use_container_width=True)
 
     _section("SENSIBILITÉ DELTA vs SPOT")
-    deltas_call = norm.cdf((np.log(spots/K) + (r-q+0.5*sigma**2)*T) / (sigma*np.sqrt(T)))
-    deltas_put  = deltas_call - 1
+    deltas_call, deltas_put = curve["delta"]
     fig2 = go.Figure()
     fig2.add_trace(go.Scatter(x=spots, y=deltas_call, name="Delta Call", line=dict(color="#00C853", width=2)))
     fig2.add_trace(go.Scatter(x=spots, y=deltas_put, name="Delta Put", line=dict(color="#FF3B30", width=2)))
@@ -178,10 +160,8 @@ def show_vol_surface():
     mat_labels = ["1M","2M","3M","6M","1Y","18M","2Y"]
 
     moneyness = np.log(strikes / S0)
-    vol_matrix = np.zeros((len(maturities), len(strikes)))
-    for i, T in enumerate(maturities):
-        term_adj = atm_vol + term_str * T
-        vol_matrix[i] = term_adj + skew * moneyness + convex * moneyness**2
+    T_col     = np.asarray(maturities)[:, None]
+    vol_matrix = (atm_vol + term_str * T_col) + skew * moneyness + convex * moneyness**2
 
     vol_matrix = np.clip(vol_matrix, 0.01, 2.0)
 
@@ -231,6 +211,35 @@ def show_vol_surface():
                        xaxis_title="Maturité", yaxis_title="Vol ATM (%)")
     st.plotly_chart(fig3, use_container_width=True)
 
+    _section("CHAÎNE THÉORIQUE — PRIX & DELTA SUR LA SURFACE")
+    from chart_module.black_scholes import bs_price_greeks
+    # Toute la grille maturités × strikes (calls et puts) en une passe
+    chain = bs_price_greeks(S0, strikes, T_col[None], r0, vol_matrix, 0.0,
+                            np.array([True, False])[:, None, None])
+    f1, f2 = st.columns(2)
+    for col, k, title in [(f1, "price", "Prix call ($)"), (f2, "delta", "Delta call")]:
+        fig_c = go.Figure(go.Heatmap(
+            z=chain[k][0], x=np.round(strikes, 2), y=mat_labels,
+            colorscale=[[0,"#000080"],[0.5,"#4d9fff"],[1,"#ff6600"]],
+            colorbar=dict(tickfont=dict(color="#e0e0e0")),
+        ))
+        fig_c.update_layout(**PLOTLY_DARK, height=300, title=title,
+                            xaxis_title="Strike", yaxis_title="Maturité")
+        col.plotly_chart(fig_c, use_container_width=True)
+    chain_df = pd.DataFrame({
+        "Maturité": np.repeat(mat_labels, len(strikes)),
+        "Strike":   np.tile(np.round(strikes, 2), len(maturities)),
+        "Vol %":    (vol_matrix * 100).ravel().round(2),
+        "Call":     chain["price"][0].ravel().round(4),
+        "Put":      chain["price"][1].ravel().round(4),
+        "Δ Call":   chain["delta"][0].ravel().round(4),
+        "Γ":        chain["gamma"][0].ravel().round(6),
+        "Vega":     chain["vega"][0].ravel().round(4),
+        "Θ Call":   chain["theta"][0].ravel().round(4),
+    })
+    with st.expander(f"Chaîne complète ({len(chain_df) * 2} contrats)"):
+        st.dataframe(chain_df, use_container_width=True, hide_index=True)
+
 
 # ════════════════════════════════════════════════════════════
 #  3. COURBE DES TAUX & OBLIGATIONS
@@ -347,7 +356,7 @@ def show_var():
     st.markdown("## 🎯 VALUE AT RISK & STRESS TESTS")
     st.caption("VaR paramétrique, historique, Monte Carlo + Expected Shortfall")
 
-    import yfinance as yf
+    from chart_module import market_data
 
     c1, c2, c3 = st.columns(3)
     tickers_input = c1.text_input(t("ticker"), value="NVDA,AAPL,MSFT", key="var_tickers")
@@ -358,7 +367,7 @@ def show_var():
 
     with st.spinner("Chargement des données..."):
         try:
-            raw = yf.download(tickers, period="2y", progress=False, auto_adjust=True)
+            raw = market_data.download(tickers, period="2y", progress=False, auto_adjust=True)
             if isinstance(raw.columns, pd.MultiIndex):
                 prices = raw["Close"]
             else:
@@ -449,7 +458,7 @@ def show_markowitz():
     st.markdown("## 🎯 OPTIMISATION MARKOWITZ — Frontière Efficiente")
     st.caption("Frontière efficiente, portefeuille de Sharpe max, minimum variance")
 
-    import yfinance as yf
+    from chart_module import market_data
 
     c1, c2 = st.columns([3,1])
     tickers_input = c1.text_input(t("ticker"), value="AAPL,NVDA,MSFT,TSLA,JPM,GLD", key="mk_tickers")
@@ -459,7 +468,7 @@ def show_markowitz():
 
     with st.spinner("Calcul de la frontière efficiente..."):
         try:
-            raw = yf.download(tickers, period="2y", progress=False, auto_adjust=True)
+            raw = market_data.download(tickers, period="2y", progress=False, auto_adjust=True)
             prices = raw["Close"] if isinstance(raw.columns, pd.MultiIndex) else raw
             if isinstance(prices.columns, pd.MultiIndex):
                 prices.columns = prices.columns.get_level_values(0)
@@ -566,7 +575,7 @@ def show_backtest_quant():
     st.markdown("## 🔁 BACKTEST STRATÉGIES QUANTITATIVES")
     st.caption("Mean reversion, momentum, pairs trading — signaux, métriques, drawdown")
 
-    import yfinance as yf
+    from chart_module import market_data
 
     c1, c2, c3 = st.columns(3)
     ticker   = c1.text_input(t("ticker"), value="NVDA", key="bq_ticker").upper()
@@ -584,7 +593,7 @@ def show_backtest_quant():
 
     with st.spinner("Backtest en cours..."):
         try:
-            raw = yf.download(ticker, period=period, progress=False, auto_adjust=True)
+            raw = market_data.download(ticker, period=period, progress=False, auto_adjust=True)
             if isinstance(raw.columns, pd.MultiIndex):
                 raw.columns = raw.columns.get_level_values(0)
             df = raw[["Open","High","Low","Close","Volume"]].copy().dropna()
@@ -595,59 +604,14 @@ def show_backtest_quant():
             st.error(f"Erreur : {e}")
             return
 
-    df["returns"] = df["Close"].pct_change()
-
-    if strategy == "Mean Reversion (Bollinger)":
-        w = 20
-        df["sma"]   = df["Close"].rolling(w).mean()
-        df["std"]   = df["Close"].rolling(w).std()
-        df["upper"] = df["sma"] + 2 * df["std"]
-        df["lower"] = df["sma"] - 2 * df["std"]
-        df["signal"] = 0
-        df.loc[df["Close"] < df["lower"], "signal"] = 1   # achat
-        df.loc[df["Close"] > df["upper"], "signal"] = -1  # vente
-        signal_name = "Bollinger Bands (20,2)"
-
-    elif strategy == "Momentum (SMA Crossover)":
-        df["sma_fast"] = df["Close"].rolling(20).mean()
-        df["sma_slow"] = df["Close"].rolling(50).mean()
-        df["signal"]   = np.where(df["sma_fast"] > df["sma_slow"], 1, -1)
-        signal_name    = "SMA 20/50 Crossover"
-
-    elif strategy == "RSI Reversal":
-        delta   = df["Close"].diff()
-        gain    = delta.where(delta > 0, 0).rolling(14).mean()
-        loss    = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs      = gain / loss
-        df["rsi"] = 100 - 100 / (1 + rs)
-        df["signal"] = 0
-        df.loc[df["rsi"] < 30, "signal"] = 1
-        df.loc[df["rsi"] > 70, "signal"] = -1
-        signal_name = "RSI(14) 30/70"
-
-    else:  # Breakout Volatilité
-        df["atr"]    = df["High"].rolling(14).max() - df["Low"].rolling(14).min()
-        df["signal"] = np.where(df["Close"] > df["Close"].shift(1) + df["atr"]*0.5, 1,
-                       np.where(df["Close"] < df["Close"].shift(1) - df["atr"]*0.5, -1, 0))
-        signal_name = "ATR Breakout"
-
-    df["position"]    = df["signal"].shift(1).fillna(0)
-    df["strat_ret"]   = df["position"] * df["returns"] - abs(df["position"].diff().fillna(0)) * fees
-    df["cum_ret"]     = (1 + df["returns"]).cumprod()
-    df["cum_strat"]   = (1 + df["strat_ret"]).cumprod()
-    df["equity"]      = capital * df["cum_strat"]
-    df["drawdown"]    = (df["equity"] / df["equity"].cummax()) - 1
+    from chart_module.backtest import quant_signal, run_positions
+    signal, signal_name = quant_signal(df, strategy)
+    df, m = run_positions(df, signal, capital, fees)
 
     # Métriques
-    total_ret  = float(df["cum_strat"].iloc[-1]) - 1
-    bh_ret     = float(df["cum_ret"].iloc[-1]) - 1
-    n_years    = len(df) / 252
-    cagr       = (1 + total_ret) ** (1/n_years) - 1 if n_years > 0 else 0
-    vol_ann    = float(df["strat_ret"].std()) * np.sqrt(252)
-    sharpe     = (cagr - 0.045) / vol_ann if vol_ann > 0 else 0
-    max_dd     = float(df["drawdown"].min())
-    n_trades   = int((df["position"].diff().fillna(0) != 0).sum())
-    win_rate   = float((df.loc[df["strat_ret"] != 0, "strat_ret"] > 0).mean()) if n_trades > 0 else 0
+    total_ret, bh_ret = m["total_ret"], m["bh_ret"]
+    cagr, sharpe, max_dd = m["cagr"], m["sharpe"], m["max_dd"]
+    n_trades, win_rate   = m["n_trades"], m["win_rate"]
 
     _section("MÉTRIQUES DE PERFORMANCE")
     m1,m2,m3,m4,m5,m6 = st.columns(6)
@@ -680,6 +644,100 @@ def show_backtest_quant():
     vs_bh = total_ret - bh_ret
     st.info(f"📊 **{signal_name}** : {total_ret*100:+.1f}% vs Buy & Hold {bh_ret*100:+.1f}% → **{'+' if vs_bh>=0 else ''}{vs_bh*100:.1f}% d'alpha**")
 
+    with st.expander("🔬 OPTIMISATION DES PARAMÈTRES (grid / random / walk-forward)"):
+        show_optimizer(lambda: df, "quant", strategy, capital, key="bq_opt",
+                       fixed={"fees": fees})
+
+
+def _parse_values(txt: str) -> list:
+    """'10, 20, 30' → [10, 20, 30] (entiers si possible, sinon floats)."""
+    vals = [float(v) for v in txt.replace(";", ",").split(",") if v.strip()]
+    return [int(v) if v.is_integer() else v for v in vals]
+
+
+def show_optimizer(load_df, engine: str, strategy: str, capital: float,
+                   key: str, fixed: dict = None):
+    """
+    Balayage de paramètres / walk-forward sur un pool de processus
+    (chart_module.optimizer), partagé par les deux écrans de backtest.
+    `load_df()` n'est appelé qu'au lancement ; `fixed` fixe des paramètres
+    non balayés (ex. frais choisis dans l'écran).
+    """
+    from chart_module import optimizer
+
+    defaults = optimizer.DEFAULT_SPACES.get((engine, strategy), {})
+    space = {}
+    cols = st.columns(max(1, min(len(defaults), 4)))
+    for i, (name, vals) in enumerate(defaults.items()):
+        txt = cols[i % len(cols)].text_input(name, ", ".join(f"{v:g}" for v in vals),
+                                             key=f"{key}_{strategy}_{name}")
+        try:
+            space[name] = _parse_values(txt) or vals
+        except ValueError:
+            st.warning(f"Valeurs invalides pour {name} — défaut utilisé.")
+            space[name] = vals
+    for name, v in (fixed or {}).items():
+        space.setdefault(name, [v])
+
+    o1, o2, o3, o4 = st.columns(4)
+    mode   = o1.selectbox("Mode", ["Grille", "Aléatoire", "Walk-forward"], key=f"{key}_mode")
+    metric = o2.selectbox("Critère", ["sharpe", "cagr", "max_dd", "total_ret"], key=f"{key}_metric")
+    n_iter = o3.number_input("Tirages (aléatoire)", 10, 5000, 200, step=10, key=f"{key}_niter")
+    folds  = o4.number_input("Folds (walk-forward)", 2, 10, 4, key=f"{key}_folds")
+    n_comb = int(np.prod([len(v) for v in space.values()])) if space else 0
+    st.caption(f"{n_comb} combinaisons dans la grille")
+
+    if st.button("🔬 LANCER L'OPTIMISATION", key=f"{key}_run"):
+        with st.spinner("Optimisation en cours (multi-processus)..."):
+            try:
+                df_opt = load_df()
+                params = (optimizer.random_search(space, int(n_iter))
+                          if mode == "Aléatoire" else optimizer.grid(space))
+                if mode == "Walk-forward":
+                    folds_df, summary = optimizer.walk_forward(
+                        df_opt, engine, strategy, params, capital, metric, n_folds=int(folds))
+                    st.session_state[key] = {"mode": mode, "folds": folds_df, "summary": summary,
+                                             "table": optimizer.sweep(df_opt, engine, strategy, params, capital, metric)}
+                else:
+                    st.session_state[key] = {"mode": mode,
+                                             "table": optimizer.sweep(df_opt, engine, strategy, params, capital, metric)}
+            except Exception as e:
+                st.error(f"Erreur d'optimisation : {e}")
+                return
+
+    res = st.session_state.get(key)
+    if not res or res["table"].empty:
+        return
+    table = res["table"]
+
+    if res["mode"] == "Walk-forward" and not res["folds"].empty:
+        _section("WALK-FORWARD — IN-SAMPLE vs OUT-OF-SAMPLE")
+        sm = res["summary"]
+        w1, w2, w3, w4 = st.columns(4)
+        with w1: _metric("Sharpe OOS moyen", f"{sm['oos_sharpe']:.2f}")
+        with w2: _metric("CAGR OOS moyen", f"{sm['oos_cagr']*100:.1f}%")
+        with w3: _metric("Max DD OOS moyen", f"{sm['oos_max_dd']*100:.1f}%")
+        with w4: _metric("Efficacité WF", f"{sm['efficiency']:.2f}")
+        st.dataframe(res["folds"], use_container_width=True, hide_index=True)
+
+    _section(f"CLASSEMENT — {len(table)} combinaisons (par {metric})")
+    st.dataframe(table.head(50), use_container_width=True)
+
+    swept = [c for c in table.columns if c not in optimizer.METRICS and table[c].nunique() > 1]
+    if len(swept) >= 2:
+        h1, h2 = st.columns(2)
+        x = h1.selectbox("Axe X", swept, index=0, key=f"{key}_hx")
+        y = h2.selectbox("Axe Y", [c for c in swept if c != x], index=0, key=f"{key}_hy")
+        hcols = st.columns(3)
+        for col, (m, lbl, scale) in zip(hcols, [("sharpe", "Sharpe", 1), ("cagr", "CAGR %", 100),
+                                               ("max_dd", "Max DD %", 100)]):
+            hm = optimizer.heatmap(table, x, y, m) * scale
+            fig = go.Figure(go.Heatmap(z=hm.values, x=[str(v) for v in hm.columns],
+                                       y=[str(v) for v in hm.index],
+                                       colorscale="RdYlGn", colorbar=dict(tickfont=dict(color="#e0e0e0"))))
+            fig.update_layout(**PLOTLY_DARK, height=320, title=lbl, xaxis_title=x, yaxis_title=y)
+            col.plotly_chart(fig, use_container_width=True)
+
 
 # ════════════════════════════════════════════════════════════
 #  7. MODÈLES DE MONTE CARLO
@@ -688,16 +746,20 @@ def show_monte_carlo():
     st.markdown("## 🎲 SIMULATION MONTE CARLO")
     st.caption("GBM, prix futurs, intervalles de confiance, pricing d'options par simulation")
 
-    import yfinance as yf
+    from chart_module import market_data
 
     c1, c2, c3 = st.columns(3)
     ticker   = c1.text_input(t("ticker"), value="NVDA", key="mc_ticker").upper()
     n_sims   = c2.select_slider(t("fm_simulations"), [100,500,1000,5000,10000], value=1000, key="mc_nsims")
     horizon  = c3.number_input(t("fm_horizon"), value=252, min_value=1, max_value=756, key="mc_hor")
+    variance = st.radio("Réduction de variance", ["plain", "antithetic", "control", "sobol"],
+                        format_func={"plain": "Aucune", "antithetic": "Antithétique",
+                                     "control": "Variable de contrôle", "sobol": "Sobol (QMC)"}.get,
+                        horizontal=True, key="mc_variance")
 
     with st.spinner("Simulation..."):
         try:
-            raw = yf.download(ticker, period="1y", progress=False, auto_adjust=True)
+            raw = market_data.download(ticker, period="1y", progress=False, auto_adjust=True)
             if isinstance(raw.columns, pd.MultiIndex):
                 raw.columns = raw.columns.get_level_values(0)
             prices = raw["Close"].dropna()
@@ -714,13 +776,11 @@ def show_monte_carlo():
     S0      = float(prices.iloc[-1])
     dt      = 1/252
 
-    # Simulation GBM
-    np.random.seed(42)
+    # Simulation GBM (multi-thread, reproductible : graine 42 quel que soit le nb de cœurs)
+    from chart_module.monte_carlo import gbm_paths, gbm_estimates
     drift   = (mu - 0.5 * sigma**2) * dt
     diffusion = sigma * np.sqrt(dt)
-    Z       = np.random.standard_normal((horizon, n_sims))
-    log_paths = np.cumsum(drift + diffusion * Z, axis=0)
-    paths   = S0 * np.exp(log_paths)
+    paths   = gbm_paths(S0, drift, diffusion, int(horizon), n_sims, seed=42, variance=variance)
 
     # Statistiques
     final_prices = paths[-1, :]
@@ -729,14 +789,16 @@ def show_monte_carlo():
     p50 = np.percentile(final_prices, 50)
     p75 = np.percentile(final_prices, 75)
     p95 = np.percentile(final_prices, 95)
-    prob_up = (final_prices > S0).mean()
+    est     = gbm_estimates(final_prices, S0, drift, diffusion, int(horizon), variance)
+    prob_up = est["prob_up"]
 
-    m1,m2,m3,m4,m5 = st.columns(5)
+    m1,m2,m3,m4,m5,m6 = st.columns(6)
     with m1: _metric("Spot actuel", f"${S0:.2f}")
     with m2: _metric("Médiane", f"${p50:.2f}", f"{(p50/S0-1)*100:+.1f}%")
     with m3: _metric("P5 (bear)", f"${p5:.2f}", f"{(p5/S0-1)*100:+.1f}%")
     with m4: _metric("P95 (bull)", f"${p95:.2f}", f"{(p95/S0-1)*100:+.1f}%")
-    with m5: _metric("P(hausse)", f"{prob_up*100:.1f}%")
+    with m5: _metric("P(hausse)", f"{prob_up*100:.1f}%", f"± {1.96*est['se_prob_up']*100:.2f} pts (IC 95%)")
+    with m6: _metric("Prix moyen", f"${est['mean']:.2f}", f"± {1.96*est['se_mean']:.2f} (IC 95%)")
 
     _section(f"TRAJECTOIRES GBM — {n_sims} simulations sur {horizon} jours")
     t_axis = np.arange(horizon)
@@ -785,7 +847,7 @@ def show_factor_analysis():
     st.markdown("## 📐 ANALYSE FACTORIELLE — CAPM & Fama-French")
     st.caption("Alpha, Bêta, R², tracking error, décomposition factorielle")
 
-    import yfinance as yf
+    from chart_module import market_data
 
     c1, c2, c3 = st.columns(3)
     ticker    = c1.text_input("Actif à analyser", value="NVDA", key="fa_ticker").upper()
@@ -796,8 +858,8 @@ def show_factor_analysis():
 
     with st.spinner("Chargement..."):
         try:
-            raw = yf.download([ticker, benchmark, "^VIX"], period=period,
-                              progress=False, auto_adjust=True)
+            raw = market_data.download([ticker, benchmark, "^VIX"], period=period,
+                                       progress=False, auto_adjust=True)
             prices = raw["Close"] if isinstance(raw.columns, pd.MultiIndex) else raw
             if isinstance(prices.columns, pd.MultiIndex):
                 prices.columns = prices.columns.get_level_values(0)
@@ -10,7 +10,8 @@ import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import yfinance as yf
-import requests
+from chart_module import market_data
+from chart_module import http_client
 from datetime import datetime, timedelta
 from translations import t, get_lang
 
@@ -70,7 +71,7 @@ def get_interest_rates() -> dict:
     rates = dict(_INTEREST_RATES_FALLBACK)
     try:
         # FED — FRED FEDFUNDS (CSV sans clé)
-        r = requests.get("https://fred.stlouisfed.org/graph/fredgraph.csv?id=FEDFUNDS",
+        r = http_client.get("https://fred.stlouisfed.org/graph/fredgraph.csv?id=FEDFUNDS",
                          timeout=6, headers={"User-Agent": "Mozilla/5.0"})
         if r.status_code == 200:
             lines = [l for l in r.text.strip().split("\n") if l and not l.startswith("DATE")]
@@ -83,7 +84,7 @@ def get_interest_rates() -> dict:
         pass
     try:
         # BCE — MRR
-        r = requests.get(
+        r = http_client.get(
             "https://data-api.ecb.europa.eu/service/data/FM/B.U2.EUR.4F.KR.MRR_FR.LEV"
             "?format=csvdata&lastNObservations=1",
             timeout=6, headers={"User-Agent": "Mozilla/5.0"})
@@ -115,7 +116,7 @@ CURRENCY_NAMES = {
 @st.cache_data(ttl=300)
 def get_forex_data(ticker, period="1mo"):
     try:
-        df = yf.download(ticker, period=period, progress=False, auto_adjust=True)
+        df = market_data.download(ticker, period=period, progress=False, auto_adjust=True)
         if isinstance(df.columns, pd.MultiIndex):
             df.columns = df.columns.get_level_values(0)
         return df
@@ -134,7 +135,7 @@ def get_current_price(ticker):
 @st.cache_data(ttl=300)
 def get_pair_change(ticker, period="1d"):
     try:
-        df = yf.download(ticker, period="5d", progress=False, auto_adjust=True)
+        df = market_data.download(ticker, period="5d", progress=False, auto_adjust=True)
         if isinstance(df.columns, pd.MultiIndex):
             df.columns = df.columns.get_level_values(0)
         if len(df) >= 2:
@@ -8,9 +8,10 @@ import json
 import streamlit as st
 import streamlit.components.v1 as components
 import yfinance as yf
+from chart_module import market_data
 import pandas as pd
 import feedparser
-import requests
+from chart_module import http_client
 from datetime import datetime, timedelta
 from translations import t, get_lang
 
@@ -84,7 +85,6 @@ def get_commodity_history(ticker, period="3mo"):
     """Historique — Yahoo Finance v2 chart API → yf.download fallback."""
     # Source 1 : Yahoo Finance chart API directe
     try:
-        import requests as _rq
         period_map = {"1mo":"1mo","3mo":"3mo","6mo":"6mo","1y":"1y","2y":"2y","5y":"5y"}
         _range = period_map.get(period, "3mo")
         _hdrs = {
@@ -92,7 +92,7 @@ def get_commodity_history(ticker, period="3mo"):
             "Accept": "application/json",
             "Referer": "https://finance.yahoo.com",
         }
-        _r = _rq.get(
+        _r = http_client.get(
             f"https://query2.finance.yahoo.com/v8/finance/chart/{ticker}?range={_range}&interval=1d&includeAdjustedClose=true",
             headers=_hdrs, timeout=8)
         if _r.status_code == 200:
@@ -120,8 +120,8 @@ def get_commodity_history(ticker, period="3mo"):
         pass
     # Source 2 : yf.download fallback
     try:
-        df = yf.download(ticker, period=period, interval="1d",
-                         progress=False, auto_adjust=True)
+        df = market_data.download(ticker, period=period, interval="1d",
+                                  progress=False, auto_adjust=True)
         if df.empty:
             return None
         if hasattr(df.columns, 'get_level_values'):
@@ -601,7 +601,6 @@ def _show_category(category):
 @st.cache_data(ttl=300)
 def _fetch_candles(ticker: str, period: str = "6mo", interval: str = "1d") -> list:
     """Fetch OHLCV — Yahoo Finance chart API directe → yf.download fallback."""
-    import requests as _rq
     from datetime import datetime as _dt
 
     def _parse_df(df):
@@ -629,7 +628,7 @@ def _fetch_candles(ticker: str, period: str = "6mo", interval: str = "1d") -> li
             "Accept": "application/json",
             "Referer": "https://finance.yahoo.com",
         }
-        _r = _rq.get(
+        _r = http_client.get(
             f"https://query2.finance.yahoo.com/v8/finance/chart/{ticker}?range={period}&interval={interval}&includeAdjustedClose=true",
             headers=_hdrs, timeout=8)
         if _r.status_code == 200:
@@ -654,8 +653,8 @@ def _fetch_candles(ticker: str, period: str = "6mo", interval: str = "1d") -> li
 
     # Source 2 : yf.download fallback
     try:
-        df = yf.download(ticker, period=period, interval=interval,
-                         progress=False, auto_adjust=True)
+        df = market_data.download(ticker, period=period, interval=interval,
+                                  progress=False, auto_adjust=True)
         if df.empty:
             return []
         if hasattr(df.columns, 'get_level_values'):
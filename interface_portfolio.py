@@ -8,11 +8,13 @@ P&L : Détaillé par position, historique, graphiques
 
 import streamlit as st
 import streamlit.components.v1 as components
-import yfinance as yf
+from chart_module import market_data
+from chart_module import portfolio as pf_engine
+from chart_module import ledger as pf_ledger
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
+from chart_module import http_client
 from datetime import datetime, timedelta
 import json
 from translations import t, get_lang
@@ -74,7 +76,7 @@ def _save_portfolio(positions: list):
             return
         url = f"{FIRESTORE_URL}/users/{uid}?updateMask.fieldPaths=portfolio_v2"
         payload = {"fields": {"portfolio_v2": _to_firestore(positions)}}
-        requests.patch(url, headers=_firestore_headers(id_token), json=payload, timeout=8)
+        http_client.patch(url, headers=_firestore_headers(id_token), json=payload, timeout=8)
     except Exception as e:
         st.warning(f"Erreur sauvegarde Firebase : {e}")
 
@@ -92,6 +94,8 @@ def _load_portfolio() -> list:
             id_token = st.session_state.get("user_id_token", "")
             if uid and id_token:
                 config = load_user_config(id_token, uid)
+                if config and "portfolio_tx" in config:
+                    st.session_state["portfolio_tx"] = config["portfolio_tx"]
                 if config and "portfolio_v2" in config:
                     data = config["portfolio_v2"]
                     st.session_state["portfolio_v2"] = data
@@ -103,33 +107,76 @@ def _load_portfolio() -> list:
     return []
 
 
+def _save_transactions(transactions: list):
+    """Sauvegarde le journal (ventes, dividendes, frais) — champ portfolio_tx."""
+    st.session_state["portfolio_tx"] = transactions
+    if not _is_logged_in():
+        return
+    try:
+        from firebase_auth import save_user_field
+        uid      = st.session_state.get("user_uid", "")
+        id_token = st.session_state.get("user_id_token", "")
+        if uid and id_token:
+            save_user_field(id_token, uid, "portfolio_tx", transactions)
+    except Exception as e:
+        st.warning(f"Erreur sauvegarde Firebase : {e}")
+
+
+def _load_transactions() -> list:
+    """Journal chargé avec le portfolio (_load_portfolio) ; vide par défaut."""
+    return st.session_state.get("portfolio_tx", [])
+
+
+def _get_ledger(enriched: list, transactions: list, method: str):
+    """
+    Journal incrémental gardé en session : les achats viennent des
+    positions, le reste de portfolio_tx. Seules les nouvelles
+    transactions sont appliquées d'un rendu à l'autre.
+    """
+    ledgers = st.session_state.setdefault("portfolio_ledger", {})
+    led = ledgers.get(method)
+    if led is None:
+        led = ledgers[method] = pf_ledger.Ledger(method)
+    led.sync(pf_ledger.from_positions(enriched) + transactions)
+    return led
+
+
 # ══════════════════════════════════════════════════════════════
 #  PRIX EN TEMPS RÉEL
 # ══════════════════════════════════════════════════════════════
 
 @st.cache_data(ttl=60, show_spinner=False)
 def _get_price(ticker_yf: str) -> float | None:
+    return _get_prices((ticker_yf,)).get(ticker_yf)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_prices(tickers: tuple) -> dict:
+    """Derniers prix de toutes les positions — un seul appel multi-tickers."""
     try:
-        t = yf.Ticker(ticker_yf)
-        hist = t.history(period="2d")
-        if hist.empty:
-            return None
-        return float(hist["Close"].iloc[-1])
-    except:
-        return None
+        return pf_engine.last_prices(tickers)
+    except Exception:
+        return {}
 
 
 @st.cache_data(ttl=60, show_spinner=False)
 def _get_price_history(ticker_yf: str, period: str = "1y") -> pd.DataFrame:
     try:
-        df = yf.download(ticker_yf, period=period, auto_adjust=True)
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+        df = market_data.history(ticker_yf, period=period)
         return df[["Close"]].dropna()
     except:
         return pd.DataFrame()
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def _get_close_matrix(tickers: tuple, period: str = "1y") -> pd.DataFrame:
+    """Clôtures alignées (dates × tickers) — un seul téléchargement."""
+    try:
+        return pf_engine.close_matrix(tickers, period=period)
+    except Exception:
+        return pd.DataFrame()
+
+
 def _yf_ticker(symbol: str, asset_type: str) -> str:
     """Convertit le symbole utilisateur en ticker Yahoo Finance."""
     s = symbol.upper().strip()
@@ -238,31 +285,25 @@ PORTFOLIO_CSS = """
 # ══════════════════════════════════════════════════════════════
 
 def _compute_positions(positions: list) -> list:
-    """Enrichit chaque position avec prix actuel, P&L, etc."""
-    enriched = []
-    for pos in positions:
-        ticker_yf = _yf_ticker(pos["symbol"], pos["asset_type"])
-        current   = _get_price(ticker_yf)
-        qty       = float(pos.get("qty", 0))
-        buy_price = float(pos.get("buy_price", 0))
-        fees      = float(pos.get("fees", 0))
-
-        if current is None:
-            current = buy_price  # fallback
-
-        cost_basis   = qty * buy_price + fees
-        market_value = qty * current
-        pnl_abs      = market_value - cost_basis
-        pnl_pct      = (pnl_abs / cost_basis * 100) if cost_basis else 0
+    """Enrichit chaque position avec prix actuel, P&L, poids, etc. (valorisation en lot)."""
+    if not positions:
+        return []
+    tickers = [_yf_ticker(pos["symbol"], pos["asset_type"]) for pos in positions]
+    prices  = _get_prices(tuple(dict.fromkeys(tickers)))
+    val     = pf_engine.value_positions(
+        [{**pos, "ticker_yf": tk} for pos, tk in zip(positions, tickers)], prices)
 
+    enriched = []
+    for i, (pos, ticker_yf) in enumerate(zip(positions, tickers)):
         enriched.append({
             **pos,
-            "ticker_yf":    ticker_yf,
-            "current_price": current,
-            "market_value":  market_value,
-            "cost_basis":    cost_basis,
-            "pnl_abs":       pnl_abs,
-            "pnl_pct":       pnl_pct,
+            "ticker_yf":     ticker_yf,
+            "current_price": float(val["current"][i]),
+            "market_value":  float(val["market_value"][i]),
+            "cost_basis":    float(val["cost_basis"][i]),
+            "pnl_abs":       float(val["pnl_abs"][i]),
+            "pnl_pct":       float(val["pnl_pct"][i]),
+            "weight":        float(val["weight"][i]),
             "display_sym":   _display_symbol(pos["symbol"], pos["asset_type"]),
         })
     return enriched
@@ -462,7 +503,7 @@ def _render_allocation_chart(enriched: list):
 #  GRAPHIQUE HISTORIQUE PORTFOLIO
 # ══════════════════════════════════════════════════════════════
 
-def _render_history_chart(enriched: list):
+def _render_history_chart(enriched: list, transactions: list = ()):
     if not enriched:
         return
 
@@ -472,48 +513,68 @@ def _render_history_chart(enriched: list):
                               index=2, key="port_hist_period",
                               format_func=lambda x: {"1mo":"1 Mois","3mo":"3 Mois","6mo":"6 Mois","1y":"1 An","2y":"2 Ans"}[x])
 
+    # ── NAV réelle depuis le journal (dates d'achat, ventes, dividendes) ──
+    method = st.radio("Coût de revient", list(pf_ledger.METHODS), horizontal=True,
+                      key="port_cost_method",
+                      format_func=lambda m: {"fifo": "FIFO", "average": "Prix moyen pondéré"}[m])
+    ledger = _get_ledger(enriched, list(transactions), method)
+
     with st.spinner("Calcul de l'historique..."):
-        all_series = {}
-        for pos in enriched:
-            df = _get_price_history(pos["ticker_yf"], period=period_opt)
-            if not df.empty:
-                all_series[pos["display_sym"]] = df["Close"] * float(pos["qty"])
+        closes_nav = _get_close_matrix(tuple(ledger.tickers),
+                                       period=pf_ledger.period_for(ledger.start))
+        nav = ledger.nav(closes_nav)
 
-    if not all_series:
-        st.warning("Impossible de récupérer l'historique des prix.")
-        return
+        # Une seule matrice de clôtures alignée (dates × tickers) pour les graphiques par position
+        tickers = [pos["ticker_yf"] for pos in enriched]
+        closes  = _get_close_matrix(tuple(dict.fromkeys(tickers)), period=period_opt)
+        values  = pf_engine.position_values(closes, tickers, [float(p["qty"]) for p in enriched])
 
-    # Aligner les séries sur le même index
-    df_all = pd.DataFrame(all_series).fillna(method="ffill").fillna(method="bfill").dropna()
-    if df_all.empty:
+    if nav.empty:
+        st.warning("Impossible de récupérer l'historique des prix.")
         return
 
-    portfolio_total = df_all.sum(axis=1)
-    cost_total = sum(float(p["qty"]) * float(p["buy_price"]) + float(p.get("fees", 0))
-                     for p in enriched)
+    months = {"1mo": 1, "3mo": 3, "6mo": 6, "1y": 12, "2y": 24}[period_opt]
+    view   = nav[nav.index >= nav.index[-1] - pd.DateOffset(months=months)]
+    if view.empty:
+        view = nav
+
+    invested   = view["invested"]
+    pnl_series = view["value"] + nav["income"].cumsum().reindex(view.index) - invested
+    twr_view   = ((1 + view["twr"]) / (1 + view["twr"].iloc[0]) - 1) * 100
+    mwr_curve  = ledger.mwr_series(nav)
+    mwr_curve  = mwr_curve[mwr_curve.index >= view.index[0]] * 100
+    mwr_total  = ledger.mwr(nav)
+
+    # KPIs de performance
+    book = ledger.book({p["ticker_yf"]: p["current_price"] for p in enriched})
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("TWR (période)", f"{twr_view.iloc[-1]:+.2f}%")
+    k2.metric("MWR annualisé", "—" if pd.isna(mwr_total) else f"{mwr_total * 100:+.2f}%")
+    k3.metric("P&L réalisé", f"${book['realized'].sum():,.2f}")
+    k4.metric("Dividendes − frais", f"${book['income'].sum():,.2f}")
 
     fig = make_subplots(
-        rows=2, cols=1, shared_xaxes=True,
-        vertical_spacing=0.06, row_heights=[0.7, 0.3],
-        subplot_titles=["Valeur totale du portefeuille", "P&L ($)"]
+        rows=3, cols=1, shared_xaxes=True,
+        vertical_spacing=0.05, row_heights=[0.5, 0.2, 0.3],
+        subplot_titles=["Valeur totale du portefeuille", "P&L ($)", "Performance (%)"]
     )
 
     # Valeur totale
     fig.add_trace(go.Scatter(
-        x=portfolio_total.index, y=portfolio_total.values,
+        x=view.index, y=view["value"].values,
         name="Valeur portfolio",
         line=dict(color="#ff6600", width=2),
         fill="tozeroy", fillcolor="rgba(255,102,0,0.05)"
     ), row=1, col=1)
 
-    # Ligne cost basis
-    fig.add_hline(y=cost_total, line_color="#4d9fff", line_dash="dash",
-                  line_width=1, row=1, col=1,
-                  annotation_text="Coût d'acquisition",
-                  annotation_font=dict(color="#4d9fff", size=9))
+    # Capital investi net (apports − retraits) — suit les vraies dates d'achat / vente
+    fig.add_trace(go.Scatter(
+        x=invested.index, y=invested.values,
+        name="Capital investi", line=dict(color="#4d9fff", width=1, dash="dash"),
+        line_shape="hv",
+    ), row=1, col=1)
 
     # P&L
-    pnl_series = portfolio_total - cost_total
     pnl_color  = ["#26a69a" if v >= 0 else "#ef5350" for v in pnl_series.values]
     fig.add_trace(go.Bar(
         x=pnl_series.index, y=pnl_series.values,
@@ -521,24 +582,46 @@ def _render_history_chart(enriched: list):
         showlegend=False,
     ), row=2, col=1)
 
+    # TWR (neutre aux apports) et MWR (TRI annualisé, fin de mois)
+    fig.add_trace(go.Scatter(
+        x=twr_view.index, y=twr_view.values, name="TWR",
+        line=dict(color="#ffd700", width=1.5),
+    ), row=3, col=1)
+    if not mwr_curve.empty:
+        fig.add_trace(go.Scatter(
+            x=mwr_curve.index, y=mwr_curve.values, name="MWR annualisé",
+            mode="lines+markers", line=dict(color="#00e5ff", width=1),
+            marker=dict(size=4),
+        ), row=3, col=1)
+
     fig.update_layout(
         template="plotly_dark", paper_bgcolor="#050505", plot_bgcolor="#050505",
-        height=460, margin=dict(l=20, r=20, t=40, b=20),
+        height=620, margin=dict(l=20, r=20, t=40, b=20),
         font=dict(family="IBM Plex Mono", color="#787b86"),
         xaxis_rangeslider_visible=False,
-        showlegend=False,
+        showlegend=True,
+        legend=dict(font=dict(size=9), bgcolor="rgba(0,0,0,0)", orientation="h", y=1.06),
     )
     st.plotly_chart(fig, use_container_width=True)
 
+    # Livre des positions (lots agrégés par ticker)
+    st.markdown('<div class="section-bar">» LIVRE DES POSITIONS</div>', unsafe_allow_html=True)
+    st.dataframe(
+        book.rename(columns={
+            "qty": "Qté", "avg_cost": "PRU", "cost_basis": "Coût", "realized": "P&L réalisé",
+            "income": "Div. − frais", "price": "Prix", "market_value": "Valeur",
+            "unrealized": "P&L latent"}).round(4),
+        use_container_width=True,
+    )
+
+    has_hist = values.notna().any(axis=0).to_numpy() if not values.empty else [False] * len(enriched)
+
     # Graphiques individuels
     st.markdown('<div class="section-bar">» PERFORMANCE PAR POSITION</div>', unsafe_allow_html=True)
     cols_ind = st.columns(2)
     for i, pos in enumerate(enriched):
-        if pos["ticker_yf"] in [p["ticker_yf"] for p in enriched]:
-            df_pos = _get_price_history(pos["ticker_yf"], period=period_opt)
-            if df_pos.empty:
-                continue
-            val_series = df_pos["Close"] * float(pos["qty"])
+        if has_hist[i]:
+            val_series = values.iloc[:, i].dropna()
             cost_line  = float(pos["qty"]) * float(pos["buy_price"])
             ret_pct    = (val_series.iloc[-1] - cost_line) / cost_line * 100 if cost_line else 0
             line_c     = "#26a69a" if ret_pct >= 0 else "#ef5350"
@@ -646,6 +729,72 @@ def _render_add_form(positions: list) -> list | None:
     return None
 
 
+TX_LABELS = {"sell": "Vente", "dividend": "Dividende", "fee": "Frais"}
+
+
+def _render_transaction_form(enriched: list, transactions: list) -> list | None:
+    """Ventes, dividendes et frais (les achats sont les positions). Retourne le journal mis à jour ou None."""
+    st.markdown('<div class="section-bar">» JOURNAL — VENTES · DIVIDENDES · FRAIS</div>', unsafe_allow_html=True)
+    if not enriched:
+        st.caption("Ajoutez d'abord une position.")
+        return None
+
+    tickers = list(dict.fromkeys(p["ticker_yf"] for p in enriched))
+    c1, c2, c3 = st.columns([1.2, 1.5, 1.3])
+    with c1:
+        kind = st.selectbox("Opération", list(TX_LABELS), format_func=TX_LABELS.get, key="tx_type")
+    with c2:
+        ticker = st.selectbox("Actif", tickers, key="tx_ticker")
+    with c3:
+        tx_date = st.date_input("Date", value=datetime.today(), max_value=datetime.today(),
+                                key="tx_date")
+
+    c4, c5, c6 = st.columns(3)
+    qty = price = amount = fees = 0.0
+    if kind == "sell":
+        with c4:
+            qty = st.number_input("Quantité vendue", min_value=0.0, value=0.0,
+                                  step=0.0001, format="%.6f", key="tx_qty")
+        with c5:
+            price = st.number_input("Prix de vente ($)", min_value=0.0, value=0.0,
+                                    step=0.01, format="%.4f", key="tx_price")
+        with c6:
+            fees = st.number_input("Frais ($)", min_value=0.0, value=0.0, step=0.01, key="tx_fees")
+    else:
+        with c4:
+            amount = st.number_input("Montant ($)", min_value=0.0, value=0.0, step=0.01,
+                                     key="tx_amount")
+
+    if st.button("＋ ENREGISTRER", key="btn_add_tx"):
+        if kind == "sell" and (qty <= 0 or price <= 0):
+            st.error("Quantité et prix de vente doivent être > 0.")
+            return None
+        if kind != "sell" and amount <= 0:
+            st.error("Le montant doit être > 0.")
+            return None
+        return transactions + [{
+            "id":     f"tx:{datetime.now().isoformat()}",
+            "date":   tx_date.isoformat(),
+            "type":   kind,
+            "ticker": ticker,
+            "qty":    round(qty, 8),
+            "price":  round(price, 8),
+            "fees":   round(fees, 4),
+            "amount": round(amount, 4),
+        }]
+
+    for i, tx in enumerate(transactions):
+        col_a, col_b = st.columns([6, 1])
+        detail = (f"{tx['qty']} @ ${tx['price']:,.4g}" if tx["type"] == "sell"
+                  else f"${tx['amount']:,.2f}")
+        col_a.markdown(f"**{TX_LABELS.get(tx['type'], tx['type'])}** · {tx['ticker']} — "
+                       f"{detail} · {tx['date']}")
+        if col_b.button("🗑️", key=f"del_tx_{i}"):
+            return transactions[:i] + transactions[i + 1:]
+
+    return None
+
+
 # ══════════════════════════════════════════════════════════════
 #  ONGLET ANALYSE DÉTAILLÉE
 # ══════════════════════════════════════════════════════════════
@@ -824,7 +973,7 @@ def show_portfolio():
     # ══════════════════════
     with tab_historique:
         if enriched:
-            _render_history_chart(enriched)
+            _render_history_chart(enriched, _load_transactions())
         else:
             st.info("Ajoutez des positions pour voir l'historique.")
 
@@ -852,6 +1001,13 @@ def show_portfolio():
                     _save_portfolio(positions)
                     st.rerun()
 
+        # Journal de transactions
+        st.markdown("---")
+        updated_tx = _render_transaction_form(enriched, _load_transactions())
+        if updated_tx is not None:
+            _save_transactions(updated_tx)
+            st.rerun()
+
         # Bouton sauvegarde manuelle
         st.markdown("---")
         col_sv1, col_sv2 = st.columns([3, 1])
@@ -1,8 +1,8 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import yfinance as yf
 import pandas as pd
 import feedparser
+from chart_module import http_client, market_data
 from datetime import datetime
 
 # ============================================
@@ -22,7 +22,7 @@ def get_ticker_from_name(query):
     try:
         # Recherche via l'API Yahoo Finance
         url = f"https://query2.finance.yahoo.com/v1/finance/search?q={query}"
-        res = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}).json()
+        res = http_client.get(url, headers={'User-Agent': 'Mozilla/5.0'}).json()
         if res['quotes']:
             return res['quotes'][0]['symbol']
     except:
@@ -76,8 +76,7 @@ def get_upcoming_events():
     symbols = ['AAPL', 'NVDA', 'BTC-USD', 'ETH-USD', 'TSLA']
     for symbol in symbols:
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="1d")
+            hist = market_data.history(symbol, period="1d")
             if not hist.empty:
                 price = hist['Close'].iloc[-1]
                 open_price = hist['Open'].iloc[0]
@@ -94,8 +93,7 @@ def get_heatmap_data():
     heatmap_data = []
     for symbol in symbols:
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="1d")
+            hist = market_data.history(symbol, period="1d")
             if not hist.empty:
                 price = hist['Close'].iloc[-1]
                 open_price = hist['Open'].iloc[0]
@@ -111,8 +109,7 @@ def get_market_stats():
     stats = []
     for symbol in symbols:
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="5d")
+            hist = market_data.history(symbol, period="5d")
             if len(hist) >= 2:
                 change_5d = ((hist['Close'].iloc[-1] - hist['Close'].iloc[0]) / hist['Close'].iloc[0]) * 100
                 stats.append({'symbol': symbol.replace('-USD', ''), 'change': change_5d})
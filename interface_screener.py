@@ -6,13 +6,9 @@ Affichage : tableau triable + mini graphiques Plotly
 """
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-import requests
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from translations import t, get_lang
 
 # ══════════════════════════════════════════
@@ -36,122 +32,47 @@ SP500_TOP50 = [
 ]
 
 # ══════════════════════════════════════════
-#  CALCULS TECHNIQUES
+#  CHARGEMENT DE L'UNIVERS (EN LOT)
 # ══════════════════════════════════════════
 
-def _rsi(closes: pd.Series, period=14) -> float:
-    try:
-        delta = closes.diff()
-        gain  = delta.clip(lower=0).rolling(period).mean()
-        loss  = (-delta.clip(upper=0)).rolling(period).mean()
-        rs    = gain / loss.replace(0, np.nan)
-        return round(float(100 - 100 / (1 + rs.iloc[-1])), 1)
-    except Exception:
-        return float("nan")
+def _load_universe(symbols, on_progress=None):
+    """
+    Prix de tout l'univers en un seul téléchargement multi-tickers
+    (cache OHLCV court) + fondamentaux en lot (cache long,
+    chart_module.fundamentals), puis construction de l'index
+    d'indicateurs (chart_module.screener_index). None si rien n'a pu
+    être chargé. `on_progress(fraction, texte)` est appelé entre les étapes.
+    """
+    from chart_module import market_data, fundamentals
+    from chart_module.screener_index import build_index
+
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    if not symbols:
+        return None
+    progress = on_progress or (lambda *_: None)
 
-def _perf(closes: pd.Series, days: int) -> float:
+    progress(0.05, f"Téléchargement des prix ({len(symbols)} tickers, 1 requête)...")
     try:
-        if len(closes) < days + 1:
-            return float("nan")
-        return round((closes.iloc[-1] / closes.iloc[-days] - 1) * 100, 2)
+        # 1 an : plus haut/bas 52 semaines et MM200
+        raw = market_data.download(symbols, period="1y", auto_adjust=True, threads=True)
     except Exception:
-        return float("nan")
+        return None
+    if raw is None or raw.empty:
+        return None
+    if isinstance(raw.columns, pd.MultiIndex):
+        closes, volumes = raw["Close"], raw["Volume"]
+    else:
+        closes  = raw[["Close"]].rename(columns={"Close": symbols[0]})
+        volumes = raw[["Volume"]].rename(columns={"Volume": symbols[0]})
+    closes = closes[[s for s in symbols if s in closes.columns]]
 
-# ══════════════════════════════════════════
-#  FETCH UN TICKER
-# ══════════════════════════════════════════
+    progress(0.5, "Fondamentaux (cache longue durée)...")
+    funds = fundamentals.get_many(list(closes.columns))
 
-def _fetch_ticker(symbol: str) -> dict | None:
-    try:
-        t  = yf.Ticker(symbol)
-
-        # Priorité : history pour le prix (plus fiable que fast_info sur Streamlit Cloud)
-        hist = t.history(period="3mo", auto_adjust=True)
-        if hist.empty or len(hist) < 5:
-            return None
-        if isinstance(hist.columns, pd.MultiIndex):
-            hist.columns = hist.columns.get_level_values(0)
-
-        price = float(hist["Close"].iloc[-1])
-        if not price or price == 0:
-            return None
-
-        # fast_info pour les métadonnées
-        mktcap   = None
-        shares   = None
-        currency = "USD"
-        prev     = float(hist["Close"].iloc[-2]) if len(hist) >= 2 else price
-        try:
-            fi       = t.fast_info
-            mktcap   = getattr(fi, "market_cap",     None)
-            shares   = getattr(fi, "shares",         None)
-            currency = getattr(fi, "currency",       "USD") or "USD"
-        except Exception:
-            pass
-
-        closes = hist["Close"].squeeze()
-        volume = float(hist["Volume"].iloc[-1]) if "Volume" in hist.columns else 0
-
-        # Info fondamentaux
-        info = {}
-        try:
-            import requests as _req
-            s = _req.Session()
-            s.headers["User-Agent"] = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36"
-            info = yf.Ticker(symbol, session=s).info or {}
-        except Exception:
-            try:
-                info = t.info or {}
-            except Exception:
-                pass
-
-        chg_1d  = _perf(closes, 1)
-        chg_5d  = _perf(closes, 5)
-        chg_1m  = _perf(closes, 21)
-        rsi_val = _rsi(closes)
-
-        pe      = info.get("trailingPE")   or info.get("forwardPE")
-        pb      = info.get("priceToBook")
-        eps     = info.get("trailingEps")  or info.get("forwardEps")
-        div_y   = info.get("dividendYield", 0) or 0
-        sector  = info.get("sector",   "—")
-        name    = info.get("shortName") or info.get("longName") or symbol
-
-        # EPS depuis income_stmt si absent
-        if not eps and shares:
-            try:
-                inc = t.income_stmt
-                if inc is not None and not inc.empty:
-                    for lbl in ["Net Income", "NetIncome", "Net Income Common Stockholders"]:
-                        if lbl in inc.index:
-                            eps = round(float(inc.loc[lbl].iloc[0]) / float(shares), 3)
-                            break
-            except Exception:
-                pass
-
-        # Stocker l'historique comme liste JSON-sérialisable
-        hist_prices = closes.tolist()[-63:]  # 3 mois max
-
-        return {
-            "symbol":    symbol,
-            "name":      name[:28],
-            "price":     round(float(price), 2),
-            "currency":  currency,
-            "mktcap":    float(mktcap) if mktcap else None,
-            "volume":    volume,
-            "chg_1d":    chg_1d,
-            "chg_5d":    chg_5d,
-            "chg_1m":    chg_1m,
-            "rsi":       rsi_val,
-            "pe":        round(float(pe), 1)  if pe  else None,
-            "pb":        round(float(pb), 2)  if pb  else None,
-            "eps":       round(float(eps), 3) if eps else None,
-            "div_yield": round(div_y * 100, 2) if div_y else 0.0,
-            "sector":    sector,
-            "hist":      hist_prices,
-        }
-    except Exception:
-        return None
+    progress(0.9, "Calcul de l'index d'indicateurs...")
+    index = build_index(closes, volumes, funds)
+    progress(1.0, f"{len(index)}/{len(symbols)} tickers chargés")
+    return index if len(index) else None
 
 # ══════════════════════════════════════════
 #  MINI GRAPHIQUE
@@ -179,22 +100,49 @@ def _mini_chart(closes: pd.Series, symbol: str, chg: float) -> go.Figure:
 # ══════════════════════════════════════════
 
 def _run_screener(symbols: tuple) -> pd.DataFrame:
-    """Fetch tous les tickers en parallèle et retourne le DataFrame brut."""
-    results = []
-    with ThreadPoolExecutor(max_workers=6) as ex:
-        futures = {ex.submit(_fetch_ticker, s): s for s in symbols}
-        for fut in as_completed(futures):
-            try:
-                data = fut.result(timeout=15)
-                if data:
-                    results.append(data)
-            except Exception:
-                continue
-    if not results:
-        return pd.DataFrame()
-    df = pd.DataFrame(results)
-    df = df.sort_values("mktcap", ascending=False, na_position="last")
-    return df
+    """Charge tout l'univers en lot et retourne le DataFrame brut."""
+    index = _load_universe(symbols)
+    return index.frame if index is not None else pd.DataFrame()
+
+
+def _build_query(f: dict) -> str:
+    """
+    Traduit les widgets de filtre en expression pour ScreenerIndex.query.
+    Une valeur manquante (NaN) ne fait pas échouer un filtre de plage,
+    comme avant.
+    """
+    def rng(col, lo, hi):
+        return f"(isna({col}) or {float(lo)!r} <= {col} <= {float(hi)!r})"
+
+    conds = [
+        rng("pe",  *f["pe"]),
+        rng("pb",  *f["pb"]),
+        f"(isna(eps) or eps >= {float(f['eps_min'])!r})",
+        f"div_yield >= {float(f['div_min'])!r}",
+        rng("rsi", *f["rsi"]),
+        rng("chg_1d", *f["chg1d"]),
+        rng("chg_1m", *f["chg1m"]),
+    ]
+    conds += {"Survente (<30)":  ["rsi < 30"],
+              "Neutre (30-70)":  ["30 <= rsi <= 70"],
+              "Surachat (>70)":  ["rsi > 70"]}.get(f["rsi_signal"], [])
+    if f["mc_min"] > 0:
+        conds.append(f"notna(mktcap) and mktcap >= {float(f['mc_min'])!r}")
+    if f["vol_min"] > 0:
+        conds.append(f"volume >= {float(f['vol_min'])!r}")
+    if f["d52"] != (-100.0, 0.0):
+        conds.append(rng("dist_52w_high", *f["d52"]))
+    if f["ma50"] != (-50.0, 50.0):
+        conds.append(rng("dist_ma50", *f["ma50"]))
+    if f["ma200"] != (-50.0, 50.0):
+        conds.append(rng("dist_ma200", *f["ma200"]))
+    if f["volz_min"] > -5.0:
+        conds.append(f"(isna(vol_z) or vol_z >= {float(f['volz_min'])!r})")
+    if f["sectors"]:
+        conds.append(f"sector in {tuple(f['sectors'])!r}")
+    if f["custom"].strip():
+        conds.append(f"({f['custom'].strip()})")
+    return " and ".join(conds)
 
 # ══════════════════════════════════════════
 #  UI
@@ -280,6 +228,17 @@ def show_screener():
         with m2:
             vol_min = st.selectbox("Volume minimum", ["Tous", ">100K", ">500K", ">1M", ">10M"], key="f_vol")
 
+    with st.expander("📉 Tendance & Volume — 52 semaines · MM50 / MM200 · Z-score volume", expanded=False):
+        r1, r2, r3, r4 = st.columns(4)
+        with r1:
+            d52 = st.slider("Distance plus haut 52s (%)", -100.0, 0.0, (-100.0, 0.0), step=1.0, key="f_d52")
+        with r2:
+            ma50 = st.slider("Distance MM50 (%)", -50.0, 50.0, (-50.0, 50.0), step=1.0, key="f_ma50")
+        with r3:
+            ma200 = st.slider("Distance MM200 (%)", -50.0, 50.0, (-50.0, 50.0), step=1.0, key="f_ma200")
+        with r4:
+            volz_min = st.slider("Z-score volume min", -5.0, 10.0, -5.0, step=0.5, key="f_volz")
+
     with st.expander("🏭 Secteur / Industrie", expanded=False):
         secteurs_dispo = [
             "Tous", "Technology", "Financial Services", "Consumer Cyclical",
@@ -289,6 +248,14 @@ def show_screener():
         secteur_filtre = st.multiselect("Secteurs", secteurs_dispo[1:], default=[], key="f_sector",
                                          placeholder="Tous les secteurs")
 
+    with st.expander("🧮 Requête avancée", expanded=False):
+        custom_query = st.text_input(
+            "Expression (colonnes : price, volume, chg_1d, chg_5d, chg_1m, chg_3m, rsi, "
+            "dist_52w_high, dist_52w_low, dist_ma20, dist_ma50, dist_ma200, vol_z, "
+            "pe, pb, eps, div_yield, mktcap, sector)",
+            value="", key="f_query",
+            placeholder="ex : rsi < 35 and dist_ma200 > 0 and vol_z > 1.5")
+
     # ── Lancement ────────────────────────────────────
     if run_btn or "sc_df" in st.session_state:
 
@@ -298,29 +265,18 @@ def show_screener():
                 return
             # Vider le cache précédent
             st.session_state.pop("sc_df", None)
+            st.session_state.pop("sc_index", None)
             prog = st.progress(0, text="Initialisation...")
             status = st.empty()
             
-            results = []
             total = len(symbols_list)
-            with ThreadPoolExecutor(max_workers=6) as ex:
-                futures = {ex.submit(_fetch_ticker, s): s for s in symbols_list}
-                done = 0
-                for fut in as_completed(futures):
-                    sym = futures[fut]
-                    try:
-                        data = fut.result(timeout=15)
-                        if data:
-                            results.append(data)
-                    except Exception:
-                        pass
-                    done += 1
-                    prog.progress(done / total, text=f"Analyse {sym}... ({done}/{total})")
+            index = _load_universe(symbols_list,
+                                   on_progress=lambda f, txt: prog.progress(f, text=txt))
             
             prog.empty()
             status.empty()
             
-            if not results:
+            if index is None:
                 st.error(f"Aucune donnée récupérée sur {total} tickers testés.")
                 # Test rapide sur le premier ticker pour diagnostiquer
                 if symbols_list:
@@ -339,58 +295,33 @@ def show_screener():
                         st.error(f"❌ Erreur : {_e}")
                 return
             
-            df_raw = pd.DataFrame(results)
-            df_raw = df_raw.sort_values("mktcap", ascending=False, na_position="last")
-            st.session_state.sc_df = df_raw
+            # Index construit une fois par chargement ; les filtres ne font que le requêter
+            st.session_state.sc_index = index
+            st.session_state.sc_df = index.frame
             st.session_state.sc_symbols = tuple(symbols_list)
-            st.success(f"✅ {len(results)}/{total} actions chargées")
+            st.success(f"✅ {len(index)}/{total} actions chargées")
 
-        df = st.session_state.get("sc_df", pd.DataFrame())
-        if df.empty:
+        index = st.session_state.get("sc_index")
+        if index is None:
             return
+        df = index.frame
 
-        # ── Application des filtres ──
-        df_f = df.copy()
-
-        # P/E
-        mask_pe = df_f["pe"].isna() | ((df_f["pe"] >= pe_min) & (df_f["pe"] <= pe_max))
-        df_f = df_f[mask_pe]
-        # P/B
-        mask_pb = df_f["pb"].isna() | ((df_f["pb"] >= pb_min) & (df_f["pb"] <= pb_max))
-        df_f = df_f[mask_pb]
-        # EPS
-        mask_eps = df_f["eps"].isna() | (df_f["eps"] >= eps_min)
-        df_f = df_f[mask_eps]
-        # Dividende
-        df_f = df_f[df_f["div_yield"] >= div_min]
-        # RSI
-        mask_rsi = df_f["rsi"].isna() | ((df_f["rsi"] >= rsi_min) & (df_f["rsi"] <= rsi_max))
-        df_f = df_f[mask_rsi]
-        if rsi_signal == "Survente (<30)":
-            df_f = df_f[df_f["rsi"] < 30]
-        elif rsi_signal == "Neutre (30-70)":
-            df_f = df_f[(df_f["rsi"] >= 30) & (df_f["rsi"] <= 70)]
-        elif rsi_signal == "Surachat (>70)":
-            df_f = df_f[df_f["rsi"] > 70]
-        # Variation 1j
-        mask_c1 = df_f["chg_1d"].isna() | ((df_f["chg_1d"] >= chg1d_min) & (df_f["chg_1d"] <= chg1d_max))
-        df_f = df_f[mask_c1]
-        # Variation 1m
-        mask_cm = df_f["chg_1m"].isna() | ((df_f["chg_1m"] >= chg1m_min) & (df_f["chg_1m"] <= chg1m_max))
-        df_f = df_f[mask_cm]
-        # Market Cap
-        mc_map = {"Toutes": 0, ">100M": 1e8, ">1Md": 1e9, ">10Md": 1e10, ">100Md": 1e11}
-        mc_threshold = mc_map.get(mc_min, 0)
-        if mc_threshold > 0:
-            df_f = df_f[df_f["mktcap"].notna() & (df_f["mktcap"] >= mc_threshold)]
-        # Volume
+        # ── Application des filtres (requête sur l'index) ──
+        mc_map  = {"Toutes": 0, ">100M": 1e8, ">1Md": 1e9, ">10Md": 1e10, ">100Md": 1e11}
         vol_map = {"Tous": 0, ">100K": 1e5, ">500K": 5e5, ">1M": 1e6, ">10M": 1e7}
-        vol_threshold = vol_map.get(vol_min, 0)
-        if vol_threshold > 0:
-            df_f = df_f[df_f["volume"] >= vol_threshold]
-        # Secteur
-        if secteur_filtre:
-            df_f = df_f[df_f["sector"].isin(secteur_filtre)]
+        query = _build_query({
+            "pe": (pe_min, pe_max), "pb": (pb_min, pb_max), "eps_min": eps_min,
+            "div_min": div_min, "rsi": (rsi_min, rsi_max), "rsi_signal": rsi_signal,
+            "chg1d": (chg1d_min, chg1d_max), "chg1m": (chg1m_min, chg1m_max),
+            "mc_min": mc_map.get(mc_min, 0), "vol_min": vol_map.get(vol_min, 0),
+            "d52": d52, "ma50": ma50, "ma200": ma200, "volz_min": volz_min,
+            "sectors": secteur_filtre, "custom": custom_query,
+        })
+        try:
+            df_f = df[index.query(query)]
+        except ValueError as e:
+            st.error(f"Requête invalide : {e}")
+            return
 
         # ── Résultats ──
         st.markdown("---")
@@ -418,7 +349,8 @@ def show_screener():
         with col_sort1:
             sort_by = st.selectbox("Trier par", [
                 "Market Cap", "Performance 1j", "Performance 1 mois",
-                "RSI", "P/E", "P/B", "Dividende", "Volume"
+                "RSI", "P/E", "P/B", "Dividende", "Volume",
+                "Distance plus haut 52s", "Distance MM200", "Z-score volume"
             ], key="sc_sort")
         with col_sort2:
             sort_asc = st.checkbox("Ordre croissant", value=False, key="sc_asc")
@@ -426,7 +358,9 @@ def show_screener():
         sort_map = {
             "Market Cap": "mktcap", "Performance 1j": "chg_1d",
             "Performance 1 mois": "chg_1m", "RSI": "rsi",
-            "P/E": "pe", "P/B": "pb", "Dividende": "div_yield", "Volume": "volume"
+            "P/E": "pe", "P/B": "pb", "Dividende": "div_yield", "Volume": "volume",
+            "Distance plus haut 52s": "dist_52w_high", "Distance MM200": "dist_ma200",
+            "Z-score volume": "vol_z",
         }
         df_sorted = df_f.sort_values(sort_map[sort_by], ascending=sort_asc, na_position="last")
 
@@ -522,7 +456,7 @@ def show_screener():
 
         # ── Export CSV ──
         st.markdown("---")
-        df_export = df_sorted.drop(columns=["_hist"], errors="ignore")
+        df_export = df_sorted.drop(columns=["hist"], errors="ignore")
         csv = df_export.to_csv(index=False).encode("utf-8")
         st.download_button(
             "⬇️ Exporter les résultats en CSV",
@@ -19,30 +19,19 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import numpy as np
-import requests
+from chart_module import http_client
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import time
 
 
 # ══════════════════════════════════════════════════════════════
 #  HTTP HELPER
 # ══════════════════════════════════════════════════════════════
 
-def _get(url, params=None, retries=2, timeout=10):
-    for _ in range(retries):
-        try:
-            r = requests.get(url, params=params, timeout=timeout,
-                             headers={"User-Agent": "Mozilla/5.0 (AM-Terminal/2.0)"})
-            if r.status_code == 429:
-                time.sleep(2)
-                continue
-            if r.status_code == 200:
-                return r.json()
-        except Exception:
-            pass
-    return None
+def _get(url, params=None, timeout=10):
+    # Retry/backoff (429, 5xx) et keep-alive gérés par la session partagée
+    return http_client.get_json(url, params=params, timeout=timeout)
 
 
 # ══════════════════════════════════════════════════════════════
@@ -229,7 +218,7 @@ def get_binance_liquidations():
 def get_coinbase_order_book(symbol="BTC"):
     try:
         url = f"https://api.exchange.coinbase.com/products/{symbol}-USD/book"
-        r = requests.get(url, params={"level":2}, timeout=10)
+        r = http_client.get(url, params={"level":2}, timeout=10)
         if r.status_code == 200:
             data = r.json()
             bids = pd.DataFrame(data.get("bids",[])[:15], columns=["Price","Quantity","Orders"])